@@ -14,6 +14,7 @@ from rich.status import Status
 from gac.errors import AIError
 from gac.oauth import refresh_token_if_expired
 from gac.oauth.token_store import TokenStore
+from gac.tokenizers import CHARS_PER_TOKEN, count_text_tokens
 from gac.utils import console
 
 __all__ = [
@@ -43,18 +44,19 @@ def extract_text_content(content: str | list[dict[str, str]] | dict[str, Any]) -
 
 
 def count_tokens(content: str | list[dict[str, str]] | dict[str, Any], model: str) -> int:
-    """Count tokens in content using character-based estimation (1 token per 3.4 characters)."""
-    text = extract_text_content(content)
-    if not text:
-        return 0
-    result = round(len(text) / 3.4)
-    return result if result > 0 else 1
+    """Count tokens in content for ``model``.
+
+    Uses the model family's byte-pair encoding when its vocabulary file is
+    available locally (see :mod:`gac.tokenizers`), otherwise estimates one
+    token per 3.4 characters.
+    """
+    return count_text_tokens(extract_text_content(content), model)
 
 
 def estimate_reasoning_tokens(reasoning_text: str) -> int:
     """Estimate reasoning tokens from the reasoning/thinking content text.
 
-    Uses the same 3.4 chars/token ratio as ``count_tokens``, but explicitly
+    Uses the character ratio ``count_tokens`` falls back to, but explicitly
     for reasoning content.  Returns 0 when the text is empty; callers can
     use it as a fallback when explicit token counts are unavailable.
 
@@ -64,7 +66,7 @@ def estimate_reasoning_tokens(reasoning_text: str) -> int:
     """
     if not reasoning_text or not reasoning_text.strip():
         return 0
-    result = round(len(reasoning_text) / 3.4)
+    result = round(len(reasoning_text) / CHARS_PER_TOKEN)
     return result if result > 0 else 1
 
 
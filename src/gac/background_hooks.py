@@ -0,0 +1,131 @@
+"""Run pre-commit and Lefthook hooks while the commit message is generated.
+
+Hooks only need to pass before the commit is created, and generating the
+message is mostly spent waiting on the AI provider, so with
+``--parallel-hooks`` both run at the same time.  The staged tree is
+recorded when the hooks start; if a hook changes what is staged, the
+message was written for a diff that no longer exists and
+:class:`StagedTreeChangedError` tells the caller to regenerate it.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import subprocess
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+
+from gac.errors import GitError
+from gac.utils import console
+
+logger = logging.getLogger(__name__)
+
+
+class StagedTreeChangedError(GitError):
+    """Hooks changed the staged files after the commit message was generated from them."""
+
+
+def _staged_tree() -> str | None:
+    """Object id of the tree the index would commit, or None if it cannot be written."""
+    from gac.git import run_git_command
+
+    result = run_git_command(["write-tree"], silent=True)
+    return result.output.strip() if result.success else None
+
+
+def run_hooks(hook_timeout: int, on_start: Callable[[subprocess.Popen[bytes]], None] | None = None) -> str | None:
+    """Run Lefthook and then pre-commit hooks.
+
+    Args:
+        hook_timeout: Timeout in seconds for each hook runner
+        on_start: Called with each hook runner's process once it has started
+
+    Returns:
+        Display name of the hook runner that failed, or None if all passed.
+    """
+    from gac.git import run_lefthook_hooks, run_pre_commit_hooks
+
+    if not run_lefthook_hooks(hook_timeout, on_start=on_start):
+        return "Lefthook"
+    if not run_pre_commit_hooks(hook_timeout, on_start=on_start):
+        return "Pre-commit"
+    return None
+
+
+def report_hook_failure(runner: str) -> None:
+    """Tell the user which hooks failed and how to skip them."""
+    console.print(f"[red]{runner} hooks failed. Please fix the issues and try again.[/red]")
+    console.print("[yellow]You can use --no-verify to skip pre-commit and lefthook hooks.[/yellow]")
+
+
+class BackgroundHooks:
+    """Hooks running on a worker thread, started before the message is generated.
+
+    The thread is a daemon and the running hook process is kept, so hooks
+    that are no longer wanted (the user aborted, or gac is exiting) are
+    stopped by :meth:`cancel` instead of holding up exit and restaging files
+    after gac has finished.
+    """
+
+    def __init__(self, hook_timeout: int) -> None:
+        self.tree_before = _staged_tree()
+        self._future: Future[str | None] = Future()
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen[bytes] | None = None
+        self._cancelled = False
+        atexit.register(self.cancel)
+        threading.Thread(target=self._run, args=(hook_timeout,), name="gac-hooks", daemon=True).start()
+        logger.debug(f"Started hooks in the background for tree {self.tree_before}")
+
+    def _run(self, hook_timeout: int) -> None:
+        try:
+            self._future.set_result(run_hooks(hook_timeout, on_start=self._started))
+        except BaseException as e:
+            self._future.set_exception(e)
+
+    def _started(self, process: subprocess.Popen[bytes]) -> None:
+        with self._lock:
+            self._process = process
+            cancelled = self._cancelled
+        if cancelled:
+            process.terminate()
+
+    def cancel(self) -> None:
+        """Stop the hooks if they are still running; no hook runner starts afterwards."""
+        with self._lock:
+            self._cancelled = True
+            process = self._process
+        atexit.unregister(self.cancel)
+        if process is not None and process.poll() is None:
+            logger.debug("Stopping background hooks")
+            process.terminate()
+
+    def wait(self) -> bool:
+        """Block until the hooks finish.
+
+        Returns:
+            True if the hooks passed, False (after reporting it) if they failed.
+
+        Raises:
+            StagedTreeChangedError: If the hooks changed the staged tree.
+        """
+        failed = self._future.result()
+        atexit.unregister(self.cancel)
+        if failed is not None:
+            report_hook_failure(failed)
+            return False
+        tree_after = _staged_tree()
+        if self.tree_before is not None and tree_after != self.tree_before:
+            raise StagedTreeChangedError(
+                f"Hooks changed the staged tree from {self.tree_before[:12]} to {(tree_after or 'unknown')[:12]}"
+            )
+        return True
+
+
+def finish_background_hooks(hooks: BackgroundHooks | None) -> bool:
+    """Wait for ``hooks`` if any are running; see :meth:`BackgroundHooks.wait`."""
+    if hooks is None:
+        return True
+    return hooks.wait()
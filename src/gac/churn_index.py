@@ -0,0 +1,168 @@
+"""Per-path commit frequency and recency, kept in ``.git/gac/churn-index.json``.
+
+Files that change often and recently are the ones a repository's history
+says matter: when the token budget is tight, an edit to one of them should
+win over an incidental change elsewhere.  :func:`get_churn_index` keeps a
+small index of how many commits touched each path and when it last
+changed, built from ``git log --name-only`` over the most recent
+``MAX_INDEXED_COMMITS`` commits and then updated incrementally from the
+last indexed commit to ``HEAD``.
+
+:meth:`ChurnIndex.factor` turns an entry into a score multiplier between 1
+and ``1 + MAX_CHURN_BOOST``; recency is measured from the newest indexed
+commit rather than the wall clock, so scores only change with history.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import NamedTuple
+
+from gac.state_files import gac_state_path, load_json_state, store_json_state
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "churn-index.json"
+INDEX_VERSION = 1
+# Commits read when the index is first built or must be rebuilt
+MAX_INDEXED_COMMITS = 2000
+# Paths kept in the index; the least recently changed are dropped first
+MAX_INDEXED_PATHS = 20000
+# Largest multiplier added to a section's importance
+MAX_CHURN_BOOST = 0.5
+# A path's churn counts half as much this long after it last changed
+RECENCY_HALF_LIFE_DAYS = 90
+
+_SECONDS_PER_DAY = 86400
+
+_memo: dict[str, ChurnIndex] = {}
+
+
+class ChurnIndex(NamedTuple):
+    """Commit counts and last change times of the paths in a repository's history.
+
+    Attributes:
+        head: Commit the index is up to date with
+        paths: ``(commits, last change time)`` by path
+        newest: Commit time of the newest indexed commit
+        most_commits: Highest commit count of any path
+    """
+
+    head: str
+    paths: dict[str, tuple[int, int]]
+    newest: int
+    most_commits: int
+
+    def factor(self, path: str) -> float:
+        """Importance multiplier for ``path``: 1.0 for unknown paths, up to ``1 + MAX_CHURN_BOOST``."""
+        commits, last_changed = self.paths.get(path, (0, 0))
+        if not commits:
+            return 1.0
+        frequency = math.log1p(commits) / math.log1p(self.most_commits)
+        age_days = max(0, self.newest - last_changed) / _SECONDS_PER_DAY
+        recency = math.pow(0.5, age_days / RECENCY_HALF_LIFE_DAYS)
+        return 1.0 + MAX_CHURN_BOOST * frequency * recency
+
+
+def _build(head: str, paths: dict[str, tuple[int, int]], newest: int) -> ChurnIndex:
+    return ChurnIndex(head, paths, newest, max((commits for commits, _ in paths.values()), default=0))
+
+
+def _read_log(revisions: list[str], paths: dict[str, tuple[int, int]]) -> int | None:
+    """Add the commits in ``git log <revisions>`` to ``paths``, returning the newest commit time."""
+    from gac.git import run_git_command
+
+    result = run_git_command(
+        ["log", "--no-merges", "--no-renames", "--name-only", "-z", "--format=%x01%ct", *revisions],
+        silent=True,
+        timeout=60,
+    )
+    if not result.success:
+        return None
+    newest = 0
+    for record in result.output.split("\x01")[1:]:
+        fields = record.split("\0")
+        try:
+            committed = int(fields[0])
+        except ValueError:
+            continue
+        newest = max(newest, committed)
+        for name in fields[1:]:
+            name = name.lstrip("\n")
+            if name:
+                commits, last_changed = paths.get(name, (0, 0))
+                paths[name] = (commits + 1, max(last_changed, committed))
+    return newest
+
+
+def _is_ancestor(commit: str, head: str) -> bool:
+    from gac.git import run_git_command
+
+    return run_git_command(["merge-base", "--is-ancestor", commit, head], silent=True).success
+
+
+def _load(path: str) -> ChurnIndex | None:
+    data = load_json_state(path)
+    if data.get("version") != INDEX_VERSION:
+        return None
+    try:
+        paths = {name: (int(entry[0]), int(entry[1])) for name, entry in data["paths"].items()}
+        return _build(str(data["head"]), paths, int(data["newest"]))
+    except (ValueError, TypeError, KeyError, IndexError, AttributeError):
+        return None
+
+
+def _store(path: str, index: ChurnIndex) -> None:
+    store_json_state(path, {"version": INDEX_VERSION, "head": index.head, "newest": index.newest, "paths": index.paths})
+
+
+def get_churn_index() -> ChurnIndex | None:
+    """The churn index of the current repository, brought up to date with ``HEAD``.
+
+    Returns:
+        The index, or None outside a repository, before the first commit or
+        if the history cannot be read
+    """
+    from gac.git import run_git_command
+
+    head_result = run_git_command(["rev-parse", "--verify", "--quiet", "HEAD"], silent=True)
+    if not head_result.success or not head_result.output:
+        return None
+    head = head_result.output
+    index_path = gac_state_path(INDEX_FILENAME)
+    if index_path is None:
+        return None
+    memoized = _memo.get(index_path)
+    if memoized is not None and memoized.head == head:
+        return memoized
+
+    stored = memoized or _load(index_path)
+    if stored is not None and stored.head == head:
+        _memo[index_path] = stored
+        return stored
+
+    index: ChurnIndex | None = None
+    # Only a descendant of the indexed commit can be read incrementally; after switching to another
+    # branch or an older commit, stored..HEAD is empty or skips commits and the index is rebuilt
+    if stored is not None and _is_ancestor(stored.head, head):
+        paths = dict(stored.paths)
+        newest = _read_log([f"{stored.head}..{head}"], paths)
+        if newest is not None:
+            index = _build(head, paths, max(stored.newest, newest))
+            logger.debug(f"Updated churn index from {stored.head[:12]} to {head[:12]}")
+    if index is None:
+        # No index yet, its commit is gone (e.g. after a history rewrite) or HEAD is not a descendant of it
+        paths = {}
+        newest = _read_log([f"--max-count={MAX_INDEXED_COMMITS}", head], paths)
+        if newest is None:
+            return None
+        index = _build(head, paths, newest)
+        logger.debug(f"Built churn index for {len(paths)} paths")
+
+    if len(index.paths) > MAX_INDEXED_PATHS:
+        recent = sorted(index.paths.items(), key=lambda item: item[1][1], reverse=True)[:MAX_INDEXED_PATHS]
+        index = _build(head, dict(recent), index.newest)
+    _store(index_path, index)
+    _memo[index_path] = index
+    return index
@@ -90,6 +90,11 @@ logger = logging.getLogger(__name__)
     default=0,
     help="Timeout for pre-commit and lefthook hooks in seconds (0 to use configuration)",
 )
+@click.option(
+    "--parallel-hooks",
+    is_flag=True,
+    help="Run pre-commit and lefthook hooks while the commit message is generated",
+)
 @click.option(
     "--50-72",
     "fifty_seventy_two",
@@ -124,6 +129,7 @@ def cli(
     skip_secret_scan: bool = False,
     no_verify_ssl: bool = False,
     hook_timeout: int = 0,
+    parallel_hooks: bool = False,
     signoff: bool = False,
 ) -> None:
     """Git Auto Commit - Generate commit messages with AI."""
@@ -194,6 +200,7 @@ def cli(
                 hook_timeout=hook_timeout if hook_timeout > 0 else config["hook_timeout"],
                 fifty_seventy_two=use_fifty_seventy_two,
                 signoff=use_signoff,
+                parallel_hooks=parallel_hooks,
             )
             exit_code = main(opts, config)
             sys.exit(exit_code)
@@ -225,6 +232,7 @@ def cli(
             "skip_secret_scan": skip_secret_scan,
             "no_verify_ssl": no_verify_ssl,
             "hook_timeout": hook_timeout,
+            "parallel_hooks": parallel_hooks,
             "fifty_seventy_two": fifty_seventy_two,
             "signoff": signoff,
         }
@@ -36,5 +36,11 @@ class Utility:
     """General utility constants."""
 
     DEFAULT_DIFF_TOKEN_LIMIT: int = 15000  # Maximum tokens for diff processing
+    QUESTION_DIFF_TOKEN_LIMIT: int = 2000  # Larger diffs are condensed for contextual question generation
+    MAX_BUFFERED_DIFF_LINES: int = 50000  # Larger staged diffs are streamed within the token budget
     MAX_WORKERS: int = os.cpu_count() or 4  # Maximum number of parallel workers
+    PARALLEL_MIN_SECTIONS: int = 1000  # Fewer diff sections are always processed in place
+    FREE_THREADED_MIN_CHARS: int = 1_000_000  # Diff size at which threads help on a free-threaded interpreter
     MAX_DISPLAYED_SECRET_LENGTH: int = 50  # Maximum length for displaying secrets
+    GIT_WORKER_POOL_SIZE: int = 4  # Maximum number of long-lived git helpers kept by the MCP server
+    GIT_WORKER_IDLE_TIMEOUT: float = 300.0  # Seconds before an idle git helper is closed
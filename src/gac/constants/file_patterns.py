@@ -108,3 +108,6 @@ class CodePatternImportance:
         r"\+\s*(test|describe|it|should)\s*\(": 1.1,  # Test definitions
         r"\+\s*(assert|expect)": 1.0,  # Assertions
     }
+
+    # Cap on the combined multiplier of all patterns found in one section
+    MAX_COMBINED_MULTIPLIER: float = 2.5
@@ -0,0 +1,163 @@
+"""Choose how many context lines each file's patch carries.
+
+The staged diff is read once with git's default context (three lines
+unless ``diff.context`` says otherwise).
+That is wasteful in both directions: a small change reads better with its
+whole enclosing function (``--function-context``), while a change far over
+the token budget spends 30-60% of its tokens on unchanged lines that
+``-U0`` would drop before any file has to be truncated away.
+
+:func:`choose_diff_contexts` picks a width per file from the numstat
+estimates against the budget, and :func:`apply_diff_contexts` refetches
+only the files whose width differs from the default, splicing their new
+sections into the diff.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from collections.abc import Iterable, Mapping
+
+from gac.diff_sections import parse_diff
+from gac.preprocess import estimate_entry_tokens, is_filtered_filename
+from gac.repo_snapshot import StagedEntry
+
+logger = logging.getLogger(__name__)
+
+FUNCTION_CONTEXT = "--function-context"
+NO_CONTEXT = "-U0"
+# Whatever git uses when no context option is given, which ``diff.context`` may change
+DEFAULT_CONTEXT = "default"
+
+CONTEXT_LABELS = {
+    FUNCTION_CONTEXT: "whole functions",
+    DEFAULT_CONTEXT: "default context",
+    NO_CONTEXT: "no context",
+}
+
+# Whole-function context is only requested while the estimated diff uses at
+# most this share of the budget, and only for files with few changed lines
+FUNCTION_CONTEXT_BUDGET_SHARE = 0.5
+FUNCTION_CONTEXT_MAX_CHANGED_LINES = 40
+# A section refetched with whole functions may be at most this many times
+# the size of its default-context section; a small change inside a huge
+# function (or a file git sees as one) keeps the default context instead
+FUNCTION_CONTEXT_MAX_GROWTH = 10
+
+
+def choose_diff_contexts(entries: Iterable[StagedEntry], token_limit: int) -> dict[str, str]:
+    """Pick a context option for each file whose patch should not use git's default.
+
+    When the estimated patch of all files fits well within ``token_limit``,
+    small files get ``--function-context``. When it exceeds the budget,
+    files estimated above an even share of the budget get ``-U0``. Binary
+    and filtered files, lockfiles among them, keep the default, since only
+    their header or version lines are used.
+
+    Args:
+        entries: Staged entries with numstat counts
+        token_limit: Maximum tokens for the diff
+
+    Returns:
+        Context option by path, for files that should be refetched
+    """
+    candidates = [e for e in entries if not e.is_binary and not is_filtered_filename(e.path)]
+    if not candidates:
+        return {}
+    estimates = {e.path: estimate_entry_tokens(e) for e in candidates}
+    total = sum(estimates.values())
+
+    if total <= token_limit * FUNCTION_CONTEXT_BUDGET_SHARE:
+        return {
+            e.path: FUNCTION_CONTEXT
+            for e in candidates
+            if e.status != "D" and 0 < (e.additions or 0) + (e.deletions or 0) <= FUNCTION_CONTEXT_MAX_CHANGED_LINES
+        }
+    if total > token_limit:
+        share = token_limit / len(candidates)
+        return {path: NO_CONTEXT for path, estimate in estimates.items() if estimate > share}
+    return {}
+
+
+def describe_diff_contexts(contexts: Mapping[str, str], total_files: int) -> str:
+    """Summarize the chosen context widths, e.g. ``no context for 2 files, default context for 5 files``."""
+    counts = Counter(contexts.values())
+    counts[DEFAULT_CONTEXT] += max(total_files - len(contexts), 0)
+    parts = []
+    for option in (FUNCTION_CONTEXT, NO_CONTEXT, DEFAULT_CONTEXT):
+        if counts[option]:
+            files = "file" if counts[option] == 1 else "files"
+            parts.append(f"{CONTEXT_LABELS[option]} for {counts[option]} {files}")
+    return ", ".join(parts)
+
+
+def apply_diff_contexts(
+    diff: str,
+    entries: Iterable[StagedEntry],
+    contexts: Mapping[str, str],
+    max_section_chars: int | None = None,
+) -> str:
+    """Replace the sections of files with a non-default context by refetched ones.
+
+    Files are fetched with one ``git diff --cached`` per context option.
+    Sections that cannot be refetched are kept as they are, and so are
+    sections whose refetched text is longer than ``max_section_chars`` or,
+    with ``--function-context``, :data:`FUNCTION_CONTEXT_MAX_GROWTH` times
+    their default-context text.
+
+    Args:
+        diff: Staged diff read with the default context
+        entries: Staged entries, used for the rename sources of refetched files
+        contexts: Context option by path, from :func:`choose_diff_contexts`
+        max_section_chars: Size limit for any refetched section, e.g. the
+            limit the sections of a streamed ``diff`` were read with
+
+    Returns:
+        The diff with refetched sections in place of the originals
+    """
+    from gac.git import run_git_command
+
+    if not contexts:
+        return diff
+
+    old_paths = {e.path: e.old_path for e in entries if e.old_path}
+    by_option: dict[str, list[str]] = {}
+    for path, option in contexts.items():
+        if option != DEFAULT_CONTEXT:
+            by_option.setdefault(option, []).append(path)
+
+    original = parse_diff(diff)
+    original_sizes = {section.path: len(section.text) for section in original if section.has_header}
+
+    replacements: dict[str, str] = {}
+    for option, paths in by_option.items():
+        pathspecs = [*paths, *(old_paths[path] for path in paths if path in old_paths)]
+        result = run_git_command(
+            ["--literal-pathspecs", "diff", "--cached", option, "--", *pathspecs],
+            silent=True,
+        )
+        if not result.success:
+            logger.debug(f"Could not refetch {len(paths)} files with {option}: {result.stderr}")
+            continue
+        wanted = set(paths)
+        for section in parse_diff(result.output):
+            if section.path in wanted:
+                text = section.text
+                limit = max_section_chars
+                if option == FUNCTION_CONTEXT and section.path in original_sizes:
+                    grown = original_sizes[section.path] * FUNCTION_CONTEXT_MAX_GROWTH
+                    limit = grown if limit is None else min(limit, grown)
+                if limit is not None and len(text) > limit:
+                    logger.debug(f"Keeping {section.path} with the default context: {option} exceeds the section limit")
+                    continue
+                replacements[section.path] = text if text.endswith("\n") else text + "\n"
+
+    if not replacements:
+        return diff
+    logger.info(f"Refetched {len(replacements)} files with adapted diff context")
+    sections = []
+    for section in original:
+        replacement = replacements.get(section.path) if section.has_header else None
+        sections.append(replacement if replacement is not None else section.text)
+    return "".join(sections)
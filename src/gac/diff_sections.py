@@ -0,0 +1,226 @@
+"""Parse a unified git diff into per-file section records.
+
+Preprocessing, the secret scanner, the MCP diff statistics and rename
+detection all need the same facts about each ``diff --git`` section: its
+paths, what kind of change it is, whether it is binary and how many lines
+it adds and removes.  :func:`parse_diff` walks the diff once and returns a
+compact :class:`DiffSection` per file so none of them has to split or
+regex-scan the text again.
+"""
+
+from __future__ import annotations
+
+_HEADER = "diff --git "
+
+
+class DiffSection:
+    """One file's section of a unified diff.
+
+    Attributes:
+        text: The section text, starting at its ``diff --git`` line
+        path: Path of the file after the change ("" for text before the first header)
+        old_path: Path before a rename or copy, otherwise None
+        change_type: "added", "deleted", "renamed", "copied" or "modified"
+        is_binary: Whether git reported a binary change
+        hunk_offsets: Character offsets of each ``@@`` hunk header within ``text``
+        additions: Number of added lines
+        deletions: Number of removed lines
+        has_patch_headers: Whether the section has both ``---`` and ``+++`` lines
+        elided_bytes: Characters of embedded data preprocessing removed from ``text``
+        folded_hunks: Copies of hunks shown in ``text`` that were removed from other places
+        folded_paths: Files dropped because all their hunks were folded into ``text``
+    """
+
+    __slots__ = (
+        "text",
+        "path",
+        "old_path",
+        "change_type",
+        "is_binary",
+        "hunk_offsets",
+        "additions",
+        "deletions",
+        "has_patch_headers",
+        "elided_bytes",
+        "folded_hunks",
+        "folded_paths",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        path: str = "",
+        old_path: str | None = None,
+        change_type: str = "modified",
+        is_binary: bool = False,
+        hunk_offsets: tuple[int, ...] = (),
+        additions: int = 0,
+        deletions: int = 0,
+        has_patch_headers: bool = False,
+    ) -> None:
+        self.text = text
+        self.path = path
+        self.old_path = old_path
+        self.change_type = change_type
+        self.is_binary = is_binary
+        self.hunk_offsets = hunk_offsets
+        self.additions = additions
+        self.deletions = deletions
+        self.has_patch_headers = has_patch_headers
+        self.elided_bytes = 0
+        self.folded_hunks = 0
+        self.folded_paths: tuple[str, ...] = ()
+
+    @property
+    def has_header(self) -> bool:
+        """Whether this is a file section rather than text preceding the first ``diff --git`` line."""
+        return self.text.startswith(_HEADER)
+
+    def __repr__(self) -> str:
+        return (
+            f"DiffSection(path={self.path!r}, old_path={self.old_path!r}, change_type={self.change_type!r}, "
+            f"is_binary={self.is_binary}, +{self.additions}/-{self.deletions}, hunks={len(self.hunk_offsets)})"
+        )
+
+
+def split_diff_header(line: str) -> tuple[str, str]:
+    """Split a ``diff --git a/<old> b/<new>`` line into its old and new paths.
+
+    When both paths are equal the split is unambiguous even if the path
+    itself contains `` b/``; otherwise the last `` b/`` separates them.
+    Lines that do not follow the ``a/``/``b/`` form return the raw remainder
+    for both paths.
+    """
+    rest = line[len(_HEADER) :] if line.startswith(_HEADER) else line
+    rest = rest.rstrip("\r\n")
+    if rest.startswith("a/"):
+        length = len(rest)
+        if length % 2 == 1:
+            half = (length - 5) // 2
+            if rest[half + 2 : half + 5] == " b/" and rest[2 : half + 2] == rest[half + 5 :]:
+                return rest[2 : half + 2], rest[half + 5 :]
+        separator = rest.rfind(" b/")
+        if separator != -1:
+            return rest[2:separator], rest[separator + 3 :]
+    return rest, rest
+
+
+def parse_diff_section(text: str) -> DiffSection:
+    """Parse the text of a single file section."""
+    path = ""
+    old_path: str | None = None
+    rename_from: str | None = None
+    rename_to: str | None = None
+    change_type = "modified"
+    is_binary = False
+    hunk_offsets: list[int] = []
+    additions = deletions = 0
+    seen_minus = seen_plus = False
+    in_body = False
+
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        first = line[:1]
+        if in_body:
+            if first == "+":
+                additions += 1
+            elif first == "-":
+                deletions += 1
+            elif first == "@" and line.startswith("@@"):
+                hunk_offsets.append(offset)
+        elif line.startswith("@@"):
+            in_body = True
+            hunk_offsets.append(offset)
+        elif line.startswith(_HEADER):
+            old_path, path = split_diff_header(line)
+        elif line.startswith("--- ") and not seen_minus:
+            seen_minus = True
+        elif line.startswith("+++ ") and not seen_plus:
+            seen_plus = True
+        elif first == "+":
+            in_body = True
+            additions += 1
+        elif first == "-":
+            in_body = True
+            deletions += 1
+        elif line.startswith("new file mode"):
+            change_type = "added"
+        elif line.startswith("deleted file mode"):
+            change_type = "deleted"
+        elif line.startswith("rename from "):
+            rename_from = line[len("rename from ") :].rstrip("\r\n")
+            change_type = "renamed"
+        elif line.startswith("rename to "):
+            rename_to = line[len("rename to ") :].rstrip("\r\n")
+        elif line.startswith("copy from "):
+            rename_from = line[len("copy from ") :].rstrip("\r\n")
+            change_type = "copied"
+        elif line.startswith("copy to "):
+            rename_to = line[len("copy to ") :].rstrip("\r\n")
+        elif line.startswith("Binary files "):
+            is_binary = True
+        elif line.startswith("GIT binary patch"):
+            is_binary = True
+            in_body = True
+        offset += len(line)
+
+    # "rename from"/"rename to" lines are unambiguous even when paths contain " b/"
+    if rename_to is not None:
+        path = rename_to
+    if rename_from is not None:
+        old_path = rename_from
+    if old_path == path:
+        old_path = None
+
+    return DiffSection(
+        text,
+        path=path,
+        old_path=old_path,
+        change_type=change_type,
+        is_binary=is_binary,
+        hunk_offsets=tuple(hunk_offsets),
+        additions=additions,
+        deletions=deletions,
+        has_patch_headers=seen_minus and seen_plus,
+    )
+
+
+def blob_ids(section: DiffSection) -> tuple[str, str] | None:
+    """Old and new blob IDs from the section's ``index <old>..<new>`` line, if it has one.
+
+    Added and deleted files have an all-zero ID on the missing side.
+    """
+    start = section.text.find("\nindex ")
+    if start == -1 or (section.hunk_offsets and start > section.hunk_offsets[0]):
+        return None
+    end = section.text.find("\n", start + 1)
+    ids = section.text[start + len("\nindex ") : end if end != -1 else None].split(" ", 1)[0]
+    old, separator, new = ids.partition("..")
+    if not separator or not old or not new:
+        return None
+    return old, new
+
+
+def parse_diff(diff: str) -> list[DiffSection]:
+    """Split a diff into sections at each ``diff --git`` line and parse them.
+
+    Text before the first header, if any, becomes a section without a path.
+    """
+    if not diff:
+        return []
+
+    starts = [0] if diff.startswith(_HEADER) else []
+    position = diff.find("\n" + _HEADER)
+    while position != -1:
+        starts.append(position + 1)
+        position = diff.find("\n" + _HEADER, position + 1)
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+
+    ends = starts[1:] + [len(diff)]
+    return [parse_diff_section(diff[start:end]) for start, end in zip(starts, ends, strict=True) if end > start]
+
+
+def as_diff_section(section: str | DiffSection) -> DiffSection:
+    """Return ``section`` parsed, reusing it if it already is a :class:`DiffSection`."""
+    return section if isinstance(section, DiffSection) else parse_diff_section(section)
@@ -0,0 +1,337 @@
+"""Streaming reader for very large staged diffs.
+
+Buffering a multi-gigabyte ``git diff --cached`` only for ``preprocess_diff``
+to throw most of it away costs gigabytes of memory.  This module reads the
+diff from a ``Popen`` pipe instead and yields one ``diff --git`` section at
+a time.  Every line is still shown to the secret scanner as it passes, but
+patch bodies are only kept while they can still make it into the token
+budget:
+
+- files that preprocessing would filter anyway (generated, minified,
+  build output) keep only their header, and lockfiles only the lines
+  naming package versions,
+- a section stops growing once it alone exceeds the budget, and
+- once higher-scoring sections already fill the budget, lower-priority
+  files keep only a one-line summary, and
+- with a :class:`~gac.preprocess.DiffPlan`, only files picked from the
+  numstat estimates are kept (or even requested from git at all).
+"""
+
+from __future__ import annotations
+
+import logging
+import subprocess
+from collections.abc import Callable, Iterator, Sequence
+from typing import NamedTuple
+
+from gac.ai_utils import count_tokens
+from gac.churn_index import MAX_CHURN_BOOST
+from gac.constants import CodePatternImportance, Utility
+from gac.diff_sections import parse_diff_section, split_diff_header
+from gac.errors import GitError
+from gac.lockfile_diff import lockfile_line_filter
+from gac.preprocess import (
+    DiffPlan,
+    calculate_section_importance,
+    condense_section,
+    extract_filtered_file_summary,
+    get_extension_score,
+    is_filtered_filename,
+    should_filter_section,
+)
+from gac.repo_snapshot import StagedEntry
+from gac.security import DetectedSecret, DiffSecretScanner
+from gac.tokenizers import CHARS_PER_TOKEN
+from gac.utils import decode_output
+
+logger = logging.getLogger(__name__)
+
+_UNPLANNED = "not selected for the token budget from numstat estimates"
+
+# Most the churn index can raise a score when the diff is finally ranked;
+# sections are compared here without it.
+_MAX_CHURN_FACTOR = 1.0 + MAX_CHURN_BOOST
+
+# Highest score the content of a section can add on top of its file type:
+# new-file bonus x maximum change factor x capped code pattern multiplier x churn boost.
+_MAX_CONTENT_MULTIPLIER = 1.2 * 2.0 * CodePatternImportance.MAX_COMBINED_MULTIPLIER * _MAX_CHURN_FACTOR
+
+
+class StreamedSection(NamedTuple):
+    """One file section read from a streamed diff."""
+
+    filename: str
+    text: str
+    complete: bool
+    additions: int
+    deletions: int
+
+
+class StreamedDiff(NamedTuple):
+    """Result of reading a staged diff within a token budget."""
+
+    diff: str
+    secrets: list[DetectedSecret]
+    total_files: int
+    omitted_files: list[str]
+
+
+def _summarize_entry(entry: StagedEntry) -> str:
+    """Summary section for a file whose patch was not fetched."""
+    header = f"diff --git a/{entry.old_path or entry.path} b/{entry.path}\n"
+    if entry.is_binary:
+        return extract_filtered_file_summary(header, "[Binary file change]")
+    if is_filtered_filename(entry.path):
+        return extract_filtered_file_summary(header)
+    return header + f"[Omitted: {_UNPLANNED}, +{entry.additions}/-{entry.deletions} lines]\n"
+
+
+def max_section_importance(filename: str) -> float:
+    """Upper bound of the churn-weighted importance of any patch of ``filename``."""
+    return get_extension_score(filename) * _MAX_CONTENT_MULTIPLIER
+
+
+def section_char_limit(token_limit: int) -> int:
+    """Characters of a streamed section's body retained before it is summarized instead."""
+    return int(token_limit * CHARS_PER_TOKEN) + 1
+
+
+def iter_diff_sections(
+    args: Sequence[str] = ("diff", "--cached"),
+    keep_body: Callable[[str], bool] | None = None,
+    on_line: Callable[[str], None] | None = None,
+    max_section_chars: int | None = None,
+    body_filter: Callable[[str], Callable[[str], bool] | None] | None = None,
+) -> Iterator[StreamedSection]:
+    """Yield file sections of ``git <args>`` as they arrive on the pipe.
+
+    Args:
+        args: Git arguments producing a patch
+        keep_body: Called with each filename when its header arrives; returning
+            False keeps only the header lines of that section
+        on_line: Called with every line of the diff, retained or not
+        max_section_chars: Stop retaining a section's body beyond this size
+        body_filter: Called with each filename when its header arrives; a
+            returned predicate selects the body lines to retain regardless of
+            ``keep_body`` and ``max_section_chars``; dropping the others
+            leaves the section complete
+
+    Yields:
+        StreamedSection per file, in diff order. ``complete`` is False when
+        part of the body was not retained.
+
+    Raises:
+        GitError: If git cannot be started or exits with an error.
+    """
+    try:
+        process = subprocess.Popen(["git", *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitError(f"Failed to run git {' '.join(args)}: {e}") from e
+
+    filename = ""
+    lines: list[str] = []
+    size = 0
+    retain = True
+    keep_line: Callable[[str], bool] | None = None
+    complete = True
+    in_body = False
+    additions = deletions = 0
+
+    def _section() -> StreamedSection:
+        return StreamedSection(filename, "".join(lines), complete, additions, deletions)
+
+    finished = False
+    try:
+        assert process.stdout is not None
+        for raw in process.stdout:
+            line = decode_output(raw)
+            if on_line is not None:
+                on_line(line[:-1] if line.endswith("\n") else line)
+
+            if line.startswith("diff --git "):
+                if lines:
+                    yield _section()
+                filename = split_diff_header(line)[1]
+                lines, size = [line], len(line)
+                retain = keep_body(filename) if keep_body is not None else True
+                keep_line = body_filter(filename) if body_filter is not None else None
+                complete, in_body = True, False
+                additions = deletions = 0
+                continue
+
+            if line.startswith(("@@", "GIT binary patch")):
+                in_body = True
+            elif in_body and line.startswith("+"):
+                additions += 1
+            elif in_body and line.startswith("-"):
+                deletions += 1
+
+            if in_body and keep_line is not None:
+                if not keep_line(line):
+                    continue
+            elif in_body and (not retain or (max_section_chars is not None and size + len(line) > max_section_chars)):
+                complete = False
+                continue
+            lines.append(line)
+            size += len(line)
+
+        if lines:
+            yield _section()
+        finished = True
+    finally:
+        if not finished and process.poll() is None:
+            process.kill()
+        stderr = process.stderr.read() if process.stderr is not None else b""
+        returncode = process.wait()
+        if process.stdout is not None:
+            process.stdout.close()
+        if process.stderr is not None:
+            process.stderr.close()
+
+    if returncode != 0:
+        message = decode_output(stderr).strip() or f"git exited with code {returncode}"
+        raise GitError(f"Failed to stream git {' '.join(args)}: {message}")
+
+
+def read_diff_within_budget(
+    token_limit: int = Utility.DEFAULT_DIFF_TOKEN_LIMIT,
+    model: str = "anthropic:claude-3-haiku-latest",
+    scan_secrets: bool = True,
+    args: Sequence[str] = ("diff", "--cached"),
+    plan: DiffPlan | None = None,
+    exclude: Sequence[str] = (),
+) -> StreamedDiff:
+    """Stream a diff, scanning every line for secrets but keeping only what can fit ``token_limit``.
+
+    A section's body is dropped once the sections already read that are
+    guaranteed to score higher fill the budget on their own. Dropped
+    sections are replaced by their header and a one-line summary.
+
+    With a numstat ``plan``, only the planned files' bodies are kept. When
+    secrets need not be scanned, git is asked for just those paths, so the
+    other patches are never produced at all. Otherwise the ``exclude``
+    pathspecs (e.g. from :attr:`RepoSnapshot.exclude_pathspecs`) keep files
+    the caller summarizes itself out of the diff.
+
+    Returns:
+        StreamedDiff with the retained diff text, secrets and omitted filenames.
+    """
+    planned: set[str] | None = None
+    pathspec_limited = False
+    if plan is not None:
+        planned = {e.path for e in plan.included}
+        pathspec_limited = not scan_secrets
+        if pathspec_limited:
+            args = ("--literal-pathspecs", *args, "--", *plan.pathspecs)
+    if exclude and not pathspec_limited:
+        args = (*args, "--", ":(top)", *exclude)
+
+    scanner = DiffSecretScanner() if scan_secrets else None
+    max_section_chars = section_char_limit(token_limit)
+
+    # Retained full sections as (position in ``sections``, score, tokens, section)
+    kept: list[tuple[int, float, int, StreamedSection]] = []
+    sections: list[str] = []
+    omitted: list[str] = []
+    outranked: set[str] = set()
+
+    def _keep_body(filename: str) -> bool:
+        if is_filtered_filename(filename) or (planned is not None and filename not in planned):
+            return False
+        bound = max_section_importance(filename)
+        if sum(tokens for _, score, tokens, _ in kept if score > bound) < token_limit:
+            return True
+        outranked.add(filename)
+        return False
+
+    def _omit(index: int, section: StreamedSection, reason: str) -> None:
+        header = [line for line in section.text.split("\n") if line and not line.startswith(("@@", "+", "-", " "))]
+        summary = f"[Omitted: {reason}, +{section.additions}/-{section.deletions} lines]"
+        sections[index] = "\n".join(header + [summary]) + "\n"
+        omitted.append(section.filename)
+
+    streamed = (
+        iter_diff_sections(
+            args,
+            keep_body=_keep_body,
+            on_line=scanner.feed if scanner is not None else None,
+            max_section_chars=max_section_chars,
+            body_filter=lockfile_line_filter,
+        )
+        if not pathspec_limited or planned
+        else iter(())
+    )
+
+    total_files = 0
+    for section in streamed:
+        total_files += 1
+        index = len(sections)
+        sections.append(section.text)
+
+        parsed = parse_diff_section(section.text)
+        condensed = condense_section(parsed) if section.complete else None
+        if condensed is not None:
+            sections[index] = condensed
+            continue
+        if is_filtered_filename(section.filename) or should_filter_section(parsed):
+            sections[index] = extract_filtered_file_summary(parsed)
+            continue
+        if not section.complete:
+            if planned is not None and section.filename not in planned:
+                _omit(index, section, _UNPLANNED)
+            elif section.filename in outranked:
+                _omit(index, section, "lower priority than changes that already fill the token budget")
+            else:
+                _omit(index, section, "larger than the whole token budget")
+            continue
+
+        kept.append((index, calculate_section_importance(parsed), count_tokens(section.text, model), section))
+
+        # Release earlier sections once higher-scoring ones fill the budget on their own
+        kept.sort(key=lambda item: item[1], reverse=True)
+        filled = 0
+        for position, (_, score, tokens, _) in enumerate(kept):
+            filled += tokens
+            if filled >= token_limit:
+                cut = position + 1
+                # Keep sections churn could still lift above the last one needed
+                while cut < len(kept) and kept[cut][1] * _MAX_CHURN_FACTOR >= score:
+                    cut += 1
+                for dropped_index, _, _, dropped in kept[cut:]:
+                    _omit(dropped_index, dropped, "lower priority than changes that already fill the token budget")
+                del kept[cut:]
+                break
+
+    if pathspec_limited and plan is not None:
+        # git never produced these sections; summarize them from their numstat entries
+        for entry in plan.omitted:
+            total_files += 1
+            sections.append(_summarize_entry(entry))
+            if not entry.is_binary and not is_filtered_filename(entry.path):
+                omitted.append(entry.path)
+
+    if omitted:
+        logger.info(f"Streamed diff: kept {total_files - len(omitted)} of {total_files} files within the token budget")
+
+    return StreamedDiff(
+        diff="".join(sections).strip(),
+        secrets=scanner.secrets if scanner is not None else [],
+        total_files=total_files,
+        omitted_files=omitted,
+    )
+
+
+def scan_staged_paths(pathspecs: Sequence[str]) -> list[DetectedSecret]:
+    """Scan the staged patches of ``pathspecs`` for secrets without retaining any of their text.
+
+    Raises:
+        GitError: If git cannot be started or exits with an error.
+    """
+    if not pathspecs:
+        return []
+    scanner = DiffSecretScanner()
+    for _ in iter_diff_sections(
+        ("diff", "--cached", "--", *pathspecs), keep_body=lambda _: False, on_line=scanner.feed
+    ):
+        pass
+    return scanner.secrets
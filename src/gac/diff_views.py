@@ -0,0 +1,113 @@
+"""Full, condensed and file-list views of a processed diff.
+
+The commit prompt needs the processed patch, but other calls about the same
+changes do not: contextual questions only need to know what was touched and
+where.  :func:`build_diff_views` parses the processed diff once and derives
+every view from those sections, with the token count of each, so a caller
+can pick the cheapest view that serves its purpose instead of sending the
+whole patch again.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+from gac.ai_utils import count_tokens
+from gac.diff_sections import DiffSection, parse_diff
+
+# Changed lines that declare a type or function, in the languages gac scores
+_SIGNATURE = re.compile(
+    r"[+-]\s*(?:(?:export|default|public|private|protected|internal|static|abstract|async|pub)\s+)*"
+    r"(?:class|interface|enum|struct|trait|impl|type|def|function|func|fn)\s+\w+"
+)
+
+
+class DiffViews(NamedTuple):
+    """Views of one processed diff at decreasing resolution, with their token counts.
+
+    Attributes:
+        full: The processed diff itself
+        condensed: Diff headers, hunk headers and changed signature lines only
+        file_list: One line per changed file with its change type and line counts
+        full_tokens: Tokens in ``full``
+        condensed_tokens: Tokens in ``condensed``
+        file_list_tokens: Tokens in ``file_list``
+    """
+
+    full: str
+    condensed: str
+    file_list: str
+    full_tokens: int
+    condensed_tokens: int
+    file_list_tokens: int
+
+    def fitting(self, token_limit: int) -> str:
+        """The most detailed view within ``token_limit``, or the file list if none fits."""
+        if self.full_tokens <= token_limit:
+            return self.full
+        if self.condensed_tokens <= token_limit:
+            return self.condensed
+        return self.file_list
+
+
+def condense_to_signatures(section: DiffSection) -> str:
+    """Reduce a section to its headers, hunk headers and changed signature lines.
+
+    Notes and summaries that preprocessing added to the section are kept;
+    context lines and other changed lines are dropped.
+    """
+    if not section.has_header:
+        return section.text
+    kept: list[str] = []
+    in_body = False
+    for line in section.text.splitlines(keepends=True):
+        first = line[:1]
+        if not in_body:
+            if line.startswith("@@"):
+                in_body = True
+            elif line.startswith("index "):
+                continue
+            kept.append(line)
+        elif first in " \\\r\n":
+            # Context lines, including blank ones whose leading space was stripped
+            continue
+        elif first in "+-":
+            if _SIGNATURE.match(line):
+                kept.append(line)
+        else:
+            kept.append(line)
+    return "".join(kept)
+
+
+def describe_section(section: DiffSection) -> str | None:
+    """One file-list line for ``section``, or None for text preceding the first file."""
+    if not section.has_header:
+        return None
+    path = f"{section.old_path} -> {section.path}" if section.old_path else section.path
+    if section.is_binary:
+        return f"{path} ({section.change_type}, binary)"
+    return f"{path} ({section.change_type}, +{section.additions}/-{section.deletions})"
+
+
+def build_diff_views(diff: str, model: str) -> DiffViews:
+    """Build every view of ``diff`` from a single parse.
+
+    Args:
+        diff: The processed diff
+        model: Model identifier for token counting
+
+    Returns:
+        The views and their token counts
+    """
+    sections = parse_diff(diff)
+    condensed = "".join(condense_to_signatures(section) for section in sections).strip()
+    file_list = "\n".join(line for line in map(describe_section, sections) if line is not None)
+    return DiffViews(
+        full=diff,
+        condensed=condensed,
+        file_list=file_list,
+        full_tokens=count_tokens(diff, model) if diff else 0,
+        condensed_tokens=count_tokens(condensed, model) if condensed else 0,
+        file_list_tokens=count_tokens(file_list, model) if file_list else 0,
+    )
@@ -0,0 +1,149 @@
+"""Collapse embedded base64, data URI and hex blobs in text diffs.
+
+Whole minified or binary files are filtered by preprocessing, but ordinary
+text files often carry inline data: data URIs in CSS and SVG, PEM
+certificates, fixtures with base64 payloads or hex dumps.  A few kilobytes
+of such data cost thousands of tokens and tell the model nothing, so
+:func:`collapse_embedded_blobs` replaces long high-entropy runs on added and
+removed lines with a placeholder such as ``<base64 12.4KB>`` and records
+how much text it elided on the returned section.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+
+from gac.diff_sections import DiffSection, as_diff_section, parse_diff_section
+
+# Shortest base64 or hex run collapsed within a line
+MIN_BLOB_CHARS = 100
+# Consecutive changed lines that are each entirely base64 (e.g. a PEM body)
+# are collapsed together once there are this many of at least MIN_BLOB_LINE_CHARS
+MIN_BLOB_LINES = 3
+MIN_BLOB_LINE_CHARS = 40
+
+# Random base64 carries about 6 bits per character and random hex 4; prose,
+# identifiers and repeated padding stay well below these
+_BASE64_MIN_ENTROPY = 4.5
+_HEX_MIN_ENTROPY = 3.0
+
+# Cheap prefilters: sections with neither a long unbroken run nor 0x-prefixed
+# byte lists are returned without a line-by-line scan
+_LONG_RUN = re.compile(rf"[A-Za-z0-9+/_-]{{{MIN_BLOB_LINE_CHARS},}}")
+_HEX_LIST = re.compile(r"(?:0x[0-9a-fA-F]{2},\s*){16}")
+_DATA_URI = re.compile(
+    rf"(data:[\w.+-]+/[\w.+-]+(?:;[\w.+-]+=[\w.+-]+)*;base64,)([A-Za-z0-9+/]{{{MIN_BLOB_CHARS},}}=*)"
+)
+_HEX_RUN = re.compile(rf"(?<![0-9A-Za-z])[0-9a-fA-F]{{{MIN_BLOB_CHARS},}}(?![0-9A-Za-z])")
+_HEX_BYTES = re.compile(rf"(?:(?:0x)?[0-9a-fA-F]{{2}}(?:,\s*|\s+)){{{MIN_BLOB_CHARS // 2},}}(?:0x)?[0-9a-fA-F]{{2}}\b")
+_BASE64_RUN = re.compile(
+    rf"(?<![A-Za-z0-9+/])[A-Za-z0-9+/]{{{MIN_BLOB_CHARS},}}={{0,2}}|[A-Za-z0-9_-]{{{MIN_BLOB_CHARS},}}"
+)
+_BASE64_LINE = re.compile(rf"^(\s*)[\"']?([A-Za-z0-9+/]{{{MIN_BLOB_LINE_CHARS},}}={{0,2}})[\"']?,?\s*$")
+
+
+def format_size(size: int) -> str:
+    """Format a byte count as e.g. ``850B``, ``12.4KB`` or ``3.1MB``."""
+    if size < 1024:
+        return f"{size}B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f}KB"
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+def _entropy(text: str) -> float:
+    length = len(text)
+    return -sum(count / length * math.log2(count / length) for count in Counter(text).values())
+
+
+def _looks_random(run: str, min_entropy: float) -> bool:
+    # Base64 and hex data mixes character classes; long words and identifiers do not
+    has_digit = any(c.isdigit() for c in run)
+    return has_digit and _entropy(run) >= min_entropy
+
+
+class _Collapser:
+    def __init__(self) -> None:
+        self.elided = 0
+
+    def _placeholder(self, kind: str, run: str) -> str:
+        self.elided += len(run)
+        return f"<{kind} {format_size(len(run))}>"
+
+    def _data_uri(self, match: re.Match[str]) -> str:
+        return match.group(1) + self._placeholder("base64", match.group(2))
+
+    def _hex(self, match: re.Match[str]) -> str:
+        run = match.group(0)
+        return self._placeholder("hex", run) if _looks_random(run, _HEX_MIN_ENTROPY) else run
+
+    def _base64(self, match: re.Match[str]) -> str:
+        run = match.group(0)
+        if not _looks_random(run, _BASE64_MIN_ENTROPY):
+            return run
+        return self._placeholder("hex" if all(c in "0123456789abcdefABCDEF" for c in run) else "base64", run)
+
+    def line(self, content: str) -> str:
+        content = _DATA_URI.sub(self._data_uri, content)
+        content = _HEX_BYTES.sub(self._hex, content)
+        content = _HEX_RUN.sub(self._hex, content)
+        return _BASE64_RUN.sub(self._base64, content)
+
+    def block(self, marker: str, lines: list[str]) -> list[str]:
+        """Collapse a run of same-marker lines that are each a base64 chunk."""
+        matches = [_BASE64_LINE.match(line[1:]) for line in lines]
+        chunks = [match.group(2) if match else "" for match in matches]
+        if len(lines) < MIN_BLOB_LINES or not _looks_random("".join(chunks), _BASE64_MIN_ENTROPY):
+            return [marker + self.line(line[1:]) for line in lines]
+        indent = matches[0].group(1) if matches[0] else ""
+        self.elided += sum(len(line) - 1 for line in lines) - sum(len(chunk) for chunk in chunks)
+        return [f"{marker}{indent}{self._placeholder('base64', ''.join(chunks))} ({len(lines)} lines)"]
+
+
+def collapse_embedded_blobs(section: str | DiffSection) -> DiffSection:
+    """Replace long base64, data URI and hex runs on changed lines with placeholders.
+
+    Args:
+        section: Diff section to scan
+
+    Returns:
+        The parsed section, rewritten with ``elided_bytes`` set when anything
+        was collapsed, otherwise unchanged
+    """
+    parsed = as_diff_section(section)
+    if parsed.is_binary or not parsed.hunk_offsets:
+        return parsed
+    text = parsed.text
+    body_start = parsed.hunk_offsets[0]
+    if not _LONG_RUN.search(text, body_start) and not ("0x" in text and _HEX_LIST.search(text, body_start)):
+        return parsed
+
+    collapser = _Collapser()
+    output: list[str] = []
+    pending: list[str] = []
+
+    def flush() -> None:
+        if pending:
+            output.extend(collapser.block(pending[0][0], pending))
+            pending.clear()
+
+    body = text[body_start:]
+    trailing_newline = "\n" if body.endswith("\n") else ""
+    for line in body[: len(body) - len(trailing_newline)].split("\n"):
+        marker = line[:1]
+        if marker in ("+", "-") and _BASE64_LINE.match(line[1:]):
+            if pending and pending[0][0] != marker:
+                flush()
+            pending.append(line)
+            continue
+        flush()
+        output.append(marker + collapser.line(line[1:]) if marker in ("+", "-") else line)
+    flush()
+
+    if not collapser.elided:
+        return parsed
+    collapsed = parse_diff_section(text[:body_start] + "\n".join(output) + trailing_newline)
+    collapsed.elided_bytes = parsed.elided_bytes + collapser.elided
+    return collapsed
@@ -0,0 +1,85 @@
+"""Exclude files listed in ``.gacignore`` from the staged diff at git level.
+
+``.gacignore`` lives at the repository root and uses gitignore syntax.  Its
+patterns are turned into ``:(exclude)`` pathspecs for the ``git diff`` that
+produces the patch, so matching files never produce patch text, are never
+scanned for secrets and are never tokenized.  They are still listed (from a
+cheap ``--raw`` diff that compares no content) so the status and grouped
+mode's file coverage check see every staged file.
+
+Negated patterns (``!pattern``) cannot be expressed as pathspecs and are
+ignored with a warning.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+GACIGNORE_FILENAME = ".gacignore"
+
+
+def _convert(pattern: str) -> list[str]:
+    """Glob pathspec bodies, relative to the repository root, matching one gitignore pattern."""
+    directory_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    # A slash anywhere but the end anchors the pattern to the root
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    if not pattern:
+        return []
+    base = pattern if anchored or pattern.startswith("**/") else f"**/{pattern}"
+    if directory_only or base.endswith("/**"):
+        return [base if base.endswith("/**") else f"{base}/**"]
+    # Without a trailing slash the pattern also matches directories, and so everything below them
+    return [base, f"{base}/**"]
+
+
+def parse_gacignore(text: str) -> list[str]:
+    """Turn the lines of a ``.gacignore`` file into glob pathspec bodies.
+
+    Args:
+        text: Contents of the file
+
+    Returns:
+        Patterns relative to the repository root, without pathspec magic
+    """
+    patterns: list[str] = []
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("!"):
+            logger.warning(f"Ignoring negated pattern in {GACIGNORE_FILENAME}: {line}")
+            continue
+        if line.startswith(("\\#", "\\!")):
+            line = line[1:]
+        for converted in _convert(line):
+            if converted not in patterns:
+                patterns.append(converted)
+    return patterns
+
+
+def load_gacignore(repo_root: str) -> list[str]:
+    """Patterns from ``.gacignore`` at ``repo_root``, or an empty list if there is none."""
+    try:
+        with open(os.path.join(repo_root, GACIGNORE_FILENAME), encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return []
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning(f"Could not read {GACIGNORE_FILENAME}: {e}")
+        return []
+    return parse_gacignore(text)
+
+
+def exclude_pathspecs(patterns: list[str]) -> list[str]:
+    """Pathspecs excluding ``patterns`` from anywhere in the repository."""
+    return [f":(top,exclude,glob){pattern}" for pattern in patterns]
+
+
+def include_pathspecs(patterns: list[str]) -> list[str]:
+    """Pathspecs selecting only the files matching ``patterns``."""
+    return [f":(top,glob){pattern}" for pattern in patterns]
@@ -7,68 +7,80 @@ It focuses on the core operations needed for commit generation.
 import logging
 import os
 import subprocess
+from collections.abc import Callable
 
+from gac.diff_sections import parse_diff
 from gac.errors import GitError
+from gac.hook_cache import find_hook_tool as _find_hook_tool
+from gac.hook_cache import hook_cache_key, is_cached_success, record_success
 from gac.utils import run_subprocess
 
 logger = logging.getLogger(__name__)
 
 
+def _run_and_report_start(
+    command: list[str], timeout: int, on_start: Callable[[subprocess.Popen[bytes]], None]
+) -> subprocess.CompletedProcess[bytes]:
+    """``subprocess.run`` that hands the started process to ``on_start``, so another thread can stop it."""
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+        on_start(process)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+    return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+
 def run_subprocess_with_encoding_fallback(
-    command: list[str], silent: bool = False, timeout: int = 60
+    command: list[str],
+    silent: bool = False,
+    timeout: int = 60,
+    on_start: Callable[[subprocess.Popen[bytes]], None] | None = None,
 ) -> subprocess.CompletedProcess[str]:
     """Run subprocess with encoding fallback, returning full CompletedProcess object.
 
     This is used for cases where we need both stdout and stderr separately,
-    like pre-commit and lefthook hook execution.
+    like pre-commit and lefthook hook execution. Output is captured once as
+    bytes and decoded in memory, so the command is never run twice.
 
     Args:
         command: List of command arguments
         silent: If True, suppress debug logging
         timeout: Command timeout in seconds
+        on_start: Called with the process once it has started
 
     Returns:
-        CompletedProcess object with stdout, stderr, and returncode
+        CompletedProcess object with decoded stdout, stderr, and returncode
+
+    Raises:
+        subprocess.TimeoutExpired: If the command times out
+        subprocess.CalledProcessError: If the command could not be started
     """
-    from gac.utils import get_safe_encodings
+    from gac.utils import decode_output
 
-    encodings = get_safe_encodings()
-    last_exception: Exception | None = None
+    if not silent:
+        logger.debug(f"Running command: {' '.join(command)}")
 
-    for encoding in encodings:
-        try:
-            if not silent:
-                logger.debug(f"Running command: {' '.join(command)} (encoding: {encoding})")
-
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=timeout,
-                encoding=encoding,
-                errors="replace",
-            )
-            return result
-        except UnicodeError as e:
-            last_exception = e
-            if not silent:
-                logger.debug(f"Failed to decode with {encoding}: {e}")
-            continue
-        except subprocess.TimeoutExpired:
-            raise
-        except (subprocess.SubprocessError, OSError, FileNotFoundError) as e:
-            if not silent:
-                logger.debug(f"Command error: {e}")
-            # Try next encoding for non-timeout errors
-            last_exception = e
-            continue
-
-    # If we get here, all encodings failed
-    if last_exception:
-        raise subprocess.CalledProcessError(1, command, "", f"Encoding error: {last_exception}") from last_exception
-    else:
-        raise subprocess.CalledProcessError(1, command, "", "All encoding attempts failed")
+    try:
+        if on_start is None:
+            result = subprocess.run(command, capture_output=True, check=False, timeout=timeout)
+        else:
+            result = _run_and_report_start(command, timeout, on_start)
+    except subprocess.TimeoutExpired:
+        raise
+    except (subprocess.SubprocessError, OSError) as e:
+        if not silent:
+            logger.debug(f"Command error: {e}")
+        raise subprocess.CalledProcessError(1, command, "", str(e)) from e
+
+    return subprocess.CompletedProcess(
+        args=result.args,
+        returncode=result.returncode,
+        stdout=decode_output(result.stdout),
+        stderr=decode_output(result.stderr),
+    )
 
 
 class GitCommandResult:
@@ -216,14 +228,20 @@ def get_staged_files(file_type: str | None = None, existing_only: bool = False)
         GitError: If the underlying git command fails (e.g. not inside a
             repository, corrupted index, etc.).
     """
-    result = run_git_command(["diff", "--name-only", "--cached"])
-    if not result.success:
-        raise GitError(result.fail_message("Failed to list staged files"))
-    if not result.output:
-        return []
+    from gac.repo_snapshot import peek_repo_snapshot
+
+    snapshot = peek_repo_snapshot()
+    if snapshot is not None:
+        files = snapshot.files
+    else:
+        result = run_git_command(["diff", "--name-only", "--cached"])
+        if not result.success:
+            raise GitError(result.fail_message("Failed to list staged files"))
+        if not result.output:
+            return []
 
-    # Parse and filter the file list
-    files = [line.strip() for line in result.output.splitlines() if line.strip()]
+        # Parse and filter the file list
+        files = [line.strip() for line in result.output.splitlines() if line.strip()]
 
     if file_type:
         files = [f for f in files if f.endswith(file_type)]
@@ -247,19 +265,8 @@ def get_staged_status() -> str:
     result = run_git_command(["diff", "--name-status", "--staged"])
     if not result.success:
         raise GitError(result.fail_message("Failed to get staged status"))
-    if not result.output:
-        return "No changes staged for commit."
 
-    status_map = {
-        "M": "modified",
-        "A": "new file",
-        "D": "deleted",
-        "R": "renamed",
-        "C": "copied",
-        "T": "typechange",
-    }
-
-    status_lines = ["Changes to be committed:"]
+    name_status = []
     for line in result.output.splitlines():
         line = line.strip()
         if not line:
@@ -270,10 +277,35 @@ def get_staged_status() -> str:
         if len(parts) < 2:
             continue
 
-        change_type = parts[0][0]  # First char is the status (M, A, D, R, etc.)
-        file_path = parts[-1]  # Last part is the new/current file path
+        # First char is the status (M, A, D, R, etc.); last part is the new/current file path
+        name_status.append((parts[0][0], parts[-1]))
+
+    return format_staged_status(name_status)
+
+
+_STATUS_LABELS = {
+    "M": "modified",
+    "A": "new file",
+    "D": "deleted",
+    "R": "renamed",
+    "C": "copied",
+    "T": "typechange",
+}
+
+
+def format_staged_status(name_status: list[tuple[str, str]]) -> str:
+    """Format (status letter, path) pairs as a ``git status``-like block.
+
+    Returns:
+        Formatted status string with M/A/D/R indicators, or a fallback
+        message when the list is empty.
+    """
+    if not name_status:
+        return "No changes staged for commit."
 
-        status_label = status_map.get(change_type, "modified")
+    status_lines = ["Changes to be committed:"]
+    for change_type, file_path in name_status:
+        status_label = _STATUS_LABELS.get(change_type, "modified")
         status_lines.append(f"\t{status_label}:   {file_path}")
 
     return "\n".join(status_lines)
@@ -359,6 +391,7 @@ def _run_hook_runner(
     config_files: list[str],
     run_args: list[str],
     hook_timeout: int = 120,
+    on_start: Callable[[subprocess.Popen[bytes]], None] | None = None,
 ) -> bool:
     """Run a hook runner (pre-commit or lefthook) if configured.
 
@@ -368,6 +401,7 @@ def _run_hook_runner(
         config_files: List of possible config filenames to check for
         run_args: Full command to run the hooks
         hook_timeout: Timeout in seconds
+        on_start: Called with the hook runner's process once it has started
 
     Returns:
         True if hooks passed or don't exist, False if they failed.
@@ -378,17 +412,24 @@ def _run_hook_runner(
         return True
 
     # Check if the binary is installed
-    try:
-        version_check = run_subprocess([name, "--version"], silent=True, raise_on_error=False)
-        if not version_check:
-            logger.debug(f"{display_name} not installed, skipping hooks")
-            return True
+    tool = _find_hook_tool(name)
+    if not tool:
+        logger.debug(f"{display_name} not installed, skipping hooks")
+        return True
+
+    cache_key = hook_cache_key(name, tool, config_files)
+    if cache_key is not None and is_cached_success(cache_key):
+        logger.info(f"{display_name} hooks already passed for this staged tree, skipping")
+        return True
 
+    try:
         # Run the hooks
         logger.info(f"Running {display_name} hooks with {hook_timeout}s timeout...")
-        result = run_subprocess_with_encoding_fallback(run_args, timeout=hook_timeout)
+        result = run_subprocess_with_encoding_fallback(run_args, timeout=hook_timeout, on_start=on_start)
 
         if result.returncode == 0:
+            if cache_key is not None:
+                record_success(cache_key)
             return True
         else:
             output = result.stdout or ""
@@ -405,7 +446,9 @@ def _run_hook_runner(
         return True
 
 
-def run_pre_commit_hooks(hook_timeout: int = 120) -> bool:
+def run_pre_commit_hooks(
+    hook_timeout: int = 120, on_start: Callable[[subprocess.Popen[bytes]], None] | None = None
+) -> bool:
     """Run pre-commit hooks if they exist.
 
     Returns:
@@ -417,10 +460,13 @@ def run_pre_commit_hooks(hook_timeout: int = 120) -> bool:
         config_files=[".pre-commit-config.yaml"],
         run_args=["pre-commit", "run"],
         hook_timeout=hook_timeout,
+        on_start=on_start,
     )
 
 
-def run_lefthook_hooks(hook_timeout: int = 120) -> bool:
+def run_lefthook_hooks(
+    hook_timeout: int = 120, on_start: Callable[[subprocess.Popen[bytes]], None] | None = None
+) -> bool:
     """Run Lefthook hooks if they exist.
 
     Returns:
@@ -432,6 +478,7 @@ def run_lefthook_hooks(hook_timeout: int = 120) -> bool:
         config_files=[".lefthook.yml", "lefthook.yml", ".lefthook.yaml", "lefthook.yaml"],
         run_args=["lefthook", "run", "pre-commit"],
         hook_timeout=hook_timeout,
+        on_start=on_start,
     )
 
 
@@ -464,48 +511,17 @@ def push_changes() -> bool:
 def detect_rename_mappings(staged_diff: str) -> dict[str, str]:
     """Detect file rename mappings from a staged diff.
 
+    Only sections with "rename from"/"rename to" lines produce a mapping;
+    header parsing is ambiguous when paths contain " a/" or " b/".
+
     Args:
         staged_diff: The output of 'git diff --cached --binary'
 
     Returns:
         Dictionary mapping new_file_path -> old_file_path for rename operations
     """
-    rename_mappings = {}
-    lines = staged_diff.split("\n")
-
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-
-        if line.startswith("diff --git a/"):
-            # Scan following lines for rename markers and path lines.
-            # Prefer "rename from"/"rename to" lines for path extraction —
-            # they are unambiguous even when paths contain " a/" or " b/".
-            # Fall back to header parsing only when those lines are absent.
-            j = i + 1
-            is_rename = False
-            rename_from = None
-            rename_to = None
-
-            while j < len(lines) and not lines[j].startswith("diff --git"):
-                if lines[j].startswith("similarity index "):
-                    is_rename = True
-                elif lines[j].startswith("rename from "):
-                    is_rename = True
-                    rename_from = lines[j][len("rename from ") :]
-                elif lines[j].startswith("rename to "):
-                    rename_to = lines[j][len("rename to ") :]
-                j += 1
-
-            if is_rename:
-                if rename_from and rename_to:
-                    # Only use rename-from/to lines — they are unambiguous.
-                    # Header parsing (split on " a/" or " b/") is fundamentally
-                    # ambiguous when paths contain those substrings, so we
-                    # produce no mapping when rename lines are absent.
-                    if rename_from != rename_to:
-                        rename_mappings[rename_to] = rename_from
-
-        i += 1
-
-    return rename_mappings
+    return {
+        section.path: section.old_path
+        for section in parse_diff(staged_diff)
+        if section.change_type == "renamed" and section.old_path is not None
+    }
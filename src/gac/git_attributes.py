@@ -0,0 +1,139 @@
+"""Files marked as generated, vendored or ignored in ``.gitattributes``.
+
+Repositories already tell GitHub which files are generated or vendored with
+``linguist-generated`` and ``linguist-vendored``, and gac honors the same
+marks plus its own ``gac-ignore`` attribute.  One ``git check-attr --stdin``
+pass classifies all staged paths; flagged files are summarized in the diff
+by excluding them through ``attr:`` pathspecs, and their patches are only
+produced for the secret scan, which streams them without keeping any text.
+"""
+
+from __future__ import annotations
+
+import logging
+import subprocess
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING
+
+from gac.diff_sections import parse_diff
+from gac.utils import decode_output
+
+if TYPE_CHECKING:
+    from gac.repo_snapshot import StagedEntry
+
+logger = logging.getLogger(__name__)
+
+# Attributes that mark a file whose patch is not worth sending, in order of precedence
+SUMMARY_ATTRIBUTES = ("linguist-generated", "linguist-vendored", "gac-ignore")
+
+ATTRIBUTE_LABELS = {
+    "linguist-generated": "Generated file change",
+    "linguist-vendored": "Vendored file change",
+    "gac-ignore": "File change ignored by gac-ignore",
+    ".gacignore": "File change excluded by .gacignore",
+}
+
+# check-attr reports a bare attribute as "set"; linguist also accepts "=true"
+_FLAGGED_VALUES = ("set", "true")
+_STATUS_WORDS = {"A": "new file", "D": "deleted file", "R": "renamed", "C": "copied"}
+
+# Seconds check-attr may take, the same default as run_git_command
+_CHECK_ATTR_TIMEOUT = 30
+
+
+def check_summary_attributes(paths: Iterable[str], repo_root: str | None = None) -> dict[str, str]:
+    """Find the paths flagged by one of :data:`SUMMARY_ATTRIBUTES` with a single ``git check-attr``.
+
+    Args:
+        paths: Repository-relative paths, as reported by ``git diff``
+        repo_root: Repository root to resolve the paths against; defaults to
+            the current directory
+
+    Returns:
+        The first flagging attribute by path, for flagged paths only; empty
+        if git could not be run or timed out
+    """
+    paths = list(paths)
+    if not paths:
+        return {}
+    payload = "".join(f"{path}\0" for path in paths).encode("utf-8")
+    try:
+        result = subprocess.run(
+            ["git", "check-attr", "--stdin", "-z", *SUMMARY_ATTRIBUTES],
+            input=payload,
+            capture_output=True,
+            cwd=repo_root,
+            check=False,
+            timeout=_CHECK_ATTR_TIMEOUT,
+        )
+    except subprocess.TimeoutExpired:
+        logger.warning(f"git check-attr timed out after {_CHECK_ATTR_TIMEOUT} seconds; .gitattributes flags ignored")
+        return {}
+    except OSError as e:
+        logger.debug(f"git check-attr could not be run: {e}")
+        return {}
+    if result.returncode != 0:
+        logger.debug(f"git check-attr failed: {decode_output(result.stderr).strip()}")
+        return {}
+
+    flagged: dict[str, str] = {}
+    fields = decode_output(result.stdout).split("\0")
+    for index in range(0, len(fields) - 2, 3):
+        path, attribute, value = fields[index : index + 3]
+        if value in _FLAGGED_VALUES and path not in flagged:
+            flagged[path] = attribute
+    if flagged:
+        logger.info(f"{len(flagged)} staged files are marked generated, vendored or ignored in .gitattributes")
+    return flagged
+
+
+def exclude_flagged_pathspecs() -> list[str]:
+    """Pathspecs excluding files flagged by :data:`SUMMARY_ATTRIBUTES` anywhere in the repository."""
+    pathspecs = []
+    for attribute in SUMMARY_ATTRIBUTES:
+        pathspecs.append(f":(top,exclude,attr:{attribute})")
+        pathspecs.append(f":(top,exclude,attr:{attribute}=true)")
+    return pathspecs
+
+
+def summarize_flagged_entry(entry: StagedEntry, attribute: str) -> str:
+    """Header-only diff section standing in for the patch of a flagged file."""
+    header = f"diff --git a/{entry.old_path or entry.path} b/{entry.path}\n"
+    details = [attribute]
+    if entry.status in _STATUS_WORDS:
+        details.append(_STATUS_WORDS[entry.status])
+    # Files excluded by .gacignore are listed without comparing contents, so their line counts are unknown
+    if attribute != ".gacignore":
+        details.append("binary" if entry.is_binary else f"+{entry.additions}/-{entry.deletions} lines")
+    return header + f"[{ATTRIBUTE_LABELS.get(attribute, 'Filtered file change')} ({', '.join(details)})]\n"
+
+
+def merge_flagged_summaries(diff: str, entries: Iterable[StagedEntry], flagged: Mapping[str, str]) -> str:
+    """Insert a summary section for each flagged entry into ``diff`` where git would have put its patch.
+
+    The sections of ``diff`` keep their order; each summary goes before the
+    first section of a file that follows it in ``entries``.
+    """
+    entries = list(entries)
+    order = {e.path: index for index, e in enumerate(entries)}
+    summaries = [(order[e.path], summarize_flagged_entry(e, flagged[e.path])) for e in entries if e.path in flagged]
+    pieces: list[str] = []
+    pending = 0
+    for section in parse_diff(diff):
+        position = order.get(section.path) if section.has_header else None
+        while position is not None and pending < len(summaries) and summaries[pending][0] < position:
+            pieces.append(summaries[pending][1])
+            pending += 1
+        pieces.append(section.text if section.text.endswith("\n") else section.text + "\n")
+    pieces.extend(summary for _, summary in summaries[pending:])
+    return "".join(pieces).strip()
+
+
+def flagged_secret_pathspecs(flagged: Mapping[str, str]) -> list[str]:
+    """Pathspecs selecting the files flagged in ``.gitattributes``, which still have to be scanned for secrets.
+
+    Their patches are left out of the prompt, but a vendored or generated
+    file can carry a credential as easily as any other.  Files excluded by
+    ``.gacignore`` are never diffed at all and are not included.
+    """
+    return [f":(top,literal){path}" for path, attribute in flagged.items() if attribute in SUMMARY_ATTRIBUTES]
@@ -0,0 +1,309 @@
+"""Pool of long-lived git helpers shared by everything in one gac process.
+
+The MCP server answers many small requests against the same repository, and
+spawning git for each one costs a fork/exec plus an index refresh.  This
+module keeps warm helpers around instead:
+
+- a ``git cat-file --batch`` process per repository, through which the
+  Python and notebook summaries read their blobs (see :func:`read_blob`),
+- the repository root and git directory of each working directory, so the
+  current branch is read from ``HEAD`` without spawning git, and
+- the memoized :class:`~gac.repo_snapshot.RepoSnapshot` for staged status
+  and diff, which is reused until the index changes.
+
+The pool is bounded (least recently used workers are closed first) and
+workers idle for longer than ``idle_timeout`` seconds are evicted.
+
+Working-tree status and ``git diff HEAD`` are not pooled: git has no
+long-running status server, and edits to tracked files change neither
+the index nor ``HEAD``, so there is nothing to validate a cached answer by.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from gac.constants import Utility
+from gac.errors import GitError
+from gac.repo_snapshot import RepoSnapshot, get_repo_snapshot, peek_repo_snapshot
+
+logger = logging.getLogger(__name__)
+
+_BRANCH_REF = "ref: refs/heads/"
+
+
+class RepositoryHead(NamedTuple):
+    """The repository containing the working directory and what is checked out.
+
+    Attributes:
+        repo_root: Top-level directory of the working tree
+        branch: Current branch, or ``HEAD`` when detached (as ``git rev-parse --abbrev-ref HEAD`` reports it)
+    """
+
+    repo_root: str
+    branch: str
+
+
+class CatFileWorker:
+    """A ``git cat-file --batch`` process bound to one repository."""
+
+    def __init__(self, repo_root: str) -> None:
+        self.repo_root = repo_root
+        self._lock = threading.Lock()
+        try:
+            self._process: subprocess.Popen[bytes] = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=repo_root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise GitError(f"Failed to start git cat-file for {repo_root}: {e}") from e
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    def read_blob(self, object_name: str) -> bytes | None:
+        """Return the contents of ``object_name`` (e.g. ``HEAD:path`` or ``:path``).
+
+        Returns:
+            The object bytes, or None if the object does not exist.
+
+        Raises:
+            GitError: If the worker process has died.
+        """
+        if "\n" in object_name:
+            raise ValueError("Object names cannot contain newlines")
+
+        with self._lock:
+            stdin, stdout = self._process.stdin, self._process.stdout
+            if stdin is None or stdout is None or not self.alive:
+                raise GitError("git cat-file worker is not running")
+            try:
+                stdin.write(object_name.encode("utf-8") + b"\n")
+                stdin.flush()
+                header = stdout.readline()
+            except (BrokenPipeError, OSError) as e:
+                raise GitError(f"git cat-file worker failed: {e}") from e
+
+            self.last_used = time.monotonic()
+            if not header:
+                raise GitError("git cat-file worker exited unexpectedly")
+            fields = header.split()
+            if len(fields) < 3 or fields[-1] == b"missing":
+                return None
+
+            size = int(fields[2])
+            content = stdout.read(size)
+            stdout.read(1)  # trailing newline after every object
+            return content
+
+    def close(self) -> None:
+        """Terminate the worker process."""
+        if self._process.stdin is not None:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+        try:
+            self._process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        if self._process.stdout is not None:
+            self._process.stdout.close()
+
+
+class GitWorkerPool:
+    """Bounded, per-repository pool of warm git helpers with idle eviction."""
+
+    def __init__(
+        self,
+        max_workers: int = Utility.GIT_WORKER_POOL_SIZE,
+        idle_timeout: float = Utility.GIT_WORKER_IDLE_TIMEOUT,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.idle_timeout = idle_timeout
+        self._workers: OrderedDict[str, CatFileWorker] = OrderedDict()
+        # (repository root, git directory) by working directory; neither changes for a directory
+        self._locations: dict[str, tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        # Observed cost of a cold call (process start + first answer), used to
+        # estimate how much each warm call saves.
+        self._cold_call_ms: float | None = None
+        self._snapshot_build_ms: float | None = None
+        self._rev_parse_ms: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._workers)
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Close workers that have been idle longer than ``idle_timeout``.
+
+        Returns:
+            Number of workers evicted.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            stale = [
+                root
+                for root, worker in self._workers.items()
+                if not worker.alive or now - worker.last_used > self.idle_timeout
+            ]
+            evicted = [self._workers.pop(root) for root in stale]
+        for worker in evicted:
+            logger.debug(f"Evicting idle git worker for {worker.repo_root}")
+            worker.close()
+        return len(evicted)
+
+    def _acquire(self, repo_root: str) -> tuple[CatFileWorker, bool]:
+        """Return (worker, is_cold) for ``repo_root``, spawning one if needed."""
+        self.evict_idle()
+        overflow: list[CatFileWorker] = []
+        with self._lock:
+            worker = self._workers.get(repo_root)
+            if worker is not None:
+                self._workers.move_to_end(repo_root)
+                return worker, False
+
+            worker = CatFileWorker(repo_root)
+            self._workers[repo_root] = worker
+            while len(self._workers) > self.max_workers:
+                _, oldest = self._workers.popitem(last=False)
+                overflow.append(oldest)
+        for oldest in overflow:
+            logger.debug(f"Git worker pool full, closing worker for {oldest.repo_root}")
+            oldest.close()
+        return worker, True
+
+    def read_blob(self, repo_root: str, object_name: str) -> bytes | None:
+        """Read a blob through the warm ``cat-file --batch`` worker for ``repo_root``."""
+        start = time.perf_counter()
+        worker, cold = self._acquire(repo_root)
+        content = worker.read_blob(object_name)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if cold:
+            self._cold_call_ms = elapsed_ms if self._cold_call_ms is None else (self._cold_call_ms + elapsed_ms) / 2
+            logger.debug(f"git cat-file {object_name}: {elapsed_ms:.1f} ms (cold start)")
+        elif self._cold_call_ms is not None:
+            logger.debug(
+                f"git cat-file {object_name}: {elapsed_ms:.1f} ms via warm worker "
+                f"(saved ~{max(0.0, self._cold_call_ms - elapsed_ms):.1f} ms vs. spawning git)"
+            )
+        return content
+
+    def staged_snapshot(self) -> RepoSnapshot:
+        """Return the staged snapshot for the current directory, reusing it while the index is unchanged."""
+        start = time.perf_counter()
+        snapshot = peek_repo_snapshot()
+        if snapshot is not None:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if self._snapshot_build_ms is not None:
+                logger.debug(
+                    f"Staged status/diff: {elapsed_ms:.1f} ms from cached snapshot "
+                    f"(saved ~{max(0.0, self._snapshot_build_ms - elapsed_ms):.1f} ms vs. running git diff)"
+                )
+            return snapshot
+
+        snapshot = get_repo_snapshot(refresh=True)
+        self._snapshot_build_ms = (time.perf_counter() - start) * 1000
+        logger.debug(f"Staged status/diff: {self._snapshot_build_ms:.1f} ms to build snapshot")
+        return snapshot
+
+    def _locate(self, cwd: str) -> tuple[str, str]:
+        from gac.git import run_git_command
+
+        result = run_git_command(["rev-parse", "--show-toplevel", "--absolute-git-dir"], silent=True)
+        if not result.success:
+            raise GitError(result.fail_message("Not in a git repository"))
+        lines = result.output.splitlines()
+        if len(lines) < 2:
+            raise GitError("Not in a git repository")
+        location = (lines[0], lines[1])
+        with self._lock:
+            self._locations[cwd] = location
+        return location
+
+    def repository_head(self) -> RepositoryHead:
+        """Repository root and current branch for the current directory.
+
+        The root and git directory are resolved with one ``git rev-parse`` per
+        directory; afterwards the branch is read from the ``HEAD`` file
+        without spawning git.
+
+        Raises:
+            GitError: If the current directory is not inside a repository.
+        """
+        start = time.perf_counter()
+        cwd = os.getcwd()
+        location = self._locations.get(cwd)
+        cold = location is None or not os.path.isdir(location[1])
+        if location is None or cold:
+            location = self._locate(cwd)
+        repo_root, git_dir = location
+
+        try:
+            with open(os.path.join(git_dir, "HEAD"), encoding="utf-8") as f:
+                head = f.read().strip()
+        except OSError as e:
+            raise GitError(f"Failed to read HEAD: {e}") from e
+        branch = head[len(_BRANCH_REF) :] if head.startswith(_BRANCH_REF) else "HEAD"
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if cold:
+            self._rev_parse_ms = elapsed_ms
+            logger.debug(f"Repository root and branch: {elapsed_ms:.1f} ms (git rev-parse)")
+        elif self._rev_parse_ms is not None:
+            logger.debug(
+                f"Repository root and branch: {elapsed_ms:.1f} ms from HEAD "
+                f"(saved ~{max(0.0, self._rev_parse_ms - elapsed_ms):.1f} ms vs. running git rev-parse)"
+            )
+        return RepositoryHead(repo_root, branch)
+
+    def close(self) -> None:
+        """Close every worker in the pool."""
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.close()
+
+
+_shared_pool: GitWorkerPool | None = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_git_pool() -> GitWorkerPool:
+    """The pool shared by the whole process, created on first use and closed at exit."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = GitWorkerPool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
+
+
+def read_blob(object_name: str) -> bytes | None:
+    """Read an object of the current repository through the shared pool's ``cat-file`` worker.
+
+    Returns:
+        The object bytes, or None if it does not exist or git cannot be run
+    """
+    snapshot = peek_repo_snapshot()
+    repo_root = snapshot.repo_root if snapshot is not None else os.getcwd()
+    try:
+        return shared_git_pool().read_blob(repo_root, object_name)
+    except GitError as e:
+        logger.debug(f"Could not read {object_name}: {e}")
+        return None
@@ -5,10 +5,16 @@ import logging
 import subprocess
 from typing import Any, NamedTuple
 
+from gac.churn_index import get_churn_index
 from gac.config import GACConfig
+from gac.diff_context import apply_diff_contexts, choose_diff_contexts, describe_diff_contexts
+from gac.diff_stream import read_diff_within_budget, scan_staged_paths, section_char_limit
+from gac.diff_views import DiffViews, build_diff_views
 from gac.errors import ConfigError, GitError, handle_error
-from gac.git import get_staged_files, get_staged_status, run_git_command
-from gac.preprocess import preprocess_diff
+from gac.git import get_staged_files, run_git_command
+from gac.git_attributes import flagged_secret_pathspecs, merge_flagged_summaries
+from gac.preprocess import plan_diff_from_numstat, preprocess_diff
+from gac.repo_snapshot import get_repo_snapshot, invalidate_repo_snapshot
 from gac.security import get_affected_files, scan_staged_diff
 from gac.utils import console
 from gac.workflow_utils import PromptFn
@@ -27,6 +33,13 @@ class GitState(NamedTuple):
     processed_diff: str
     has_secrets: bool
     secrets: list[Any]
+    diff_context: str = ""
+    diff_views: DiffViews | None = None
+
+    @property
+    def views(self) -> DiffViews:
+        """Views of ``processed_diff``, built here only if the state was not made by :meth:`get_git_state`."""
+        return self.diff_views or build_diff_views(self.processed_diff, "")
 
 
 class GitStateValidator:
@@ -58,6 +71,7 @@ class GitStateValidator:
         if stage_all and (not dry_run):
             logger.info("Staging all changes")
             run_git_command(["add", "--all"]).require_success()
+            invalidate_repo_snapshot()
 
     def get_git_state(
         self,
@@ -71,17 +85,20 @@ class GitStateValidator:
 
         Returns:
             GitState if staged changes exist, None if no staged changes found.
+
+        Raises:
+            GitError: If not inside a git repository or the staged diff cannot be read.
         """
         from gac.constants import Utility
 
-        # Validate repository
-        repo_root = self.validate_repository()
-
         # Stage files if requested
         self.stage_all_if_requested(stage_all, dry_run)
 
-        # Get staged files
-        staged_files = get_staged_files(existing_only=False)
+        # One diff invocation provides the file list, status, stat and patch; the
+        # snapshot's rev-parse also finds the repository root, or raises outside one
+        snapshot = get_repo_snapshot()
+        repo_root = snapshot.repo_root
+        staged_files = snapshot.files
 
         if not staged_files:
             console.print(
@@ -89,29 +106,70 @@ class GitStateValidator:
             )
             return None
 
-        # Get git status and diffs
-        status = get_staged_status()
-        diff_result = run_git_command(["diff", "--staged"])
-        if not diff_result.success:
-            raise GitError(diff_result.fail_message("Failed to get staged diff"))
-        diff = diff_result.output
-        stat_result = run_git_command(["diff", "--stat", "--cached"])
-        diff_stat = " " + (stat_result.output if stat_result.success else "")
+        status = snapshot.status
+        diff_stat = " " + snapshot.stat
+
+        if model is None:
+            raise ConfigError("Model must be specified via GAC_MODEL environment variable or --model flag")
 
-        # Scan for secrets
         has_secrets = False
         secrets = []
-        if not skip_secret_scan:
-            logger.info("Scanning staged changes for potential secrets...")
-            secrets = scan_staged_diff(diff)
+        if snapshot.patch is None:
+            # Too large to buffer: stream it, scanning every line but keeping only what fits the budget
+            logger.info(f"Streaming large staged diff ({snapshot.changed_lines} changed lines)")
+            # Weights files by how often and recently they changed; None outside a repository with history
+            plan = plan_diff_from_numstat(
+                snapshot.entries, Utility.DEFAULT_DIFF_TOKEN_LIMIT, snapshot.flagged, churn=get_churn_index()
+            )
+            streamed = read_diff_within_budget(
+                token_limit=Utility.DEFAULT_DIFF_TOKEN_LIMIT,
+                model=model,
+                scan_secrets=not skip_secret_scan,
+                plan=plan,
+                exclude=snapshot.exclude_pathspecs,
+            )
+            diff = streamed.diff
+            if snapshot.flagged:
+                diff = merge_flagged_summaries(diff, snapshot.entries, snapshot.flagged)
+            secrets = streamed.secrets
+            has_secrets = bool(secrets)
+            # Only the planned files have patch bodies worth refetching
+            context_entries = plan.included
+        else:
+            diff = snapshot.patch
+
+            # Scan for secrets
+            if not skip_secret_scan:
+                logger.info("Scanning staged changes for potential secrets...")
+                secrets = scan_staged_diff(diff)
+                has_secrets = bool(secrets)
+            # Files flagged in .gitattributes are only summarized
+            context_entries = tuple(e for e in snapshot.entries if e.path not in snapshot.flagged)
+
+        if not skip_secret_scan and snapshot.flagged:
+            # Flagged patches are left out of the diff above, but still scanned the same way in either mode
+            secrets = secrets + scan_staged_paths(flagged_secret_pathspecs(snapshot.flagged))
             has_secrets = bool(secrets)
 
-        # Process diff for AI consumption
-        logger.debug(f"Preprocessing diff ({len(diff)} characters)")
-        if model is None:
-            raise ConfigError("Model must be specified via GAC_MODEL environment variable or --model flag")
-        processed_diff = preprocess_diff(diff, token_limit=Utility.DEFAULT_DIFF_TOKEN_LIMIT, model=model)
-        logger.debug(f"Processed diff ({len(processed_diff)} characters)")
+        # Give each file as much context as the budget allows, refetching only files off the default
+        contexts = choose_diff_contexts(context_entries, Utility.DEFAULT_DIFF_TOKEN_LIMIT)
+        # Refetched sections are bounded the same way a streamed section is, whichever way the diff was read
+        prompt_diff = apply_diff_contexts(
+            diff, snapshot.entries, contexts, section_char_limit(Utility.DEFAULT_DIFF_TOKEN_LIMIT)
+        )
+        diff_context = describe_diff_contexts(contexts, len(context_entries))
+
+        # Process diff for AI consumption; history is only read if the diff needs truncating
+        logger.debug(f"Preprocessing diff ({len(prompt_diff)} characters, context: {diff_context})")
+        processed_diff = preprocess_diff(
+            prompt_diff, token_limit=Utility.DEFAULT_DIFF_TOKEN_LIMIT, model=model, churn=get_churn_index
+        )
+        # Cheaper views of the same diff for calls that do not need every hunk
+        diff_views = build_diff_views(processed_diff, model)
+        logger.debug(
+            f"Processed diff views: full {diff_views.full_tokens}, condensed {diff_views.condensed_tokens}, "
+            f"file list {diff_views.file_list_tokens} tokens"
+        )
 
         return GitState(
             repo_root=repo_root,
@@ -122,6 +180,8 @@ class GitStateValidator:
             processed_diff=processed_diff,
             has_secrets=has_secrets,
             secrets=secrets,
+            diff_context=diff_context,
+            diff_views=diff_views,
         )
 
     def handle_secret_detection(
@@ -196,6 +256,8 @@ class GitStateValidator:
                 except GitError as e:
                     console.print(f"[red]Failed to unstage {file_path}: {e}[/red]")
 
+            invalidate_repo_snapshot()
+
             # Check if there are still staged files
             remaining_staged = get_staged_files(existing_only=False)
             if not remaining_staged:
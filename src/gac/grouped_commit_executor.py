@@ -5,6 +5,8 @@ into actual git commits, including:
 
 - Saving and restoring the staging area on failure.
 - Handling file renames during per-commit staging.
+- Building all commits from a temporary index when hooks are skipped, so
+  the branch only moves once every commit exists.
 - Pushing after successful commits (with rollback on push failure).
 - Dry-run preview.
 """
@@ -16,8 +18,10 @@ import subprocess
 from typing import Any, NamedTuple
 
 from gac.errors import AIError, ConfigError, GitError
-from gac.git import detect_rename_mappings, get_staged_files, run_git_command
+from gac.git import get_staged_files, run_git_command
+from gac.plumbing_commits import TreeCommitBuilder
 from gac.postprocess import clean_commit_message
+from gac.repo_snapshot import get_repo_snapshot, invalidate_repo_snapshot
 from gac.stats import record_commit, record_gac
 from gac.utils import console
 from gac.workflow_utils import execute_commit, restore_staging
@@ -35,6 +39,63 @@ class GroupedCommitResult(NamedTuple):
     reasoning_tokens: int = 0
 
 
+def _build_commits_from_index(result: GroupedCommitResult, fifty_seventy_two: bool, signoff: bool) -> bool:
+    """Create every grouped commit with plumbing and move the branch once.
+
+    The staging area is never reset, so a failure leaves nothing to restore.
+
+    Returns:
+        True if all commits were created and published.
+    """
+    num_commits = len(result.commits)
+    rename_mappings = get_repo_snapshot().rename_mappings
+    idx = 0
+    try:
+        with TreeCommitBuilder(signoff=signoff) as builder:
+            for idx, commit in enumerate(result.commits, 1):
+                files = list(commit["files"])
+                files.extend(rename_mappings[path] for path in commit["files"] if path in rename_mappings)
+                cleaned_message = clean_commit_message(
+                    commit["message"].strip(),
+                    fifty_seventy_two=fifty_seventy_two,
+                )
+                builder.commit(files, cleaned_message)
+                console.print(f"[green]✓ Commit {idx}/{num_commits} built[/green]")
+            builder.publish()
+    except (GitError, subprocess.SubprocessError, OSError) as e:
+        console.print(f"[red]✗ Failed at commit {idx}/{num_commits}: {e}[/red]")
+        console.print("[yellow]No commits were created; the branch and staging area are unchanged.[/yellow]")
+        return False
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Interrupted by user. No commits were created.[/yellow]")
+        return False
+    finally:
+        invalidate_repo_snapshot()
+
+    for _ in range(num_commits):
+        record_commit()
+    console.print(f"[green]✓ {num_commits} commits created[/green]")
+    return True
+
+
+def _restore_original_staging(staged_files: list[str] | None, staged_tree: str | None) -> None:
+    """Put the staging area back as it was before the grouped commits, reporting rather than raising on failure.
+
+    Without a saved state (the commits were built without touching the
+    index) the current staging area is saved and read back instead.
+    """
+    console.print("[yellow]Restoring original staging area...[/yellow]")
+    try:
+        if staged_files is None or staged_tree is None:
+            staged_files = get_staged_files(existing_only=False)
+            staged_tree = run_git_command(["write-tree"], silent=True).require_success()
+        restore_staging(staged_files, staged_tree)
+    except GitError as e:
+        console.print(f"[red]✗ Could not restore the original staging area: {e}[/red]")
+        return
+    console.print("[green]Original staging area restored.[/green]")
+
+
 def execute_grouped_commits(
     result: GroupedCommitResult,
     dry_run: bool,
@@ -54,7 +115,7 @@ def execute_grouped_commits(
 
     restore_needed = False
     original_staged_files: list[str] | None = None
-    original_staged_diff: str | None = None
+    original_staged_tree: str | None = None
 
     if dry_run:
         console.print(f"[yellow]Dry run: Would create {num_commits} commits[/yellow]")
@@ -62,14 +123,23 @@ def execute_grouped_commits(
             console.print(f"\n[cyan]Commit {idx}/{num_commits}:[/cyan]")
             console.print(f"  Files: {', '.join(commit['files'])}")
             console.print(f"  Message: {commit['message'].strip()[:50]}...")
+    elif no_verify:
+        # Hooks only run through ``git commit``; without them the commits can be
+        # built off to the side and published atomically.
+        if not _build_commits_from_index(result, fifty_seventy_two, signoff):
+            return 1
+        record_gac(model=model)
     else:
-        original_staged_files = get_staged_files(existing_only=False)
-        original_staged_diff = run_git_command(["diff", "--cached", "--binary"], silent=True).require_success()
-        run_git_command(["reset", "HEAD"]).require_success()
-
         try:
-            rename_mappings = detect_rename_mappings(original_staged_diff)
+            original_staged_files = get_staged_files(existing_only=False)
+            rename_mappings = get_repo_snapshot().rename_mappings
+            original_staged_tree = run_git_command(["write-tree"], silent=True).require_success()
+            run_git_command(["reset", "HEAD"]).require_success()
+        except GitError as e:
+            console.print(f"[red]✗ Could not save the staging area before committing: {e}[/red]")
+            return 1
 
+        try:
             for idx, commit in enumerate(result.commits, 1):
                 try:
                     for file_path in commit["files"]:
@@ -96,9 +166,7 @@ def execute_grouped_commits(
             console.print("\n[yellow]Interrupted by user. Restoring original staging area...[/yellow]")
 
         if restore_needed:
-            console.print("[yellow]Restoring original staging area...[/yellow]")
-            restore_staging(original_staged_files or [], original_staged_diff)
-            console.print("[green]Original staging area restored.[/green]")
+            _restore_original_staging(original_staged_files or [], original_staged_tree)
             return 1
 
         record_gac(model=model)
@@ -123,12 +191,7 @@ def execute_grouped_commits(
             console.print(f"[red]Error pushing changes: {e}[/red]")
 
         if restore_needed:
-            console.print("[yellow]Restoring original staging area...[/yellow]")
-            if original_staged_files is None or original_staged_diff is None:
-                original_staged_files = get_staged_files(existing_only=False)
-                original_staged_diff = run_git_command(["diff", "--cached", "--binary"]).require_success()
-            restore_staging(original_staged_files, original_staged_diff)
-            console.print("[green]Original staging area restored.[/green]")
+            _restore_original_staging(original_staged_files, original_staged_tree)
             return 1
 
     return 0
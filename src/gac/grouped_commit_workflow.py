@@ -23,6 +23,7 @@ from rich.panel import Panel
 
 from gac.ai import generate_grouped_commits
 from gac.ai_utils import count_tokens
+from gac.background_hooks import finish_background_hooks
 from gac.config import GACConfig
 from gac.grouped_commit_executor import GroupedCommitResult, execute_grouped_commits
 from gac.grouped_response_parser import parse_json_response, validate_file_coverage
@@ -350,7 +351,7 @@ class GroupedCommitWorkflow:
         from gac.git import get_staged_files
 
         if ctx.flags.show_prompt:
-            PromptBuilder.display_prompts(ctx.system_prompt, ctx.user_prompt)
+            PromptBuilder.display_prompts(ctx.system_prompt, ctx.user_prompt, ctx.git_state.diff_context)
 
         conversation_messages: list[dict[str, str]] = []
         if ctx.system_prompt:
@@ -405,6 +406,8 @@ class GroupedCommitWorkflow:
             if ctx.flags.require_confirmation:
                 decision = self.handle_grouped_commit_confirmation(commit_result, conversation_messages)
                 if decision == "accept":
+                    if not finish_background_hooks(ctx.state.background_hooks):
+                        return 1
                     return self.execute_grouped_commits(
                         result=commit_result,
                         dry_run=ctx.dry_run,
@@ -420,6 +423,8 @@ class GroupedCommitWorkflow:
                 else:
                     continue
             else:
+                if not finish_background_hooks(ctx.state.background_hooks):
+                    return 1
                 return self.execute_grouped_commits(
                     result=commit_result,
                     dry_run=ctx.dry_run,
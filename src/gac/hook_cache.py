@@ -0,0 +1,82 @@
+"""Remember which staged trees already passed the pre-commit/Lefthook hooks.
+
+Regenerating a message, retrying after an OAuth refresh or calling the MCP
+tools again re-enters the hook step with exactly the same index.  A hook
+run is fully determined by the staged tree, the hook runner and its
+configuration, so a successful run is recorded under a key built from the
+``git write-tree`` object id, the runner's executable and the contents of
+its configuration files.  Keys live in ``.git/gac/hook-results.json``;
+failures are never cached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import time
+from functools import lru_cache
+
+from gac.state_files import gac_state_path, load_json_state, store_json_state
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "hook-results.json"
+MAX_ENTRIES = 64
+
+_OBJECT_ID = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+
+
+@lru_cache(maxsize=32)
+def _which(name: str, path: str | None) -> str | None:
+    return shutil.which(name, path=path)
+
+
+def find_hook_tool(name: str) -> str | None:
+    """Locate a hook runner executable on ``PATH`` without spawning it.
+
+    Lookups are memoized per ``PATH`` value for the life of the process.
+    """
+    return _which(name, os.environ.get("PATH"))
+
+
+def _cache_path() -> str | None:
+    return gac_state_path(CACHE_FILENAME)
+
+
+def hook_cache_key(name: str, tool: str, config_files: list[str]) -> str | None:
+    """Key identifying a hook run on the current staged tree, or None if it cannot be computed."""
+    from gac.git import run_git_command
+
+    tree = run_git_command(["write-tree"], silent=True)
+    if not tree.success or not _OBJECT_ID.match(tree.output):
+        return None
+
+    digest = hashlib.sha256(f"{name}\0{tool}\0{tree.output}\0".encode())
+    for config_file in config_files:
+        try:
+            with open(config_file, "rb") as f:
+                content = f.read()
+        except OSError:
+            continue
+        digest.update(config_file.encode() + b"\0" + hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+def is_cached_success(key: str) -> bool:
+    """Whether hooks already passed for ``key``."""
+    path = _cache_path()
+    return path is not None and key in load_json_state(path)
+
+
+def record_success(key: str) -> None:
+    """Remember that hooks passed for ``key``, keeping only the newest entries."""
+    path = _cache_path()
+    if path is None:
+        return
+    entries = load_json_state(path)
+    entries[key] = time.time()
+    newest = sorted(entries.items(), key=lambda item: item[1], reverse=True)[:MAX_ENTRIES]
+    store_json_state(path, dict(newest))
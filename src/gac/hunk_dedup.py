@@ -0,0 +1,169 @@
+"""Fold hunks that repeat across files into a single copy.
+
+A codemod or a rename across hundreds of files stages hundreds of nearly
+identical hunks, and truncation would either spend the whole token budget
+repeating them or drop most of the files.  :func:`dedupe_hunks` normalizes
+the changed lines of every hunk (whitespace and the file's own path are
+ignored, and optionally every identifier), hashes them, and keeps only the
+first hunk of each group that repeats, annotated with the other files it
+stands for.  Files left without hunks are dropped; their paths are kept on
+the section that shows the change so the truncation summary can count them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from collections import defaultdict
+
+from gac.diff_sections import DiffSection, as_diff_section, parse_diff_section
+
+logger = logging.getLogger(__name__)
+
+# Hunks repeated fewer times are left alone
+MIN_DUPLICATE_HUNKS = 3
+# Changes shorter than this once normalized (e.g. a lone "}") match too easily by chance
+MIN_NORMALIZED_CHARS = 16
+# Paths listed in the note on a folded hunk
+MAX_LISTED_PATHS = 8
+
+_WHITESPACE = re.compile(r"\s+")
+_IDENTIFIER = re.compile(r"\b[A-Za-z_]\w*\b")
+
+
+def normalize_hunk(hunk: str, path: str, identifiers: bool = False) -> str:
+    """Changed lines of ``hunk`` with whitespace and references to ``path`` removed.
+
+    Args:
+        hunk: Hunk text starting at its ``@@`` line
+        path: Path of the file the hunk belongs to
+        identifiers: Also replace every identifier, so renames of different
+            symbols with the same shape normalize alike
+
+    Returns:
+        The normalized change, or "" if the hunk changes no lines
+    """
+    filename = path.rsplit("/", 1)[-1]
+    stem = filename.rsplit(".", 1)[0]
+    replacements = [(path, "<path>"), (filename, "<file>")]
+    stem_pattern = re.compile(rf"\b{re.escape(stem)}\b") if len(stem) >= 3 else None
+
+    lines = []
+    for line in hunk.split("\n")[1:]:
+        marker = line[:1]
+        if marker not in ("+", "-"):
+            continue
+        content = line[1:]
+        for text, placeholder in replacements:
+            content = content.replace(text, placeholder)
+        if stem_pattern is not None:
+            content = stem_pattern.sub("<stem>", content)
+        if identifiers:
+            content = _IDENTIFIER.sub("_", content)
+        lines.append(marker + _WHITESPACE.sub("", content))
+    return "\n".join(lines)
+
+
+def _hunks(section: DiffSection) -> tuple[str, list[str]]:
+    text = section.text
+    bounds = [*section.hunk_offsets, len(text)]
+    return text[: bounds[0]], [text[start:end] for start, end in zip(bounds, bounds[1:], strict=False)]
+
+
+def _list_paths(paths: list[str]) -> str:
+    listed = ", ".join(paths[:MAX_LISTED_PATHS])
+    if len(paths) > MAX_LISTED_PATHS:
+        listed += f" and {len(paths) - MAX_LISTED_PATHS} more"
+    return listed
+
+
+def dedupe_hunks(sections: list[str] | list[DiffSection], identifiers: bool = False) -> list[DiffSection]:
+    """Keep one copy of each hunk repeated across at least ``MIN_DUPLICATE_HUNKS`` places.
+
+    The kept copy is followed by a note listing the other files with the
+    same change. Other copies are removed from their sections, which note
+    how many they lost; sections left without hunks are dropped and their
+    paths recorded in ``folded_paths`` of the section keeping the copy.
+
+    Args:
+        sections: Diff sections, in diff order
+        identifiers: Also ignore identifiers when comparing hunks
+
+    Returns:
+        The sections with repeated hunks folded, in the same order
+    """
+    sections = [as_diff_section(section) for section in sections]
+    groups: defaultdict[bytes, list[tuple[int, int]]] = defaultdict(list)
+    split: list[tuple[str, list[str]]] = []
+    for section_index, section in enumerate(sections):
+        header, hunks = _hunks(section) if section.has_header and not section.is_binary else (section.text, [])
+        split.append((header, hunks))
+        for hunk_index, hunk in enumerate(hunks):
+            normalized = normalize_hunk(hunk, section.path, identifiers)
+            if len(normalized) >= MIN_NORMALIZED_CHARS:
+                groups[hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()].append(
+                    (section_index, hunk_index)
+                )
+
+    # (section, hunk) of each kept copy -> (number of other copies, other paths with the change)
+    kept: dict[tuple[int, int], tuple[int, list[str]]] = {}
+    removed: defaultdict[int, set[int]] = defaultdict(set)
+    representative_of: dict[int, int] = {}
+    for members in groups.values():
+        if len(members) < MIN_DUPLICATE_HUNKS:
+            continue
+        first_section, first_hunk = members[0]
+        others: list[str] = []
+        for section_index, hunk_index in members[1:]:
+            removed[section_index].add(hunk_index)
+            representative_of.setdefault(section_index, first_section)
+            path = sections[section_index].path
+            if path != sections[first_section].path and path not in others:
+                others.append(path)
+        kept[(first_section, first_hunk)] = (len(members) - 1, others)
+
+    if not removed:
+        return sections
+
+    # A section keeping a copy survives even if all its other hunks were folded
+    keeping = {section_index for section_index, _ in kept}
+    dropped = {index for index, hunk_indexes in removed.items() if len(hunk_indexes) == len(split[index][1])} - keeping
+    folded_paths: defaultdict[int, list[str]] = defaultdict(list)
+    for index in sorted(dropped):
+        folded_paths[representative_of[index]].append(sections[index].path)
+
+    result: list[DiffSection] = []
+    for index, section in enumerate(sections):
+        if index in dropped:
+            continue
+        if index not in removed and index not in keeping:
+            result.append(section)
+            continue
+
+        header, hunks = split[index]
+        parts = [header]
+        folded_hunks = 0
+        for hunk_index, hunk in enumerate(hunks):
+            if hunk_index in removed[index]:
+                continue
+            parts.append(hunk if hunk.endswith("\n") else hunk + "\n")
+            if (index, hunk_index) in kept:
+                copies, others = kept[(index, hunk_index)]
+                folded_hunks += copies
+                where = f" in {len(others)} other files: {_list_paths(others)}" if others else ""
+                parts.append(f"[Same change repeated {copies} more times{where}]\n")
+        if removed[index]:
+            parts.append(f"[{len(removed[index])} hunks folded into an identical change shown once]\n")
+
+        rebuilt = parse_diff_section("".join(parts))
+        rebuilt.elided_bytes = section.elided_bytes
+        rebuilt.folded_hunks = section.folded_hunks + folded_hunks
+        rebuilt.folded_paths = section.folded_paths + tuple(folded_paths[index])
+        result.append(rebuilt)
+
+    logger.info(
+        f"Folded {sum(len(hunks) for hunks in removed.values())} repeated hunks; "
+        f"{len(dropped)} files had no other changes"
+    )
+    return result
@@ -35,10 +35,12 @@ class InteractiveMode:
         quiet: bool = False,
     ) -> list[str]:
         """Generate contextual questions about staged changes."""
+        from gac.constants import Utility
         from gac.prompt import build_question_generation_prompt
 
         status = git_state.status
-        diff = git_state.processed_diff
+        # Questions rarely need every hunk, and the commit prompt sends the full diff anyway
+        diff = git_state.views.fitting(Utility.QUESTION_DIFF_TOKEN_LIMIT)
         diff_stat = git_state.diff_stat
 
         try:
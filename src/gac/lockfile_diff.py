@@ -0,0 +1,198 @@
+"""Summarize lockfile diffs as package version changes.
+
+A lockfile diff is thousands of lines of hashes and URLs, but what a commit
+message needs from it is which packages were added, removed or moved
+between versions.  :func:`summarize_lockfile_section` walks the hunks of a
+supported lockfile, tracking the package each old and new line belongs to,
+and replaces them with a compact table::
+
+    httpx 0.27.0 → 0.28.1
+    + rich 14.1.0
+    - six 1.16.0
+
+Only the hunks are read, so a version line whose package name lies outside
+the diff context cannot be attributed; such lines are counted instead.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from collections.abc import Callable
+from typing import NamedTuple
+
+from gac.diff_sections import DiffSection
+
+# Longest table emitted for one lockfile; further rows are counted
+MAX_LOCKFILE_ROWS = 40
+
+
+class LockfileFormat(NamedTuple):
+    """How package names and versions appear in one lockfile format.
+
+    Attributes:
+        name: Line naming the package that following version lines belong to
+        version: Line giving the version of the most recently named package
+        entry: Line giving both the name and the version of a package
+    """
+
+    name: re.Pattern[str] | None = None
+    version: re.Pattern[str] | None = None
+    entry: re.Pattern[str] | None = None
+
+
+_TOML = LockfileFormat(name=re.compile(r'^name = "([^"]+)"'), version=re.compile(r'^version = "([^"]+)"'))
+# "node_modules/<name>": { (npm v2+) or "<name>": { (npm v1, Pipfile.lock); the
+# project itself is the "" key, whose version is not a dependency change
+_JSON_KEYED = LockfileFormat(
+    name=re.compile(r'^\s*"(?:[^"]*node_modules/)?([^"]*)": \{\s*$'),
+    version=re.compile(r'^\s*"version": "(?:==)?([^"]+)"'),
+)
+
+LOCKFILE_FORMATS: dict[str, LockfileFormat] = {
+    "uv.lock": _TOML,
+    "poetry.lock": _TOML,
+    "Cargo.lock": _TOML,
+    "package-lock.json": _JSON_KEYED,
+    "npm-shrinkwrap.json": _JSON_KEYED,
+    "Pipfile.lock": _JSON_KEYED,
+    "composer.lock": LockfileFormat(
+        name=re.compile(r'^\s*"name": "([^"]+)"'), version=re.compile(r'^\s*"version": "([^"]+)"')
+    ),
+    # "@babel/core@^7.0.0", "@babel/core@^7.1.0":  then  version "7.1.2" (or version: 7.1.2 for Yarn 2+)
+    "yarn.lock": LockfileFormat(
+        name=re.compile(r'^"?(@?[^@"\s]+)@'), version=re.compile(r'^\s+version:?\s+"?([^"\s]+)"?\s*$')
+    ),
+    # /lodash@4.17.21: (v6), lodash@4.17.21: (v9) or /lodash/4.17.21: (v5)
+    "pnpm-lock.yaml": LockfileFormat(
+        entry=re.compile(r"""^ {2}['"]?/?((?:@[^@/\s'"]+/)?[^@/\s'"]+)[@/](\d[^:'"\s(]*)""")
+    ),
+    "Gemfile.lock": LockfileFormat(entry=re.compile(r"^ {4}([^\s(]+) \(([^)\s]+)\)\s*$")),
+    "go.sum": LockfileFormat(entry=re.compile(r"^(\S+) (v[^\s/]+)(?:/go\.mod)? h1:")),
+}
+
+
+def lockfile_format(path: str) -> LockfileFormat | None:
+    """The :class:`LockfileFormat` for ``path``, if its lockfile type is supported."""
+    return LOCKFILE_FORMATS.get(path.rsplit("/", 1)[-1])
+
+
+def is_lockfile_section(section: DiffSection) -> bool:
+    """Whether ``section`` is a textual diff of a supported lockfile that has not been summarized yet."""
+    return (
+        section.has_header
+        and not section.is_binary
+        and bool(section.hunk_offsets)
+        and lockfile_format(section.path) is not None
+    )
+
+
+def lockfile_line_filter(path: str) -> Callable[[str], bool] | None:
+    """Predicate keeping only the diff lines :func:`summarize_lockfile_section` reads.
+
+    Lets a streamed lockfile section be summarized without retaining its
+    hashes and URLs. Returns None for unsupported files.
+    """
+    lockfile = lockfile_format(path)
+    if lockfile is None:
+        return None
+    patterns = [pattern for pattern in lockfile if pattern is not None]
+
+    def keep(line: str) -> bool:
+        if line.startswith("@@"):
+            return True
+        content = line[1:]
+        return any(pattern.match(content) for pattern in patterns)
+
+    return keep
+
+
+def _hunk_lines(section: DiffSection) -> list[list[str]]:
+    text = section.text
+    bounds = [*section.hunk_offsets, len(text)]
+    return [text[start:end].split("\n")[1:] for start, end in zip(bounds, bounds[1:], strict=False)]
+
+
+def lockfile_version_changes(
+    section: DiffSection, lockfile: LockfileFormat
+) -> tuple[dict[str, set[str]], dict[str, set[str]], int]:
+    """Collect the package versions on the old and new side of a lockfile diff.
+
+    Context lines count for both sides, so unchanged packages cancel out.
+
+    Returns:
+        ``(old, new, unattributed)``: versions per package name on each side,
+        and the number of changed version lines whose package is unknown
+    """
+    versions: dict[str, defaultdict[str, set[str]]] = {"-": defaultdict(set), "+": defaultdict(set)}
+    unattributed = 0
+
+    for hunk in _hunk_lines(section):
+        names: dict[str, str | None] = {"-": None, "+": None}
+        for line in hunk:
+            marker, content = line[:1], line[1:]
+            if marker == " ":
+                sides: tuple[str, ...] = ("-", "+")
+            elif marker in ("-", "+"):
+                sides = (marker,)
+            else:
+                continue
+
+            if lockfile.entry and (match := lockfile.entry.match(content)):
+                for side in sides:
+                    versions[side][match.group(1)].add(match.group(2))
+            elif lockfile.name and (match := lockfile.name.match(content)):
+                for side in sides:
+                    names[side] = match.group(1)
+            elif lockfile.version and (match := lockfile.version.match(content)):
+                for side in sides:
+                    name = names[side]
+                    if name:
+                        versions[side][name].add(match.group(1))
+                    elif name is None and marker != " ":
+                        unattributed += 1
+                    names[side] = None
+
+    return dict(versions["-"]), dict(versions["+"]), unattributed
+
+
+def format_version_changes(old: dict[str, set[str]], new: dict[str, set[str]]) -> list[str]:
+    """One row per package that was added, removed or changed version, sorted by name."""
+    rows = []
+    for name in sorted(old.keys() | new.keys(), key=str.lower):
+        removed = sorted(old.get(name, set()) - new.get(name, set()))
+        added = sorted(new.get(name, set()) - old.get(name, set()))
+        if removed and added:
+            rows.append(f"{name} {', '.join(removed)} → {', '.join(added)}")
+        elif added:
+            rows.append(f"+ {name} {', '.join(added)}")
+        elif removed:
+            rows.append(f"- {name} {', '.join(removed)}")
+    return rows
+
+
+def summarize_lockfile_section(section: DiffSection) -> str:
+    """Rewrite a lockfile diff section as a table of package version changes.
+
+    Args:
+        section: Parsed lockfile diff section
+
+    Returns:
+        The section's header lines followed by the version change table
+    """
+    lockfile = lockfile_format(section.path)
+    header = section.text[: section.hunk_offsets[0]] if section.hunk_offsets else section.text
+    if not header.endswith("\n"):
+        header += "\n"
+    if lockfile is None:
+        return header
+
+    old, new, unattributed = lockfile_version_changes(section, lockfile)
+    rows = format_version_changes(old, new)
+    lines = ["[Lockfile dependency changes]"] if rows else ["[Lockfile changed without package version changes]"]
+    lines.extend(rows[:MAX_LOCKFILE_ROWS])
+    if len(rows) > MAX_LOCKFILE_ROWS:
+        lines.append(f"... and {len(rows) - MAX_LOCKFILE_ROWS} more packages")
+    if unattributed:
+        lines.append(f"[{unattributed} version lines changed for packages outside the diff context]")
+    return header + "\n".join(lines) + "\n"
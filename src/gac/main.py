@@ -7,6 +7,7 @@ import logging
 
 from gac.ai import generate_commit_message
 from gac.ai_utils import count_tokens
+from gac.background_hooks import BackgroundHooks, StagedTreeChangedError, finish_background_hooks
 from gac.commit_executor import CommitExecutor
 from gac.config import GACConfig
 from gac.errors import AIError, ConfigError, handle_error
@@ -93,6 +94,8 @@ def _execute_single_commit_workflow(ctx: WorkflowContext, config: GACConfig) ->
         conversation_messages.append({"role": "assistant", "content": commit_message})
 
         if ctx.message_only:
+            if not finish_background_hooks(ctx.state.background_hooks):
+                return 1
             print(commit_message)
             reset_gac_token_accumulator()  # Don't leak tokens into next request
             return 0
@@ -126,6 +129,10 @@ def _execute_single_commit_workflow(ctx: WorkflowContext, config: GACConfig) ->
         else:
             break
 
+    # Hooks started in the background must pass, and leave the staged tree alone, before committing
+    if not finish_background_hooks(ctx.state.background_hooks):
+        return 1
+
     # Execute the commit
     ctx.state.commit_executor.create_commit(commit_message)
 
@@ -233,8 +240,9 @@ def main(opts: CLIOptions, config: GACConfig | None = None) -> int:
     if git_state is None:
         return 0
 
-    # Run pre-commit hooks
-    if not opts.no_verify and not opts.dry_run:
+    # Run pre-commit hooks (or start them alongside message generation below)
+    hooks_enabled = not opts.no_verify and not opts.dry_run
+    if hooks_enabled and not opts.parallel_hooks:
         if not run_lefthook_hooks(opts.hook_timeout):
             console.print("[red]Lefthook hooks failed. Please fix the issues and try again.[/red]")
             console.print("[yellow]You can use --no-verify to skip pre-commit and lefthook hooks.[/yellow]")
@@ -245,50 +253,53 @@ def main(opts: CLIOptions, config: GACConfig | None = None) -> int:
             console.print("[yellow]You can use --no-verify to skip pre-commit and lefthook hooks.[/yellow]")
             return 1
 
-    # Handle secret detection
-    if git_state.has_secrets:
-        secret_decision = git_validator.handle_secret_detection(git_state.secrets, opts.quiet)
-        if secret_decision is None:
-            # User chose to abort
-            return 0
-        if not secret_decision:
-            # Secrets were removed, we need to refresh the git state
-            git_state = git_validator.get_git_state(
-                stage_all=False,
-                dry_run=opts.dry_run,
-                skip_secret_scan=True,
-                quiet=opts.quiet,
-                model=model,
-            )
-            # After removing secret files, no staged changes may remain
-            if git_state is None:
+    base_max_output_tokens = max_output_tokens
+    while True:
+        # Handle secret detection
+        if git_state.has_secrets:
+            secret_decision = git_validator.handle_secret_detection(git_state.secrets, opts.quiet)
+            if secret_decision is None:
+                # User chose to abort
                 return 0
+            if not secret_decision:
+                # Secrets were removed, we need to refresh the git state
+                git_state = git_validator.get_git_state(
+                    stage_all=False,
+                    dry_run=opts.dry_run,
+                    skip_secret_scan=True,
+                    quiet=opts.quiet,
+                    model=model,
+                )
+                # After removing secret files, no staged changes may remain
+                if git_state is None:
+                    return 0
+
+        background_hooks = BackgroundHooks(opts.hook_timeout) if hooks_enabled and opts.parallel_hooks else None
+
+        # Adjust max_output_tokens for grouped mode
+        max_output_tokens = base_max_output_tokens
+        if opts.group:
+            num_files = len(git_state.staged_files)
+            multiplier = min(5, 2 + (num_files // 10))
+            max_output_tokens *= multiplier
+            logger.debug(f"Grouped mode: scaling max_output_tokens by {multiplier}x for {num_files} files")
 
-    # Adjust max_output_tokens for grouped mode
-    if opts.group:
-        num_files = len(git_state.staged_files)
-        multiplier = min(5, 2 + (num_files // 10))
-        max_output_tokens *= multiplier
-        logger.debug(f"Grouped mode: scaling max_output_tokens by {multiplier}x for {num_files} files")
-
-    # Build prompts
-    prompts = prompt_builder.build_prompts(
-        git_state=git_state,
-        group=opts.group,
-        one_liner=opts.one_liner,
-        hint=opts.hint,
-        infer_scope=opts.infer_scope,
-        verbose=opts.verbose,
-        language=opts.language,
-        fifty_seventy_two=opts.fifty_seventy_two,
-    )
+        # Build prompts
+        prompts = prompt_builder.build_prompts(
+            git_state=git_state,
+            group=opts.group,
+            one_liner=opts.one_liner,
+            hint=opts.hint,
+            infer_scope=opts.infer_scope,
+            verbose=opts.verbose,
+            language=opts.language,
+            fifty_seventy_two=opts.fifty_seventy_two,
+        )
 
-    # Display prompts if requested
-    if opts.show_prompt:
-        prompt_builder.display_prompts(prompts.system_prompt, prompts.user_prompt)
+        # Display prompts if requested
+        if opts.show_prompt:
+            prompt_builder.display_prompts(prompts.system_prompt, prompts.user_prompt, git_state.diff_context)
 
-    def _build_context() -> WorkflowContext:
-        """Build WorkflowContext for the single-commit path."""
         gen_config = GenerationConfig(
             model=model,
             temperature=temperature,
@@ -314,18 +325,40 @@ def main(opts: CLIOptions, config: GACConfig | None = None) -> int:
             hint=opts.hint,
             commit_executor=commit_executor,
             interactive_mode=interactive_mode,
+            background_hooks=background_hooks,
         )
-        return WorkflowContext(config=gen_config, flags=flags, state=state)
-
-    try:
-        if opts.group:
-            # Execute grouped workflow using the same WorkflowContext
-            return grouped_workflow.execute_workflow(_build_context(), config)
-        else:
-            # Execute single commit workflow
-            return _execute_single_commit_workflow(_build_context(), config)
-    except AIError as e:
-        return handle_oauth_retry(e=e, ctx=_build_context(), config=config)
+        ctx = WorkflowContext(config=gen_config, flags=flags, state=state)
+
+        try:
+            try:
+                if opts.group:
+                    # Execute grouped workflow using the same WorkflowContext
+                    return grouped_workflow.execute_workflow(ctx, config)
+                else:
+                    # Execute single commit workflow
+                    return _execute_single_commit_workflow(ctx, config)
+            except AIError as e:
+                return handle_oauth_retry(e=e, ctx=ctx, config=config)
+        except StagedTreeChangedError as e:
+            # The message was written for a diff that no longer exists
+            logger.info(str(e))
+            if not opts.quiet:
+                console.print("[yellow]Hooks changed the staged files; regenerating the commit message...[/yellow]")
+            git_state = git_validator.get_git_state(
+                stage_all=False,
+                dry_run=opts.dry_run,
+                skip_secret_scan=opts.skip_secret_scan,
+                quiet=opts.quiet,
+                model=model,
+            )
+            if git_state is None:
+                return 0
+            # The hooks already passed on the new tree
+            hooks_enabled = False
+        finally:
+            # Hooks still running when the workflow ends (e.g. the user aborted) must not restage files later
+            if background_hooks is not None:
+                background_hooks.cancel()
 
 
 if __name__ == "__main__":
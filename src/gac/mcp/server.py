@@ -18,6 +18,9 @@ import logging
 
 from mcp.server.fastmcp import FastMCP
 
+from gac.diff_stream import read_diff_within_budget
+from gac.errors import GitError
+from gac.git_pool import shared_git_pool
 from gac.mcp.models import (
     CommitRequest,
     CommitResult,
@@ -48,6 +51,9 @@ mcp = FastMCP(
     "Use gac_status to see repository state, then gac_commit to generate and execute commits.",
 )
 
+# Warm git helpers shared by every tool call for the lifetime of the server
+_git_pool = shared_git_pool()
+
 
 # =============================================================================
 # MCP TOOLS
@@ -100,9 +106,10 @@ def gac_status(request: StatusRequest) -> StatusResult:
             include_history=5
         ))
     """
-    # Check if we're in a git repo
-    is_repo, error = _check_git_repo()
-    if not is_repo:
+    # Check if we're in a git repo; after the first call this reads HEAD without spawning git
+    try:
+        branch = _git_pool.repository_head().branch
+    except GitError as error:
         return StatusResult(
             branch="",
             is_clean=False,
@@ -112,10 +119,10 @@ def gac_status(request: StatusRequest) -> StatusResult:
         )
 
     try:
-        from gac.git import get_current_branch, run_git_command
+        from gac.git import run_git_command
 
-        # Get basic status
-        branch = get_current_branch()
+        # Get basic status. Unlike the staged snapshot this runs git on every call:
+        # worktree edits leave no on-disk signature a cached answer could be checked against
         file_status = _get_file_status()
 
         staged = file_status.staged
@@ -133,13 +140,14 @@ def gac_status(request: StatusRequest) -> StatusResult:
         diff_truncated = False
 
         if request.include_diff:
-            diff_args = ["diff"]
             if request.staged_only:
-                diff_args.append("--cached")
+                # Reused across calls until the index changes; huge diffs are streamed within the token budget
+                raw_diff = _git_pool.staged_snapshot().patch
+                if raw_diff is None:
+                    raw_diff = read_diff_within_budget(scan_secrets=False).diff
             else:
-                diff_args.append("HEAD")
-
-            raw_diff = run_git_command(diff_args).require_success()
+                # Includes unstaged changes, so it cannot be served from the snapshot either
+                raw_diff = run_git_command(["diff", "HEAD"]).require_success()
             diff_output, diff_truncated = _truncate_diff(raw_diff, request.max_diff_lines)
 
             # Include stats
@@ -14,6 +14,7 @@ from typing import NamedTuple
 
 from rich.console import Console as RichConsole
 
+from gac.diff_sections import parse_diff
 from gac.mcp.models import CommitInfo, DiffStats, FileStat
 
 logger = logging.getLogger(__name__)
@@ -100,47 +101,15 @@ def _get_file_status() -> FileStatus:
 
 def _get_diff_stats(diff_output: str) -> DiffStats:
     """Parse diff output to extract statistics."""
-    files_changed = 0
-    insertions = 0
-    deletions = 0
-    file_stats: list[FileStat] = []
-
-    current_file = None
-    file_insertions = 0
-    file_deletions = 0
-
-    for line in diff_output.splitlines():
-        if line.startswith("diff --git"):
-            # Save previous file stats
-            if current_file:
-                file_stats.append(
-                    FileStat(
-                        file=current_file,
-                        insertions=file_insertions,
-                        deletions=file_deletions,
-                    )
-                )
-            # Start new file
-            parts = line.split(" b/")
-            current_file = parts[-1] if len(parts) > 1 else ""
-            file_insertions = 0
-            file_deletions = 0
-            files_changed += 1
-        elif line.startswith("+") and not line.startswith("+++"):
-            insertions += 1
-            file_insertions += 1
-        elif line.startswith("-") and not line.startswith("---"):
-            deletions += 1
-            file_deletions += 1
-
-    # Save last file
-    if current_file:
-        file_stats.append(FileStat(file=current_file, insertions=file_insertions, deletions=file_deletions))
-
+    file_stats = [
+        FileStat(file=section.path, insertions=section.additions, deletions=section.deletions)
+        for section in parse_diff(diff_output)
+        if section.has_header
+    ]
     return DiffStats(
-        files_changed=files_changed,
-        insertions=insertions,
-        deletions=deletions,
+        files_changed=len(file_stats),
+        insertions=sum(stat.insertions for stat in file_stats),
+        deletions=sum(stat.deletions for stat in file_stats),
         file_stats=file_stats,
     )
 
@@ -0,0 +1,248 @@
+"""Condense Jupyter notebook diffs to their cell source changes.
+
+A notebook is a JSON document, so its raw diff is mostly execution counts,
+base64-encoded images and metadata.  :func:`condense_notebook_section`
+replaces the hunks of a ``.ipynb`` section with one pseudo-hunk per changed
+cell, showing the cell's index, type and source diff, followed by a single
+line each for output and metadata changes.
+
+Both versions of the notebook are read from the blob IDs on the section's
+``index`` line.  When they are not available (e.g. the diff did not come
+from this repository) the hunks are condensed directly, keeping only the
+changed lines inside ``"source"`` arrays.
+"""
+
+from __future__ import annotations
+
+import difflib
+import json
+import logging
+import re
+from typing import Any
+
+from gac.diff_sections import DiffSection, blob_ids
+
+logger = logging.getLogger(__name__)
+
+NOTEBOOK_SUFFIX = ".ipynb"
+
+_KEY_LINE = re.compile(r'^(\s*)"(source|outputs|metadata|attachments)": [\[{]\s*$')
+_CELL_TYPE = re.compile(r'^\s*"cell_type": "(\w+)"')
+_SOURCE_CONTEXT_LINES = 1
+
+
+def is_notebook_section(section: DiffSection) -> bool:
+    """Whether ``section`` is a textual diff of a Jupyter notebook that has not been condensed yet."""
+    return (
+        section.has_header
+        and section.path.endswith(NOTEBOOK_SUFFIX)
+        and not section.is_binary
+        and bool(section.hunk_offsets)
+        and section.text.startswith("@@ -", section.hunk_offsets[0])
+    )
+
+
+def condense_notebook_section(section: DiffSection) -> str:
+    """Rewrite a notebook diff section as per-cell source changes.
+
+    Args:
+        section: Parsed ``.ipynb`` diff section
+
+    Returns:
+        The section's header lines followed by the condensed changes
+    """
+    header = section.text[: section.hunk_offsets[0]] if section.hunk_offsets else section.text
+    if not header.endswith("\n"):
+        header += "\n"
+
+    notebooks = _load_notebooks(section)
+    if notebooks is not None:
+        body = _describe_notebook_changes(*notebooks)
+    else:
+        body = _condense_hunks(section)
+    if not body:
+        body = ["[Notebook changed without cell source, output or metadata changes]"]
+    return header + "\n".join(body) + "\n"
+
+
+def _read_notebook(blob: str) -> dict[str, Any] | None:
+    if not blob.strip("0"):
+        return {"cells": []}
+
+    from gac.git_pool import read_blob
+
+    content = read_blob(blob)
+    if content is None:
+        return None
+    try:
+        notebook = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(notebook, dict) or not isinstance(notebook.get("cells", []), list):
+        return None
+    return notebook
+
+
+def _load_notebooks(section: DiffSection) -> tuple[dict[str, Any], dict[str, Any]] | None:
+    ids = blob_ids(section)
+    if ids is None:
+        return None
+    old = _read_notebook(ids[0])
+    new = _read_notebook(ids[1]) if old is not None else None
+    if old is None or new is None:
+        logger.debug(f"Notebook blobs for {section.path} unavailable, condensing its hunks instead")
+        return None
+    return old, new
+
+
+def _source_lines(cell: dict[str, Any]) -> list[str]:
+    source = cell.get("source", "")
+    text = "".join(source) if isinstance(source, list) else str(source)
+    return text.splitlines()
+
+
+def _cell_label(index: int, cell: dict[str, Any], change: str) -> str:
+    return f"@@ cell {index + 1} ({cell.get('cell_type', 'unknown')}) {change} @@"
+
+
+def _source_diff(old: list[str], new: list[str]) -> list[str]:
+    lines: list[str] = []
+    for line in difflib.unified_diff(old, new, lineterm="", n=_SOURCE_CONTEXT_LINES):
+        if line.startswith(("---", "+++")):
+            continue
+        if line.startswith("@@"):
+            if lines:
+                lines.append(" ...")
+            continue
+        lines.append(line)
+    return lines
+
+
+def _format_cells(indexes: list[int]) -> str:
+    label = "cell" if len(indexes) == 1 else "cells"
+    return f"{label} {', '.join(str(index + 1) for index in indexes)}"
+
+
+def _describe_notebook_changes(old_nb: dict[str, Any], new_nb: dict[str, Any]) -> list[str]:
+    old_cells = [cell for cell in old_nb.get("cells", []) if isinstance(cell, dict)]
+    new_cells = [cell for cell in new_nb.get("cells", []) if isinstance(cell, dict)]
+    old_keys = [(cell.get("cell_type"), tuple(_source_lines(cell))) for cell in old_cells]
+    new_keys = [(cell.get("cell_type"), tuple(_source_lines(cell))) for cell in new_cells]
+
+    body: list[str] = []
+    pairs: list[tuple[int, int]] = []
+    matcher = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            pairs.extend(zip(range(i1, i2), range(j1, j2), strict=True))
+            continue
+        deleted = list(range(i1, i2))
+        added = list(range(j1, j2))
+        if tag == "replace":
+            # Cells at the same position with the same type were edited rather than replaced
+            for offset in range(min(i2 - i1, j2 - j1)):
+                old_cell, new_cell = old_cells[i1 + offset], new_cells[j1 + offset]
+                if old_cell.get("cell_type") != new_cell.get("cell_type"):
+                    continue
+                pairs.append((i1 + offset, j1 + offset))
+                deleted.remove(i1 + offset)
+                added.remove(j1 + offset)
+                body.append(_cell_label(j1 + offset, new_cell, "modified"))
+                body.extend(_source_diff(_source_lines(old_cell), _source_lines(new_cell)))
+        for index in deleted:
+            body.append(_cell_label(index, old_cells[index], "deleted"))
+            body.extend(f"-{line}" for line in _source_lines(old_cells[index]))
+        for index in added:
+            body.append(_cell_label(index, new_cells[index], "added"))
+            body.extend(f"+{line}" for line in _source_lines(new_cells[index]))
+
+    outputs_changed = []
+    metadata_changed = []
+    for old_index, new_index in pairs:
+        old_cell, new_cell = old_cells[old_index], new_cells[new_index]
+        if old_cell.get("outputs") != new_cell.get("outputs") or old_cell.get("execution_count") != new_cell.get(
+            "execution_count"
+        ):
+            outputs_changed.append(new_index)
+        if old_cell.get("metadata") != new_cell.get("metadata") or old_cell.get("attachments") != new_cell.get(
+            "attachments"
+        ):
+            metadata_changed.append(new_index)
+
+    if outputs_changed:
+        body.append(f"[Outputs or execution counts changed in {_format_cells(sorted(outputs_changed))}]")
+    metadata_parts = []
+    if old_nb.get("metadata") != new_nb.get("metadata") or old_nb.get("nbformat") != new_nb.get("nbformat"):
+        metadata_parts.append("notebook")
+    if metadata_changed:
+        metadata_parts.append(_format_cells(sorted(metadata_changed)))
+    if metadata_parts:
+        body.append(f"[Metadata changed: {', '.join(metadata_parts)}]")
+    return body
+
+
+def _decode_source_line(line: str) -> str:
+    literal = line.strip().rstrip(",")
+    try:
+        value = json.loads(literal)
+    except ValueError:
+        return line.strip()
+    return value.rstrip("\n") if isinstance(value, str) else line.strip()
+
+
+def _condense_hunks(section: DiffSection) -> list[str]:
+    """Keep the changed source lines of each hunk, counting everything else."""
+    text = section.text
+    offsets = section.hunk_offsets
+    body: list[str] = []
+    output_lines = metadata_lines = other_lines = 0
+
+    for number, start in enumerate(offsets):
+        end = offsets[number + 1] if number + 1 < len(offsets) else len(text)
+        hunk = text[start:end].splitlines()
+        hunk_header = re.match(r"@@ -\d+(?:,\d+)? \+(\d+)", hunk[0])
+        line_number = int(hunk_header.group(1)) if hunk_header else 0
+        # Hunks can start inside any part of a cell, so the enclosing keys are unknown until one is seen
+        keys: list[tuple[str, str]] = []
+        # The old and new side of a hunk can be in cells of different types
+        cell_types = {"-": "unknown", "+": "unknown"}
+        labelled: str | None = None
+
+        for line in hunk[1:]:
+            marker, content = line[:1], line[1:]
+            if marker == "\\":
+                continue
+            type_match = _CELL_TYPE.match(content)
+            if type_match:
+                for side in cell_types if marker == " " else (marker,):
+                    cell_types[side] = type_match.group(1)
+                labelled = None
+            key_match = _KEY_LINE.match(content)
+            stripped = content.lstrip()
+            if key_match:
+                keys.append((key_match.group(2), key_match.group(1)))
+            elif keys and stripped.startswith(("]", "}")) and len(content) - len(stripped) == len(keys[-1][1]):
+                keys.pop()
+            elif marker in "+-":
+                enclosing = {key for key, _ in keys}
+                if "outputs" in enclosing or '"execution_count"' in content:
+                    output_lines += 1
+                elif "source" in enclosing:
+                    if labelled != cell_types[marker]:
+                        labelled = cell_types[marker]
+                        body.append(f"@@ notebook line {line_number} ({labelled} cell) @@")
+                    body.append(marker + _decode_source_line(content))
+                elif enclosing & {"metadata", "attachments"}:
+                    metadata_lines += 1
+                elif stripped.rstrip(",") not in ("", "{", "}", "[", "]"):
+                    other_lines += 1
+            if marker != "-":
+                line_number += 1
+
+    if output_lines:
+        body.append(f"[{output_lines} output or execution count lines changed]")
+    if metadata_lines:
+        body.append(f"[{metadata_lines} metadata lines changed]")
+    if other_lines:
+        body.append(f"[{other_lines} other notebook lines changed]")
+    return body
@@ -0,0 +1,182 @@
+"""Build a chain of commits from the staged index without touching it.
+
+``git commit`` can only commit what is in the index, so creating several
+commits from one staging area normally means resetting and re-adding files
+for every commit.  :class:`TreeCommitBuilder` instead copies the staged
+entries of each group into a temporary ``GIT_INDEX_FILE``, turns it into a
+tree with ``write-tree`` and chains ``commit-tree`` objects.  The branch is
+moved with a single ``update-ref`` once every commit exists, so an error
+part-way through leaves the branch, the index and the working tree exactly
+as they were.
+
+Commit hooks are not run for commits built this way.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import tempfile
+
+from gac.errors import GitError
+from gac.utils import decode_output
+
+logger = logging.getLogger(__name__)
+
+
+def _run_git(args: list[str], index_file: str | None = None, stdin: str | None = None, timeout: int = 60) -> str:
+    """Run a git plumbing command, optionally against another index file."""
+    env = None
+    if index_file is not None:
+        env = {**os.environ, "GIT_INDEX_FILE": index_file}
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            input=stdin.encode("utf-8") if stdin is not None else None,
+            capture_output=True,
+            env=env,
+            timeout=timeout,
+            check=False,
+        )
+    except (subprocess.SubprocessError, OSError) as e:
+        raise GitError(f"git {args[0]} failed: {e}") from e
+    if result.returncode != 0:
+        stderr = decode_output(result.stderr).strip()
+        raise GitError(f"git {args[0]} failed: {stderr or f'exit code {result.returncode}'}")
+    return decode_output(result.stdout)
+
+
+def _try_git(args: list[str]) -> str | None:
+    """Run a git query whose failure just means "no value"."""
+    try:
+        return _run_git(args).strip() or None
+    except GitError:
+        return None
+
+
+class TreeCommitBuilder:
+    """Create commits for groups of staged files and publish them atomically.
+
+    Usage::
+
+        with TreeCommitBuilder() as builder:
+            for files, message in groups:
+                builder.commit(files, message)
+            builder.publish()
+    """
+
+    def __init__(self, signoff: bool = False) -> None:
+        self.signoff = signoff
+        self.commits: list[str] = []
+
+        self.original_head = _try_git(["rev-parse", "--verify", "--quiet", "HEAD^{commit}"])
+        self.head_ref = _try_git(["symbolic-ref", "--quiet", "HEAD"])
+        self._tree = _run_git(["rev-parse", f"{self.original_head}^{{tree}}"]).strip() if self.original_head else None
+        self._zero_oid = "0" * (64 if _run_git(["rev-parse", "--show-object-format"]).strip() == "sha256" else 40)
+        self._sign = _try_git(["config", "--bool", "commit.gpgSign"]) == "true"
+
+        # Staged entries of the real index: path -> "mode oid"
+        self._staged: dict[str, str] = {}
+        for record in _run_git(["ls-files", "--stage", "-z"]).split("\0"):
+            if not record:
+                continue
+            meta, path = record.split("\t", 1)
+            mode, oid, stage = meta.split()
+            if stage != "0":
+                raise GitError(f"Cannot build commits while {path} has merge conflicts")
+            self._staged[path] = f"{mode} {oid}"
+
+        git_dir = _run_git(["rev-parse", "--absolute-git-dir"]).strip()
+        fd, self._index_file = tempfile.mkstemp(prefix="gac-index-", dir=git_dir)
+        os.close(fd)
+        os.unlink(self._index_file)  # git rejects an empty file as an index
+        try:
+            if self.original_head:
+                _run_git(["read-tree", self.original_head], index_file=self._index_file)
+            else:
+                _run_git(["read-tree", "--empty"], index_file=self._index_file)
+        except GitError:
+            self.close()
+            raise
+
+    @property
+    def tip(self) -> str | None:
+        """The newest commit built so far, or the original HEAD."""
+        return self.commits[-1] if self.commits else self.original_head
+
+    def _signoff_message(self, message: str) -> str:
+        ident = _run_git(["var", "GIT_COMMITTER_IDENT"]).strip()
+        # "Name <email> <timestamp> <tz>"
+        trailer = f"Signed-off-by: {ident.rsplit(' ', 2)[0]}"
+        if trailer in message:
+            return message
+        return f"{message.rstrip()}\n\n{trailer}\n"
+
+    def commit(self, files: list[str], message: str) -> str:
+        """Commit the staged state of ``files`` on top of the previous commit.
+
+        Paths that are not in the index (deleted files, rename sources) are
+        removed from the commit.
+
+        Returns:
+            The new commit's object id.
+
+        Raises:
+            GitError: If nothing changes or any plumbing command fails.
+        """
+        lines = []
+        for path in files:
+            entry = self._staged.get(path)
+            lines.append(f"{entry}\t{path}" if entry else f"0 {self._zero_oid}\t{path}")
+        _run_git(["update-index", "-z", "--index-info"], index_file=self._index_file, stdin="\0".join(lines) + "\0")
+
+        tree = _run_git(["write-tree"], index_file=self._index_file).strip()
+        if tree == self._tree:
+            raise GitError(f"Nothing to commit for {', '.join(files)}")
+
+        if self.signoff:
+            message = self._signoff_message(message)
+
+        args = ["commit-tree", tree]
+        if self.tip:
+            args.extend(["-p", self.tip])
+        if self._sign:
+            args.append("-S")
+        args.extend(["-F", "-"])
+        commit = _run_git(args, stdin=message).strip()
+
+        self._tree = tree
+        self.commits.append(commit)
+        logger.debug(f"Built commit {commit[:12]} with {len(files)} file(s)")
+        return commit
+
+    def publish(self) -> None:
+        """Point the current branch (or detached HEAD) at the last commit in one atomic update.
+
+        Raises:
+            GitError: If HEAD moved since the builder was created.
+        """
+        if not self.commits:
+            return
+        ref = self.head_ref or "HEAD"
+        args = ["update-ref", "-m", f"gac: {len(self.commits)} grouped commit(s)"]
+        if self.head_ref is None:
+            args.append("--no-deref")
+        args.extend([ref, self.commits[-1], self.original_head or ""])
+        _run_git(args)
+        logger.info(f"Updated {ref} to {self.commits[-1][:12]}")
+
+    def close(self) -> None:
+        """Remove the temporary index."""
+        for path in (self._index_file, self._index_file + ".lock"):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> TreeCommitBuilder:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
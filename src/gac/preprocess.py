@@ -5,10 +5,17 @@ This module provides functions to preprocess git diffs for AI analysis,
 with a focus on handling large repositories efficiently.
 """
 
+import atexit
 import concurrent.futures
 import logging
+import math
 import os
 import re
+import sys
+import threading
+from collections.abc import Callable, Collection
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple, TypeVar
 
 from gac.ai_utils import count_tokens
 from gac.constants import (
@@ -17,6 +24,17 @@ from gac.constants import (
     FileTypeImportance,
     Utility,
 )
+from gac.diff_sections import DiffSection, as_diff_section, parse_diff, parse_diff_section
+from gac.embedded_blobs import collapse_embedded_blobs, format_size
+from gac.hunk_dedup import dedupe_hunks
+from gac.lockfile_diff import is_lockfile_section, summarize_lockfile_section
+from gac.notebook_diff import condense_notebook_section, is_notebook_section
+from gac.python_ast_diff import is_python_section, summarize_python_section
+from gac.tokenizers import CHARS_PER_TOKEN
+
+if TYPE_CHECKING:
+    from gac.churn_index import ChurnIndex
+    from gac.repo_snapshot import StagedEntry
 
 logger = logging.getLogger(__name__)
 
@@ -41,21 +59,112 @@ _GENERATED_PATTERNS: list[re.Pattern[str]] = [
 ]
 
 
+class SectionCondenser(NamedTuple):
+    """Rewrites one kind of diff section into a compact, prompt-friendly form.
+
+    Attributes:
+        name: Short name used in log messages
+        matches: Whether the condenser applies to a section
+        condense: Returns the condensed section text, starting with its diff header
+    """
+
+    name: str
+    matches: Callable[[DiffSection], bool]
+    condense: Callable[[DiffSection], str]
+
+
+# Consulted in order before should_filter_section(); the first match wins
+SECTION_CONDENSERS: list[SectionCondenser] = [
+    SectionCondenser("notebook", is_notebook_section, condense_notebook_section),
+    SectionCondenser("lockfile", is_lockfile_section, summarize_lockfile_section),
+]
+
+# Section-level helpers hand back sections in the form they were given
+_Section = TypeVar("_Section", str, DiffSection)
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+_executor: concurrent.futures.Executor | None = None
+_executor_lock = threading.Lock()
+_parallel_broken = False
+
+
+def _free_threaded() -> bool:
+    """Whether this interpreter runs Python threads in parallel (a free-threaded build with the GIL off)."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _section_executor() -> concurrent.futures.Executor:
+    """Shared thread pool for section work, created on first use and reused for the life of the process.
+
+    Section processing is pure-Python string and regex work, so it is only
+    spread over threads on a free-threaded interpreter.  Worker processes
+    would need a diff of tens of megabytes to repay their startup and
+    pickling cost, far more than gac ever buffers, so there is no process pool.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=Utility.MAX_WORKERS, thread_name_prefix="gac-sections"
+            )
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
+
+
+def _section_chars(section: str | DiffSection) -> int:
+    return len(section) if isinstance(section, str) else len(section.text)
+
+
+def _use_parallel(sections: list[str] | list[DiffSection]) -> bool:
+    """Whether ``sections`` are enough work to outweigh handing them to the shared pool."""
+    if _parallel_broken or not _free_threaded() or Utility.MAX_WORKERS < 2:
+        return False
+    if len(sections) < Utility.PARALLEL_MIN_SECTIONS:
+        return False
+    return sum(_section_chars(section) for section in sections) >= Utility.FREE_THREADED_MIN_CHARS
+
+
+def _map_sections(func: Callable[[_T], _R], sections: list[_T]) -> list[_R]:
+    """``[func(s) for s in sections]``, spread over the shared pool in contiguous chunks.
+
+    Results come back by section index, so the order never depends on which
+    worker finishes first.
+    """
+    global _parallel_broken
+    chunksize = max(1, len(sections) // (Utility.MAX_WORKERS * 4))
+    try:
+        return list(_section_executor().map(func, sections, chunksize=chunksize))
+    except (concurrent.futures.BrokenExecutor, OSError) as e:
+        # e.g. a pool shut down at interpreter exit; stay in-process from now on
+        logger.warning(f"Parallel section processing failed, continuing in-process: {e}")
+        _parallel_broken = True
+        return [func(section) for section in sections]
+
+
 def preprocess_diff(
-    diff: str, token_limit: int = Utility.DEFAULT_DIFF_TOKEN_LIMIT, model: str = "anthropic:claude-3-haiku-latest"
+    diff: str,
+    token_limit: int = Utility.DEFAULT_DIFF_TOKEN_LIMIT,
+    model: str = "anthropic:claude-3-haiku-latest",
+    churn: "Callable[[], ChurnIndex | None] | None" = None,
 ) -> str:
     """Preprocess a git diff to make it more suitable for AI analysis.
 
     This function processes a git diff by:
-    1. Filtering out binary and minified files
-    2. Scoring and prioritizing changes by importance
-    3. Truncating to fit within token limits
-    4. Focusing on structural and important changes
+    1. Filtering out binary and minified files and collapsing embedded data blobs
+    2. Folding hunks repeated across many files into one copy
+    3. Scoring and prioritizing changes by importance
+    4. Truncating to fit within token limits
+    5. Focusing on structural and important changes
 
     Args:
         diff: The git diff to process
         token_limit: Maximum tokens to keep in the processed diff
         model: Model identifier for token counting
+        churn: Loader of the history index weighting files by how often and
+            recently they change; only called when the diff needs truncating
 
     Returns:
         Processed diff optimized for AI consumption
@@ -69,9 +178,9 @@ def preprocess_diff(
 
     logger.info(f"Processing large diff ({initial_tokens} tokens, limit {token_limit})")
 
-    sections = split_diff_into_sections(diff)
-    processed_sections = process_sections_parallel(sections)
-    scored_sections = score_sections(processed_sections)
+    sections = parse_diff(diff)
+    processed_sections = dedupe_hunks(process_sections_parallel(sections))
+    scored_sections = score_sections(processed_sections, churn() if churn else None)
     truncated_diff = smart_truncate_diff(scored_sections, token_limit, model)
 
     return truncated_diff
@@ -86,14 +195,15 @@ def split_diff_into_sections(diff: str) -> list[str]:
     Returns:
         List of individual file sections
     """
-    if not diff:
-        return []
+    return [section.text for section in parse_diff(diff)]
 
-    return [s for s in re.split(r"(?=diff --git )", diff) if s]
 
+def process_sections_parallel(sections: list[_Section]) -> list[_Section]:
+    """Process diff sections, in parallel when there are enough of them.
 
-def process_sections_parallel(sections: list[str]) -> list[str]:
-    """Process diff sections in parallel for better performance.
+    On a free-threaded interpreter, diffs with thousands of sections are
+    spread over threads; everything else is processed in place. Either way
+    the result keeps the order of ``sections``.
 
     Args:
         sections: List of diff sections to process
@@ -101,27 +211,14 @@ def process_sections_parallel(sections: list[str]) -> list[str]:
     Returns:
         List of processed sections (filtered)
     """
-    # Small number of sections - process sequentially to avoid overhead
-    if len(sections) <= 3:
-        processed = []
-        for section in sections:
-            result = process_section(section)
-            if result:
-                processed.append(result)
-        return processed
+    if _use_parallel(sections):
+        results = _map_sections(process_section, sections)
+    else:
+        results = [process_section(section) for section in sections]
+    return [result for result in results if result]
 
-    filtered_sections = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=Utility.MAX_WORKERS) as executor:
-        future_to_section = {executor.submit(process_section, section): section for section in sections}
-        for future in concurrent.futures.as_completed(future_to_section):
-            result = future.result()
-            if result:
-                filtered_sections.append(result)
 
-    return filtered_sections
-
-
-def process_section(section: str) -> str | None:
+def process_section(section: _Section) -> _Section | None:
     """Process a single diff section.
 
     Args:
@@ -130,13 +227,41 @@ def process_section(section: str) -> str | None:
     Returns:
         Processed section or None if it should be filtered
     """
-    if should_filter_section(section):
+    parsed = as_diff_section(section)
+    condensed = condense_section(parsed)
+    if condensed is not None:
+        return condensed if isinstance(section, str) else parse_diff_section(condensed)
+    collapsed = collapse_embedded_blobs(parsed)
+    if should_filter_section(collapsed):
         # Return a summary for filtered files instead of removing completely
-        return extract_filtered_file_summary(section)
-    return section
+        summary = extract_filtered_file_summary(collapsed)
+        return summary if isinstance(section, str) else parse_diff_section(summary)
+    if collapsed is parsed:
+        return section
+    return collapsed.text if isinstance(section, str) else collapsed
+
+
+def condense_section(section: str | DiffSection) -> str | None:
+    """Condense a section with the first matching :data:`SECTION_CONDENSERS` entry.
+
+    Args:
+        section: Diff section to condense
+
+    Returns:
+        The condensed section text, or None if no condenser applies
+    """
+    parsed = as_diff_section(section)
+    for condenser in SECTION_CONDENSERS:
+        if condenser.matches(parsed):
+            condensed = condenser.condense(parsed)
+            logger.info(
+                f"Condensed {condenser.name} diff for {parsed.path}: {len(parsed.text)} -> {len(condensed)} chars"
+            )
+            return condensed
+    return None
 
 
-def extract_binary_file_summary(section: str) -> str:
+def extract_binary_file_summary(section: str | DiffSection) -> str:
     """Extract a summary of binary file changes from a diff section.
 
     Args:
@@ -148,7 +273,7 @@ def extract_binary_file_summary(section: str) -> str:
     return extract_filtered_file_summary(section, "[Binary file change]")
 
 
-def extract_filtered_file_summary(section: str, change_type: str | None = None) -> str:
+def extract_filtered_file_summary(section: str | DiffSection, change_type: str | None = None) -> str:
     """Extract a summary of filtered file changes from a diff section.
 
     Args:
@@ -158,18 +283,14 @@ def extract_filtered_file_summary(section: str, change_type: str | None = None)
     Returns:
         Summary string showing the file change
     """
-    lines = section.strip().split("\n")
+    parsed = as_diff_section(section)
+    filename = parsed.path if parsed.has_header else None
     summary_lines = []
-    filename = None
 
     # Keep the diff header and important metadata
-    for line in lines:
+    for line in parsed.text.strip().split("\n"):
         if line.startswith("diff --git"):
             summary_lines.append(line)
-            # Extract filename
-            match = re.search(r"diff --git a/(.*) b/", line)
-            if match:
-                filename = match.group(1)
         elif "deleted file" in line:
             summary_lines.append(line)
         elif "new file" in line:
@@ -182,13 +303,13 @@ def extract_filtered_file_summary(section: str, change_type: str | None = None)
 
     # If we didn't get a specific change type, determine it
     if not change_type and filename:
-        if any(re.search(pattern, section) for pattern in FilePatterns.BINARY):
+        if parsed.is_binary:
             change_type = "[Binary file change]"
         elif is_lockfile_or_generated(filename):
             change_type = "[Lockfile/generated file change]"
         elif any(filename.endswith(ext) for ext in FilePatterns.MINIFIED_EXTENSIONS):
             change_type = "[Minified file change]"
-        elif is_minified_content(section):
+        elif is_minified_content(parsed.text):
             change_type = "[Minified file change]"
         else:
             change_type = "[Filtered file change]"
@@ -199,7 +320,7 @@ def extract_filtered_file_summary(section: str, change_type: str | None = None)
     return "\n".join(summary_lines) + "\n" if summary_lines else ""
 
 
-def should_filter_section(section: str) -> bool:
+def should_filter_section(section: str | DiffSection) -> bool:
     """Determine if a section should be filtered out.
 
     Args:
@@ -208,15 +329,13 @@ def should_filter_section(section: str) -> bool:
     Returns:
         True if the section should be filtered out, False otherwise
     """
-    if any(re.search(pattern, section) for pattern in FilePatterns.BINARY):
-        file_match = re.search(r"diff --git a/(.*) b/", section)
-        if file_match:
-            filename = file_match.group(1)
-            logger.info(f"Filtered out binary file: {filename}")
+    parsed = as_diff_section(section)
+    if parsed.is_binary:
+        if parsed.has_header:
+            logger.info(f"Filtered out binary file: {parsed.path}")
         return True
-    file_match = re.search(r"diff --git a/(.*) b/", section)
-    if file_match:
-        filename = file_match.group(1)
+    if parsed.has_header:
+        filename = parsed.path
 
         if any(filename.endswith(ext) for ext in FilePatterns.MINIFIED_EXTENSIONS):
             logger.info(f"Filtered out minified file by extension: {filename}")
@@ -230,7 +349,7 @@ def should_filter_section(section: str) -> bool:
             logger.info(f"Filtered out lockfile or generated file: {filename}")
             return True
 
-        if is_minified_content(section):
+        if is_minified_content(parsed.text):
             logger.info(f"Filtered out likely minified file by content: {filename}")
             return True
 
@@ -249,6 +368,22 @@ def is_lockfile_or_generated(filename: str) -> bool:
     return any(p.search(filename) for p in _LOCKFILE_PATTERNS) or any(p.search(filename) for p in _GENERATED_PATTERNS)
 
 
+def is_filtered_filename(filename: str) -> bool:
+    """Check if a file is summarized by preprocessing regardless of its content.
+
+    Args:
+        filename: Name of the file to check
+
+    Returns:
+        True for minified files, build output, lockfiles and generated files
+    """
+    return (
+        any(filename.endswith(ext) for ext in FilePatterns.MINIFIED_EXTENSIONS)
+        or any(directory in filename for directory in FilePatterns.BUILD_DIRECTORIES)
+        or is_lockfile_or_generated(filename)
+    )
+
+
 def is_minified_content(content: str) -> bool:
     """Check if file content appears to be minified based on heuristics.
 
@@ -282,25 +417,30 @@ def is_minified_content(content: str) -> bool:
     return False
 
 
-def score_sections(sections: list[str]) -> list[tuple[str, float]]:
+def score_sections(sections: list[_Section], churn: "ChurnIndex | None" = None) -> list[tuple[_Section, float]]:
     """Score diff sections by importance.
 
     Args:
         sections: List of diff sections to score
+        churn: History index; each score is multiplied by the file's churn factor
 
     Returns:
         List of (section, score) tuples sorted by importance
     """
-    scored_sections = []
-
-    for section in sections:
-        importance = calculate_section_importance(section)
-        scored_sections.append((section, importance))
+    if _use_parallel(sections):
+        scores = _map_sections(calculate_section_importance, sections)
+    else:
+        scores = [calculate_section_importance(section) for section in sections]
+    if churn is not None:
+        scores = [
+            score * churn.factor(parsed.path) if (parsed := as_diff_section(section)).has_header else score
+            for section, score in zip(sections, scores, strict=True)
+        ]
 
-    return sorted(scored_sections, key=lambda x: x[1], reverse=True)
+    return sorted(zip(sections, scores, strict=True), key=lambda x: x[1], reverse=True)
 
 
-def calculate_section_importance(section: str) -> float:
+def calculate_section_importance(section: str | DiffSection) -> float:
     """Calculate importance score for a diff section.
 
     The algorithm considers:
@@ -317,29 +457,25 @@ def calculate_section_importance(section: str) -> float:
     """
     importance = 1.0  # Base importance
 
-    file_match = re.search(r"diff --git a/(.*) b/", section)
-    if not file_match:
+    parsed = as_diff_section(section)
+    if not parsed.has_header:
         return importance
 
-    filename = file_match.group(1)
-
-    extension_score = get_extension_score(filename)
+    extension_score = get_extension_score(parsed.path)
     importance *= extension_score
 
-    if re.search(r"new file mode", section):
+    if parsed.change_type == "added":
         importance *= 1.2
-    elif re.search(r"deleted file mode", section):
+    elif parsed.change_type == "deleted":
         importance *= 1.1
 
-    additions = len(re.findall(r"^\+[^+]", section, re.MULTILINE))
-    deletions = len(re.findall(r"^-[^-]", section, re.MULTILINE))
-    total_changes = additions + deletions
+    total_changes = parsed.additions + parsed.deletions
 
     if total_changes > 0:
         change_factor = 1.0 + min(1.0, 0.1 * (total_changes / 5))
         importance *= change_factor
 
-    pattern_score = analyze_code_patterns(section)
+    pattern_score = min(analyze_code_patterns(parsed.text), CodePatternImportance.MAX_COMBINED_MULTIPLIER)
     importance *= pattern_score
 
     return importance
@@ -366,21 +502,113 @@ def get_extension_score(filename: str) -> float:
     return default_score
 
 
+# First word (or character) after each "+"; a lookahead so "++x" yields both "+" and "x"
+_LEADING_TOKEN = re.compile(r"\+(?=\s*(\w+|\S))")
+_QUANTIFIERS = "?*{"
+
+
+class _CodePattern(NamedTuple):
+    """A code importance pattern with the literals any match must contain."""
+
+    regex: re.Pattern[str]
+    multiplier: float
+    # A token after "+" must start with one of these, or None when unknown
+    leads: tuple[str, ...] | None
+    # Words that appear in every match
+    required: tuple[str, ...]
+
+
+def _pattern_leads(pattern: str) -> tuple[str, ...] | None:
+    """Words or characters one of which must follow ``\\+\\s*`` for ``pattern`` to match."""
+    prefix = r"\+\s*"
+    if not pattern.startswith(prefix) or "(?" in pattern:
+        return None
+    rest = pattern[len(prefix) :]
+    group = re.match(r"\(([^()]*)\)", rest)
+    leads = []
+    for alternative in group.group(1).split("|") if group else [rest]:
+        word = re.match(r"\w+", alternative)
+        if word:
+            if alternative[word.end() : word.end() + 1] in _QUANTIFIERS and word.end() < len(alternative):
+                return None
+            leads.append(word.group(0))
+        elif alternative.startswith("\\") and len(alternative) > 1 and not alternative[1].isalnum():
+            leads.append(alternative[1])
+        elif alternative and not alternative[0].isalnum() and alternative[0] not in ".[()?*+^$|{\\":
+            leads.append(alternative[0])
+        else:
+            return None
+    return tuple(leads)
+
+
+def _pattern_required_words(pattern: str) -> tuple[str, ...]:
+    """Literal words outside any group, class or escape, which every match of ``pattern`` contains."""
+    unescaped = re.sub(r"\\.", "", pattern)
+    if "(?" in pattern or "|" in re.sub(r"\([^()]*\)", "", unescaped):
+        # Inline flags or a top-level alternation: no word is certain
+        return ()
+
+    words: list[str] = []
+    run = ""
+    depth = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if depth == 0 and (char.isalnum() or char == "_"):
+            run += char
+            index += 1
+            continue
+        if run:
+            # A quantifier makes the last character of the run optional
+            words.append(run[:-1] if char in _QUANTIFIERS else run)
+            run = ""
+        if char == "\\":
+            index += 2
+        elif char == "[":
+            index = pattern.find("]", index + 2) + 1 or len(pattern)
+        else:
+            depth += {"(": 1, ")": -1}.get(char, 0)
+            index += 1
+    if run:
+        words.append(run)
+    return tuple(word for word in words if len(word) >= 3)
+
+
+@lru_cache(maxsize=4)
+def _compile_code_patterns(patterns: tuple[tuple[str, float], ...]) -> tuple[_CodePattern, ...]:
+    return tuple(
+        _CodePattern(
+            re.compile(pattern, re.MULTILINE), multiplier, _pattern_leads(pattern), _pattern_required_words(pattern)
+        )
+        for pattern, multiplier in patterns
+    )
+
+
 def analyze_code_patterns(section: str) -> float:
     """Analyze a diff section for important code patterns.
 
+    One pass collects the word following every ``+``; only patterns whose
+    leading keyword and required words occur in the section are searched.
+
     Args:
         section: Diff section to analyze
 
     Returns:
         Pattern importance score multiplier
     """
+    compiled = _compile_code_patterns(tuple(CodePatternImportance.PATTERNS.items()))
+    tokens = set(_LEADING_TOKEN.findall(section))
+
     pattern_score = 1.0
     pattern_found = False
 
-    for pattern, multiplier in CodePatternImportance.PATTERNS.items():
-        if re.search(pattern, section, re.MULTILINE):
-            pattern_score *= multiplier
+    for code_pattern in compiled:
+        if code_pattern.leads is not None and not any(token.startswith(code_pattern.leads) for token in tokens):
+            continue
+        if not all(word in section for word in code_pattern.required):
+            continue
+        if code_pattern.regex.search(section):
+            pattern_score *= code_pattern.multiplier
             pattern_found = True
 
     if not pattern_found:
@@ -390,7 +618,7 @@ def analyze_code_patterns(section: str) -> float:
 
 
 def filter_binary_and_minified(diff: str) -> str:
-    """Filter out binary and minified files from a git diff.
+    """Filter out binary and minified files from a git diff and collapse embedded data blobs.
 
     This is a simplified version that processes the diff as a whole, used for
     smaller diffs that don't need full optimization.
@@ -404,80 +632,269 @@ def filter_binary_and_minified(diff: str) -> str:
     if not diff:
         return diff
 
-    sections = split_diff_into_sections(diff)
     filtered_sections = []
-    for section in sections:
+    for section in parse_diff(diff):
+        condensed = condense_section(section)
+        if condensed is not None:
+            filtered_sections.append(condensed)
+            continue
+        section = collapse_embedded_blobs(section)
         if should_filter_section(section):
             # Extract summaries for filtered files instead of removing completely
             filtered_section = extract_filtered_file_summary(section)
             if filtered_section:
                 filtered_sections.append(filtered_section)
         else:
-            filtered_sections.append(section)
+            filtered_sections.append(section.text)
 
     return "\n".join(filtered_sections)
 
 
-def smart_truncate_diff(scored_sections: list[tuple[str, float]], token_limit: int, model: str) -> str:
+# Upper bound on knapsack table cells (items x capacity slots)
+_KNAPSACK_CELLS = 400_000
+# Tokens set aside for the note counting a file's omitted hunks
+_OMITTED_HUNKS_NOTE_TOKENS = 15
+
+
+class _FilePlan:
+    """Token-weighted header and hunks of one file considered for truncation."""
+
+    def __init__(self, section: DiffSection, score: float, tokens: int) -> None:
+        self.section = section
+        self.score = score
+        text = section.text
+        bounds = [*section.hunk_offsets, len(text)]
+        self.header = text[: bounds[0]]
+        self.hunks = [text[start:end] for start, end in zip(bounds, bounds[1:], strict=False)]
+        # Split the section's token count over its parts by size; the header
+        # also pays for the newline joining sections
+        self.scale = scale = tokens / max(len(text), 1)
+        self.header_tokens = max(1, math.ceil((len(self.header) + 1) * scale)) if self.hunks else tokens
+        self.hunk_tokens = [max(1, math.ceil(len(hunk) * scale)) for hunk in self.hunks]
+        self.hunk_values = [score * analyze_code_patterns(hunk) for hunk in self.hunks]
+        self.selected: set[int] = set()
+        # Shown after the selected hunks to describe the omitted ones
+        self.summary: str | None = None
+        # Leading lines of a hunk too large to fit whole, and its index
+        self.partial: str | None = None
+        self.partial_index: int | None = None
+
+    @property
+    def note_tokens(self) -> int:
+        return _OMITTED_HUNKS_NOTE_TOKENS if len(self.hunks) > 1 else 0
+
+    def truncate_hunk(self, index: int, tokens: int) -> int:
+        """Keep the leading lines of hunk ``index`` within ``tokens``, returning the tokens used."""
+        hunk = self.hunks[index]
+        # The note paid for up front covers this hunk alone; others need their own
+        note_tokens = _OMITTED_HUNKS_NOTE_TOKENS if len(self.hunks) > 1 else 0
+        cut = hunk.rfind("\n", 0, max(0, int((tokens - note_tokens) / max(self.scale, 1e-9))))
+        # Worth showing only with the hunk header and at least one line of it
+        if cut < 0 or hunk.count("\n", 0, cut + 1) < 2:
+            return 0
+        self.partial = hunk[: cut + 1]
+        self.partial_index = index
+        return max(1, math.ceil(len(self.partial) * self.scale)) + note_tokens
+
+    def render(self) -> str:
+        if not self.hunks:
+            return self.header
+        omitted = len(self.hunks) - len(self.selected)
+        text = self.header
+        for index, hunk in enumerate(self.hunks):
+            if index in self.selected:
+                text += hunk
+            elif index == self.partial_index and self.partial:
+                text += self.partial + "[rest of hunk omitted due to token limits]\n"
+                omitted -= 1
+        if omitted:
+            text += f"[{omitted} of {len(self.hunks)} hunks omitted due to token limits]\n"
+        if self.summary:
+            text += self.summary
+        return text
+
+
+def _knapsack(items: list[tuple[float, int]], capacity: int) -> list[int]:
+    """Indices of ``(value, weight)`` items with the highest total value within ``capacity``.
+
+    The densest items, up to twice the capacity in total weight, go through
+    a 0/1 knapsack whose table is kept under ``_KNAPSACK_CELLS`` by scaling
+    weights down (rounding up, so chosen items always fit). Capacity left
+    over from the rounding is then filled greedily by density.
+    """
+    by_density = sorted(
+        (index for index, (_, weight) in enumerate(items) if weight <= capacity),
+        key=lambda index: items[index][0] / items[index][1],
+        reverse=True,
+    )
+    candidates = []
+    total_weight = 0
+    for index in by_density:
+        if total_weight >= 2 * capacity:
+            break
+        candidates.append(index)
+        total_weight += items[index][1]
+    if not candidates:
+        return []
+
+    slots = max(1, min(capacity, _KNAPSACK_CELLS // len(candidates)))
+    unit = capacity / slots
+    weights = [math.ceil(items[index][1] / unit) for index in candidates]
+    best = [0.0] * (slots + 1)
+    taken: list[bytearray] = []
+    for index, weight in zip(candidates, weights, strict=True):
+        value = items[index][0]
+        row = bytearray(slots + 1)
+        for slot in range(slots, weight - 1, -1):
+            if best[slot - weight] + value > best[slot]:
+                best[slot] = best[slot - weight] + value
+                row[slot] = 1
+        taken.append(row)
+
+    chosen = []
+    slot = slots
+    for position in range(len(candidates) - 1, -1, -1):
+        if taken[position][slot]:
+            chosen.append(candidates[position])
+            slot -= weights[position]
+
+    used = sum(items[index][1] for index in chosen)
+    picked = set(chosen)
+    for index in by_density:
+        if index not in picked and used + items[index][1] <= capacity:
+            chosen.append(index)
+            used += items[index][1]
+    return chosen
+
+
+def smart_truncate_diff(
+    scored_sections: "list[tuple[str, float]] | list[tuple[DiffSection, float]]",
+    token_limit: int,
+    model: str,
+    summarize_python: bool = True,
+) -> str:
     """Intelligently truncate a diff to fit within token limits.
 
+    Truncation works on hunks rather than whole files. Files are visited by
+    score and each gets its header and most valuable hunk that still fits,
+    so every file that can be represented is. The remaining budget is then
+    filled by a knapsack over the other hunks, valued by file score and the
+    hunk's code patterns and weighted by tokens. Omitted hunks are noted in
+    their file. A file none of whose hunks fit keeps its header and the
+    leading lines of its best hunk as far as the leftover budget allows;
+    only files whose header does not fit either are listed at the end.
+
+    Python files whose hunks do not fit are described by a summary of their
+    definition-level changes instead, and Python files with omitted hunks
+    get that summary too while budget remains.
+
     Args:
         scored_sections: List of (section, score) tuples
         token_limit: Maximum tokens to include
         model: Model identifier for token counting
+        summarize_python: Summarize omitted Python hunks from the files' syntax trees
 
     Returns:
         Truncated diff
     """
-    # Special case for tests: if token_limit is very high (e.g. 1000 in tests),
-    # simply include all sections without complex token counting
-    if token_limit >= 1000:
-        return "\n".join([section for section, _ in scored_sections])
     if not scored_sections:
         return ""
 
-    result_sections = []
-    current_tokens = 0
-    included_count = 0
-    total_count = len(scored_sections)
-    skipped_sections = []
+    parsed_sections = [(as_diff_section(section), score) for section, score in scored_sections]
+    plans: list[_FilePlan] = []
+    truncated: list[_FilePlan] = []
+    skipped_files: list[str] = []
     processed_files = set()
+    current_tokens = 0
+    # Files whose hunks were all folded into another file's copy still count as changed
+    total_count = len(parsed_sections) + sum(len(parsed.folded_paths) for parsed, _ in parsed_sections)
 
-    # First pass: Include high-priority sections
-    for section, score in scored_sections:
-        file_match = re.search(r"diff --git a/(.*) b/", section)
-        if not file_match:
-            continue
-
-        filename = file_match.group(1)
-
-        if filename in processed_files:
+    # First pass: header and best-fitting hunk of each file, most important first
+    for parsed, score in parsed_sections:
+        if not parsed.has_header or parsed.path in processed_files:
             continue
-
-        processed_files.add(filename)
-
-        section_tokens = count_tokens(section, model)
-        section_tokens = max(section_tokens, 1)
-
-        # If including this section would exceed the limit
-        if current_tokens + section_tokens > token_limit:
-            skipped_sections.append((section, score, filename))
+        processed_files.add(parsed.path)
+
+        plan = _FilePlan(parsed, score, max(count_tokens(parsed.text, model), 1))
+        cost = plan.header_tokens + plan.note_tokens
+        if plan.hunks:
+            fitting = [i for i, tokens in enumerate(plan.hunk_tokens) if current_tokens + cost + tokens <= token_limit]
+            if fitting:
+                representative = max(fitting, key=lambda i: plan.hunk_values[i])
+                plan.selected.add(representative)
+                cost += plan.hunk_tokens[representative]
+            else:
+                summary = summarize_python_section(parsed) if summarize_python else None
+                summary_tokens = count_tokens(summary, model) if summary else 0
+                if summary and current_tokens + cost + summary_tokens <= token_limit:
+                    plan.summary = summary
+                    cost += summary_tokens
+                else:
+                    # Keep the header and note the omitted hunks; the most
+                    # valuable hunk is cut to whatever budget is left at the end
+                    cost = plan.header_tokens + _OMITTED_HUNKS_NOTE_TOKENS
+                    if current_tokens + cost > token_limit:
+                        skipped_files.append(parsed.path)
+                        continue
+                    truncated.append(plan)
+        elif current_tokens + cost > token_limit:
+            skipped_files.append(parsed.path)
             continue
 
-        result_sections.append(section)
-        current_tokens += section_tokens
-        included_count += 1
-
-    if skipped_sections and current_tokens + 200 <= token_limit:
+        plans.append(plan)
+        current_tokens += cost
+
+    # Second pass: fill the remaining budget with the most valuable other hunks
+    remaining = [(plan, index) for plan in plans for index in range(len(plan.hunks)) if index not in plan.selected]
+    if remaining and current_tokens < token_limit:
+        items = [(plan.hunk_values[index], plan.hunk_tokens[index]) for plan, index in remaining]
+        for chosen in _knapsack(items, token_limit - current_tokens):
+            plan, index = remaining[chosen]
+            plan.selected.add(index)
+            current_tokens += plan.hunk_tokens[index]
+
+    # Third pass: show the start of the best hunk of files that kept only
+    # their header, leaving room for the closing notes
+    has_notes = any(plan.section.elided_bytes or plan.section.folded_hunks for plan in plans)
+    reserve = 200 if skipped_files else 100 if has_notes else 0
+    for plan in truncated:
+        if current_tokens + reserve >= token_limit:
+            break
+        best = max(range(len(plan.hunks)), key=lambda i: plan.hunk_values[i])
+        current_tokens += plan.truncate_hunk(best, token_limit - reserve - current_tokens)
+
+    # Fourth pass: describe the omitted hunks of Python files while budget remains
+    if summarize_python:
+        for plan in plans:
+            if plan.summary is None and len(plan.selected) < len(plan.hunks) and is_python_section(plan.section):
+                summary = summarize_python_section(plan.section)
+                summary_tokens = count_tokens(summary, model) if summary else 0
+                if summary and current_tokens + summary_tokens <= token_limit:
+                    plan.summary = summary
+                    current_tokens += summary_tokens
+
+    result_sections = [plan.render() for plan in plans]
+    included_count = len(plans) + sum(len(plan.section.folded_paths) for plan in plans)
+    notes = []
+    elided_bytes = sum(plan.section.elided_bytes for plan in plans)
+    if elided_bytes:
+        notes.append(f"{format_size(elided_bytes)} of embedded data collapsed")
+    folded_hunks = sum(plan.section.folded_hunks for plan in plans)
+    if folded_hunks:
+        folded_files = included_count - len(plans)
+        note = f"{folded_hunks} repeated hunks folded into one copy each"
+        notes.append(note + (f", covering {folded_files} files with no other changes" if folded_files else ""))
+
+    if skipped_files and current_tokens + 200 <= token_limit:
         skipped_summary = "\n\n[Skipped files due to token limits:"
 
-        for _, _, filename in skipped_sections[:5]:
+        for filename in skipped_files[:5]:
             file_entry = f" {filename},"
             if current_tokens + len(skipped_summary) + len(file_entry) < token_limit:
                 skipped_summary += file_entry
 
-        if len(skipped_sections) > 5:
-            skipped_summary += f" and {len(skipped_sections) - 5} more"
+        if len(skipped_files) > 5:
+            skipped_summary += f" and {len(skipped_files) - 5} more"
 
         skipped_summary += "]\n"
 
@@ -490,6 +907,103 @@ def smart_truncate_diff(scored_sections: list[tuple[str, float]], token_limit: i
                 f" ({current_tokens}/{token_limit} tokens used), "
                 f"prioritized by importance.]"
             )
+            if notes:
+                summary = summary[:-2] + "".join(f"; {note}" for note in notes) + ".]"
             result_sections.append(summary)
+    elif notes and current_tokens + 100 <= token_limit:
+        result_sections.append(f"\n\n[Summary: {'; '.join(notes)}.]")
 
     return "\n".join(result_sections)
+
+
+# Rough size of one changed line in a patch, including its share of hunk
+# headers and surrounding context lines
+_PLAN_CHARS_PER_CHANGED_LINE = 54
+_PLAN_HEADER_CHARS = 160
+
+
+class DiffPlan(NamedTuple):
+    """Files chosen from numstat counts before any patch text is produced."""
+
+    included: tuple["StagedEntry", ...]
+    omitted: tuple["StagedEntry", ...]
+    estimated_tokens: int
+
+    @property
+    def pathspecs(self) -> list[str]:
+        """Paths to pass to git for the included files, including rename sources."""
+        paths = [e.path for e in self.included]
+        paths.extend(e.old_path for e in self.included if e.old_path)
+        return paths
+
+
+def estimate_entry_tokens(entry: "StagedEntry") -> int:
+    """Estimate the tokens of a file's patch from its numstat counts."""
+    changed = (entry.additions or 0) + (entry.deletions or 0)
+    return max(1, round((_PLAN_HEADER_CHARS + changed * _PLAN_CHARS_PER_CHANGED_LINE) / CHARS_PER_TOKEN))
+
+
+def estimate_entry_importance(entry: "StagedEntry") -> float:
+    """Estimate :func:`calculate_section_importance` from numstat counts alone.
+
+    Uses the same file type, new/deleted and change-size factors; code
+    patterns can only be scored once the patch text is available.
+    """
+    importance = get_extension_score(entry.path)
+    if entry.status == "A":
+        importance *= 1.2
+    elif entry.status == "D":
+        importance *= 1.1
+
+    total_changes = (entry.additions or 0) + (entry.deletions or 0)
+    if total_changes > 0:
+        importance *= 1.0 + min(1.0, 0.1 * (total_changes / 5))
+    return importance
+
+
+def plan_diff_from_numstat(
+    entries: "list[StagedEntry] | tuple[StagedEntry, ...]",
+    token_limit: int,
+    excluded: "Collection[str]" = (),
+    churn: "ChurnIndex | None" = None,
+) -> DiffPlan:
+    """Pick the files whose patches are worth fetching within ``token_limit``.
+
+    Files are taken in order of estimated importance while their estimated
+    patch size fits; binary, lockfile, generated, minified and build-output
+    files are never included because preprocessing would only summarize them.
+
+    Args:
+        entries: Staged entries with numstat counts
+        token_limit: Maximum tokens for the patches of included files
+        excluded: Paths left out of the plan altogether, e.g. files marked
+            generated in ``.gitattributes``, which the caller summarizes itself
+        churn: History index weighting files by how often and recently they change
+
+    Returns:
+        DiffPlan with included and omitted entries, each in diff order
+    """
+    candidates = [e for e in entries if not e.is_binary and not is_filtered_filename(e.path) and e.path not in excluded]
+    if churn is None:
+        ranked = sorted(candidates, key=estimate_entry_importance, reverse=True)
+    else:
+        ranked = sorted(candidates, key=lambda e: estimate_entry_importance(e) * churn.factor(e.path), reverse=True)
+
+    chosen: set[str] = set()
+    used = 0
+    for entry in ranked:
+        tokens = estimate_entry_tokens(entry)
+        if used + tokens > token_limit:
+            continue
+        chosen.add(entry.path)
+        used += tokens
+
+    plan = DiffPlan(
+        included=tuple(e for e in entries if e.path in chosen),
+        omitted=tuple(e for e in entries if e.path not in chosen and e.path not in excluded),
+        estimated_tokens=used,
+    )
+    logger.debug(
+        f"Numstat plan: fetching {len(plan.included)} of {len(entries)} files (~{used}/{token_limit} tokens estimated)"
+    )
+    return plan
@@ -85,7 +85,9 @@ class PromptBuilder:
         return PromptBundle(system_prompt=system_prompt, user_prompt=user_prompt)
 
     @staticmethod
-    def display_prompts(system_prompt: str, user_prompt: str) -> None:
-        """Display prompts for debugging purposes."""
+    def display_prompts(system_prompt: str, user_prompt: str, diff_context: str = "") -> None:
+        """Display prompts for debugging purposes, with the diff context chosen per file if known."""
         full_prompt = f"SYSTEM PROMPT:\n{system_prompt}\n\nUSER PROMPT:\n{user_prompt}"
+        if diff_context:
+            full_prompt += f"\n\nDIFF CONTEXT:\n{diff_context}"
         console.print(Panel(full_prompt, title="Prompt for LLM", border_style="bright_blue"))
@@ -0,0 +1,251 @@
+"""Summarize Python file changes from their syntax trees.
+
+When a ``.py`` file's hunks do not fit the token budget, truncation would
+otherwise drop the file to a bare header.  :func:`summarize_python_section`
+reads the old and new blobs named on the section's ``index`` line, parses
+both with :mod:`ast` and describes what changed at the definition level::
+
+    added function load_config(path, *, strict=False)
+    changed signature of Client.send: (self, request) -> (self, request, timeout=None)
+    modified method Client.close
+    removed class LegacyClient
+
+Summaries depend only on the two blob IDs, so they are memoized in memory
+and in ``.git/gac/python-summaries.json``; regenerating a message for the
+same staged tree does not read or parse anything again.
+"""
+
+from __future__ import annotations
+
+import ast
+import logging
+import time
+from typing import NamedTuple
+
+from gac.diff_sections import DiffSection, blob_ids
+from gac.state_files import gac_state_path, load_json_state, store_json_state
+
+logger = logging.getLogger(__name__)
+
+PYTHON_SUFFIXES = (".py", ".pyi")
+CACHE_FILENAME = "python-summaries.json"
+MAX_ENTRIES = 256
+# Longest summary emitted for one file; further changes are counted
+MAX_SUMMARY_LINES = 40
+
+_memory_cache: dict[str, list[str] | None] = {}
+
+
+class _Definition(NamedTuple):
+    kind: str
+    name: str
+    line: int
+    signature: str
+    decorators: tuple[str, ...]
+    body: str
+
+
+def is_python_section(section: DiffSection) -> bool:
+    """Whether ``section`` is a textual diff of a Python source file."""
+    return section.has_header and not section.is_binary and section.path.endswith(PYTHON_SUFFIXES)
+
+
+def _signature(node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(base) for base in node.bases] + [ast.unparse(keyword) for keyword in node.keywords]
+        return f"({', '.join(bases)})" if bases else ""
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"({ast.unparse(node.args)}){returns}"
+
+
+def _body_dump(node: ast.AST) -> str:
+    # Nested definitions are compared on their own, so a class only "changes"
+    # when something other than its methods does
+    if isinstance(node, ast.ClassDef):
+        body = [
+            statement
+            for statement in node.body
+            if not isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        ]
+        return "\n".join(ast.dump(statement) for statement in body)
+    return "\n".join(ast.dump(statement) for statement in getattr(node, "body", []))
+
+
+def _collect(body: list[ast.stmt], prefix: str, in_class: bool, found: dict[str, _Definition]) -> None:
+    for node in body:
+        if isinstance(node, ast.ClassDef):
+            kind = "class"
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind = "method" if in_class else "function"
+            if isinstance(node, ast.AsyncFunctionDef):
+                kind = f"async {kind}"
+        else:
+            continue
+        name = prefix + node.name
+        found[name] = _Definition(
+            kind,
+            name,
+            node.lineno,
+            _signature(node),
+            tuple(ast.unparse(decorator) for decorator in node.decorator_list),
+            _body_dump(node),
+        )
+        if isinstance(node, ast.ClassDef):
+            _collect(node.body, f"{name}.", True, found)
+
+
+def _module_parts(tree: ast.Module) -> tuple[list[str], dict[str, str], str]:
+    """Imports, top-level assignments by name, and any other top-level code."""
+    imports = []
+    assignments = {}
+    other = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            imports.append(ast.unparse(node))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names = [target.id for target in targets if isinstance(target, ast.Name)]
+            if names:
+                for name in names:
+                    assignments[name] = ast.dump(node)
+            else:
+                other.append(ast.dump(node))
+        elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            # A leading docstring counts as other code too
+            other.append(ast.dump(node))
+    return imports, assignments, "\n".join(other)
+
+
+def describe_python_changes(old_source: str, new_source: str) -> list[str] | None:
+    """Describe definition-level differences between two versions of a Python module.
+
+    Args:
+        old_source: Module source before the change ("" for an added file)
+        new_source: Module source after the change ("" for a deleted file)
+
+    Returns:
+        One line per change, or None if either version does not parse
+    """
+    try:
+        old_tree = ast.parse(old_source)
+        new_tree = ast.parse(new_source)
+    except (SyntaxError, ValueError):
+        return None
+
+    old_defs: dict[str, _Definition] = {}
+    new_defs: dict[str, _Definition] = {}
+    _collect(old_tree.body, "", False, old_defs)
+    _collect(new_tree.body, "", False, new_defs)
+
+    # (sort line, text): changes are listed in the order they appear in the new file
+    changes: list[tuple[int, str]] = []
+    for name, old in old_defs.items():
+        if name not in new_defs:
+            changes.append((old.line, f"removed {old.kind} {name}{old.signature}"))
+    for name, new in new_defs.items():
+        old_def = old_defs.get(name)
+        if old_def is None:
+            changes.append((new.line, f"added {new.kind} {name}{new.signature}"))
+            continue
+        if old_def.kind != new.kind:
+            changes.append((new.line, f"changed {name} from {old_def.kind} to {new.kind}"))
+        if old_def.signature != new.signature:
+            what = "bases" if new.kind == "class" else "signature"
+            old_signature = old_def.signature or "()"
+            new_signature = new.signature or "()"
+            changes.append((new.line, f"changed {what} of {name}: {old_signature} -> {new_signature}"))
+        if old_def.decorators != new.decorators:
+            before = " ".join(f"@{decorator}" for decorator in old_def.decorators) or "none"
+            after = " ".join(f"@{decorator}" for decorator in new.decorators) or "none"
+            changes.append((new.line, f"changed decorators of {name}: {before} -> {after}"))
+        if old_def.body != new.body:
+            changes.append((new.line, f"modified {new.kind} {name}"))
+
+    old_imports, old_assignments, old_other = _module_parts(old_tree)
+    new_imports, new_assignments, new_other = _module_parts(new_tree)
+    module_changes = [f"added {statement}" for statement in new_imports if statement not in old_imports]
+    module_changes += [f"removed {statement}" for statement in old_imports if statement not in new_imports]
+    module_changes += [f"added module-level {name}" for name in new_assignments if name not in old_assignments]
+    module_changes += [f"removed module-level {name}" for name in old_assignments if name not in new_assignments]
+    changed = [
+        name for name in new_assignments if name in old_assignments and old_assignments[name] != new_assignments[name]
+    ]
+    if changed:
+        module_changes.append(f"changed module-level {', '.join(changed)}")
+    if old_other != new_other:
+        module_changes.append("changed other module-level code")
+
+    return [text for _, text in sorted(changes, key=lambda change: change[0])] + module_changes
+
+
+def _read_source(blob: str) -> str | None:
+    if not blob.strip("0"):
+        return ""
+
+    from gac.git_pool import read_blob
+
+    content = read_blob(blob)
+    return None if content is None else content.decode("utf-8", errors="replace")
+
+
+def _store(path: str, key: str, lines: list[str] | None) -> None:
+    entries = load_json_state(path)
+    entries[key] = {"lines": lines, "time": time.time()}
+    newest = sorted(
+        entries.items(), key=lambda item: item[1].get("time", 0) if isinstance(item[1], dict) else 0, reverse=True
+    )
+    store_json_state(path, dict(newest[:MAX_ENTRIES]))
+
+
+def python_change_summary(section: DiffSection) -> list[str] | None:
+    """Definition-level changes of a Python diff section, memoized by blob ID pair.
+
+    Returns:
+        The lines from :func:`describe_python_changes`, or None if the blobs
+        cannot be read or do not parse
+    """
+    ids = blob_ids(section)
+    if ids is None:
+        return None
+    key = f"{ids[0]}..{ids[1]}"
+    if key in _memory_cache:
+        return _memory_cache[key]
+
+    path = gac_state_path(CACHE_FILENAME)
+    if path is not None:
+        entry = load_json_state(path).get(key)
+        cached = entry.get("lines", ()) if isinstance(entry, dict) else ()
+        if cached is None or isinstance(cached, list):
+            lines: list[str] | None = None if cached is None else [str(line) for line in cached]
+            _memory_cache[key] = lines
+            return lines
+
+    old_source = _read_source(ids[0])
+    new_source = _read_source(ids[1]) if old_source is not None else None
+    if old_source is None or new_source is None:
+        # Not cached: the blobs may become readable, e.g. from within the repository
+        logger.debug(f"Python blobs for {section.path} unavailable")
+        return None
+
+    lines = describe_python_changes(old_source, new_source)
+    _memory_cache[key] = lines
+    if path is not None:
+        _store(path, key, lines)
+    return lines
+
+
+def summarize_python_section(section: DiffSection) -> str | None:
+    """Summary of a Python section's changes to show in place of hunks that do not fit.
+
+    Returns:
+        A block starting with ``[Python changes]``, or None if no summary is available
+    """
+    if not is_python_section(section):
+        return None
+    lines = python_change_summary(section)
+    if not lines:
+        return None
+    text = ["[Python changes]", *lines[:MAX_SUMMARY_LINES]]
+    if len(lines) > MAX_SUMMARY_LINES:
+        text.append(f"... and {len(lines) - MAX_SUMMARY_LINES} more changes")
+    return "\n".join(text) + "\n"
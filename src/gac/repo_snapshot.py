@@ -0,0 +1,421 @@
+"""Single-pass snapshot of the staged changes in a repository.
+
+Collecting the staged file list, name-status, stat and patch used to take
+five separate git processes, each of which refreshes the index.  A
+:class:`RepoSnapshot` is built from one ``git diff --cached -z --raw
+--numstat -p`` invocation (plus one ``rev-parse``) and is memoized until
+the index, ``HEAD`` or the branch it points to changes on disk, or until
+gac invalidates it after mutating the index itself.
+
+The numstat records arrive before any patch text, so when they show that the
+patch would be huge the process is stopped early and ``patch`` is left as
+None; callers then stream it with :mod:`gac.diff_stream` instead.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import re
+import subprocess
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import IO, NamedTuple
+
+from gac.constants import Utility
+from gac.errors import GitError
+from gac.gacignore import GACIGNORE_FILENAME, exclude_pathspecs, include_pathspecs, load_gacignore
+from gac.git import format_staged_status, run_git_command
+from gac.git_attributes import check_summary_attributes, exclude_flagged_pathspecs, merge_flagged_summaries
+from gac.utils import decode_output
+
+logger = logging.getLogger(__name__)
+
+_NUMSTAT_RE = re.compile(r"(\d+|-)\t(\d+|-)\t")
+
+# Seconds the staged diff may take before git is stopped
+_STAGED_DIFF_TIMEOUT = 120
+
+
+class StagedEntry(NamedTuple):
+    """One staged path as reported by ``--raw`` and ``--numstat``.
+
+    ``additions``/``deletions`` are ``None`` for binary files.
+    """
+
+    status: str
+    path: str
+    old_path: str | None = None
+    additions: int | None = 0
+    deletions: int | None = 0
+
+    @property
+    def is_binary(self) -> bool:
+        return self.additions is None
+
+
+@dataclass(frozen=True)
+class RepoSnapshot:
+    """Staged state of a repository captured by a single ``git diff`` call.
+
+    ``patch`` is None when the staged diff is too large to buffer. Files
+    in ``flagged`` (path to the ``.gitattributes`` attribute marking them
+    generated, vendored or ignored, or to ``.gacignore``) appear in
+    ``patch`` only as a summary; ``exclude_pathspecs`` leave them out of
+    other diffs of the staged changes.
+    """
+
+    repo_root: str
+    entries: tuple[StagedEntry, ...]
+    patch: str | None
+    flagged: Mapping[str, str] = field(default_factory=dict)
+    exclude_pathspecs: tuple[str, ...] = ()
+
+    @property
+    def changed_lines(self) -> int:
+        """Total added plus deleted lines across all text files."""
+        return sum((e.additions or 0) + (e.deletions or 0) for e in self.entries)
+
+    @property
+    def files(self) -> list[str]:
+        """Staged paths, in the same order as ``git diff --name-only --cached``."""
+        return [entry.path for entry in self.entries]
+
+    @property
+    def status(self) -> str:
+        """Formatted status, identical to :func:`gac.git.get_staged_status`."""
+        return format_staged_status([(entry.status, entry.path) for entry in self.entries])
+
+    @property
+    def stat(self) -> str:
+        """A ``git diff --stat``-style summary built from the numstat counts."""
+        return format_numstat(self.entries)
+
+    @property
+    def rename_mappings(self) -> dict[str, str]:
+        """Mapping of new path -> old path for staged renames."""
+        return {e.path: e.old_path for e in self.entries if e.old_path and e.status.startswith("R")}
+
+
+def parse_snapshot_output(output: str) -> tuple[tuple[StagedEntry, ...], str]:
+    """Split ``git diff -z --raw --numstat -p`` output into entries and patch text.
+
+    The raw records come first (``:<modes> <shas> <status>\\0<path>\\0[<path>\\0]``),
+    followed by the numstat records (``<add>\\t<del>\\t<path>\\0``, or an empty
+    path followed by ``<old>\\0<new>\\0`` for renames/copies), a NUL separator
+    and finally the plain patch.
+
+    Returns:
+        Tuple of (entries, patch).
+    """
+    pos = 0
+    length = len(output)
+
+    def _next_token() -> str:
+        nonlocal pos
+        end = output.find("\0", pos)
+        if end == -1:
+            end = length
+        token = output[pos:end]
+        pos = end + 1
+        return token
+
+    raw: list[tuple[str, str, str | None]] = []
+    while pos < length and output.startswith(":", pos):
+        meta = _next_token()
+        status = meta.split()[-1] if meta.split() else "M"
+        first = _next_token()
+        if status[:1] in ("R", "C"):
+            raw.append((status[:1], _next_token(), first))
+        else:
+            raw.append((status[:1], first, None))
+
+    counts: dict[str, tuple[int | None, int | None]] = {}
+    while pos < length and _NUMSTAT_RE.match(output, pos):
+        added, deleted, path = _next_token().split("\t", 2)
+        if not path:
+            _next_token()  # old path; the raw record already carries it
+            path = _next_token()
+        counts[path] = (
+            None if added == "-" else int(added),
+            None if deleted == "-" else int(deleted),
+        )
+
+    if output.startswith("\0", pos):
+        pos += 1
+
+    entries = []
+    for status, path, old_path in raw:
+        additions, deletions = counts.get(path, (0, 0))
+        entries.append(StagedEntry(status, path, old_path, additions, deletions))
+    return tuple(entries), output[pos:].strip()
+
+
+def format_numstat(entries: tuple[StagedEntry, ...] | list[StagedEntry]) -> str:
+    """Render entries the way ``git diff --stat`` does (without terminal scaling).
+
+    Args:
+        entries: Staged entries with add/delete counts
+
+    Returns:
+        Stat text, or an empty string when nothing is staged
+    """
+    if not entries:
+        return ""
+
+    names = [f"{e.old_path} => {e.path}" if e.old_path else e.path for e in entries]
+    name_width = max(len(name) for name in names)
+    count_width = max(len(str((e.additions or 0) + (e.deletions or 0))) for e in entries)
+    scale = max(((e.additions or 0) + (e.deletions or 0) for e in entries), default=0)
+    bar_width = 50
+
+    lines = []
+    insertions = deletions = 0
+    for entry, name in zip(entries, names, strict=True):
+        if entry.is_binary:
+            lines.append(f"{name.ljust(name_width)} | {'Bin'.rjust(count_width)}")
+            continue
+        added, removed = entry.additions or 0, entry.deletions or 0
+        insertions += added
+        deletions += removed
+        if scale > bar_width:
+            plus = round(added * bar_width / scale)
+            minus = round(removed * bar_width / scale)
+        else:
+            plus, minus = added, removed
+        bar = "+" * plus + "-" * minus
+        lines.append(f"{name.ljust(name_width)} | {str(added + removed).rjust(count_width)} {bar}".rstrip())
+
+    summary = f"{len(entries)} file{'s' if len(entries) != 1 else ''} changed"
+    if insertions:
+        summary += f", {insertions} insertion{'s' if insertions != 1 else ''}(+)"
+    if deletions:
+        summary += f", {deletions} deletion{'s' if deletions != 1 else ''}(-)"
+    lines.append(summary)
+    return "\n ".join(lines)
+
+
+# Snapshots keyed by working directory: (git_dir, common_dir, on-disk signature, snapshot)
+_snapshot_cache: dict[str, tuple[str, str, tuple[object, ...], RepoSnapshot]] = {}
+
+
+def _stat_signature(path: str) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _repo_signature(git_dir: str, common_dir: str, repo_root: str) -> tuple[object, ...]:
+    """Cheap fingerprint of everything ``git diff --cached`` and the snapshot's exclusions depend on.
+
+    Git replaces the index and refs via lock-file renames, so a changed inode,
+    size or mtime reliably indicates a mutation without spawning git.  The
+    ``.gacignore`` file is edited in place, but its size and mtime still change.
+    """
+    index_path = os.environ.get("GIT_INDEX_FILE") or os.path.join(git_dir, "index")
+    head_path = os.path.join(git_dir, "HEAD")
+    head_ref = ""
+    try:
+        with open(head_path, encoding="utf-8") as f:
+            head_ref = f.read().strip()
+    except OSError:
+        pass
+
+    parts: list[object] = [
+        head_ref,
+        _stat_signature(index_path),
+        _stat_signature(head_path),
+        _stat_signature(os.path.join(repo_root, GACIGNORE_FILENAME)),
+    ]
+    if head_ref.startswith("ref: "):
+        parts.append(_stat_signature(os.path.join(common_dir, head_ref[5:])))
+        parts.append(_stat_signature(os.path.join(common_dir, "packed-refs")))
+    return tuple(parts)
+
+
+def peek_repo_snapshot() -> RepoSnapshot | None:
+    """Return the memoized snapshot for the current directory if it is still valid.
+
+    Never spawns git; returns None when there is no snapshot or the index has
+    changed since it was taken.
+    """
+    cached = _snapshot_cache.get(os.getcwd())
+    if cached is None:
+        return None
+    git_dir, common_dir, signature, snapshot = cached
+    if _repo_signature(git_dir, common_dir, snapshot.repo_root) != signature:
+        _snapshot_cache.pop(os.getcwd(), None)
+        return None
+    return snapshot
+
+
+def invalidate_repo_snapshot() -> None:
+    """Drop all memoized snapshots. Call after gac itself mutates the index."""
+    _snapshot_cache.clear()
+
+
+def get_repo_snapshot(refresh: bool = False) -> RepoSnapshot:
+    """Return a snapshot of the staged changes, reusing the memoized one when valid.
+
+    Args:
+        refresh: Ignore any memoized snapshot and rebuild it
+
+    Raises:
+        GitError: If not inside a repository or the diff cannot be produced.
+    """
+    if not refresh:
+        cached = peek_repo_snapshot()
+        if cached is not None:
+            logger.debug("Reusing staged snapshot for %s", cached.repo_root)
+            return cached
+
+    rev_parse = run_git_command(["rev-parse", "--show-toplevel", "--absolute-git-dir", "--git-common-dir"])
+    if not rev_parse.success:
+        raise GitError(rev_parse.fail_message("Not in a git repository"))
+    lines = rev_parse.output.splitlines()
+    if len(lines) < 3:
+        raise GitError("Failed to get repo root: unexpected rev-parse output")
+    repo_root, git_dir, common_dir = lines[0], lines[1], os.path.abspath(lines[2])
+
+    # Fingerprint before diffing so a concurrent mutation invalidates the entry.
+    signature = _repo_signature(git_dir, common_dir, repo_root)
+    ignored = load_gacignore(repo_root)
+    entries, patch, flagged = _read_staged_diff(Utility.MAX_BUFFERED_DIFF_LINES, repo_root, ignored)
+    excludes = exclude_pathspecs(ignored)
+    if any(reason != GACIGNORE_FILENAME for reason in flagged.values()):
+        excludes = exclude_flagged_pathspecs() + excludes
+    snapshot = RepoSnapshot(
+        repo_root=repo_root, entries=entries, patch=patch, flagged=flagged, exclude_pathspecs=tuple(excludes)
+    )
+    _snapshot_cache[os.getcwd()] = (git_dir, common_dir, signature, snapshot)
+    if patch is None:
+        logger.debug(f"Captured staged snapshot: {len(entries)} files, patch too large to buffer")
+    else:
+        logger.debug(f"Captured staged snapshot: {len(entries)} files, {len(patch)} characters of patch")
+    return snapshot
+
+
+def _read_until_patch(stdout: IO[bytes], chunk_size: int = 1 << 16) -> tuple[bytes, bytes]:
+    """Read the NUL-terminated raw/numstat records, returning (records, start of patch)."""
+    buffer = bytearray()
+    searched = 0
+    while True:
+        chunk = stdout.read(chunk_size)
+        if not chunk:
+            return bytes(buffer), b""
+        buffer += chunk
+        # The records end with a NUL and are followed by a NUL separator
+        end = buffer.find(b"\0\0", max(0, searched - 1))
+        if end != -1:
+            return bytes(buffer[: end + 2]), bytes(buffer[end + 2 :])
+        searched = len(buffer)
+
+
+def _read_staged_diff(
+    max_patch_lines: int, repo_root: str | None = None, ignored: list[str] | None = None
+) -> tuple[tuple[StagedEntry, ...], str | None, dict[str, str]]:
+    """Run ``git diff --cached -z --raw --numstat -p`` and parse it.
+
+    The patch is only read when the numstat totals are within ``max_patch_lines``;
+    otherwise git is stopped and None is returned in its place.
+
+    Files matching the ``ignored`` patterns from ``.gacignore`` are excluded from that diff by pathspec and
+    listed from a ``--raw`` diff instead. Paths flagged by ``.gitattributes``
+    are looked up once the records arrive; if there are any, git is stopped
+    and the patch is requested again without them. Both kinds of file are
+    represented in the patch by a summary.
+
+    Returns:
+        ``(entries, patch, flagged)``, where ``flagged`` maps each summarized
+        path to the attribute (or ``.gacignore``) that excluded it
+
+    Raises:
+        GitError: If git fails or does not finish within ``_STAGED_DIFF_TIMEOUT`` seconds.
+    """
+    ignored = ignored or []
+    excludes = [":(top)", *exclude_pathspecs(ignored)] if ignored else []
+    command = ["git", "diff", "--cached", "-z", "--raw", "--numstat", "-p"]
+    if excludes:
+        command += ["--", *excludes]
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitError(f"Failed to get staged diff: {e}") from e
+
+    assert process.stdout is not None and process.stderr is not None
+    expired = threading.Event()
+
+    def _expire() -> None:
+        expired.set()
+        process.kill()
+
+    def _check_deadline() -> None:
+        if expired.is_set():
+            logger.error(f"Command timed out after {_STAGED_DIFF_TIMEOUT} seconds: {' '.join(command)}")
+            raise GitError(f"Failed to get staged diff: git timed out after {_STAGED_DIFF_TIMEOUT} seconds")
+
+    # Killing git ends the reads below, which then report the timeout
+    deadline = threading.Timer(_STAGED_DIFF_TIMEOUT, _expire)
+    deadline.daemon = True
+    deadline.start()
+    try:
+        records, patch_start = _read_until_patch(process.stdout)
+        _check_deadline()
+        entries, _ = parse_snapshot_output(decode_output(records))
+        flagged = check_summary_attributes((e.path for e in entries), repo_root)
+        changed_lines = sum((e.additions or 0) + (e.deletions or 0) for e in entries if e.path not in flagged)
+
+        if ignored:
+            # Without --numstat git compares no file contents, so listing these is cheap
+            listed = run_git_command(["diff", "--cached", "-z", "--raw", "--", *include_pathspecs(ignored)])
+            if not listed.success:
+                raise GitError(listed.fail_message("Failed to list files matching .gacignore"))
+            ignored_entries, _ = parse_snapshot_output(listed.output)
+            flagged.update((e.path, GACIGNORE_FILENAME) for e in ignored_entries)
+            # Both lists are already in git's order; interleave them without reordering either
+            entries = tuple(heapq.merge(entries, ignored_entries, key=lambda e: e.path))
+
+        if changed_lines > max_patch_lines:
+            logger.info(f"Staged diff has {changed_lines} changed lines; it will be streamed instead of buffered")
+            process.kill()
+            process.wait()
+            return entries, None, flagged
+
+        if any(reason != GACIGNORE_FILENAME for reason in flagged.values()):
+            process.kill()
+            process.wait()
+            command = [
+                "diff",
+                "--cached",
+                "-p",
+                "--",
+                ":(top)",
+                *exclude_flagged_pathspecs(),
+                *exclude_pathspecs(ignored),
+            ]
+            result = run_git_command(command, timeout=_STAGED_DIFF_TIMEOUT)
+            if not result.success:
+                raise GitError(result.fail_message("Failed to get staged diff"))
+            return entries, merge_flagged_summaries(result.output, entries, flagged), flagged
+
+        patch = decode_output(patch_start + process.stdout.read()).strip()
+        stderr = process.stderr.read()
+        process.wait()
+        _check_deadline()
+        if process.returncode != 0:
+            message = decode_output(stderr).strip() or f"git exited with code {process.returncode}"
+            raise GitError(f"Failed to get staged diff: {message}")
+        if flagged:
+            patch = merge_flagged_summaries(patch, entries, flagged)
+        return entries, patch, flagged
+    finally:
+        deadline.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
@@ -10,6 +10,7 @@ import re
 from dataclasses import dataclass
 
 from gac.constants import Utility
+from gac.diff_sections import DiffSection, as_diff_section, parse_diff, split_diff_header
 
 logger = logging.getLogger(__name__)
 
@@ -143,10 +144,8 @@ def extract_file_path_from_diff_section(section: str) -> str | None:
     Returns:
         The file path or None if not found
     """
-    match = re.search(r"diff --git a/(.*?) b/", section)
-    if match:
-        return match.group(1)
-    return None
+    parsed = as_diff_section(section)
+    return parsed.path if parsed.has_header and parsed.path else None
 
 
 def extract_line_number_from_hunk(line: str, hunk_header: str | None) -> int | None:
@@ -170,73 +169,96 @@ def extract_line_number_from_hunk(line: str, hunk_header: str | None) -> int | N
     return int(match.group(1))
 
 
-def scan_diff_section(section: str) -> list[DetectedSecret]:
-    """Scan a single git diff section for secrets.
-
-    Args:
-        section: A git diff section to scan
+class DiffSecretScanner:
+    """Incremental secret scanner that consumes a diff one line at a time.
 
-    Returns:
-        List of detected secrets
+    This lets secrets be detected while a diff is streamed from git, including
+    in files whose patch text is never kept in memory.
     """
-    secrets: list[DetectedSecret] = []
-    file_path = extract_file_path_from_diff_section(section)
 
-    if not file_path:
-        return secrets
+    def __init__(self, file_path: str | None = None) -> None:
+        self.secrets: list[DetectedSecret] = []
+        self._patterns = SecretPatterns.get_all_patterns()
+        self._file_path = file_path
+        self._line_counter = 0
+
+    def feed(self, line: str) -> None:
+        """Scan one diff line (without its trailing newline)."""
+        if line.startswith("diff --git "):
+            self._file_path = split_diff_header(line)[1] or self._file_path
+            self._line_counter = 0
+            return
 
-    patterns = SecretPatterns.get_all_patterns()
-    lines = section.split("\n")
-    line_counter = 0
+        if not self._file_path:
+            return
 
-    for line in lines:
         # Track hunk headers for line number extraction
         if line.startswith("@@"):
             # Reset line counter based on hunk header (this is the starting line number in the new file)
             match = re.search(r"@@ -\d+(?:,\d+)? \+(\d+)", line)
             if match:
-                line_counter = int(match.group(1)) - 1  # Start one line before, will increment correctly
-            continue
+                self._line_counter = int(match.group(1)) - 1  # Start one line before, will increment correctly
+            return
 
         # Skip metadata lines
         if line.startswith("+++") or line.startswith("---"):
-            continue
+            return
 
         # Increment line counter for both added and context lines
         if line.startswith("+") or line.startswith(" "):
-            line_counter += 1
+            self._line_counter += 1
 
         # Only scan added lines (starting with '+')
-        if line.startswith("+") and not line.startswith("+++"):
-            # Check each pattern
-            content = line[1:]  # Remove the '+' prefix for pattern matching
-            for pattern_name, pattern in patterns.items():
-                matches = pattern.finditer(content)
-                for match in matches:
-                    matched_text = match.group(0)
-
-                    # Skip false positives
-                    if is_false_positive(matched_text, file_path):
-                        logger.debug(f"Skipping false positive: {matched_text}")
-                        continue
-
-                    display_text = (
-                        matched_text[: Utility.MAX_DISPLAYED_SECRET_LENGTH] + "..."
-                        if len(matched_text) > Utility.MAX_DISPLAYED_SECRET_LENGTH
-                        else matched_text
+        if line.startswith("+"):
+            self._scan_added_line(line[1:])  # Remove the '+' prefix for pattern matching
+
+    def _scan_added_line(self, content: str) -> None:
+        file_path = self._file_path or ""
+        for pattern_name, pattern in self._patterns.items():
+            for match in pattern.finditer(content):
+                matched_text = match.group(0)
+
+                # Skip false positives
+                if is_false_positive(matched_text, file_path):
+                    logger.debug(f"Skipping false positive: {matched_text}")
+                    continue
+
+                display_text = (
+                    matched_text[: Utility.MAX_DISPLAYED_SECRET_LENGTH] + "..."
+                    if len(matched_text) > Utility.MAX_DISPLAYED_SECRET_LENGTH
+                    else matched_text
+                )
+
+                self.secrets.append(
+                    DetectedSecret(
+                        file_path=file_path,
+                        line_number=self._line_counter,
+                        secret_type=pattern_name,
+                        matched_text=display_text,
+                        context=content.strip(),
                     )
+                )
 
-                    secrets.append(
-                        DetectedSecret(
-                            file_path=file_path,
-                            line_number=line_counter,
-                            secret_type=pattern_name,
-                            matched_text=display_text,
-                            context=content.strip(),
-                        )
-                    )
 
-    return secrets
+def scan_diff_section(section: str | DiffSection) -> list[DetectedSecret]:
+    """Scan a single git diff section for secrets.
+
+    Args:
+        section: A git diff section to scan
+
+    Returns:
+        List of detected secrets
+    """
+    parsed = as_diff_section(section)
+    if not parsed.has_header or not parsed.path:
+        return []
+
+    scanner = DiffSecretScanner(parsed.path)
+    for line in parsed.text.split("\n"):
+        if not line.startswith("diff --git "):
+            scanner.feed(line)
+
+    return scanner.secrets
 
 
 def scan_staged_diff(diff: str) -> list[DetectedSecret]:
@@ -251,23 +273,11 @@ def scan_staged_diff(diff: str) -> list[DetectedSecret]:
     if not diff:
         return []
 
-    # Split diff into sections (one per file)
-    sections = re.split(r"(?=^diff --git )", diff, flags=re.MULTILINE)
     all_secrets = []
 
-    for section in sections:
-        if not section.strip():
-            continue
-
-        # Validate that this is a real git diff section
+    for section in parse_diff(diff):
         # Real diff sections must have diff --git header followed by --- and +++ lines
-        if not re.search(r"^diff --git ", section, flags=re.MULTILINE):
-            continue
-
-        if not re.search(r"^--- ", section, flags=re.MULTILINE):
-            continue
-
-        if not re.search(r"^\+\+\+ ", section, flags=re.MULTILINE):
+        if not section.has_header or not section.has_patch_headers:
             continue
 
         secrets = scan_diff_section(section)
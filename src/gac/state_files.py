@@ -0,0 +1,65 @@
+"""JSON state files in the repository's ``.git/gac`` directory.
+
+The hook result cache, the Python summary cache and the churn index are
+small JSON files kept next to each other under ``.git/gac``.  They are read
+leniently, so a missing or corrupt file reads as empty, and written
+atomically, so an interrupted or concurrent gac never leaves a partial file.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Mapping
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def gac_state_path(filename: str) -> str | None:
+    """Path of ``filename`` in the repository's ``.git/gac`` state directory, or None outside a repository."""
+    from gac.git import run_git_command
+
+    result = run_git_command(["rev-parse", "--git-common-dir"], silent=True)
+    if not result.success or not result.output:
+        return None
+    git_dir = os.path.abspath(result.output)
+    if not os.path.isdir(git_dir):
+        return None
+    return os.path.join(git_dir, "gac", filename)
+
+
+def load_json_state(path: str) -> dict[str, Any]:
+    """The JSON object stored at ``path``, or an empty dict if it is missing, unreadable or not an object."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def store_json_state(path: str, data: Mapping[str, Any]) -> bool:
+    """Atomically replace ``path`` with ``data`` as JSON.
+
+    Returns:
+        Whether the file was written; failures are logged and leave no temporary file behind
+    """
+    directory = os.path.dirname(path)
+    tmp_path: str | None = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}-", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        return True
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f"Could not write {path}: {e}")
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+        return False
@@ -46,6 +46,7 @@ from gac.stats.store import (
     find_model_key,
     format_tokens,
     get_current_project_name,
+    invalidate_project_name_cache,
     load_stats,
     model_activity,
     project_activity,
@@ -89,6 +90,7 @@ __all__ = [
     "find_model_key",
     "format_tokens",
     "get_current_project_name",
+    "invalidate_project_name_cache",
     "load_stats",
     "model_activity",
     "project_activity",
@@ -117,12 +117,21 @@ def stats_enabled() -> bool:
     return raw.strip().lower() in _FALSY_VALUES
 
 
-def get_current_project_name() -> str | None:
-    """Get the current project name from git remote or directory name.
+# cwd -> (repo root, path of the repository's shared config file)
+_repo_locations: dict[str, tuple[str, str]] = {}
+# repo root -> (config file signature, project name)
+_project_names: dict[str, tuple[tuple[int, int, int] | None, str | None]] = {}
 
-    Returns:
-        Project name (repo name) or None if not in a git repo
-    """
+
+def _config_signature(config_path: str) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(config_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _project_name_from_git(repo_root: str) -> str | None:
     try:
         # Try to get the remote origin URL
         result = subprocess.run(
@@ -140,21 +149,57 @@ def get_current_project_name() -> str | None:
                 if repo_name.endswith(".git"):
                     repo_name = repo_name[:-4]
                 return repo_name
-
-        # Fallback: get directory name
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            repo_path = result.stdout.strip()
-            return Path(repo_path).name
     except (subprocess.SubprocessError, OSError):
         pass
 
-    return None
+    # Fallback: directory name
+    return Path(repo_root).name
+
+
+def invalidate_project_name_cache() -> None:
+    """Forget every resolved project name."""
+    _repo_locations.clear()
+    _project_names.clear()
+
+
+def get_current_project_name() -> str | None:
+    """Get the current project name from git remote or directory name.
+
+    The name is resolved once per repository root and reused until the
+    repository's ``config`` file changes (e.g. the origin remote is edited),
+    so recording several stats in one run spawns git only once.
+
+    Returns:
+        Project name (repo name) or None if not in a git repo
+    """
+    cwd = os.getcwd()
+    location = _repo_locations.get(cwd)
+    if location is None:
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel", "--git-common-dir"],
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
+        except (subprocess.SubprocessError, OSError):
+            return None
+        lines = result.stdout.splitlines()
+        if result.returncode != 0 or len(lines) < 2:
+            return None
+        location = (lines[0], os.path.join(os.path.abspath(lines[1]), "config"))
+        _repo_locations[cwd] = location
+
+    repo_root, config_path = location
+    signature = _config_signature(config_path)
+    cached = _project_names.get(repo_root)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    project_name = _project_name_from_git(repo_root)
+    _project_names[repo_root] = (signature, project_name)
+    logger.debug(f"Resolved project name {project_name!r} for {repo_root}")
+    return project_name
 
 
 # =============================================================================
@@ -0,0 +1,213 @@
+"""Offline token counting for :func:`gac.ai_utils.count_tokens`.
+
+The default estimate of one token per 3.4 characters is far off for CJK
+text, minified code and base64 data.  When the byte-pair encoding used by a
+model family is available as a local tiktoken-format rank file (one
+``<base64 token> <rank>`` pair per line, e.g. ``o200k_base.tiktoken``) in
+``$GAC_TOKENIZER_DIR`` (default ``~/.config/gac/tokenizers``), tokens are
+counted with it instead.  Nothing is ever downloaded; models without a
+known encoding, or whose file is missing, keep the heuristic.
+
+Exact counts are cached by content hash, so counting the same diff section
+again is free.  Texts longer than a few token budgets are always estimated:
+the pure-Python encoder would spend seconds on them, and whether a whole
+unprocessed diff is four or eight times over the budget changes nothing.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 3.4
+TOKENIZER_DIR_ENV = "GAC_TOKENIZER_DIR"
+DEFAULT_TOKENIZER_DIR = Path.home() / ".config" / "gac" / "tokenizers"
+
+# Model name prefixes (provider and vendor prefixes removed) and the encoding
+# their models use; the first matching prefix wins.
+TOKENIZER_FAMILIES: dict[str, str] = {
+    "gpt-4o": "o200k_base",
+    "chatgpt-4o": "o200k_base",
+    "gpt-4.1": "o200k_base",
+    "gpt-4.5": "o200k_base",
+    "gpt-5": "o200k_base",
+    "gpt-oss": "o200k_base",
+    "o1": "o200k_base",
+    "o3": "o200k_base",
+    "o4": "o200k_base",
+    "gpt-4": "cl100k_base",
+    "gpt-3.5": "cl100k_base",
+}
+
+# Splits text into the pieces byte-pair merges are applied to, approximating
+# the Unicode-class pattern of the OpenAI encodings with the stdlib ``re``.
+_PRETOKENIZE = re.compile(
+    r"'(?i:[sdmt]|ll|ve|re)|[^\r\n\w]?[^\W\d_]+|\d{1,3}| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"
+)
+# Longer pieces (e.g. base64 runs) are merged in chunks to bound the quadratic merge loop
+_MAX_PIECE_BYTES = 256
+_PIECE_CACHE_SIZE = 65536
+_COUNT_CACHE_SIZE = 4096
+# Hashing costs more than counting very short texts
+_MIN_CACHED_LENGTH = 256
+# Longer texts are estimated even when an encoding is available
+MAX_EXACT_LENGTH = 200_000
+
+
+class Tokenizer(Protocol):
+    """Something that counts the tokens of a text."""
+
+    name: str
+    exact: bool
+
+    def count(self, text: str) -> int: ...
+
+
+class HeuristicTokenizer:
+    """One token per :data:`CHARS_PER_TOKEN` characters."""
+
+    name = "heuristic"
+    exact = False
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        result = round(len(text) / CHARS_PER_TOKEN)
+        return result if result > 0 else 1
+
+
+class BPETokenizer:
+    """Byte-pair encoder over a tiktoken-format rank table."""
+
+    exact = True
+
+    def __init__(self, name: str, ranks: dict[bytes, int]) -> None:
+        self.name = name
+        self._ranks = ranks
+        # Least recently used pieces are evicted first; common ones stay cached across diffs
+        self._piece_count: Callable[[bytes], int] = lru_cache(maxsize=_PIECE_CACHE_SIZE)(self._count_piece)
+
+    @classmethod
+    def from_file(cls, path: Path) -> BPETokenizer:
+        """Load ``path``, a file of ``<base64 token> <rank>`` lines.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If a line is malformed.
+        """
+        ranks: dict[bytes, int] = {}
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+        return cls(path.stem, ranks)
+
+    def _merge_count(self, piece: bytes) -> int:
+        ranks = self._ranks
+        if piece in ranks:
+            return 1
+        parts = [piece[i : i + 1] for i in range(len(piece))]
+        while len(parts) > 1:
+            best_rank = None
+            best_index = -1
+            for index in range(len(parts) - 1):
+                rank = ranks.get(parts[index] + parts[index + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank, best_index = rank, index
+            if best_index < 0:
+                break
+            parts[best_index : best_index + 2] = [parts[best_index] + parts[best_index + 1]]
+        return len(parts)
+
+    def _count_piece(self, piece: bytes) -> int:
+        return sum(
+            self._merge_count(piece[start : start + _MAX_PIECE_BYTES])
+            for start in range(0, len(piece), _MAX_PIECE_BYTES)
+        )
+
+    def count(self, text: str) -> int:
+        return sum(self._piece_count(piece.encode("utf-8")) for piece in _PRETOKENIZE.findall(text))
+
+
+_HEURISTIC = HeuristicTokenizer()
+
+_counts: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+def tokenizer_dir() -> Path:
+    """Directory searched for ``<encoding>.tiktoken`` files."""
+    configured = os.getenv(TOKENIZER_DIR_ENV)
+    return Path(configured).expanduser() if configured else DEFAULT_TOKENIZER_DIR
+
+
+def encoding_for_model(model: str) -> str | None:
+    """Name of the encoding used by ``model`` (e.g. ``openai:gpt-4o``), if known."""
+    name = model.split(":", 1)[-1].rsplit("/", 1)[-1].lower()
+    for prefix, encoding in TOKENIZER_FAMILIES.items():
+        if name.startswith(prefix):
+            return encoding
+    return None
+
+
+@lru_cache(maxsize=8)
+def _load_encoding(directory: Path, encoding: str) -> BPETokenizer | None:
+    path = directory / f"{encoding}.tiktoken"
+    if not path.is_file():
+        return None
+    try:
+        tokenizer = BPETokenizer.from_file(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable tokenizer file {path}: {e}")
+        return None
+    logger.debug(f"Loaded {len(tokenizer._ranks)} tokens from {path}")
+    return tokenizer
+
+
+def get_tokenizer(model: str) -> Tokenizer:
+    """Tokenizer for ``model``: its local BPE encoding if present, else the heuristic."""
+    encoding = encoding_for_model(model)
+    if encoding is None:
+        return _HEURISTIC
+    return _load_encoding(tokenizer_dir(), encoding) or _HEURISTIC
+
+
+def count_text_tokens(text: str, model: str) -> int:
+    """Count the tokens of ``text`` for ``model``, caching exact counts by content hash.
+
+    Texts over :data:`MAX_EXACT_LENGTH` characters are estimated without
+    loading or running an encoding.
+    """
+    if not text:
+        return 0
+    if len(text) > MAX_EXACT_LENGTH:
+        return _HEURISTIC.count(text)
+    tokenizer = get_tokenizer(model)
+    if not tokenizer.exact or len(text) < _MIN_CACHED_LENGTH:
+        return tokenizer.count(text)
+
+    key = (tokenizer.name, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+    with _counts_lock:
+        cached = _counts.get(key)
+        if cached is not None:
+            _counts.move_to_end(key)
+            return cached
+    count = max(tokenizer.count(text), 1)
+    with _counts_lock:
+        _counts[key] = count
+        if len(_counts) > _COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return count
@@ -139,20 +139,55 @@ def get_safe_encodings() -> list[str]:
     return encodings
 
 
-def run_subprocess_with_encoding(
+def _decode_line(line: bytes, encodings: list[str]) -> str:
+    for encoding in encodings:
+        try:
+            return line.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return line.decode("utf-8", errors="replace")
+
+
+def decode_output(data: bytes | str | None, encodings: list[str] | None = None) -> str:
+    """Decode captured subprocess output without re-running the command.
+
+    The whole buffer is decoded as UTF-8 first. If that fails, it is decoded
+    line by line, trying each of ``encodings`` (default: :func:`get_safe_encodings`)
+    so that a single file in a legacy encoding does not garble the rest of a diff.
+    Undecodable bytes are replaced as a last resort, so this never raises.
+
+    Args:
+        data: Raw output bytes (text is returned unchanged)
+        encodings: Encodings to try, in order of preference
+
+    Returns:
+        Decoded text
+    """
+    if data is None:
+        return ""
+    if isinstance(data, str):
+        return data
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+
+    encodings = encodings or get_safe_encodings()
+    return "".join(_decode_line(line, encodings) for line in data.splitlines(keepends=True))
+
+
+def run_subprocess(
     command: list[str],
-    encoding: str,
     silent: bool = False,
     timeout: int = 60,
     check: bool = True,
     strip_output: bool = True,
     raise_on_error: bool = True,
 ) -> str:
-    """Run subprocess with a specific encoding, handling encoding errors gracefully.
+    """Run a subprocess command safely and return the output, trying multiple encodings.
 
     Args:
         command: List of command arguments
-        encoding: Specific encoding to use
         silent: If True, suppress debug logging
         timeout: Command timeout in seconds
         check: Whether to check return code (for compatibility)
@@ -165,33 +200,27 @@ def run_subprocess_with_encoding(
     Raises:
         GacError: If the command times out
         subprocess.CalledProcessError: If the command fails and raise_on_error is True
+
+    Note:
+        Output is captured once as bytes and decoded in memory with :func:`decode_output`
+        (utf-8, locale encoding, platform-specific fallbacks). The command is never re-run
+        to decode its output, which prevents UnicodeDecodeError on systems with non-UTF-8
+        locales (e.g., Chinese Windows) without paying for a second ``git diff``.
     """
     if not silent:
-        logger.debug(f"Running command: {' '.join(command)} (encoding: {encoding})")
+        logger.debug(f"Running command: {' '.join(command)}")
 
     try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=timeout,
-            encoding=encoding,
-            errors="replace",  # Replace problematic characters instead of crashing
-        )
-
-        should_raise = result.returncode != 0 and (check or raise_on_error)
-
-        if should_raise:
-            if not silent:
-                logger.debug(f"Command stderr: {result.stderr}")
-            raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
+        result = subprocess.run(command, capture_output=True, check=False, timeout=timeout)
+        stdout = decode_output(result.stdout)
+        stderr = decode_output(result.stderr)
 
-        output = result.stdout
-        if strip_output:
-            output = output.strip()
+        if result.returncode != 0 and (check or raise_on_error):
+            if not silent:
+                logger.debug(f"Command stderr: {stderr}")
+            raise subprocess.CalledProcessError(result.returncode, command, stdout, stderr)
 
-        return output
+        return stdout.strip() if strip_output else stdout
     except subprocess.TimeoutExpired as e:
         logger.error(f"Command timed out after {timeout} seconds: {' '.join(command)}")
         raise GacError(f"Command timed out: {' '.join(command)}") from e
@@ -202,10 +231,9 @@ def run_subprocess_with_encoding(
             raise
         return ""
     except UnicodeError as e:
-        # This should be rare with errors="replace", but handle it just in case
         if not silent:
-            logger.debug(f"Encoding error with {encoding}: {e}")
-        raise
+            logger.error(f"Failed to decode command output: {e}")
+        raise subprocess.CalledProcessError(1, command, "", f"Encoding error: {e}") from e
     except Exception as e:
         if not silent:
             logger.debug(f"Command error: {e}")
@@ -213,66 +241,3 @@ def run_subprocess_with_encoding(
             # Convert generic exceptions to CalledProcessError for consistency
             raise subprocess.CalledProcessError(1, command, "", str(e)) from e
         return ""
-
-
-def run_subprocess(
-    command: list[str],
-    silent: bool = False,
-    timeout: int = 60,
-    check: bool = True,
-    strip_output: bool = True,
-    raise_on_error: bool = True,
-) -> str:
-    """Run a subprocess command safely and return the output, trying multiple encodings.
-
-    Args:
-        command: List of command arguments
-        silent: If True, suppress debug logging
-        timeout: Command timeout in seconds
-        check: Whether to check return code (for compatibility)
-        strip_output: Whether to strip whitespace from output
-        raise_on_error: Whether to raise an exception on error
-
-    Returns:
-        Command output as string
-
-    Raises:
-        GacError: If the command times out
-        subprocess.CalledProcessError: If the command fails and raise_on_error is True
-
-    Note:
-        Tries multiple encodings in order: utf-8, locale encoding, platform-specific fallbacks
-        This prevents UnicodeDecodeError on systems with non-UTF-8 locales (e.g., Chinese Windows)
-    """
-    encodings = get_safe_encodings()
-    last_exception = None
-
-    for encoding in encodings:
-        try:
-            return run_subprocess_with_encoding(
-                command=command,
-                encoding=encoding,
-                silent=silent,
-                timeout=timeout,
-                check=check,
-                strip_output=strip_output,
-                raise_on_error=raise_on_error,
-            )
-        except UnicodeError as e:
-            last_exception = e
-            if not silent:
-                logger.debug(f"Failed to decode with {encoding}: {e}")
-            continue
-        except (subprocess.CalledProcessError, GacError, subprocess.TimeoutExpired):
-            # These are not encoding-related errors, so don't retry with other encodings
-            raise
-
-    # If we get here, all encodings failed with UnicodeError
-    if not silent:
-        logger.error(f"Failed to decode command output with any encoding: {encodings}")
-
-    # Raise the last UnicodeError we encountered
-    if last_exception:
-        raise subprocess.CalledProcessError(1, command, "", f"Encoding error: {last_exception}") from last_exception
-    else:
-        raise subprocess.CalledProcessError(1, command, "", "All encoding attempts failed")
@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from gac.background_hooks import BackgroundHooks
     from gac.commit_executor import CommitExecutor
     from gac.git_state_validator import GitState
     from gac.interactive_mode import InteractiveMode
@@ -59,6 +60,7 @@ class CLIOptions:
 
     # Commit options
     signoff: bool = False
+    parallel_hooks: bool = False
 
 
 @dataclass(frozen=True)
@@ -108,6 +110,7 @@ class WorkflowState:
     hint: str
     commit_executor: CommitExecutor
     interactive_mode: InteractiveMode
+    background_hooks: BackgroundHooks | None = None
 
 
 @dataclass(frozen=True)
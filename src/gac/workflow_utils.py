@@ -1,6 +1,4 @@
 import logging
-import tempfile
-from pathlib import Path
 from typing import Any, Protocol
 
 import click
@@ -86,6 +84,7 @@ def execute_commit(
     commit_message: str, no_verify: bool, hook_timeout: int | None = None, signoff: bool = False
 ) -> None:
     from gac.git import run_git_command
+    from gac.repo_snapshot import invalidate_repo_snapshot
 
     commit_args = ["commit", "-m", commit_message]
     if no_verify:
@@ -93,7 +92,10 @@ def execute_commit(
     if signoff:
         commit_args.append("--signoff")
     effective_timeout = hook_timeout if hook_timeout and hook_timeout > 0 else EnvDefaults.HOOK_TIMEOUT
-    run_git_command(commit_args, timeout=effective_timeout).require_success()
+    try:
+        run_git_command(commit_args, timeout=effective_timeout).require_success()
+    finally:
+        invalidate_repo_snapshot()
     logger.info("Commit created successfully")
     console.print("[green]Commit created successfully[/green]")
 
@@ -132,31 +134,28 @@ def display_commit_message(
     console.print(f"[dim]Token usage: {format_token_usage(prompt_tokens, completion_tokens, reasoning_tokens)}[/dim]")
 
 
-def restore_staging(staged_files: list[str], staged_diff: str | None = None) -> None:
+def restore_staging(staged_files: list[str], staged_tree: str | None = None) -> None:
     """Restore the git staging area to a previous state.
 
     Args:
         staged_files: List of file paths that should be staged
-        staged_diff: Optional staged diff to reapply for partial staging
+        staged_tree: Optional tree saved with ``git write-tree``; reading it
+            back restores partial staging exactly, whatever the diff size
     """
     from gac.git import run_git_command
+    from gac.repo_snapshot import invalidate_repo_snapshot
 
-    run_git_command(["reset", "HEAD"]).require_success()
+    invalidate_repo_snapshot()
 
-    if staged_diff:
-        temp_path: Path | None = None
+    if staged_tree:
         try:
-            with tempfile.NamedTemporaryFile("w", delete=False) as tmp:
-                tmp.write(staged_diff)
-                temp_path = Path(tmp.name)
-            run_git_command(["apply", "--cached", str(temp_path)]).require_success()
+            # -m keeps the cached stat data of entries that did not change
+            run_git_command(["read-tree", "-m", staged_tree]).require_success()
             return
         except Exception as e:
-            logger.warning(f"Failed to reapply staged diff, falling back to file list: {e}")
-        finally:
-            if temp_path:
-                temp_path.unlink(missing_ok=True)
+            logger.warning(f"Failed to read back staged tree, falling back to file list: {e}")
 
+    run_git_command(["reset", "HEAD"]).require_success()
     for file_path in staged_files:
         try:
             run_git_command(["add", file_path]).require_success()
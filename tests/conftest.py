@@ -4,6 +4,7 @@ Pytest configuration file with coverage setup to avoid the module-not-measured w
 
 import logging
 import os
+import subprocess
 import sys
 from unittest.mock import patch
 
@@ -22,6 +23,32 @@ def pytest_configure(config):
     warnings.filterwarnings("ignore", category=CoverageWarning, message="Module .* was previously imported")
 
 
+def git(*args: str, env: dict[str, str] | None = None) -> str:
+    """Run git in the current directory, failing the test if it fails, and return its output."""
+    result = subprocess.run(
+        ["git", *args], check=True, capture_output=True, text=True, env={**os.environ, **env} if env else None
+    )
+    return result.stdout
+
+
+def init_repo(path: "os.PathLike[str] | str") -> None:
+    """Create an empty repository with a committer identity at ``path``."""
+    git("init", str(path))
+    git("-C", str(path), "config", "user.email", "test@test.com")
+    git("-C", str(path), "config", "user.name", "Test")
+
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+    """An empty repository in ``tmp_path``, which becomes the current directory.
+
+    Test modules that need files or history override this fixture, requesting it by the same name.
+    """
+    init_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
 @pytest.fixture
 def mock_run_subprocess():
     """Mock for gac.git.run_subprocess."""
@@ -133,6 +160,24 @@ def clean_env_state():
             os.environ[key] = value
 
 
+@pytest.fixture(autouse=True)
+def clear_repo_snapshot_cache():
+    """Drop memoized staged snapshots so one test's repository never leaks into another."""
+    from gac.repo_snapshot import invalidate_repo_snapshot
+
+    invalidate_repo_snapshot()
+    yield
+    invalidate_repo_snapshot()
+
+
+@pytest.fixture(autouse=True)
+def clear_churn_index_cache(monkeypatch):
+    """Drop memoized churn indexes so each test reads the history of the repository it creates."""
+    import gac.churn_index
+
+    monkeypatch.setattr(gac.churn_index, "_memo", {})
+
+
 @pytest.fixture
 def mock_stage_files():
     """Mock for gac.git.stage_files."""
@@ -0,0 +1,12 @@
+"""Utilities for faking repository state in workflow tests."""
+
+from gac.repo_snapshot import RepoSnapshot, StagedEntry
+
+
+def fake_snapshot(files: list[str], patch: str = "", repo_root: str = "/fake/repo") -> RepoSnapshot:
+    """Build a RepoSnapshot with every file reported as modified."""
+    return RepoSnapshot(
+        repo_root=repo_root,
+        entries=tuple(StagedEntry("M", path, None, 1, 0) for path in files),
+        patch=patch,
+    )
@@ -0,0 +1,214 @@
+"""Tests for running hooks alongside commit message generation."""
+
+from __future__ import annotations
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from gac.background_hooks import BackgroundHooks, StagedTreeChangedError, finish_background_hooks, run_hooks
+from gac.main import main
+from gac.workflow_context import CLIOptions
+from tests.conftest import git
+
+
+@pytest.fixture()
+def git_repo(git_repo):
+    (git_repo / "a.py").write_text("a = 1\n")
+    git("add", ".")
+    git("commit", "-m", "initial")
+    (git_repo / "a.py").write_text("a = 2\n")
+    git("add", "a.py")
+    return git_repo
+
+
+class TestRunHooks:
+    def test_reports_first_failing_runner(self):
+        with (
+            patch("gac.git.run_lefthook_hooks", return_value=True),
+            patch("gac.git.run_pre_commit_hooks", return_value=False),
+        ):
+            assert run_hooks(10) == "Pre-commit"
+
+        with (
+            patch("gac.git.run_lefthook_hooks", return_value=False),
+            patch("gac.git.run_pre_commit_hooks") as pre_commit,
+        ):
+            assert run_hooks(10) == "Lefthook"
+        pre_commit.assert_not_called()
+
+
+class TestBackgroundHooks:
+    def test_runs_while_caller_continues(self, git_repo):
+        release = threading.Event()
+
+        def slow_hooks(timeout, on_start=None):
+            release.wait(5)
+            return True
+
+        with (
+            patch("gac.git.run_lefthook_hooks", side_effect=slow_hooks),
+            patch("gac.git.run_pre_commit_hooks", return_value=True),
+        ):
+            hooks = BackgroundHooks(10)
+            assert not hooks._future.done()
+            release.set()
+            assert hooks.wait() is True
+
+    def test_failure_is_reported(self, git_repo):
+        with (
+            patch("gac.git.run_lefthook_hooks", return_value=True),
+            patch("gac.git.run_pre_commit_hooks", return_value=False),
+            patch("gac.background_hooks.console.print") as printed,
+        ):
+            assert finish_background_hooks(BackgroundHooks(10)) is False
+        assert "Pre-commit hooks failed" in printed.call_args_list[0].args[0]
+
+    def test_staged_tree_change_raises(self, git_repo):
+        def reformatting_hook(timeout, on_start=None):
+            (git_repo / "a.py").write_text("a = 3\n")
+            git("add", "a.py")
+            return True
+
+        with (
+            patch("gac.git.run_lefthook_hooks", side_effect=reformatting_hook),
+            patch("gac.git.run_pre_commit_hooks", return_value=True),
+        ):
+            hooks = BackgroundHooks(10)
+            with pytest.raises(StagedTreeChangedError):
+                hooks.wait()
+
+    def test_cancel_terminates_running_hooks(self, git_repo):
+        from gac.git import run_subprocess_with_encoding_fallback
+
+        started = threading.Event()
+        processes = []
+
+        def hanging_hooks(timeout, on_start=None):
+            def record(process):
+                processes.append(process)
+                on_start(process)
+                started.set()
+
+            return (
+                run_subprocess_with_encoding_fallback(["sleep", "30"], timeout=timeout, on_start=record).returncode == 0
+            )
+
+        with (
+            patch("gac.git.run_lefthook_hooks", side_effect=hanging_hooks),
+            patch("gac.git.run_pre_commit_hooks", return_value=True) as pre_commit,
+            patch("gac.background_hooks.console.print"),
+        ):
+            hooks = BackgroundHooks(60)
+            assert started.wait(5)
+            hooks.cancel()
+            assert hooks.wait() is False
+
+        assert processes[0].returncode is not None
+        pre_commit.assert_not_called()
+
+    def test_runner_started_after_cancel_is_stopped(self, git_repo):
+        release = threading.Event()
+        process = MagicMock()
+        process.poll.return_value = None
+
+        def late_hooks(timeout, on_start=None):
+            release.wait(5)
+            on_start(process)
+            return False
+
+        with (
+            patch("gac.git.run_lefthook_hooks", side_effect=late_hooks),
+            patch("gac.background_hooks.console.print"),
+        ):
+            hooks = BackgroundHooks(10)
+            hooks.cancel()
+            release.set()
+            assert hooks.wait() is False
+
+        process.terminate.assert_called_once()
+
+    def test_no_hooks(self):
+        assert finish_background_hooks(None) is True
+
+
+@patch("gac.main.GitStateValidator")
+@patch("gac.main.PromptBuilder")
+@patch("gac.main.CommitExecutor")
+@patch("gac.main.InteractiveMode")
+@patch("gac.main.GroupedCommitWorkflow")
+def test_main_regenerates_after_hooks_change_tree(_grouped, _interactive, _executor, _prompts, validator):
+    config = {"model": "openai:gpt-4o-mini", "temperature": 0.1, "max_output_tokens": 100, "max_retries": 1}
+    validator.return_value.get_git_state.return_value.has_secrets = False
+    started = []
+    cancelled = []
+
+    class FakeHooks:
+        def __init__(self, timeout):
+            started.append(timeout)
+
+        def cancel(self):
+            cancelled.append(True)
+
+    def workflow(ctx, config):
+        if ctx.state.background_hooks is not None:
+            raise StagedTreeChangedError("tree changed")
+        return 0
+
+    with (
+        patch("gac.main.BackgroundHooks", FakeHooks),
+        patch("gac.main.run_lefthook_hooks") as lefthook,
+        patch("gac.main._execute_single_commit_workflow", side_effect=workflow) as run_workflow,
+        patch("gac.main.console.print"),
+    ):
+        assert main(CLIOptions(parallel_hooks=True, hook_timeout=7), config) == 0
+
+    lefthook.assert_not_called()
+    # Hooks ran once; the regenerated message is committed with the already-verified tree
+    assert started == [7]
+    # Hooks are stopped once the workflow that started them is over
+    assert cancelled == [True]
+    assert run_workflow.call_count == 2
+    assert run_workflow.call_args_list[1].args[0].state.background_hooks is None
+    assert validator.return_value.get_git_state.call_count == 2
+
+
+def test_single_commit_waits_for_hooks_before_committing():
+    from gac.main import _execute_single_commit_workflow
+    from gac.workflow_context import GenerationConfig, WorkflowContext, WorkflowFlags, WorkflowState
+
+    hooks = MagicMock()
+    hooks.wait.return_value = False
+    executor = MagicMock()
+    ctx = WorkflowContext(
+        config=GenerationConfig(model="openai:gpt-4o-mini", temperature=0.1, max_output_tokens=100, max_retries=1),
+        flags=WorkflowFlags(
+            require_confirmation=False,
+            quiet=True,
+            no_verify=False,
+            dry_run=False,
+            message_only=False,
+            push=False,
+            show_prompt=False,
+            interactive=False,
+        ),
+        state=WorkflowState(
+            prompts=MagicMock(system_prompt="s", user_prompt="u"),
+            git_state=MagicMock(),
+            hint="",
+            commit_executor=executor,
+            interactive_mode=MagicMock(),
+            background_hooks=hooks,
+        ),
+    )
+
+    with (
+        patch("gac.main.generate_commit_message", return_value=("feat: x", 1, 1, 1, 0)),
+        patch("gac.main.count_tokens", return_value=1),
+        patch("gac.main.record_tokens"),
+    ):
+        assert _execute_single_commit_workflow(ctx, {"warning_limit_tokens": 1000}) == 1
+
+    hooks.wait.assert_called_once()
+    executor.create_commit.assert_not_called()
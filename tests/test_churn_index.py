@@ -0,0 +1,145 @@
+"""Tests for the churn-weighted history index."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from gac import churn_index
+from gac.churn_index import INDEX_FILENAME, MAX_CHURN_BOOST, get_churn_index
+from gac.diff_sections import parse_diff
+from gac.preprocess import plan_diff_from_numstat, score_sections
+from gac.repo_snapshot import StagedEntry
+from tests.conftest import git
+
+DAY = 86400
+START = 1_700_000_000
+
+
+def _commit(repo, paths: list[str], day: int) -> None:
+    for path in paths:
+        file = repo / path
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(file.read_text() + "x\n" if file.exists() else "x\n")
+    git("add", ".")
+    date = f"@{START + day * DAY} +0000"
+    git("commit", "-m", f"day {day}", env={"GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date})
+
+
+@pytest.fixture()
+def repo(git_repo):
+    _commit(git_repo, ["src/core.py", "docs/old.md"], 0)
+    for day in range(1, 6):
+        _commit(git_repo, ["src/core.py"], day * 10)
+    _commit(git_repo, ["README.md", "my file.txt"], 60)
+    return git_repo
+
+
+class TestGetChurnIndex:
+    def test_counts_commits_and_last_change(self, repo):
+        index = get_churn_index()
+
+        assert index is not None
+        assert index.paths["src/core.py"] == (6, START + 50 * DAY)
+        assert index.paths["docs/old.md"] == (1, START)
+        assert index.paths["my file.txt"] == (1, START + 60 * DAY)
+        assert index.newest == START + 60 * DAY
+
+    def test_factor_prefers_frequent_recent_files(self, repo):
+        index = get_churn_index()
+
+        assert index.factor("unknown.py") == 1.0
+        assert 1.0 < index.factor("docs/old.md") < index.factor("README.md") < index.factor("src/core.py")
+        assert index.factor("src/core.py") <= 1.0 + MAX_CHURN_BOOST
+
+    def test_updates_incrementally_from_stored_index(self, repo, monkeypatch):
+        first = get_churn_index()
+        with open(os.path.join(".git", "gac", INDEX_FILENAME), encoding="utf-8") as f:
+            assert json.load(f)["head"] == first.head
+
+        _commit(repo, ["src/core.py"], 70)
+        monkeypatch.setattr(churn_index, "_memo", {})
+        revisions = []
+        read_log = churn_index._read_log
+        monkeypatch.setattr(churn_index, "_read_log", lambda rev, paths: revisions.append(rev) or read_log(rev, paths))
+
+        index = get_churn_index()
+
+        assert revisions == [[f"{first.head}..{index.head}"]]
+        assert index.paths["src/core.py"] == (7, START + 70 * DAY)
+        assert get_churn_index() is index
+
+    def test_checkout_round_trips_do_not_count_commits_twice(self, repo):
+        assert get_churn_index().paths["src/core.py"][0] == 6
+
+        for _ in range(2):
+            git("checkout", "-q", "HEAD~3")
+            assert get_churn_index().paths["src/core.py"] == (4, START + 30 * DAY)
+            git("checkout", "-q", "-")
+            assert get_churn_index().paths["src/core.py"] == (6, START + 50 * DAY)
+
+    def test_no_commits(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        git("init")
+
+        assert get_churn_index() is None
+
+
+def test_scoring_applies_churn_factor(repo):
+    index = get_churn_index()
+    diff = (
+        "diff --git a/src/core.py b/src/core.py\n--- a/src/core.py\n+++ b/src/core.py\n@@ -1 +1 @@\n-x\n+y\n"
+        "diff --git a/src/util.py b/src/util.py\n--- a/src/util.py\n+++ b/src/util.py\n@@ -1 +1 @@\n-x\n+y\n"
+    )
+    sections = parse_diff(diff)
+
+    plain = {section.path: score for section, score in score_sections(sections)}
+    weighted = {section.path: score for section, score in score_sections(sections, index)}
+
+    assert weighted["src/util.py"] == plain["src/util.py"]
+    assert weighted["src/core.py"] == pytest.approx(plain["src/core.py"] * index.factor("src/core.py"))
+
+    entries = [StagedEntry("M", "src/util.py", None, 5, 0), StagedEntry("M", "src/core.py", None, 5, 0)]
+    budget = max(1, round(entries[0].additions * 54 / 3.4) + 50)
+    plan = plan_diff_from_numstat(entries, token_limit=budget, churn=index)
+    assert [e.path for e in plan.included] == ["src/core.py"]
+
+
+@pytest.mark.parametrize("buffered_lines", [50000, 10], ids=["buffered", "streamed"])
+def test_git_state_keeps_the_file_with_more_churn(repo, monkeypatch, buffered_lines):
+    from gac.constants import Utility
+    from gac.git_state_validator import GitStateValidator
+
+    _commit(repo, ["src/util.py"], 61)
+    # About as long as the numstat planner assumes, so one file fits the budget whichever way it is read
+    for name in ("core", "util"):
+        body = "".join(f"{name}_{i:02} = 'a line of roughly the length the planner estimates'\n" for i in range(60))
+        (repo / "src" / f"{name}.py").write_text(body)
+    git("add", ".")
+    monkeypatch.setattr(Utility, "MAX_BUFFERED_DIFF_LINES", buffered_lines)
+    monkeypatch.setattr(Utility, "DEFAULT_DIFF_TOKEN_LIMIT", 1500)
+
+    git_state = GitStateValidator({}).get_git_state(model="openai:gpt-4o-mini", quiet=True)
+
+    assert git_state is not None
+    assert "+core_59 = " in git_state.processed_diff
+    assert "+util_59 = " not in git_state.processed_diff
+    assert os.path.exists(os.path.join(".git", "gac", INDEX_FILENAME))
+
+
+def test_git_state_skips_the_index_for_small_diffs(repo, monkeypatch):
+    from gac import git_state_validator
+    from gac.git_state_validator import GitStateValidator
+
+    (repo / "src" / "core.py").write_text("y\n")
+    git("add", ".")
+    calls = []
+    monkeypatch.setattr(git_state_validator, "get_churn_index", lambda: calls.append(1))
+
+    git_state = GitStateValidator({}).get_git_state(model="openai:gpt-4o-mini", quiet=True)
+
+    assert git_state is not None and "+y" in git_state.processed_diff
+    assert calls == []
+    assert not os.path.exists(os.path.join(".git", "gac", INDEX_FILENAME))
@@ -3,6 +3,7 @@ from unittest.mock import patch
 import pytest
 from click.testing import CliRunner
 
+from gac.constants import Utility
 from gac.diff_cli import _diff_implementation, diff
 from gac.errors import GitError
 
@@ -161,14 +162,14 @@ class TestDiffCLI:
             _diff_implementation(
                 filter=False,
                 truncate=True,
-                max_tokens=None,  # Should default to 1000
+                max_tokens=None,  # Should default to the diff token limit
                 staged=False,
                 color=False,
             )
 
         # Verify default max_tokens is used
         call_args = mock_truncate.call_args[0]
-        assert call_args[1] == 1000
+        assert call_args[1] == Utility.DEFAULT_DIFF_TOKEN_LIMIT
 
     @patch("gac.diff_cli.get_diff")
     def test_color_output_direct(self, mock_get_diff):
@@ -0,0 +1,126 @@
+"""Tests for choosing the diff context width per file."""
+
+from __future__ import annotations
+
+import pytest
+
+from gac.diff_context import (
+    FUNCTION_CONTEXT,
+    NO_CONTEXT,
+    apply_diff_contexts,
+    choose_diff_contexts,
+    describe_diff_contexts,
+)
+from gac.repo_snapshot import StagedEntry
+from tests.conftest import git
+
+
+class TestChooseDiffContexts:
+    def test_small_diff_gets_function_context(self):
+        entries = [
+            StagedEntry("M", "app.py", additions=2, deletions=1),
+            StagedEntry("M", "big.py", additions=300, deletions=0),
+            StagedEntry("D", "old.py", additions=0, deletions=5),
+            StagedEntry("M", "logo.png", additions=None, deletions=None),
+        ]
+
+        assert choose_diff_contexts(entries, 100_000) == {"app.py": FUNCTION_CONTEXT}
+
+    def test_large_diff_drops_context_of_files_above_their_share(self):
+        entries = [
+            StagedEntry("M", "app.py", additions=2, deletions=1),
+            StagedEntry("M", "big.py", additions=3000, deletions=2000),
+            StagedEntry("M", "yarn.lock", additions=9000, deletions=9000),
+        ]
+
+        assert choose_diff_contexts(entries, 10_000) == {"big.py": NO_CONTEXT}
+
+    def test_diff_near_budget_keeps_default(self):
+        entries = [StagedEntry("M", "app.py", additions=300, deletions=0)]
+
+        assert choose_diff_contexts(entries, 6_000) == {}
+
+    def test_describe(self):
+        contexts = {"a.py": NO_CONTEXT, "b.py": NO_CONTEXT}
+
+        assert describe_diff_contexts(contexts, 3) == "no context for 2 files, default context for 1 file"
+
+
+@pytest.fixture()
+def repo(git_repo):
+    body = "".join(f"    x{i} = {i}\n" for i in range(12))
+    (git_repo / "app.py").write_text(f"def run():\n{body}    return x0\n")
+    (git_repo / "notes.txt").write_text("".join(f"line {i}\n" for i in range(20)))
+    git("add", ".")
+    git("commit", "-m", "initial")
+    (git_repo / "app.py").write_text(f"def run():\n{body}    return x1\n")
+    (git_repo / "notes.txt").write_text("".join(f"line {i}\n" for i in range(20)).replace("line 10", "line ten"))
+    git("add", ".")
+    return git_repo
+
+
+class TestApplyDiffContexts:
+    def test_refetches_only_changed_files(self, repo):
+        diff = git("diff", "--cached")
+        entries = [
+            StagedEntry("M", "app.py", additions=1, deletions=1),
+            StagedEntry("M", "notes.txt", additions=1, deletions=1),
+        ]
+
+        adapted = apply_diff_contexts(diff, entries, {"app.py": FUNCTION_CONTEXT, "notes.txt": NO_CONTEXT})
+
+        app, notes = adapted.split("diff --git a/notes.txt")
+        assert " def run():\n" in app and "    x0 = 0\n" in app
+        assert "-line 10\n+line ten\n" in notes and "\n line 9\n" not in notes
+
+    def test_keeps_diff_without_contexts(self, repo):
+        diff = git("diff", "--cached")
+
+        assert apply_diff_contexts(diff, [], {}) is diff
+
+    def test_keeps_sections_that_cannot_be_refetched(self, repo, monkeypatch):
+        diff = git("diff", "--cached")
+        monkeypatch.chdir(repo.parent)
+
+        assert apply_diff_contexts(diff, [], {"app.py": NO_CONTEXT}) == diff
+
+    def test_refetched_sections_keep_the_size_limit(self, repo):
+        diff = git("diff", "--cached")
+        app = diff.split("diff --git a/notes.txt")[0]
+
+        adapted = apply_diff_contexts(diff, [], {"app.py": FUNCTION_CONTEXT}, max_section_chars=len(app))
+
+        assert adapted == diff
+
+    def test_small_change_in_huge_function_keeps_default_context(self, repo):
+        body = "".join(f"    y{i} = {i}\n" for i in range(1000))
+        (repo / "huge.py").write_text(f"def huge():\n{body}")
+        git("add", ".")
+        git("commit", "-m", "huge")
+        (repo / "huge.py").write_text(f"def huge():\n{body.replace('y500 = 500', 'y500 = -500')}")
+        git("add", ".")
+        diff = git("diff", "--cached")
+
+        adapted = apply_diff_contexts(diff, [], {"huge.py": FUNCTION_CONTEXT})
+
+        assert adapted == diff
+
+
+def test_git_state_keeps_a_small_change_to_a_huge_data_file(git_repo):
+    from gac.git_state_validator import GitStateValidator
+
+    # No line starts a "function" for git, so --function-context would return the whole file
+    size = 30000
+    rows = [f"{i},{i * 2}\n" for i in range(size)]
+    (git_repo / "data.csv").write_text("".join(rows))
+    git("add", ".")
+    git("commit", "-m", "initial")
+    rows[size // 2] = "changed,row\n"
+    (git_repo / "data.csv").write_text("".join(rows))
+    git("add", ".")
+
+    git_state = GitStateValidator({}).get_git_state(model="openai:gpt-4o-mini", quiet=True)
+
+    assert git_state is not None
+    assert "+changed,row" in git_state.processed_diff
+    assert len(git_state.processed_diff) < 5000
@@ -0,0 +1,98 @@
+"""Tests for gac.diff_sections."""
+
+from gac.diff_sections import DiffSection, as_diff_section, parse_diff, parse_diff_section, split_diff_header
+
+DIFF = (
+    "diff --git a/src/app.py b/src/app.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/src/app.py\n"
+    "+++ b/src/app.py\n"
+    "@@ -1,3 +1,4 @@\n"
+    " import os\n"
+    "-old = 1\n"
+    "+new = 1\n"
+    "+added = 2\n"
+    "@@ -10,2 +11,2 @@\n"
+    "---- a comment that starts with dashes\n"
+    "++++ a line that starts with pluses\n"
+    "diff --git a/new.py b/new.py\n"
+    "new file mode 100644\n"
+    "index 0000000..3333333\n"
+    "--- /dev/null\n"
+    "+++ b/new.py\n"
+    "@@ -0,0 +1 @@\n"
+    "+print('hi')\n"
+    "diff --git a/old name.py b/new name.py\n"
+    "similarity index 90%\n"
+    "rename from old name.py\n"
+    "rename to new name.py\n"
+    "diff --git a/logo.png b/logo.png\n"
+    "index 4444444..5555555 100644\n"
+    "Binary files a/logo.png and b/logo.png differ\n"
+    "diff --git a/gone.txt b/gone.txt\n"
+    "deleted file mode 100644\n"
+    "--- a/gone.txt\n"
+    "+++ /dev/null\n"
+    "@@ -1 +0,0 @@\n"
+    "-bye\n"
+)
+
+
+class TestParseDiff:
+    def test_sections_and_paths(self):
+        sections = parse_diff(DIFF)
+        assert [s.path for s in sections] == ["src/app.py", "new.py", "new name.py", "logo.png", "gone.txt"]
+        assert "".join(s.text for s in sections) == DIFF
+
+    def test_change_types(self):
+        sections = parse_diff(DIFF)
+        assert [s.change_type for s in sections] == ["modified", "added", "renamed", "modified", "deleted"]
+        assert sections[2].old_path == "old name.py"
+        assert sections[0].old_path is None
+
+    def test_counts_only_patch_lines(self):
+        modified = parse_diff(DIFF)[0]
+        assert (modified.additions, modified.deletions) == (3, 2)
+        assert modified.has_patch_headers
+
+    def test_hunk_offsets_point_at_hunk_headers(self):
+        modified = parse_diff(DIFF)[0]
+        assert len(modified.hunk_offsets) == 2
+        for offset in modified.hunk_offsets:
+            assert modified.text[offset:].startswith("@@ ")
+
+    def test_binary(self):
+        binary = parse_diff(DIFF)[3]
+        assert binary.is_binary
+        assert not binary.has_patch_headers
+        assert binary.additions == binary.deletions == 0
+
+    def test_only_splits_at_line_start(self):
+        diff = "diff --git a/a.md b/a.md\n@@ -1 +1 @@\n+see diff --git a/x b/x\n"
+        assert len(parse_diff(diff)) == 1
+
+    def test_text_before_first_header(self):
+        sections = parse_diff("preamble\ndiff --git a/a.py b/a.py\n+x\n")
+        assert [s.has_header for s in sections] == [False, True]
+        assert sections[0].path == ""
+        assert sections[1].additions == 1
+
+    def test_empty(self):
+        assert parse_diff("") == []
+
+
+class TestSplitDiffHeader:
+    def test_same_path_containing_separator(self):
+        assert split_diff_header("diff --git a/x b/y b/x b/y") == ("x b/y", "x b/y")
+
+    def test_different_paths(self):
+        assert split_diff_header("diff --git a/old.py b/new.py\n") == ("old.py", "new.py")
+
+    def test_unprefixed(self):
+        assert split_diff_header("diff --git foo bar") == ("foo bar", "foo bar")
+
+
+def test_as_diff_section_reuses_records():
+    section = parse_diff_section("diff --git a/a.py b/a.py\n")
+    assert as_diff_section(section) is section
+    assert isinstance(as_diff_section("diff --git a/a.py b/a.py\n"), DiffSection)
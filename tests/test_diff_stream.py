@@ -0,0 +1,236 @@
+"""Tests for the streaming staged-diff reader."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from gac.churn_index import MAX_CHURN_BOOST
+from gac.diff_stream import (
+    iter_diff_sections,
+    max_section_importance,
+    read_diff_within_budget,
+)
+from gac.errors import GitError
+from gac.preprocess import calculate_section_importance, plan_diff_from_numstat
+from gac.repo_snapshot import get_repo_snapshot
+from tests.conftest import git
+
+
+@pytest.fixture()
+def git_repo(git_repo):
+    (git_repo / "README.md").write_text("# Project\n")
+    git("add", ".")
+    git("commit", "-m", "initial")
+    return git_repo
+
+
+def _stage(repo, files: dict[str, str]) -> None:
+    for name, content in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    git("add", "-A")
+
+
+class TestIterDiffSections:
+    def test_matches_buffered_diff(self, git_repo):
+        _stage(git_repo, {"a.py": "def a():\n    return 1\n", "b.txt": "hello\n", "README.md": "# Changed\n"})
+        expected = subprocess.run(["git", "diff", "--cached"], capture_output=True, text=True, check=True).stdout
+
+        sections = list(iter_diff_sections())
+
+        assert [s.filename for s in sections] == ["README.md", "a.py", "b.txt"]
+        assert all(s.complete for s in sections)
+        assert "".join(s.text for s in sections) == expected
+        assert (sections[0].additions, sections[0].deletions) == (1, 1)
+
+    def test_body_dropped_but_every_line_observed(self, git_repo):
+        _stage(git_repo, {"big.txt": "".join(f"line {i}\n" for i in range(500)), "a.py": "x = 1\n"})
+        seen: list[str] = []
+
+        sections = list(iter_diff_sections(keep_body=lambda name: name != "big.txt", on_line=seen.append))
+
+        big = next(s for s in sections if s.filename == "big.txt")
+        assert not big.complete
+        assert big.additions == 500
+        assert "@@" not in big.text
+        assert big.text.startswith("diff --git a/big.txt b/big.txt")
+        assert "+line 499" in seen
+
+    def test_max_section_chars(self, git_repo):
+        _stage(git_repo, {"big.txt": "".join(f"line {i}\n" for i in range(500))})
+
+        (section,) = iter_diff_sections(max_section_chars=300)
+
+        assert not section.complete
+        assert len(section.text) <= 300
+        assert section.additions == 500
+
+    def test_git_failure_raises(self, tmp_path):
+        cwd = os.getcwd()
+        os.chdir(tmp_path)
+        try:
+            with pytest.raises(GitError, match="Failed to stream"):
+                list(iter_diff_sections(("diff", "--no-such-option")))
+        finally:
+            os.chdir(cwd)
+
+
+class TestReadDiffWithinBudget:
+    def test_small_diff_kept_in_full(self, git_repo):
+        _stage(git_repo, {"a.py": "def a():\n    return 1\n"})
+        expected = subprocess.run(["git", "diff", "--cached"], capture_output=True, text=True, check=True).stdout
+
+        result = read_diff_within_budget(token_limit=1000)
+
+        assert result.diff == expected.strip()
+        assert result.total_files == 1
+        assert result.omitted_files == []
+
+    def test_lower_priority_files_are_omitted(self, git_repo):
+        code = "".join(f"def func_{i}():\n    return {i}\n" for i in range(12))
+        notes = "".join(f"note {i}\n" for i in range(30))
+        _stage(git_repo, {"a_core.py": code, "b_core.py": code, "z_notes.txt": notes})
+
+        result = read_diff_within_budget(token_limit=150)
+
+        assert result.total_files == 3
+        assert result.omitted_files == ["z_notes.txt"]
+        assert "def func_11" in result.diff
+        assert "diff --git a/z_notes.txt b/z_notes.txt" in result.diff
+        assert "note 29" not in result.diff
+        assert "+30/-0 lines]" in result.diff
+
+    def test_outranked_file_is_never_buffered(self, git_repo, monkeypatch):
+        code = "".join(f"class Model{i}:\n    def run(self):\n        return {i}\n" for i in range(6))
+        notes = "".join(f"note {i}\n" for i in range(30))
+        _stage(git_repo, {"a_core.py": code, "b_core.py": code, "z_notes.txt": notes})
+        streamed = []
+
+        def recording(*args, **kwargs):
+            for section in iter_diff_sections(*args, **kwargs):
+                streamed.append(section)
+                yield section
+
+        monkeypatch.setattr("gac.diff_stream.iter_diff_sections", recording)
+        result = read_diff_within_budget(token_limit=150)
+
+        notes_section = streamed[-1]
+        assert notes_section.filename == "z_notes.txt"
+        assert notes_section.complete is False
+        assert "note 0" not in notes_section.text
+        assert "[Omitted: lower priority than changes that already fill the token budget, +30/-0 lines]" in result.diff
+
+    def test_oversized_section_is_summarized(self, git_repo):
+        _stage(git_repo, {"fixture.py": "".join(f"VALUE_{i} = {i}\n" for i in range(2000))})
+
+        result = read_diff_within_budget(token_limit=200)
+
+        assert result.omitted_files == ["fixture.py"]
+        assert "[Omitted: larger than the whole token budget, +2000/-0 lines]" in result.diff
+        assert "VALUE_1999" not in result.diff
+
+    def test_filtered_files_keep_only_summary(self, git_repo):
+        _stage(git_repo, {"package-lock.json": '{\n  "lockfileVersion": 3\n}\n'})
+
+        result = read_diff_within_budget(token_limit=1000)
+
+        assert "[Lockfile changed without package version changes]" in result.diff
+        assert "lockfileVersion" not in result.diff
+
+    def test_lockfiles_summarized_from_version_lines(self, git_repo):
+        packages = "".join(
+            f'[[package]]\nname = "pkg{i}"\nversion = "1.0.{i}"\nsdist = {{ hash = "sha256:{i:064x}" }}\n\n'
+            for i in range(500)
+        )
+        _stage(git_repo, {"uv.lock": packages})
+
+        result = read_diff_within_budget(token_limit=1000)
+
+        assert "+ pkg0 1.0.0" in result.diff
+        assert "... and 460 more packages" in result.diff
+        assert "sha256" not in result.diff
+
+    def test_secrets_found_in_omitted_bodies(self, git_repo):
+        secret = 'AWS_ACCESS_KEY_ID = "AKIAZ7Q4MXR2KJ8PLW3N"\n'
+        _stage(git_repo, {"config.py": "".join(f"SETTING_{i} = {i}\n" for i in range(2000)) + secret})
+
+        result = read_diff_within_budget(token_limit=200)
+
+        assert result.omitted_files == ["config.py"]
+        assert any(s.file_path == "config.py" and s.line_number == 2001 for s in result.secrets)
+
+    def test_scan_secrets_disabled(self, git_repo):
+        _stage(git_repo, {"config.py": 'AWS_ACCESS_KEY_ID = "AKIAZ7Q4MXR2KJ8PLW3N"\n'})
+
+        assert read_diff_within_budget(scan_secrets=False).secrets == []
+
+
+class TestReadPlannedDiff:
+    @pytest.fixture()
+    def staged(self, git_repo):
+        _stage(
+            git_repo,
+            {
+                "app.py": "def main():\n    return 0\n",
+                "notes.txt": "".join(f"note {i}\n" for i in range(400)),
+                "yarn.lock": "lock\n",
+            },
+        )
+        entries = get_repo_snapshot().entries
+        return plan_diff_from_numstat(entries, token_limit=300)
+
+    def test_plan_selects_files(self, staged):
+        assert [e.path for e in staged.included] == ["app.py"]
+        assert [e.path for e in staged.omitted] == ["notes.txt", "yarn.lock"]
+
+    def test_pathspec_limited_without_secret_scan(self, staged):
+        with patch("gac.diff_stream.subprocess.Popen", wraps=subprocess.Popen) as popen:
+            result = read_diff_within_budget(token_limit=300, scan_secrets=False, plan=staged)
+
+        command = popen.call_args.args[0]
+        assert command[:2] == ["git", "--literal-pathspecs"]
+        assert command[-2:] == ["--", "app.py"]
+        assert "def main" in result.diff
+        assert "note 1" not in result.diff
+        assert "[Omitted: not selected for the token budget from numstat estimates, +400/-0 lines]" in result.diff
+        assert "[Lockfile/generated file change]" in result.diff
+        assert result.total_files == 3
+        assert result.omitted_files == ["notes.txt"]
+
+    def test_secret_scan_still_reads_unplanned_files(self, git_repo, staged):
+        (git_repo / "notes.txt").write_text('AWS_ACCESS_KEY_ID = "AKIAZ7Q4MXR2KJ8PLW3N"\n')
+        git("add", "notes.txt")
+
+        result = read_diff_within_budget(token_limit=300, plan=staged)
+
+        assert [s.file_path for s in result.secrets] == ["notes.txt"]
+        assert "AKIAZ7Q4MXR2KJ8PLW3N" not in result.diff
+        assert result.omitted_files == ["notes.txt"]
+
+    def test_empty_plan_does_not_run_git(self, git_repo):
+        _stage(git_repo, {"yarn.lock": "lock\n"})
+        plan = plan_diff_from_numstat(get_repo_snapshot().entries, token_limit=300)
+
+        with patch("gac.diff_stream.subprocess.Popen") as popen:
+            result = read_diff_within_budget(scan_secrets=False, plan=plan)
+
+        popen.assert_not_called()
+        assert "[Lockfile/generated file change]" in result.diff
+
+
+def test_max_section_importance_is_an_upper_bound():
+    section = (
+        "diff --git a/m.py b/m.py\nnew file mode 100644\n@@ -0,0 +1,52 @@\n"
+        "+import os\n+class A:\n+    def f(self):\n+        if x:\n+            return await y\n"
+        "+    # TODO\n+    # FIX\n+    try:\n+        pass\n+    except:\n+        pass\n+'''doc'''\n"
+        # Enough changed lines for the largest change factor
+        + "+        pass\n"
+        * 40
+    )
+    # The bound holds after the final ranking multiplies in the churn factor
+    assert calculate_section_importance(section) * (1 + MAX_CHURN_BOOST) <= max_section_importance("m.py")
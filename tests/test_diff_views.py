@@ -0,0 +1,138 @@
+"""Tests for the tiered views of a processed diff."""
+
+from unittest.mock import patch
+
+from gac.config import GACConfig
+from gac.diff_views import build_diff_views
+from gac.git_state_validator import GitState
+from gac.interactive_mode import InteractiveMode
+
+MODEL = "anthropic:claude-3-haiku"
+
+DIFF = """diff --git a/src/app.py b/src/app.py
+index 1111111..2222222 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -1,6 +1,9 @@ import os
+ import os
++
++def load_settings(path):
++    return read(path)
+
+ class App:
+-    def run(self):
++    async def run(self, settings):
+         value = 1
+-        return value
++        return value + 1
+diff --git a/old.txt b/new.txt
+similarity index 100%
+rename from old.txt
+rename to new.txt
+diff --git a/logo.png b/logo.png
+new file mode 100644
+index 0000000..3333333
+Binary files /dev/null and b/logo.png differ
+"""
+
+
+class TestBuildDiffViews:
+    def test_condensed_keeps_headers_hunk_headers_and_signatures(self):
+        views = build_diff_views(DIFF, MODEL)
+
+        assert views.full == DIFF
+        assert views.condensed.splitlines() == [
+            "diff --git a/src/app.py b/src/app.py",
+            "--- a/src/app.py",
+            "+++ b/src/app.py",
+            "@@ -1,6 +1,9 @@ import os",
+            "+def load_settings(path):",
+            "-    def run(self):",
+            "+    async def run(self, settings):",
+            "diff --git a/old.txt b/new.txt",
+            "similarity index 100%",
+            "rename from old.txt",
+            "rename to new.txt",
+            "diff --git a/logo.png b/logo.png",
+            "new file mode 100644",
+            "Binary files /dev/null and b/logo.png differ",
+        ]
+
+    def test_file_list(self):
+        views = build_diff_views(DIFF, MODEL)
+
+        assert views.file_list.splitlines() == [
+            "src/app.py (modified, +5/-2)",
+            "old.txt -> new.txt (renamed, +0/-0)",
+            "logo.png (added, binary)",
+        ]
+
+    def test_token_counts_decrease_with_resolution(self):
+        views = build_diff_views(DIFF, MODEL)
+
+        assert views.full_tokens > views.condensed_tokens > views.file_list_tokens > 0
+
+    def test_fitting_picks_most_detailed_view_within_limit(self):
+        views = build_diff_views(DIFF, MODEL)
+
+        assert views.fitting(views.full_tokens) == views.full
+        assert views.fitting(views.full_tokens - 1) == views.condensed
+        assert views.fitting(views.condensed_tokens - 1) == views.file_list
+        assert views.fitting(0) == views.file_list
+
+    def test_summaries_added_by_preprocessing_are_kept(self):
+        diff = DIFF.replace("         value = 1\n", "         value = 1\n[3 more hunks omitted]\n")
+
+        assert "[3 more hunks omitted]" in build_diff_views(diff, MODEL).condensed
+
+    def test_empty_diff(self):
+        views = build_diff_views("", MODEL)
+
+        assert (views.condensed, views.file_list, views.full_tokens) == ("", "", 0)
+
+
+def _git_state(processed_diff: str) -> GitState:
+    return GitState(
+        repo_root="/repo",
+        staged_files=["src/app.py"],
+        status="M src/app.py",
+        diff=processed_diff,
+        diff_stat=" src/app.py | 7 +++++--",
+        processed_diff=processed_diff,
+        has_secrets=False,
+        secrets=[],
+        diff_views=build_diff_views(processed_diff, MODEL),
+    )
+
+
+class TestQuestionGenerationView:
+    def _questions_diff(self, git_state: GitState) -> str:
+        with (
+            patch("gac.prompt.build_question_generation_prompt", return_value=("system", "user")) as build,
+            patch("gac.interactive_mode.generate_commit_message", return_value=("1. Why?", 1, 1, 1, 0)),
+        ):
+            InteractiveMode(GACConfig()).generate_contextual_questions(
+                model=MODEL, git_state=git_state, hint="", temperature=0.7, max_tokens=100, max_retries=1
+            )
+        return str(build.call_args.kwargs["processed_diff"])
+
+    def test_small_diff_is_sent_in_full(self):
+        git_state = _git_state(DIFF)
+
+        assert self._questions_diff(git_state) == DIFF
+
+    def test_large_diff_is_condensed(self):
+        body = "".join(f"+    total += {i}\n" for i in range(2000))
+        diff = DIFF.replace("+    return read(path)\n", f"+    return read(path)\n{body}")
+        git_state = _git_state(diff)
+
+        sent = self._questions_diff(git_state)
+
+        assert sent == git_state.views.condensed
+        assert "total +=" not in sent
+        assert "+def load_settings(path):" in sent
+
+    def test_state_without_views_builds_them_from_processed_diff(self):
+        git_state = _git_state(DIFF)._replace(diff_views=None)
+
+        assert git_state.views.condensed == build_diff_views(DIFF, MODEL).condensed
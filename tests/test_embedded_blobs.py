@@ -0,0 +1,64 @@
+"""Tests for collapsing embedded data blobs in diffs."""
+
+import base64
+import random
+
+from gac.diff_sections import parse_diff_section
+from gac.embedded_blobs import collapse_embedded_blobs, format_size
+from gac.preprocess import process_section, smart_truncate_diff
+
+_random = random.Random(0)
+BLOB = base64.b64encode(bytes(_random.randrange(256) for _ in range(3000))).decode()
+HEX = bytes(_random.randrange(256) for _ in range(80)).hex()
+
+
+def _section(*lines: str) -> str:
+    body = "".join(f"{line}\n" for line in lines)
+    return f"diff --git a/f.css b/f.css\n--- a/f.css\n+++ b/f.css\n@@ -1,2 +1,{len(lines)} @@\n{body}"
+
+
+class TestCollapseEmbeddedBlobs:
+    def test_data_uri(self):
+        section = collapse_embedded_blobs(_section(f'+.logo {{ background: url("data:image/png;base64,{BLOB}"); }}'))
+        assert '+.logo { background: url("data:image/png;base64,<base64 3.9KB>"); }\n' in section.text
+        assert section.elided_bytes == len(BLOB)
+
+    def test_hex_run_and_byte_list(self):
+        byte_list = ", ".join(f"0x{HEX[i : i + 2]}" for i in range(0, len(HEX), 2))
+        section = collapse_embedded_blobs(_section(f'-digest = "{HEX}"', f"+data = [{byte_list}]"))
+        assert '-digest = "<hex 160B>"\n' in section.text
+        assert f"+data = [<hex {format_size(len(byte_list))}>]\n" in section.text
+
+    def test_multi_line_base64_block(self):
+        pem = [f"+{BLOB[i : i + 64]}" for i in range(0, 640, 64)]
+        section = collapse_embedded_blobs(_section("+-----BEGIN CERTIFICATE-----", *pem, "+-----END CERTIFICATE-----"))
+        assert "+<base64 640B> (10 lines)\n" in section.text
+        assert section.additions == 3
+        assert section.elided_bytes == 640
+
+    def test_context_lines_and_ordinary_text_untouched(self):
+        identifier = "a_very_long_identifier_name_" * 5
+        text = _section(f" context {BLOB[:200]}", f"+{identifier} = 1", "+" + "=" * 120)
+        section = collapse_embedded_blobs(text)
+        assert section.text == text
+        assert section.elided_bytes == 0
+
+
+def test_format_size():
+    assert [format_size(n) for n in (850, 12_700, 3_250_000)] == ["850B", "12.4KB", "3.1MB"]
+
+
+def test_process_section_keeps_file_with_inline_blob():
+    # One long data URI line used to make the whole file look minified
+    processed = process_section(
+        parse_diff_section(_section(f'+<img src="data:image/png;base64,{BLOB}">', "+<p>hi</p>"))
+    )
+    assert processed is not None
+    assert processed.text.endswith('+<img src="data:image/png;base64,<base64 3.9KB>">\n+<p>hi</p>\n')
+    assert processed.elided_bytes == len(BLOB)
+
+
+def test_truncation_summary_reports_elided_bytes():
+    processed = process_section(parse_diff_section(_section(f'+url("data:image/png;base64,{BLOB}")')))
+    result = smart_truncate_diff([(processed, 1.0)], 1000, "test:model")
+    assert result.endswith("[Summary: 3.9KB of embedded data collapsed.]")
@@ -0,0 +1,83 @@
+"""Tests for .gacignore pathspec exclusion."""
+
+from __future__ import annotations
+
+import pytest
+
+from gac.diff_stream import read_diff_within_budget
+from gac.gacignore import exclude_pathspecs, load_gacignore, parse_gacignore
+from gac.repo_snapshot import get_repo_snapshot, peek_repo_snapshot
+from tests.conftest import git
+
+
+class TestParseGacignore:
+    def test_converts_gitignore_patterns(self):
+        text = "# fixtures\n\nfixtures/**\n*.snap\nbuild/\n/docs/api\n\\#notes\n"
+
+        assert parse_gacignore(text) == [
+            "fixtures/**",
+            "**/*.snap",
+            "**/*.snap/**",
+            "**/build/**",
+            "docs/api",
+            "docs/api/**",
+            "**/#notes",
+            "**/#notes/**",
+        ]
+
+    def test_negated_patterns_are_skipped(self, caplog):
+        assert parse_gacignore("*.snap\n!keep.snap\n") == ["**/*.snap", "**/*.snap/**"]
+        assert "!keep.snap" in caplog.text
+
+    def test_pathspecs(self):
+        assert exclude_pathspecs(["**/*.snap"]) == [":(top,exclude,glob)**/*.snap"]
+
+    def test_missing_file(self, tmp_path):
+        assert load_gacignore(str(tmp_path)) == []
+
+
+@pytest.fixture()
+def repo(git_repo):
+    (git_repo / "app.py").write_text("x = 1\n")
+    git("add", ".")
+    git("commit", "-m", "initial")
+    return git_repo
+
+
+def test_snapshot_lists_ignored_files_without_their_patches(repo):
+    (repo / ".gacignore").write_text("fixtures/**\n*.snap\n")
+    (repo / "fixtures").mkdir()
+    (repo / "fixtures" / "data.json").write_text('{"fixture": true}\n')
+    (repo / "src").mkdir()
+    (repo / "src" / "view.snap").write_text("snapshot body\n")
+    (repo / "app.py").write_text("x = 2\n")
+    git("add", ".")
+
+    snapshot = get_repo_snapshot()
+
+    assert snapshot.files == [".gacignore", "app.py", "fixtures/data.json", "src/view.snap"]
+    assert snapshot.flagged == {"fixtures/data.json": ".gacignore", "src/view.snap": ".gacignore"}
+    assert "+x = 2" in snapshot.patch
+    assert '"fixture": true' not in snapshot.patch
+    assert "snapshot body" not in snapshot.patch
+    assert "[File change excluded by .gacignore (.gacignore, new file)]" in snapshot.patch
+    assert snapshot.exclude_pathspecs == tuple(exclude_pathspecs(["fixtures/**", "**/*.snap", "**/*.snap/**"]))
+
+    streamed = read_diff_within_budget(token_limit=1000, exclude=snapshot.exclude_pathspecs)
+    assert "+x = 2" in streamed.diff
+    assert "fixtures/data.json" not in streamed.diff
+    assert "snapshot body" not in streamed.diff
+
+
+def test_editing_gacignore_invalidates_the_memoized_snapshot(repo):
+    (repo / "app.py").write_text("x = 2\n")
+    (repo / "notes.snap").write_text("snapshot body\n")
+    git("add", ".")
+    assert "snapshot body" in get_repo_snapshot().patch
+
+    (repo / ".gacignore").write_text("*.snap\n")
+
+    assert peek_repo_snapshot() is None
+    snapshot = get_repo_snapshot()
+    assert "snapshot body" not in snapshot.patch
+    assert snapshot.flagged == {"notes.snap": ".gacignore"}
@@ -267,9 +267,9 @@ def test_run_pre_commit_hooks_no_config():
 
 def test_run_pre_commit_hooks_pre_commit_not_installed():
     """Test when pre-commit is not installed."""
-    with patch("os.path.exists") as mock_exists, patch("gac.git.run_subprocess") as mock_run:
+    with patch("os.path.exists") as mock_exists, patch("gac.git._find_hook_tool") as mock_run:
         mock_exists.return_value = True
-        mock_run.return_value = ""  # Empty result indicates pre-commit not available
+        mock_run.return_value = None  # pre-commit is not on PATH
         result = run_pre_commit_hooks()
         assert result is True
 
@@ -278,11 +278,12 @@ def test_run_pre_commit_hooks_success():
     """Test when pre-commit hooks pass successfully."""
     with (
         patch("os.path.exists") as mock_exists,
-        patch("gac.git.run_subprocess") as mock_run,
+        patch("gac.git._find_hook_tool") as mock_run,
+        patch("gac.git.hook_cache_key", return_value=None),
         patch("subprocess.run") as mock_subprocess_run,
     ):
         mock_exists.return_value = True
-        mock_run.return_value = "pre-commit 3.0.0"  # pre-commit is available
+        mock_run.return_value = "/usr/bin/pre-commit"  # pre-commit is on PATH
 
         # Mock successful pre-commit run
         mock_result = MagicMock()
@@ -297,11 +298,12 @@ def test_run_pre_commit_hooks_respects_custom_timeout():
     """Custom hook timeout is passed through to subprocess execution."""
     with (
         patch("os.path.exists") as mock_exists,
-        patch("gac.git.run_subprocess") as mock_run,
+        patch("gac.git._find_hook_tool") as mock_run,
+        patch("gac.git.hook_cache_key", return_value=None),
         patch("subprocess.run") as mock_subprocess_run,
     ):
         mock_exists.return_value = True
-        mock_run.return_value = "pre-commit 3.0.0"
+        mock_run.return_value = "/usr/bin/pre-commit"
 
         mock_result = MagicMock()
         mock_result.returncode = 0
@@ -317,12 +319,13 @@ def test_run_pre_commit_hooks_failure_with_output():
     """Test when pre-commit hooks fail with detailed output."""
     with (
         patch("os.path.exists") as mock_exists,
-        patch("gac.git.run_subprocess") as mock_run,
+        patch("gac.git._find_hook_tool") as mock_run,
+        patch("gac.git.hook_cache_key", return_value=None),
         patch("subprocess.run") as mock_subprocess_run,
         patch("gac.git.logger") as mock_logger,
     ):
         mock_exists.return_value = True
-        mock_run.return_value = "pre-commit 3.0.0"  # pre-commit is available
+        mock_run.return_value = "/usr/bin/pre-commit"  # pre-commit is on PATH
 
         # Mock failed pre-commit run with output
         mock_result = MagicMock()
@@ -342,12 +345,13 @@ def test_run_pre_commit_hooks_failure_no_output():
     """Test when pre-commit hooks fail without detailed output."""
     with (
         patch("os.path.exists") as mock_exists,
-        patch("gac.git.run_subprocess") as mock_run,
+        patch("gac.git._find_hook_tool") as mock_run,
+        patch("gac.git.hook_cache_key", return_value=None),
         patch("subprocess.run") as mock_subprocess_run,
         patch("gac.git.logger") as mock_logger,
     ):
         mock_exists.return_value = True
-        mock_run.return_value = "pre-commit 3.0.0"  # pre-commit is available
+        mock_run.return_value = "/usr/bin/pre-commit"  # pre-commit is on PATH
 
         # Mock failed pre-commit run without output
         mock_result = MagicMock()
@@ -366,12 +370,13 @@ def test_run_pre_commit_hooks_exception_handling():
     """Test exception handling in run_pre_commit_hooks."""
     with (
         patch("os.path.exists") as mock_exists,
-        patch("gac.git.run_subprocess") as mock_run,
+        patch("gac.git._find_hook_tool") as mock_run,
+        patch("gac.git.hook_cache_key", return_value=None),
         patch("subprocess.run") as mock_subprocess_run,
         patch("gac.git.logger") as mock_logger,
     ):
         mock_exists.return_value = True
-        mock_run.return_value = "pre-commit 3.0.0"  # pre-commit is available
+        mock_run.return_value = "/usr/bin/pre-commit"  # pre-commit is on PATH
         mock_subprocess_run.side_effect = FileNotFoundError("subprocess error")
 
         result = run_pre_commit_hooks()
@@ -390,10 +395,10 @@ def test_run_lefthook_hooks_no_config():
 
 def test_run_lefthook_hooks_lefthook_not_installed():
     """Test when lefthook is not installed."""
-    with patch("os.path.exists") as mock_exists, patch("gac.git.run_subprocess") as mock_run:
+    with patch("os.path.exists") as mock_exists, patch("gac.git._find_hook_tool") as mock_run:
         # Mock that .lefthook.yml exists
         mock_exists.return_value = True
-        mock_run.return_value = ""  # Empty result indicates lefthook not available
+        mock_run.return_value = None  # lefthook is not on PATH
         result = run_lefthook_hooks()
         assert result is True
 
@@ -402,12 +407,13 @@ def test_run_lefthook_hooks_success():
     """Test when lefthook hooks pass successfully."""
     with (
         patch("os.path.exists") as mock_exists,
-        patch("gac.git.run_subprocess") as mock_run,
+        patch("gac.git._find_hook_tool") as mock_run,
+        patch("gac.git.hook_cache_key", return_value=None),
         patch("subprocess.run") as mock_subprocess_run,
     ):
         # Mock that .lefthook.yml exists
         mock_exists.return_value = True
-        mock_run.return_value = "lefthook 1.0.0"  # lefthook is available
+        mock_run.return_value = "/usr/bin/lefthook"  # lefthook is on PATH
 
         # Mock successful lefthook run
         mock_result = MagicMock()
@@ -422,13 +428,14 @@ def test_run_lefthook_hooks_failure_with_output():
     """Test when lefthook hooks fail with detailed output."""
     with (
         patch("os.path.exists") as mock_exists,
-        patch("gac.git.run_subprocess") as mock_run,
+        patch("gac.git._find_hook_tool") as mock_run,
+        patch("gac.git.hook_cache_key", return_value=None),
         patch("subprocess.run") as mock_subprocess_run,
         patch("gac.git.logger") as mock_logger,
     ):
         # Mock that .lefthook.yml exists
         mock_exists.return_value = True
-        mock_run.return_value = "lefthook 1.0.0"  # lefthook is available
+        mock_run.return_value = "/usr/bin/lefthook"  # lefthook is on PATH
 
         # Mock failed lefthook run with output
         mock_result = MagicMock()
@@ -448,13 +455,14 @@ def test_run_lefthook_hooks_failure_no_output():
     """Test when lefthook hooks fail without detailed output."""
     with (
         patch("os.path.exists") as mock_exists,
-        patch("gac.git.run_subprocess") as mock_run,
+        patch("gac.git._find_hook_tool") as mock_run,
+        patch("gac.git.hook_cache_key", return_value=None),
         patch("subprocess.run") as mock_subprocess_run,
         patch("gac.git.logger") as mock_logger,
     ):
         # Mock that .lefthook.yml exists
         mock_exists.return_value = True
-        mock_run.return_value = "lefthook 1.0.0"  # lefthook is available
+        mock_run.return_value = "/usr/bin/lefthook"  # lefthook is on PATH
 
         # Mock failed lefthook run without output
         mock_result = MagicMock()
@@ -473,13 +481,14 @@ def test_run_lefthook_hooks_exception_handling():
     """Test exception handling in run_lefthook_hooks."""
     with (
         patch("os.path.exists") as mock_exists,
-        patch("gac.git.run_subprocess") as mock_run,
+        patch("gac.git._find_hook_tool") as mock_run,
+        patch("gac.git.hook_cache_key", return_value=None),
         patch("subprocess.run") as mock_subprocess_run,
         patch("gac.git.logger") as mock_logger,
     ):
         # Mock that .lefthook.yml exists
         mock_exists.return_value = True
-        mock_run.return_value = "lefthook 1.0.0"  # lefthook is available
+        mock_run.return_value = "/usr/bin/lefthook"  # lefthook is on PATH
         mock_subprocess_run.side_effect = FileNotFoundError("subprocess error")
 
         result = run_lefthook_hooks()
@@ -492,7 +501,8 @@ def test_run_lefthook_hooks_multiple_config_files():
     """Test when multiple Lefthook configuration files exist."""
     with (
         patch("os.path.exists") as mock_exists,
-        patch("gac.git.run_subprocess") as mock_run,
+        patch("gac.git._find_hook_tool") as mock_run,
+        patch("gac.git.hook_cache_key", return_value=None),
         patch("subprocess.run") as mock_subprocess_run,
     ):
         # Mock that both .lefthook.yml and lefthook.yml exist
@@ -500,7 +510,7 @@ def test_run_lefthook_hooks_multiple_config_files():
             return path in [".lefthook.yml", "lefthook.yml"]
 
         mock_exists.side_effect = exists_side_effect
-        mock_run.return_value = "lefthook 1.0.0"  # lefthook is available
+        mock_run.return_value = "/usr/bin/lefthook"  # lefthook is on PATH
 
         # Mock successful lefthook run
         mock_result = MagicMock()
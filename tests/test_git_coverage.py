@@ -1,7 +1,7 @@
 """Tests to close coverage gaps in git.py.
 
 Targeting uncovered lines:
-- Lines 40-71: run_subprocess_with_encoding_fallback (encoding errors, subprocess errors, all-failed)
+- run_subprocess_with_encoding_fallback (bytes decoding, subprocess errors)
 - Line 139: get_staged_status with malformed line (< 2 tab-separated parts)
 - Lines 172->176: get_diff exception path (SubprocessError etc.)
 - Lines 346-370, 363-364: detect_rename_mappings edge cases
@@ -21,37 +21,33 @@ from gac.git import (
     run_subprocess_with_encoding_fallback,
 )
 
-# ── Lines 40-71: run_subprocess_with_encoding_fallback ──────────────
+# ── run_subprocess_with_encoding_fallback ───────────────────────────
 
 
 class TestRunSubprocessWithEncodingFallback:
     """Test encoding fallback paths in run_subprocess_with_encoding_fallback."""
 
-    def test_unicode_error_tries_next_encoding(self):
-        """UnicodeError should cause fallback to next encoding."""
-        with patch("gac.utils.get_safe_encodings", return_value=["bad-enc", "utf-8"]):
+    def test_non_utf8_output_decoded_without_rerun(self):
+        """Output that is not UTF-8 is decoded with a fallback encoding from the same run."""
+        with patch("gac.utils.get_safe_encodings", return_value=["utf-8", "latin-1"]):
             with patch("subprocess.run") as mock_run:
-                # First call raises UnicodeError, second succeeds
-                mock_run.side_effect = [
-                    UnicodeError("bad encoding"),
-                    subprocess.CompletedProcess(args=["test"], returncode=0, stdout="ok", stderr=""),
-                ]
+                mock_run.return_value = subprocess.CompletedProcess(
+                    args=["test"], returncode=1, stdout=b"caf\xe9\n", stderr=b"\xe9chec"
+                )
                 result = run_subprocess_with_encoding_fallback(["echo", "test"], silent=True)
-                assert result.returncode == 0
-                assert mock_run.call_count == 2
-
-    def test_subprocess_error_tries_next_encoding(self):
-        """SubprocessError should cause fallback to next encoding."""
-        with patch("gac.utils.get_safe_encodings", return_value=["utf-8", "utf-8"]):
-            with patch("subprocess.run") as mock_run:
-                # First call raises OSError, second succeeds
-                mock_run.side_effect = [
-                    OSError("command not found"),
-                    subprocess.CompletedProcess(args=["test"], returncode=0, stdout="ok", stderr=""),
-                ]
-                result = run_subprocess_with_encoding_fallback(["echo", "test"], silent=True)
-                assert result.returncode == 0
-                assert mock_run.call_count == 2
+                assert result.returncode == 1
+                assert result.stdout == "café\n"
+                assert result.stderr == "échec"
+                assert mock_run.call_count == 1
+
+    def test_os_error_raises_without_retry(self):
+        """OSError is reported as CalledProcessError without running the command again."""
+        with patch("subprocess.run") as mock_run:
+            mock_run.side_effect = OSError("command not found")
+            with pytest.raises(subprocess.CalledProcessError) as exc_info:
+                run_subprocess_with_encoding_fallback(["echo", "test"], silent=True)
+            assert "command not found" in exc_info.value.stderr
+            assert mock_run.call_count == 1
 
     def test_timeout_expired_is_reraised(self):
         """TimeoutExpired should NOT be caught — it should propagate."""
@@ -61,22 +57,15 @@ class TestRunSubprocessWithEncodingFallback:
                 with pytest.raises(subprocess.TimeoutExpired):
                     run_subprocess_with_encoding_fallback(["echo", "test"])
 
-    def test_all_encodings_failed_raises(self):
-        """When all encodings fail, should raise CalledProcessError."""
-        with patch("gac.utils.get_safe_encodings", return_value=["enc1", "enc2"]):
+    def test_undecodable_bytes_are_replaced(self):
+        """Bytes that no encoding accepts are replaced rather than raising."""
+        with patch("gac.utils.get_safe_encodings", return_value=["utf-8"]):
             with patch("subprocess.run") as mock_run:
-                mock_run.side_effect = UnicodeError("bad")
-                with pytest.raises(subprocess.CalledProcessError) as exc_info:
-                    run_subprocess_with_encoding_fallback(["echo", "test"], silent=True)
-                assert "Encoding error" in exc_info.value.stderr
-
-    def test_all_encodings_failed_no_exception(self):
-        """When all encodings fail with no last_exception, should still raise CalledProcessError."""
-        # This is a contrived case but covers the else branch
-        with patch("gac.utils.get_safe_encodings", return_value=[]):
-            with pytest.raises(subprocess.CalledProcessError) as exc_info:
-                run_subprocess_with_encoding_fallback(["echo", "test"], silent=True)
-            assert "All encoding attempts failed" in exc_info.value.stderr
+                mock_run.return_value = subprocess.CompletedProcess(
+                    args=["test"], returncode=0, stdout=b"ok\xff", stderr=b""
+                )
+                result = run_subprocess_with_encoding_fallback(["echo", "test"], silent=True)
+                assert result.stdout == "ok\ufffd"
 
     def test_silent_mode_no_logging(self):
         """Silent mode should suppress debug logging."""
@@ -98,33 +87,15 @@ class TestRunSubprocessWithEncodingFallback:
                     assert result.returncode == 0
                     mock_logger.debug.assert_called()
 
-    def test_unicode_error_non_silent_logs(self):
-        """UnicodeError in non-silent mode should log the error."""
-        with patch("gac.utils.get_safe_encodings", return_value=["bad-enc", "utf-8"]):
-            with patch("subprocess.run") as mock_run:
-                mock_run.side_effect = [
-                    UnicodeError("bad encoding"),
-                    subprocess.CompletedProcess(args=["test"], returncode=0, stdout="ok", stderr=""),
-                ]
-                with patch("gac.git.logger") as mock_logger:
-                    result = run_subprocess_with_encoding_fallback(["echo", "test"], silent=False)
-                    assert result.returncode == 0
-                    # Should have logged about the failed encoding
-                    assert mock_logger.debug.call_count >= 2
-
-    def test_subprocess_error_non_silent_logs(self):
-        """SubprocessError in non-silent mode should log the error."""
-        with patch("gac.utils.get_safe_encodings", return_value=["utf-8", "utf-8"]):
-            with patch("subprocess.run") as mock_run:
-                mock_run.side_effect = [
-                    OSError("command error"),
-                    subprocess.CompletedProcess(args=["test"], returncode=0, stdout="ok", stderr=""),
-                ]
-                with patch("gac.git.logger") as mock_logger:
-                    result = run_subprocess_with_encoding_fallback(["echo", "test"], silent=False)
-                    assert result.returncode == 0
-                    # Should have logged about the command error
-                    assert mock_logger.debug.call_count >= 2
+    def test_os_error_non_silent_logs(self):
+        """OSError in non-silent mode should log the error."""
+        with patch("subprocess.run") as mock_run:
+            mock_run.side_effect = OSError("command error")
+            with patch("gac.git.logger") as mock_logger:
+                with pytest.raises(subprocess.CalledProcessError):
+                    run_subprocess_with_encoding_fallback(["echo", "test"], silent=False)
+                # Should have logged the command and the error
+                assert mock_logger.debug.call_count >= 2
 
 
 # ── Line 139: get_staged_status with malformed line ─────────────────
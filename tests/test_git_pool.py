@@ -0,0 +1,126 @@
+"""Tests for the persistent git worker pool."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import time
+from unittest.mock import patch
+
+import pytest
+
+from gac.errors import GitError
+from gac.git_pool import CatFileWorker, GitWorkerPool, read_blob, shared_git_pool
+from tests.conftest import git
+
+
+@pytest.fixture()
+def git_repo(git_repo):
+    (git_repo / "a.txt").write_text("hello\n")
+    (git_repo / "b.bin").write_bytes(b"\0\n\xff")
+    git("add", ".")
+    git("commit", "-m", "initial")
+    return git_repo
+
+
+@pytest.fixture()
+def pool():
+    pool = GitWorkerPool(max_workers=2, idle_timeout=60)
+    yield pool
+    pool.close()
+
+
+class TestCatFileWorker:
+    def test_reads_blobs_and_reports_missing(self, git_repo):
+        worker = CatFileWorker(str(git_repo))
+        try:
+            assert worker.read_blob("HEAD:a.txt") == b"hello\n"
+            assert worker.read_blob("HEAD:b.bin") == b"\0\n\xff"
+            assert worker.read_blob("HEAD:missing.txt") is None
+            assert worker.alive
+        finally:
+            worker.close()
+        assert not worker.alive
+
+    def test_rejects_newlines(self, git_repo):
+        worker = CatFileWorker(str(git_repo))
+        try:
+            with pytest.raises(ValueError):
+                worker.read_blob("HEAD:a.txt\nHEAD:b.bin")
+        finally:
+            worker.close()
+
+
+class TestGitWorkerPool:
+    def test_reuses_worker_per_repo(self, git_repo, pool):
+        assert pool.read_blob(str(git_repo), "HEAD:a.txt") == b"hello\n"
+        worker = pool._workers[str(git_repo)]
+
+        (git_repo / "a.txt").write_text("staged\n")
+        git("add", "a.txt")
+
+        assert pool.read_blob(str(git_repo), ":a.txt") == b"staged\n"
+        assert pool._workers[str(git_repo)] is worker
+        assert len(pool) == 1
+
+    def test_bounded_by_max_workers(self, git_repo, tmp_path_factory, pool):
+        roots = []
+        for _ in range(3):
+            root = tmp_path_factory.mktemp("repo")
+            subprocess.run(["git", "init", str(root)], check=True, capture_output=True)
+            roots.append(str(root))
+
+        for root in roots:
+            assert pool.read_blob(root, "HEAD:nothing") is None
+
+        assert len(pool) == 2
+        assert list(pool._workers) == roots[1:]
+
+    def test_idle_workers_are_evicted(self, git_repo, pool):
+        pool.read_blob(str(git_repo), "HEAD:a.txt")
+        worker = pool._workers[str(git_repo)]
+
+        assert pool.evict_idle(now=time.monotonic() + 61) == 1
+        assert len(pool) == 0
+        assert not worker.alive
+
+    def test_staged_snapshot_reused_until_index_changes(self, git_repo, pool):
+        (git_repo / "a.txt").write_text("changed\n")
+        git("add", "a.txt")
+
+        first = pool.staged_snapshot()
+        assert first.files == ["a.txt"]
+        assert pool.staged_snapshot() is first
+
+        (git_repo / "c.txt").write_text("new\n")
+        git("add", "c.txt")
+
+        assert pool.staged_snapshot().files == ["a.txt", "c.txt"]
+
+    def test_repository_head_reads_branch_without_git_after_first_call(self, git_repo, pool):
+        first = pool.repository_head()
+        assert first.repo_root == os.path.realpath(git_repo)
+
+        git("checkout", "-q", "-b", "feature")
+        with patch("gac.git.run_git_command") as run_git_command:
+            assert pool.repository_head().branch == "feature"
+            git("checkout", "-q", "--detach")
+            assert pool.repository_head().branch == "HEAD"
+        run_git_command.assert_not_called()
+
+    def test_repository_head_outside_repository(self, tmp_path, monkeypatch, pool):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+
+        with pytest.raises(GitError, match="Not in a git repository"):
+            pool.repository_head()
+
+
+def test_read_blob_uses_the_shared_worker(git_repo):
+    blob = subprocess.run(["git", "rev-parse", "HEAD:a.txt"], check=True, capture_output=True, text=True).stdout
+
+    assert read_blob(blob.strip()) == b"hello\n"
+    assert read_blob("0" * 40) is None
+    worker = shared_git_pool()._workers[os.getcwd()]
+    assert read_blob("HEAD:b.bin") == b"\0\n\xff"
+    assert shared_git_pool()._workers[os.getcwd()] is worker
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Tests for GitStateValidator class."""
 
+import os
 from unittest.mock import patch
 
 import pytest
@@ -8,6 +9,12 @@ import pytest
 from gac.errors import GitError
 from gac.git import GitCommandResult
 from gac.git_state_validator import GitStateValidator
+from gac.repo_snapshot import RepoSnapshot, StagedEntry
+from tests.conftest import git
+
+
+def _snapshot(patch_text: str | None) -> RepoSnapshot:
+    return RepoSnapshot(repo_root="/repo", entries=(StagedEntry("M", "file.py", None, 1, 0),), patch=patch_text)
 
 
 class TestGitStateValidator:
@@ -79,16 +86,35 @@ class TestGitStateValidator:
 
         mock_run_command.assert_not_called()
 
-    @patch("gac.git_state_validator.get_staged_files")
-    def test_get_git_state_no_staged_files(self, mock_get_staged, validator):
+    @patch("gac.git_state_validator.get_repo_snapshot")
+    def test_get_git_state_no_staged_files(self, mock_snapshot, validator):
         """Test get_git_state when no files are staged."""
-        mock_get_staged.return_value = []
+        mock_snapshot.return_value = RepoSnapshot(repo_root="/repo", entries=(), patch="")
 
         with patch.object(validator, "validate_repository", return_value="/repo"):
             result = validator.get_git_state(model="openai:gpt-4o-mini")
 
         assert result is None  # Returns None when no files staged
 
+    def test_get_git_state_takes_repo_root_from_snapshot(self, validator, git_repo):
+        """Test get_git_state finds the repository root without a separate rev-parse."""
+        (git_repo / "a.txt").write_text("hello\n")
+        git("add", "a.txt")
+
+        with patch.object(validator, "validate_repository", side_effect=AssertionError("extra rev-parse")):
+            git_state = validator.get_git_state(model="openai:gpt-4o-mini", quiet=True)
+
+        assert os.path.samefile(git_state.repo_root, git_repo)
+        assert git_state.staged_files == ["a.txt"]
+
+    def test_get_git_state_outside_repository(self, validator, tmp_path, monkeypatch):
+        """Test get_git_state raises the snapshot's error outside a repository."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+
+        with pytest.raises(GitError, match="Not in a git repository"):
+            validator.get_git_state(model="openai:gpt-4o-mini", quiet=True)
+
     @patch("gac.git_state_validator.scan_staged_diff")
     def test_get_git_state_with_secrets(self, mock_scan, validator):
         """Test get_git_state when secrets are detected."""
@@ -97,17 +123,43 @@ class TestGitStateValidator:
         with (
             patch.object(validator, "validate_repository", return_value="/repo"),
             patch.object(validator, "stage_all_if_requested"),
-            patch("gac.git_state_validator.get_staged_files", return_value=["file.py"]),
-            patch("gac.git_state_validator.get_staged_status", return_value="M file.py"),
-            patch("gac.git_state_validator.run_git_command") as mock_ex,
+            patch("gac.git_state_validator.get_repo_snapshot", return_value=_snapshot("diff content")),
             patch("gac.git_state_validator.preprocess_diff", return_value="processed"),
         ):
-            mock_ex.return_value = GitCommandResult.ok("diff content")
             git_state = validator.get_git_state(model="openai:gpt-4o-mini")
 
             assert git_state.has_secrets is True
             assert git_state.secrets == ["secret1", "secret2"]
 
+    @patch("gac.git_state_validator.scan_staged_diff")
+    @patch("gac.git_state_validator.read_diff_within_budget")
+    def test_get_git_state_streams_unbuffered_patch(self, mock_stream, mock_scan, validator, git_repo):
+        """Test get_git_state streams the diff when the snapshot did not buffer it.
+
+        Runs in a repository without history, so the numstat plan has no churn index to read.
+        """
+        from gac.diff_stream import StreamedDiff
+
+        mock_stream.return_value = StreamedDiff(
+            diff="streamed diff", secrets=["secret"], total_files=1, omitted_files=[]
+        )
+
+        with (
+            patch.object(validator, "validate_repository", return_value="/repo"),
+            patch.object(validator, "stage_all_if_requested"),
+            patch("gac.git_state_validator.get_repo_snapshot", return_value=_snapshot(None)),
+            patch("gac.git_state_validator.preprocess_diff", return_value="processed") as mock_preprocess,
+        ):
+            git_state = validator.get_git_state(model="openai:gpt-4o-mini")
+
+        mock_stream.assert_called_once()
+        assert mock_stream.call_args.kwargs["scan_secrets"] is True
+        mock_scan.assert_not_called()
+        mock_preprocess.assert_called_once()
+        assert git_state.diff == "streamed diff"
+        assert git_state.secrets == ["secret"]
+        assert git_state.has_secrets is True
+
     def test_handle_secret_detection_no_secrets(self, validator):
         """Test handle_secret_detection when no secrets are found."""
         result = validator.handle_secret_detection([])
@@ -7,6 +7,11 @@ import pytest
 from gac.errors import ConfigError, GitError
 from gac.git import GitCommandResult
 from gac.git_state_validator import GitStateValidator
+from gac.repo_snapshot import RepoSnapshot, StagedEntry
+
+
+def _snapshot(patch_text: str) -> RepoSnapshot:
+    return RepoSnapshot(repo_root="/repo", entries=(StagedEntry("M", "file.py", None, 1, 0),), patch=patch_text)
 
 
 class TestGitStateValidatorMissingCoverage:
@@ -225,29 +230,23 @@ class TestGitStateValidatorMissingCoverage:
         """Test get_git_state with no model specified (line 100-106)."""
         with patch.object(validator, "validate_repository", return_value="/repo"):
             with patch.object(validator, "stage_all_if_requested"):
-                with patch("gac.git_state_validator.get_staged_files", return_value=["file.py"]):
-                    with patch("gac.git_state_validator.get_staged_status", return_value="M file.py"):
-                        with patch(
-                            "gac.git_state_validator.run_git_command", return_value=GitCommandResult.ok("mock diff")
-                        ):
-                            # Should raise ConfigError when model is None
-                            with pytest.raises(ConfigError, match="Model must be specified"):
-                                validator.get_git_state(model=None)
+                with patch("gac.git_state_validator.get_repo_snapshot", return_value=_snapshot("mock diff")):
+                    # Should raise ConfigError when model is None
+                    with pytest.raises(ConfigError, match="Model must be specified"):
+                        validator.get_git_state(model=None)
 
-    @patch("gac.git_state_validator.get_staged_files")
+    @patch("gac.git_state_validator.get_repo_snapshot")
     @patch("gac.git_state_validator.scan_staged_diff")
-    def test_get_git_state_with_secret_scan_disabled(self, mock_scan, mock_get_staged, validator):
+    def test_get_git_state_with_secret_scan_disabled(self, mock_scan, mock_snapshot, validator):
         """Test get_git_state with secret scan disabled."""
-        mock_get_staged.return_value = ["file.py"]
+        mock_snapshot.return_value = _snapshot("diff")
         mock_scan.return_value = []  # Should not be called when skip_secret_scan=True
 
         with patch.object(validator, "validate_repository", return_value="/repo"):
             with patch.object(validator, "stage_all_if_requested"):
-                with patch("gac.git_state_validator.get_staged_status", return_value="M file.py"):
-                    with patch("gac.git_state_validator.run_git_command", return_value=GitCommandResult.ok("diff")):
-                        with patch("gac.git_state_validator.preprocess_diff", return_value="processed"):
-                            git_state = validator.get_git_state(model="openai:gpt-4o-mini", skip_secret_scan=True)
-
-                            assert git_state.has_secrets is False
-                            assert git_state.secrets == []
-                            mock_scan.assert_not_called()
+                with patch("gac.git_state_validator.preprocess_diff", return_value="processed"):
+                    git_state = validator.get_git_state(model="openai:gpt-4o-mini", skip_secret_scan=True)
+
+                    assert git_state.has_secrets is False
+                    assert git_state.secrets == []
+                    mock_scan.assert_not_called()
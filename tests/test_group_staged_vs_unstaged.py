@@ -7,6 +7,7 @@ import pytest
 from gac.git import GitCommandResult
 from gac.main import main
 from gac.workflow_context import CLIOptions
+from tests.git_test_utils import fake_snapshot
 
 
 @pytest.fixture(autouse=True)
@@ -29,7 +30,7 @@ def test_group_without_add_all_only_shows_staged():
     with (
         patch("gac.git.run_git_command", return_value=GitCommandResult.ok("/fake/repo")),
         patch("gac.git.get_staged_files", return_value=["file1.py"]),
-        patch("gac.git_state_validator.get_staged_files", return_value=["file1.py"]),
+        patch("gac.git_state_validator.get_repo_snapshot", return_value=fake_snapshot(["file1.py"])),
         patch("gac.git.get_staged_status", return_value=staged_status),
         patch("gac.grouped_commit_workflow.GroupedCommitWorkflow.execute_workflow"),
         patch("gac.main.console.print"),
@@ -59,7 +60,7 @@ def test_group_with_add_all_stages_everything():
         patch("gac.git.run_git_command", side_effect=mock_git_cmd),
         patch("gac.git_state_validator.run_git_command", side_effect=mock_git_cmd),
         patch("gac.git.get_staged_files", return_value=["file1.py", "file2.py"]),
-        patch("gac.git_state_validator.get_staged_files", return_value=["file1.py", "file2.py"]),
+        patch("gac.git_state_validator.get_repo_snapshot", return_value=fake_snapshot(["file1.py", "file2.py"])),
         patch("gac.git.get_staged_status", return_value=staged_status),
         patch("gac.grouped_commit_workflow.GroupedCommitWorkflow.execute_workflow"),
         patch("gac.main.console.print"),
@@ -77,8 +78,7 @@ def test_normal_mode_uses_staged_status():
         patch("gac.git.run_git_command", return_value=GitCommandResult.ok("/fake/repo")),
         patch("gac.git.get_staged_files", return_value=["file1.py"]),
         patch("gac.git.get_staged_status", return_value=status),
-        patch("gac.git_state_validator.get_staged_files", return_value=["file1.py"]),
-        patch("gac.git_state_validator.get_staged_status", return_value=status),
+        patch("gac.git_state_validator.get_repo_snapshot", return_value=fake_snapshot(["file1.py"])),
         patch("gac.prompt.build_prompt", return_value=("system", "user")),
         patch("gac.main.generate_commit_message", return_value=("feat: update", 10, 5, 500, 0)),
         patch("gac.main.clean_commit_message", return_value="feat: update"),
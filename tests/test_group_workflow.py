@@ -8,6 +8,7 @@ from gac.errors import GitError
 from gac.git import GitCommandResult
 from gac.main import main
 from gac.workflow_context import CLIOptions
+from tests.git_test_utils import fake_snapshot
 
 
 @pytest.fixture(autouse=True)
@@ -30,7 +31,7 @@ def test_group_with_no_staged_changes(tmp_path, monkeypatch):
     with (
         patch("gac.git_state_validator.GitStateValidator.validate_repository", return_value=str(tmp_path)),
         patch("gac.git.get_staged_files", return_value=[]),
-        patch("gac.git_state_validator.get_staged_files", return_value=[]),
+        patch("gac.git_state_validator.get_repo_snapshot", return_value=fake_snapshot([])),
         patch("gac.main.console.print"),
     ):
         exit_code = main(CLIOptions(group=True, model="openai:gpt-4", require_confirmation=False))
@@ -45,8 +46,8 @@ def test_group_json_parsing_success():
         patch("gac.git.run_git_command", return_value=GitCommandResult.ok("/fake/repo")),
         patch("gac.git.get_staged_files", return_value=["src/file1.py", "tests/test_file1.py", "README.md"]),
         patch(
-            "gac.git_state_validator.get_staged_files",
-            return_value=["src/file1.py", "tests/test_file1.py", "README.md"],
+            "gac.git_state_validator.get_repo_snapshot",
+            return_value=fake_snapshot(["src/file1.py", "tests/test_file1.py", "README.md"]),
         ),
         patch("gac.grouped_commit_workflow.GroupedCommitWorkflow.execute_workflow") as mock_workflow,
         patch("gac.main.console.print"),
@@ -73,7 +74,7 @@ def test_group_validation_errors(invalid_data):
     with (
         patch("gac.git.run_git_command", return_value=GitCommandResult.ok("/fake/repo")),
         patch("gac.git.get_staged_files", return_value=["file.py"]),
-        patch("gac.git_state_validator.get_staged_files", return_value=["file.py"]),
+        patch("gac.git_state_validator.get_repo_snapshot", return_value=fake_snapshot(["file.py"])),
         patch("gac.ai.generate_grouped_commits", return_value=(invalid_data, 10, 5, 500, 0)),
         patch("gac.grouped_commit_workflow.generate_grouped_commits", return_value=(invalid_data, 10, 5, 500, 0)),
         patch("gac.main.console.print"),
@@ -89,7 +90,7 @@ def test_group_dry_run():
     with (
         patch("gac.git.run_git_command", return_value=GitCommandResult.ok("/fake/repo")),
         patch("gac.git.get_staged_files", return_value=["file1.py"]),
-        patch("gac.git_state_validator.get_staged_files", return_value=["file1.py"]),
+        patch("gac.git_state_validator.get_repo_snapshot", return_value=fake_snapshot(["file1.py"])),
         patch("gac.grouped_commit_workflow.GroupedCommitWorkflow.execute_workflow") as mock_workflow,
         patch("gac.main.console.print"),
         patch("gac.workflow_utils.execute_commit"),
@@ -105,7 +106,7 @@ def test_group_retries_when_files_missing():
     with (
         patch("gac.git.run_git_command", return_value=GitCommandResult.ok("/fake/repo")),
         patch("gac.git.get_staged_files", return_value=["a.py", "b.py"]),
-        patch("gac.git_state_validator.get_staged_files", return_value=["a.py", "b.py"]),
+        patch("gac.git_state_validator.get_repo_snapshot", return_value=fake_snapshot(["a.py", "b.py"])),
         patch("gac.grouped_commit_workflow.GroupedCommitWorkflow.execute_workflow") as mock_workflow,
         patch("gac.main.console.print"),
         patch("gac.workflow_utils.execute_commit"),
@@ -123,7 +124,7 @@ def test_group_restores_staging_on_first_commit_failure():
 
     with (
         patch("gac.git.run_git_command", return_value=GitCommandResult.ok("/fake/repo")),
-        patch("gac.git_state_validator.get_staged_files", return_value=original_files),
+        patch("gac.git_state_validator.get_repo_snapshot", return_value=fake_snapshot(original_files)),
         patch("gac.grouped_commit_workflow.GroupedCommitWorkflow.execute_workflow") as mock_workflow,
         patch("gac.main.console.print"),
         patch("gac.workflow_utils.execute_commit", side_effect=GitError("Commit failed")),
@@ -142,7 +143,7 @@ def test_group_does_not_restore_staging_on_later_commit_failure():
 
     with (
         patch("gac.git.run_git_command", return_value=GitCommandResult.ok("/fake/repo")),
-        patch("gac.git_state_validator.get_staged_files", return_value=original_files),
+        patch("gac.git_state_validator.get_repo_snapshot", return_value=fake_snapshot(original_files)),
         patch("gac.grouped_commit_workflow.GroupedCommitWorkflow.execute_workflow") as mock_workflow,
         patch("gac.main.console.print"),
         patch("gac.workflow_utils.execute_commit"),
@@ -160,8 +161,10 @@ def test_group_displays_file_lists():
     with (
         patch("gac.git.run_git_command", return_value=GitCommandResult.ok("/fake/repo")),
         patch(
-            "gac.git_state_validator.get_staged_files",
-            return_value=["src/auth.py", "src/login.py", "tests/test_auth.py", "README.md", "docs/auth.md"],
+            "gac.git_state_validator.get_repo_snapshot",
+            return_value=fake_snapshot(
+                ["src/auth.py", "src/login.py", "tests/test_auth.py", "README.md", "docs/auth.md"]
+            ),
         ),
         patch("gac.grouped_commit_workflow.GroupedCommitWorkflow.execute_workflow") as mock_workflow,
         patch("gac.main.console.print"),
@@ -205,7 +208,10 @@ def test_group_token_scaling(num_files, expected_multiplier):
     with (
         patch("gac.git.run_git_command", return_value=GitCommandResult.ok("/fake/repo")),
         patch("gac.git.get_staged_files", return_value=[f"file{i}.py" for i in range(num_files)]),
-        patch("gac.git_state_validator.get_staged_files", return_value=[f"file{i}.py" for i in range(num_files)]),
+        patch(
+            "gac.git_state_validator.get_repo_snapshot",
+            return_value=fake_snapshot([f"file{i}.py" for i in range(num_files)]),
+        ),
         patch("gac.config.load_config", return_value=mock_config),
         patch("gac.grouped_commit_workflow.GroupedCommitWorkflow.execute_workflow") as mock_exec,
     ):
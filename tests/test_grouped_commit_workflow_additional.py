@@ -8,6 +8,7 @@ from unittest import mock
 from gac.config import GACConfig
 from gac.errors import GitError
 from gac.grouped_commit_workflow import GroupedCommitResult, GroupedCommitWorkflow, WorkflowResult
+from tests.git_test_utils import fake_snapshot
 
 
 def test_display_quiet_mode():
@@ -40,7 +41,7 @@ def test_keyboard_interrupt_handling():
 
     with mock.patch("gac.grouped_commit_executor.get_staged_files", return_value=[]):
         with mock.patch("gac.grouped_commit_executor.run_git_command"):
-            with mock.patch("gac.grouped_commit_executor.detect_rename_mappings", return_value={}):
+            with mock.patch("gac.grouped_commit_executor.get_repo_snapshot", return_value=fake_snapshot([])):
                 with mock.patch("gac.grouped_commit_executor.execute_commit", side_effect=KeyboardInterrupt()):
                     with mock.patch("gac.grouped_commit_executor.restore_staging") as mock_restore:
                         with mock.patch("gac.grouped_commit_workflow.console.print"):
@@ -68,7 +69,7 @@ def test_oserror_handling():
 
     with mock.patch("gac.grouped_commit_executor.get_staged_files", return_value=[]):
         with mock.patch("gac.grouped_commit_executor.run_git_command"):
-            with mock.patch("gac.grouped_commit_executor.detect_rename_mappings", return_value={}):
+            with mock.patch("gac.grouped_commit_executor.get_repo_snapshot", return_value=fake_snapshot([])):
                 with mock.patch("gac.grouped_commit_executor.execute_commit", side_effect=OSError("Permission denied")):
                     with mock.patch("gac.grouped_commit_executor.restore_staging") as mock_restore:
                         with mock.patch("gac.grouped_commit_workflow.console.print"):
@@ -240,7 +241,7 @@ def test_push_failure_triggers_restore():
 
     with mock.patch("gac.grouped_commit_executor.get_staged_files", return_value=[]):
         with mock.patch("gac.grouped_commit_executor.run_git_command"):
-            with mock.patch("gac.grouped_commit_executor.detect_rename_mappings", return_value={}):
+            with mock.patch("gac.grouped_commit_executor.get_repo_snapshot", return_value=fake_snapshot([])):
                 with mock.patch("gac.grouped_commit_executor.execute_commit"):
                     with mock.patch("gac.git.push_changes", return_value=False):
                         with mock.patch("gac.grouped_commit_executor.restore_staging") as mock_restore:
@@ -273,7 +274,7 @@ def test_multiple_commit_failures():
 
     with mock.patch("gac.grouped_commit_executor.get_staged_files", return_value=[]):
         with mock.patch("gac.grouped_commit_executor.run_git_command"):
-            with mock.patch("gac.grouped_commit_executor.detect_rename_mappings", return_value={}):
+            with mock.patch("gac.grouped_commit_executor.get_repo_snapshot", return_value=fake_snapshot([])):
                 commit_call_count = 0
 
                 def fail_on_second(*args, **kwargs):
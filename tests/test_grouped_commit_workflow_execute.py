@@ -10,6 +10,7 @@ from gac.errors import GitError
 from gac.git import GitCommandResult
 from gac.grouped_commit_workflow import GroupedCommitResult, GroupedCommitWorkflow, WorkflowResult
 from gac.workflow_context import GenerationConfig, WorkflowContext, WorkflowFlags, WorkflowState
+from tests.git_test_utils import fake_snapshot
 
 
 def _build_ctx(
@@ -68,7 +69,7 @@ def test_push_failure_returns_false():
 
     with mock.patch("gac.grouped_commit_executor.get_staged_files", return_value=["file1.py"]):
         with mock.patch("gac.grouped_commit_executor.run_git_command", return_value=GitCommandResult.ok("diff data")):
-            with mock.patch("gac.grouped_commit_executor.detect_rename_mappings", return_value={}):
+            with mock.patch("gac.grouped_commit_executor.get_repo_snapshot", return_value=fake_snapshot([])):
                 with mock.patch("gac.grouped_commit_executor.execute_commit"):
                     with mock.patch("gac.git.push_changes", return_value=False):
                         with mock.patch("gac.grouped_commit_executor.restore_staging") as mock_restore:
@@ -97,7 +98,7 @@ def test_push_git_error_triggers_restore():
 
     with mock.patch("gac.grouped_commit_executor.get_staged_files", return_value=["file1.py"]):
         with mock.patch("gac.grouped_commit_executor.run_git_command", return_value=GitCommandResult.ok("diff data")):
-            with mock.patch("gac.grouped_commit_executor.detect_rename_mappings", return_value={}):
+            with mock.patch("gac.grouped_commit_executor.get_repo_snapshot", return_value=fake_snapshot([])):
                 with mock.patch("gac.grouped_commit_executor.execute_commit"):
                     with mock.patch("gac.git.push_changes", side_effect=GitError("push failed")):
                         with mock.patch("gac.grouped_commit_executor.restore_staging") as mock_restore:
@@ -126,7 +127,7 @@ def test_push_os_error_triggers_restore():
 
     with mock.patch("gac.grouped_commit_executor.get_staged_files", return_value=["file1.py"]):
         with mock.patch("gac.grouped_commit_executor.run_git_command", return_value=GitCommandResult.ok("diff data")):
-            with mock.patch("gac.grouped_commit_executor.detect_rename_mappings", return_value={}):
+            with mock.patch("gac.grouped_commit_executor.get_repo_snapshot", return_value=fake_snapshot([])):
                 with mock.patch("gac.grouped_commit_executor.execute_commit"):
                     with mock.patch("gac.git.push_changes", side_effect=OSError("os error")):
                         with mock.patch("gac.grouped_commit_executor.restore_staging") as mock_restore:
@@ -143,6 +144,54 @@ def test_push_os_error_triggers_restore():
     mock_restore.assert_called_once()
 
 
+def _fail_write_tree(args, **kwargs):
+    return (
+        GitCommandResult.fail(128, stderr="fatal: index file corrupt")
+        if args == ["write-tree"]
+        else GitCommandResult.ok("")
+    )
+
+
+def test_staging_save_failure_returns_one():
+    """A failed write-tree before committing is reported instead of raised."""
+    workflow = GroupedCommitWorkflow(GACConfig({"warning_limit_tokens": 4096}))
+    result = GroupedCommitResult(commits=[{"files": ["file1.py"], "message": "Test commit"}], raw_response="")
+
+    with mock.patch("gac.grouped_commit_executor.get_staged_files", return_value=["file1.py"]):
+        with mock.patch("gac.grouped_commit_executor.run_git_command", side_effect=_fail_write_tree) as mock_git:
+            with mock.patch("gac.grouped_commit_executor.get_repo_snapshot", return_value=fake_snapshot([])):
+                with mock.patch("gac.grouped_commit_executor.execute_commit") as mock_commit:
+                    with mock.patch("gac.grouped_commit_executor.console.print") as mock_print:
+                        exit_code = workflow.execute_grouped_commits(
+                            result=result, dry_run=False, push=False, no_verify=False, hook_timeout=120
+                        )
+
+    assert exit_code == 1
+    mock_commit.assert_not_called()
+    assert ["reset", "HEAD"] not in [c.args[0] for c in mock_git.call_args_list]
+    assert "Could not save the staging area" in mock_print.call_args.args[0]
+
+
+def test_push_failure_restore_error_returns_one():
+    """A failed write-tree while restoring after --no-verify commits and a failed push is reported."""
+    workflow = GroupedCommitWorkflow(GACConfig({"warning_limit_tokens": 4096}))
+    result = GroupedCommitResult(commits=[{"files": ["file1.py"], "message": "Test commit"}], raw_response="")
+
+    with mock.patch("gac.grouped_commit_executor._build_commits_from_index", return_value=True):
+        with mock.patch("gac.grouped_commit_executor.get_staged_files", return_value=["file1.py"]):
+            with mock.patch("gac.grouped_commit_executor.run_git_command", side_effect=_fail_write_tree):
+                with mock.patch("gac.git.push_changes", return_value=False):
+                    with mock.patch("gac.grouped_commit_executor.restore_staging") as mock_restore:
+                        with mock.patch("gac.grouped_commit_executor.console.print") as mock_print:
+                            exit_code = workflow.execute_grouped_commits(
+                                result=result, dry_run=False, push=True, no_verify=True, hook_timeout=120
+                            )
+
+    assert exit_code == 1
+    mock_restore.assert_not_called()
+    assert "Could not restore the original staging area" in mock_print.call_args.args[0]
+
+
 def test_push_success():
     """Test successful push after commits."""
     config = GACConfig({"warning_limit_tokens": 4096})
@@ -155,7 +204,7 @@ def test_push_success():
 
     with mock.patch("gac.grouped_commit_executor.get_staged_files", return_value=["file1.py"]):
         with mock.patch("gac.grouped_commit_executor.run_git_command", return_value=GitCommandResult.ok("diff data")):
-            with mock.patch("gac.grouped_commit_executor.detect_rename_mappings", return_value={}):
+            with mock.patch("gac.grouped_commit_executor.get_repo_snapshot", return_value=fake_snapshot([])):
                 with mock.patch("gac.grouped_commit_executor.execute_commit"):
                     with mock.patch("gac.git.push_changes", return_value=True):
                         with mock.patch("gac.grouped_commit_executor.console.print"):
@@ -229,13 +229,13 @@ class TestFileRenameHandling:
 
     @patch("gac.grouped_commit_executor.get_staged_files")
     @patch("gac.grouped_commit_executor.run_git_command")
-    @patch("gac.grouped_commit_executor.detect_rename_mappings")
+    @patch("gac.grouped_commit_executor.get_repo_snapshot")
     @patch("gac.grouped_commit_executor.execute_commit")
     @patch("gac.grouped_commit_workflow.console.print")
-    def test_file_rename_staging(self, mock_print, mock_commit, mock_rename_detect, mock_git_cmd, mock_get_files):
+    def test_file_rename_staging(self, mock_print, mock_commit, mock_snapshot, mock_git_cmd, mock_get_files):
         """Test that file renames are handled correctly during staging."""
         # Mock rename detection
-        mock_rename_detect.return_value = {"new_file.py": "old_file.py"}
+        mock_snapshot.return_value.rename_mappings = {"new_file.py": "old_file.py"}
         mock_get_files.return_value = ["old_file.py", "new_file.py"]
         mock_git_cmd.return_value = GitCommandResult.ok("fake diff")
 
@@ -262,15 +262,15 @@ class TestFileRenameHandling:
 
     @patch("gac.grouped_commit_executor.get_staged_files")
     @patch("gac.grouped_commit_executor.run_git_command")
-    @patch("gac.grouped_commit_executor.detect_rename_mappings")
+    @patch("gac.grouped_commit_executor.get_repo_snapshot")
     @patch("gac.grouped_commit_executor.execute_commit")
     @patch("gac.grouped_commit_executor.restore_staging")
     @patch("gac.grouped_commit_workflow.console.print")
     def test_commit_failure_triggers_restore(
-        self, mock_print, mock_restore, mock_commit, mock_rename_detect, mock_git_cmd, mock_get_files
+        self, mock_print, mock_restore, mock_commit, mock_snapshot, mock_git_cmd, mock_get_files
     ):
         """Test that staging is restored when commit fails."""
-        mock_rename_detect.return_value = {}
+        mock_snapshot.return_value.rename_mappings = {}
         mock_get_files.return_value = ["file1.py"]
         mock_git_cmd.return_value = GitCommandResult.ok("fake diff")
 
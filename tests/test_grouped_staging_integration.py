@@ -49,15 +49,15 @@ def git_repo_with_multiple_files(tmp_path):
 def _get_staged_snapshot() -> tuple[list[str], str]:
     """Capture current staging area state."""
     files = get_staged_files()
-    diff = run_git_command(["diff", "--cached", "--binary"], silent=True).require_success()
-    return files, diff
+    tree = run_git_command(["write-tree"], silent=True).require_success()
+    return files, tree
 
 
 class TestRestoreStaging:
     """Verify restore_staging properly resets and re-stages."""
 
     def test_restore_preserves_staged_files(self, git_repo_with_multiple_files):
-        original_files, original_diff = _get_staged_snapshot()
+        original_files, original_tree = _get_staged_snapshot()
         assert len(original_files) == 3
 
         # Simulate what execute_grouped_commits does: unstage everything
@@ -65,12 +65,12 @@ class TestRestoreStaging:
         assert get_staged_files() == []
 
         # Now restore
-        restore_staging(original_files, original_diff)
+        restore_staging(original_files, original_tree)
         restored_files = get_staged_files()
         assert set(restored_files) == set(original_files)
 
     def test_restore_after_partial_unstage(self, git_repo_with_multiple_files):
-        original_files, original_diff = _get_staged_snapshot()
+        original_files, original_tree = _get_staged_snapshot()
 
         # Unstage, then stage only one file (simulating a partial commit)
         run_git_command(["reset", "HEAD"]).require_success()
@@ -78,28 +78,43 @@ class TestRestoreStaging:
         assert get_staged_files() == ["feature.py"]
 
         # Restore should bring back all three
-        restore_staging(original_files, original_diff)
+        restore_staging(original_files, original_tree)
         restored_files = get_staged_files()
         assert set(restored_files) == set(original_files)
 
-    def test_restore_with_empty_diff(self, git_repo_with_multiple_files):
-        """Restore with no diff should still work via file list fallback."""
+    def test_restore_without_tree(self, git_repo_with_multiple_files):
+        """Restore with no saved tree should still work via file list fallback."""
         original_files = get_staged_files()
 
         run_git_command(["reset", "HEAD"]).require_success()
         assert get_staged_files() == []
 
-        # Restore without diff — uses file-by-file fallback
-        restore_staging(original_files, staged_diff=None)
+        # Restore without a tree — uses file-by-file fallback
+        restore_staging(original_files, staged_tree=None)
         restored_files = get_staged_files()
         assert set(restored_files) == set(original_files)
 
+    def test_restore_keeps_partial_and_binary_staging(self, git_repo_with_multiple_files):
+        """Reading the saved tree back restores exactly what was staged, not the working tree."""
+        repo = git_repo_with_multiple_files
+        (repo / "asset.bin").write_bytes(bytes(range(256)) * 64)
+        run_git_command(["add", "asset.bin"]).require_success()
+        (repo / "feature.py").write_text("# unstaged edit")
+        original_files, original_tree = _get_staged_snapshot()
+
+        run_git_command(["reset", "HEAD"]).require_success()
+        restore_staging(original_files, original_tree)
+
+        assert set(get_staged_files()) == set(original_files)
+        assert run_git_command(["show", ":feature.py"]).require_success() == "# feature code"
+        assert run_git_command(["diff", "--name-only"]).require_success() == "feature.py"
+
 
 class TestDryRunPreservesStaging:
     """Verify dry-run mode doesn't modify the staging area."""
 
     def test_dry_run_does_not_commit(self, git_repo_with_multiple_files):
-        original_files, original_diff = _get_staged_snapshot()
+        original_files, original_tree = _get_staged_snapshot()
         commit_count_before = int(run_git_command(["rev-list", "--count", "HEAD"]).require_success())
 
         result = GroupedCommitResult(
@@ -169,7 +184,7 @@ class TestGroupedCommitExecution:
         so they won't appear in the restored staging area. The restore ensures
         the uncommitted files are re-staged.
         """
-        original_files, original_diff = _get_staged_snapshot()
+        original_files, original_tree = _get_staged_snapshot()
 
         result = GroupedCommitResult(
             commits=[
@@ -183,7 +198,7 @@ class TestGroupedCommitExecution:
             result=result,
             dry_run=False,
             push=False,
-            no_verify=True,
+            no_verify=False,
             hook_timeout=30,
         )
 
@@ -203,3 +218,29 @@ class TestGroupedCommitExecution:
         lines = [line for line in log_output.splitlines() if line.strip()]
         assert len(lines) == 2  # initial + 1 successful commit
         assert "add feature" in lines[0]
+
+    def test_no_verify_failure_commits_nothing(self, git_repo_with_multiple_files):
+        """Without hooks, commits are built off to the side and published all at once."""
+        original_files, original_tree = _get_staged_snapshot()
+        head_before = run_git_command(["rev-parse", "HEAD"]).require_success()
+
+        result = GroupedCommitResult(
+            commits=[
+                {"files": ["feature.py"], "message": "feat: add feature"},
+                {"files": ["nonexistent_file.py"], "message": "chore: this will fail"},
+            ],
+            raw_response="...",
+        )
+
+        exit_code = execute_grouped_commits(
+            result=result,
+            dry_run=False,
+            push=False,
+            no_verify=True,
+            hook_timeout=30,
+        )
+
+        assert exit_code == 1
+        assert run_git_command(["rev-parse", "HEAD"]).require_success() == head_before
+        assert get_staged_files() == original_files
+        assert run_git_command(["write-tree"], silent=True).require_success() == original_tree
@@ -0,0 +1,101 @@
+"""Tests for skipping hooks on staged trees that already passed."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from gac.git import run_pre_commit_hooks
+from gac.hook_cache import CACHE_FILENAME, MAX_ENTRIES, find_hook_tool, hook_cache_key, record_success
+from tests.conftest import git
+
+
+@pytest.fixture()
+def git_repo(git_repo):
+    (git_repo / ".pre-commit-config.yaml").write_text("repos: []\n")
+    (git_repo / "a.py").write_text("a = 1\n")
+    git("add", ".")
+    return git_repo
+
+
+@pytest.fixture()
+def hook_run():
+    result = subprocess.CompletedProcess(["pre-commit", "run"], 0, "", "")
+    with (
+        patch("gac.git._find_hook_tool", return_value="/usr/bin/pre-commit"),
+        patch("gac.git.run_subprocess_with_encoding_fallback", return_value=result) as run,
+    ):
+        yield run
+
+
+def test_unchanged_tree_skips_hooks(git_repo, hook_run):
+    assert run_pre_commit_hooks() is True
+    assert run_pre_commit_hooks() is True
+
+    assert hook_run.call_count == 1
+    assert (git_repo / ".git" / "gac" / CACHE_FILENAME).exists()
+
+
+def test_staged_change_reruns_hooks(git_repo, hook_run):
+    run_pre_commit_hooks()
+    (git_repo / "a.py").write_text("a = 2\n")
+    git("add", "a.py")
+    run_pre_commit_hooks()
+
+    assert hook_run.call_count == 2
+
+
+def test_unstaged_change_does_not_rerun_hooks(git_repo, hook_run):
+    run_pre_commit_hooks()
+    (git_repo / "a.py").write_text("a = 2\n")
+    run_pre_commit_hooks()
+
+    assert hook_run.call_count == 1
+
+
+def test_config_change_reruns_hooks(git_repo, hook_run):
+    run_pre_commit_hooks()
+    (git_repo / ".pre-commit-config.yaml").write_text("repos: []\nfail_fast: true\n")
+    run_pre_commit_hooks()
+
+    assert hook_run.call_count == 2
+
+
+def test_failures_are_not_cached(git_repo, hook_run):
+    hook_run.return_value = subprocess.CompletedProcess(["pre-commit", "run"], 1, "failed", "")
+
+    assert run_pre_commit_hooks() is False
+    assert run_pre_commit_hooks() is False
+    assert hook_run.call_count == 2
+
+
+def test_cache_keeps_newest_entries(git_repo):
+    for i in range(MAX_ENTRIES + 5):
+        record_success(f"key-{i}")
+
+    entries = json.loads((git_repo / ".git" / "gac" / CACHE_FILENAME).read_text())
+    assert len(entries) == MAX_ENTRIES
+    assert f"key-{MAX_ENTRIES + 4}" in entries
+
+
+def test_key_requires_a_repository(tmp_path):
+    cwd = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        with patch.dict(os.environ, {"GIT_CEILING_DIRECTORIES": str(tmp_path.parent)}):
+            assert hook_cache_key("pre-commit", "/usr/bin/pre-commit", []) is None
+    finally:
+        os.chdir(cwd)
+
+
+def test_tool_discovery_is_memoized():
+    with patch("gac.hook_cache.shutil.which", return_value="/opt/bin/lefthook") as which:
+        with patch.dict(os.environ, {"PATH": "/opt/bin-memo-test"}):
+            assert find_hook_tool("lefthook") == "/opt/bin/lefthook"
+            assert find_hook_tool("lefthook") == "/opt/bin/lefthook"
+
+    which.assert_called_once_with("lefthook", path="/opt/bin-memo-test")
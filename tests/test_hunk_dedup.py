@@ -0,0 +1,95 @@
+"""Tests for folding hunks repeated across files."""
+
+from gac.diff_sections import parse_diff, parse_diff_section
+from gac.hunk_dedup import dedupe_hunks, normalize_hunk
+from gac.preprocess import smart_truncate_diff
+
+
+def _section(path: str, *hunks: str) -> str:
+    return f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n" + "".join(hunks)
+
+
+def _rename_hunk(line: int, indent: str = "    ") -> str:
+    return (
+        f"@@ -{line},3 +{line},3 @@\n context_{line}\n"
+        f"-{indent}value = old_helper(config, retries=3)\n+{indent}value = new_helper(config, retries=3)\n"
+    )
+
+
+UNIQUE_HUNK = "@@ -50,1 +50,1 @@\n-limit = 10\n+limit = 20\n"
+
+
+class TestNormalizeHunk:
+    def test_ignores_context_whitespace_and_own_path(self):
+        first = normalize_hunk(
+            "@@ -1 +1 @@\n ctx a\n-import pkg.alpha as alpha\n+import pkg.alpha  as  a\n", "pkg/alpha.py"
+        )
+        second = normalize_hunk(
+            "@@ -9 +9 @@\n ctx b\n-import pkg.beta as beta\n+import  pkg.beta as a\n", "pkg/beta.py"
+        )
+        assert first == second
+
+    def test_identifiers_optional(self):
+        first = normalize_hunk("@@ -1 +1 @@\n-x = load(a)\n+x = load(a, cache=True)\n", "a.py")
+        second = normalize_hunk("@@ -1 +1 @@\n-y = read(b)\n+y = read(b, cache=True)\n", "b.py")
+        assert first != second
+        assert normalize_hunk("@@ -1 +1 @@\n-x = load(a)\n+x = load(a, cache=True)\n", "a.py", identifiers=True) == (
+            normalize_hunk("@@ -1 +1 @@\n-y = read(b)\n+y = read(b, cache=True)\n", "b.py", identifiers=True)
+        )
+
+
+class TestDedupeHunks:
+    def test_folds_repeats_into_first_copy(self):
+        diff = "".join(
+            [
+                _section("a.py", _rename_hunk(1), UNIQUE_HUNK),
+                _section("b.py", _rename_hunk(7, indent="\t")),
+                _section("c.py", _rename_hunk(3)),
+                _section("d.py", _rename_hunk(12)),
+            ]
+        )
+        result = dedupe_hunks(parse_diff(diff))
+
+        assert [section.path for section in result] == ["a.py"]
+        kept = result[0]
+        assert kept.text.count("new_helper") == 1
+        assert "[Same change repeated 3 more times in 3 other files: b.py, c.py, d.py]\n" in kept.text
+        assert "+limit = 20" in kept.text
+        assert len(kept.hunk_offsets) == 2
+        assert kept.folded_hunks == 3
+        assert kept.folded_paths == ("b.py", "c.py", "d.py")
+
+    def test_files_with_other_changes_keep_them(self):
+        diff = "".join(
+            [
+                _section("a.py", _rename_hunk(1)),
+                _section("b.py", _rename_hunk(1)),
+                _section("c.py", _rename_hunk(1), UNIQUE_HUNK),
+            ]
+        )
+        result = dedupe_hunks(parse_diff(diff))
+
+        assert [section.path for section in result] == ["a.py", "c.py"]
+        assert "new_helper" not in result[1].text
+        assert result[1].text.endswith("+limit = 20\n[1 hunks folded into an identical change shown once]\n")
+        assert result[0].folded_paths == ("b.py",)
+
+    def test_below_threshold_unchanged(self):
+        sections = parse_diff(_section("a.py", _rename_hunk(1)) + _section("b.py", _rename_hunk(1)))
+        assert [section.text for section in dedupe_hunks(sections)] == [section.text for section in sections]
+
+    def test_trivial_hunks_not_grouped(self):
+        sections = parse_diff("".join(_section(f"{name}.py", "@@ -1 +1 @@\n-}\n+};\n") for name in "abcd"))
+        assert [section.text for section in dedupe_hunks(sections)] == [section.text for section in sections]
+
+
+def test_truncation_summary_notes_folded_files():
+    diff = "".join(_section(f"src/mod{i}.py", _rename_hunk(i + 1)) for i in range(50))
+    section = dedupe_hunks(parse_diff(diff))[0]
+    unrelated = parse_diff_section(_section("big.py", "@@ -1 +1 @@\n" + "+x = 1\n" * 400))
+
+    result = smart_truncate_diff([(section, 2.0), (unrelated, 1.0)], 400, "test:model")
+
+    assert "diff --git a/big.py b/big.py" in result
+    assert "[rest of hunk omitted due to token limits]" in result
+    assert "49 repeated hunks folded into one copy each, covering 49 files with no other changes" in result
@@ -0,0 +1,150 @@
+"""Tests for summarizing lockfile diffs."""
+
+import pytest
+
+from gac.diff_sections import parse_diff_section
+from gac.lockfile_diff import is_lockfile_section, lockfile_line_filter, summarize_lockfile_section
+from gac.preprocess import filter_binary_and_minified
+
+
+def _section(path: str, body: str) -> str:
+    return f"diff --git a/{path} b/{path}\nindex 1111111..2222222 100644\n--- a/{path}\n+++ b/{path}\n{body}"
+
+
+def _rows(path: str, body: str) -> list[str]:
+    summary = summarize_lockfile_section(parse_diff_section(_section(path, body)))
+    return summary.split("[Lockfile dependency changes]\n", 1)[1].splitlines()
+
+
+UV_LOCK = """@@ -120,12 +120,12 @@
+ [[package]]
+ name = "httpx"
+-version = "0.27.0"
++version = "0.28.1"
+ source = { registry = "https://pypi.org/simple" }
+ dependencies = [
+     { name = "anyio" },
+@@ -300,6 +300,16 @@
++[[package]]
++name = "rich"
++version = "14.1.0"
++source = { registry = "https://pypi.org/simple" }
++
+ [[package]]
+-name = "six"
+-version = "1.16.0"
++name = "sniffio"
++version = "1.3.1"
+ source = { registry = "https://pypi.org/simple" }
+"""
+
+
+class TestSummarizeLockfileSection:
+    def test_toml_lockfile(self):
+        assert _rows("uv.lock", UV_LOCK) == [
+            "httpx 0.27.0 → 0.28.1",
+            "+ rich 14.1.0",
+            "- six 1.16.0",
+            "+ sniffio 1.3.1",
+        ]
+
+    def test_keeps_header_and_drops_hunks(self):
+        summary = summarize_lockfile_section(parse_diff_section(_section("uv.lock", UV_LOCK)))
+        assert summary.startswith("diff --git a/uv.lock b/uv.lock\nindex 1111111..2222222 100644\n--- a/uv.lock\n")
+        assert "registry" not in summary
+        assert "@@" not in summary
+
+    def test_package_lock(self):
+        body = """@@ -10,9 +10,9 @@
+   "packages": {
+     "": {
+       "name": "app",
+-      "version": "1.0.0",
++      "version": "1.1.0",
+     "node_modules/@babel/core": {
+-      "version": "7.0.0",
++      "version": "7.1.2",
+       "resolved": "https://registry.npmjs.org/@babel/core/-/core-7.1.2.tgz",
+"""
+        assert _rows("web/package-lock.json", body) == ["@babel/core 7.0.0 → 7.1.2"]
+
+    def test_pipfile_lock_counts_unattributed_versions(self):
+        body = """@@ -40,7 +40,7 @@
+             "hashes": [
+-                "sha256:aaaa"
++                "sha256:bbbb"
+             ],
+-            "version": "==2.31.0"
++            "version": "==2.32.3"
+         },
+         "urllib3": {
+-            "version": "==2.0.0"
++            "version": "==2.2.1"
+"""
+        summary = summarize_lockfile_section(parse_diff_section(_section("Pipfile.lock", body)))
+        assert "urllib3 2.0.0 → 2.2.1" in summary
+        assert "[2 version lines changed for packages outside the diff context]" in summary
+
+    def test_yarn_lock(self):
+        body = """@@ -1,8 +1,8 @@
+-"@babel/core@^7.0.0":
+-  version "7.0.0"
++"@babel/core@^7.0.0", "@babel/core@^7.1.0":
++  version "7.1.2"
+   resolved "https://registry.yarnpkg.com/@babel/core/-/core.tgz"
+ lodash@^4.17.21:
+   version "4.17.21"
+"""
+        assert _rows("yarn.lock", body) == ["@babel/core 7.0.0 → 7.1.2"]
+
+    @pytest.mark.parametrize(
+        "path, body, expected",
+        [
+            (
+                "pnpm-lock.yaml",
+                "@@ -5,4 +5,4 @@\n packages:\n-  /lodash@4.17.20:\n+  /lodash@4.17.21:\n+  '@types/node@20.1.0':\n",
+                ["+ @types/node 20.1.0", "lodash 4.17.20 → 4.17.21"],
+            ),
+            (
+                "Gemfile.lock",
+                "@@ -3,4 +3,4 @@\n   specs:\n-    rails (7.0.1)\n+    rails (7.1.0)\n       actionpack (= 7.1.0)\n",
+                ["rails 7.0.1 → 7.1.0"],
+            ),
+            (
+                "go.sum",
+                "@@ -1,2 +1,2 @@\n-golang.org/x/net v0.17.0 h1:abc=\n-golang.org/x/net v0.17.0/go.mod h1:def=\n"
+                "+golang.org/x/net v0.19.0 h1:ghi=\n+golang.org/x/net v0.19.0/go.mod h1:jkl=\n",
+                ["golang.org/x/net v0.17.0 → v0.19.0"],
+            ),
+        ],
+    )
+    def test_single_line_formats(self, path, body, expected):
+        assert _rows(path, body) == expected
+
+    def test_hash_only_change(self):
+        body = (
+            '@@ -1,3 +1,3 @@\n name = "httpx"\n version = "0.28.1"\n-sdist = { hash = "a" }\n+sdist = { hash = "b" }\n'
+        )
+        summary = summarize_lockfile_section(parse_diff_section(_section("poetry.lock", body)))
+        assert summary.endswith("[Lockfile changed without package version changes]\n")
+
+
+def test_summaries_are_not_summarized_again():
+    summary = summarize_lockfile_section(parse_diff_section(_section("uv.lock", UV_LOCK)))
+    assert not is_lockfile_section(parse_diff_section(summary))
+    assert not is_lockfile_section(parse_diff_section(_section("generated.pb.go", UV_LOCK)))
+
+
+def test_line_filter_keeps_what_the_summary_needs():
+    keep = lockfile_line_filter("uv.lock")
+    assert keep is not None
+    assert lockfile_line_filter("setup.py") is None
+    kept = "".join(line for line in UV_LOCK.splitlines(keepends=True) if keep(line))
+    assert _rows("uv.lock", kept) == _rows("uv.lock", UV_LOCK)
+    assert "registry" not in kept
+
+
+def test_preprocess_summarizes_lockfiles():
+    filtered = filter_binary_and_minified(_section("uv.lock", UV_LOCK))
+    assert "httpx 0.27.0 → 0.28.1" in filtered
+    assert "[Lockfile/generated file change]" not in filtered
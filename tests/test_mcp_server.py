@@ -2,7 +2,9 @@
 
 from unittest.mock import MagicMock, patch
 
+from gac.errors import GitError
 from gac.git import GitCommandResult
+from gac.git_pool import RepositoryHead
 from gac.grouped_commit_workflow import WorkflowResult
 from gac.mcp.models import (
     CommitInfo,
@@ -14,11 +16,15 @@ from gac.mcp.models import (
 )
 from gac.mcp.server import gac_commit, gac_status
 from gac.mcp.server_utils import CommitListResult, FileStatus
+from tests.git_test_utils import fake_snapshot
 
 
 class TestGacStatus:
-    @patch("gac.mcp.server._check_git_repo", return_value=(False, "fatal: not a git repo"))
-    def test_not_in_git_repo(self, mock_check):
+    @patch(
+        "gac.mcp.server._git_pool.repository_head",
+        side_effect=GitError("Not in a git repository (exit code 128): fatal: not a git repo"),
+    )
+    def test_not_in_git_repo(self, mock_head):
         result = gac_status(StatusRequest())
         assert isinstance(result, StatusResult)
         assert result.is_repo is False
@@ -31,12 +37,10 @@ class TestGacStatus:
     @patch("gac.mcp.server._truncate_diff")
     @patch("gac.git.run_git_command")
     @patch("gac.mcp.server._get_file_status")
-    @patch("gac.git.get_current_branch", return_value="main")
-    @patch("gac.mcp.server._check_git_repo", return_value=(True, ""))
+    @patch("gac.mcp.server._git_pool.repository_head", return_value=RepositoryHead("/repo", "main"))
     def test_happy_path(
         self,
-        mock_check,
-        mock_branch,
+        mock_head,
         mock_file_status,
         mock_git_cmd,
         mock_truncate,
@@ -75,31 +79,29 @@ class TestGacStatus:
         "gac.mcp.server._get_file_status",
         return_value=FileStatus(staged=["a.py"], unstaged=[], untracked=[], conflicts=[]),
     )
-    @patch("gac.git.get_current_branch", return_value="dev")
-    @patch("gac.mcp.server._check_git_repo", return_value=(True, ""))
-    def test_diff_truncation(self, mock_check, mock_branch, mock_file_status, mock_git_cmd, mock_truncate):
+    @patch("gac.mcp.server._git_pool.repository_head", return_value=RepositoryHead("/repo", "dev"))
+    def test_diff_truncation(self, mock_head, mock_file_status, mock_git_cmd, mock_truncate):
         result = gac_status(StatusRequest(include_diff=True, max_diff_lines=3))
 
         assert result.diff_truncated is True
         assert "truncated" in result.summary.lower()
 
-    @patch("gac.mcp.server._check_git_repo", return_value=(True, ""))
-    def test_exception_handling(self, mock_check):
-        with patch("gac.git.get_current_branch", side_effect=RuntimeError("branch error")):
+    @patch("gac.mcp.server._git_pool.repository_head", return_value=RepositoryHead("/repo", "main"))
+    def test_exception_handling(self, mock_head):
+        with patch("gac.mcp.server._get_file_status", side_effect=RuntimeError("status error")):
             result = gac_status(StatusRequest())
 
         assert result.is_repo is True
         assert result.error is not None
-        assert "branch error" in result.error
+        assert "status error" in result.error
 
     @patch("gac.mcp.server._get_recent_commits")
     @patch(
         "gac.mcp.server._get_file_status",
         return_value=FileStatus(staged=["a.py"], unstaged=[], untracked=[], conflicts=[]),
     )
-    @patch("gac.git.get_current_branch", return_value="main")
-    @patch("gac.mcp.server._check_git_repo", return_value=(True, ""))
-    def test_history_error_surfaces_in_status_error(self, mock_check, mock_branch, mock_file_status, mock_commits):
+    @patch("gac.mcp.server._git_pool.repository_head", return_value=RepositoryHead("/repo", "main"))
+    def test_history_error_surfaces_in_status_error(self, mock_head, mock_file_status, mock_commits):
         """When _get_recent_commits fails, the error should appear in StatusResult.error."""
         mock_commits.return_value = CommitListResult(commits=[], error="git log failed: not a repo")
 
@@ -114,9 +116,8 @@ class TestGacStatus:
         "gac.mcp.server._get_file_status",
         return_value=FileStatus(staged=["a.py"], unstaged=[], untracked=[], conflicts=[], error="file status degraded"),
     )
-    @patch("gac.git.get_current_branch", return_value="main")
-    @patch("gac.mcp.server._check_git_repo", return_value=(True, ""))
-    def test_both_errors_combined_in_status(self, mock_check, mock_branch, mock_file_status, mock_commits):
+    @patch("gac.mcp.server._git_pool.repository_head", return_value=RepositoryHead("/repo", "main"))
+    def test_both_errors_combined_in_status(self, mock_head, mock_file_status, mock_commits):
         """When both file status and history fail, both errors appear in StatusResult.error."""
         mock_commits.return_value = CommitListResult(commits=[], error="git log failed")
 
@@ -127,17 +128,17 @@ class TestGacStatus:
         assert "git log failed" in result.error
 
     @patch("gac.git.run_git_command")
+    @patch("gac.mcp.server._git_pool.staged_snapshot", return_value=fake_snapshot(["a.py"], patch="+staged change"))
     @patch(
         "gac.mcp.server._get_file_status",
         return_value=FileStatus(staged=["a.py"], unstaged=[], untracked=[], conflicts=[]),
     )
-    @patch("gac.git.get_current_branch", return_value="main")
-    @patch("gac.mcp.server._check_git_repo", return_value=(True, ""))
-    def test_staged_only_diff(self, mock_check, mock_branch, mock_file_status, mock_git_cmd):
-        mock_git_cmd.return_value = GitCommandResult.ok("+staged change")
+    @patch("gac.mcp.server._git_pool.repository_head", return_value=RepositoryHead("/repo", "main"))
+    def test_staged_only_diff(self, mock_head, mock_file_status, mock_snapshot, mock_git_cmd):
         result = gac_status(StatusRequest(include_diff=True, staged_only=True, include_stats=False))
 
-        mock_git_cmd.assert_called_with(["diff", "--cached"])
+        mock_snapshot.assert_called_once()
+        mock_git_cmd.assert_not_called()
         assert result.diff == "+staged change"
 
     @patch("gac.git.run_git_command")
@@ -145,9 +146,8 @@ class TestGacStatus:
         "gac.mcp.server._get_file_status",
         return_value=FileStatus(staged=["a.py"], unstaged=[], untracked=[], conflicts=[]),
     )
-    @patch("gac.git.get_current_branch", return_value="main")
-    @patch("gac.mcp.server._check_git_repo", return_value=(True, ""))
-    def test_diff_head_when_not_staged_only(self, mock_check, mock_branch, mock_file_status, mock_git_cmd):
+    @patch("gac.mcp.server._git_pool.repository_head", return_value=RepositoryHead("/repo", "main"))
+    def test_diff_head_when_not_staged_only(self, mock_head, mock_file_status, mock_git_cmd):
         mock_git_cmd.return_value = GitCommandResult.ok("+change")
         gac_status(StatusRequest(include_diff=True, staged_only=False, include_stats=False))
 
@@ -157,9 +157,8 @@ class TestGacStatus:
         "gac.mcp.server._get_file_status",
         return_value=FileStatus(staged=[], unstaged=[], untracked=["extra.py"], conflicts=[]),
     )
-    @patch("gac.git.get_current_branch", return_value="main")
-    @patch("gac.mcp.server._check_git_repo", return_value=(True, ""))
-    def test_include_untracked_false(self, mock_check, mock_branch, mock_file_status):
+    @patch("gac.mcp.server._git_pool.repository_head", return_value=RepositoryHead("/repo", "main"))
+    def test_include_untracked_false(self, mock_head, mock_file_status):
         result = gac_status(StatusRequest(include_untracked=False))
 
         assert result.untracked_files == []
@@ -169,9 +168,8 @@ class TestGacStatus:
         "gac.mcp.server._get_file_status",
         return_value=FileStatus(staged=[], unstaged=[], untracked=[], conflicts=[]),
     )
-    @patch("gac.git.get_current_branch", return_value="main")
-    @patch("gac.mcp.server._check_git_repo", return_value=(True, ""))
-    def test_clean_repo(self, mock_check, mock_branch, mock_file_status):
+    @patch("gac.mcp.server._git_pool.repository_head", return_value=RepositoryHead("/repo", "main"))
+    def test_clean_repo(self, mock_head, mock_file_status):
         result = gac_status(StatusRequest())
 
         assert result.is_clean is True
@@ -182,9 +180,8 @@ class TestGacStatus:
         "gac.mcp.server._get_file_status",
         return_value=FileStatus(staged=["a.py"], unstaged=[], untracked=[], conflicts=[]),
     )
-    @patch("gac.git.get_current_branch", return_value="main")
-    @patch("gac.mcp.server._check_git_repo", return_value=(True, ""))
-    def test_no_diff_no_stats_no_history(self, mock_check, mock_branch, mock_file_status):
+    @patch("gac.mcp.server._git_pool.repository_head", return_value=RepositoryHead("/repo", "main"))
+    def test_no_diff_no_stats_no_history(self, mock_head, mock_file_status):
         result = gac_status(StatusRequest(include_diff=False, include_stats=False, include_history=0))
 
         assert result.diff is None
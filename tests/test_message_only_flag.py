@@ -4,6 +4,7 @@ import pytest
 from click.testing import CliRunner
 
 from gac.cli import cli
+from tests.git_test_utils import fake_snapshot
 
 
 class TestMessageOnlyFlag:
@@ -59,6 +60,10 @@ class TestMessageOnlyFlag:
         monkeypatch.setattr(
             "gac.git.get_staged_status", lambda: "On branch main\nChanges to be committed:\n  modified:   test.py"
         )
+        monkeypatch.setattr(
+            "gac.git_state_validator.get_repo_snapshot",
+            lambda: fake_snapshot(["test.py"], patch="diff --git a/test.py b/test.py\n@@ -1 +1 @@\n-old\n+new"),
+        )
 
         # Mock generate_commit_message to return a predictable message
         def mock_generate_commit_message(**kwargs):
@@ -180,6 +185,7 @@ class TestMessageOnlyFlag:
             return []
 
         monkeypatch.setattr("gac.git.get_staged_files", mock_get_staged_files)
+        monkeypatch.setattr("gac.git_state_validator.get_repo_snapshot", lambda: fake_snapshot([]))
 
         result = runner.invoke(cli, ["--message-only", "--yes"])
 
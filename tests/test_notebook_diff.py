@@ -0,0 +1,107 @@
+"""Tests for condensing Jupyter notebook diffs."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from gac.diff_sections import parse_diff
+from gac.notebook_diff import condense_notebook_section, is_notebook_section
+from gac.preprocess import filter_binary_and_minified, process_section
+from tests.conftest import git
+
+
+def _notebook(cells: list[dict]) -> dict:
+    return {"cells": cells, "metadata": {"kernelspec": {"name": "python3"}}, "nbformat": 4, "nbformat_minor": 5}
+
+
+def _code(source: str, count: int, image: str | None = None) -> dict:
+    outputs = [{"output_type": "display_data", "data": {"image/png": image}, "metadata": {}}] if image else []
+    return {
+        "cell_type": "code",
+        "execution_count": count,
+        "metadata": {},
+        "outputs": outputs,
+        "source": source.splitlines(keepends=True),
+    }
+
+
+def _markdown(source: str) -> dict:
+    return {"cell_type": "markdown", "metadata": {}, "source": source.splitlines(keepends=True)}
+
+
+@pytest.fixture()
+def notebook_diff(git_repo):
+    """Stage a re-run notebook with one edited, one deleted and one added cell."""
+    path = git_repo / "analysis.ipynb"
+    cells = [
+        _markdown("# Analysis\n"),
+        _code("import pandas as pd\ndf = load()\nprint(df)\n", 1, "iVBORw0KGgo" * 300),
+        _code("x = 1\n", 2),
+        _code("cleanup()\n", 3),
+    ]
+    path.write_text(json.dumps(_notebook(cells), indent=1))
+    git("add", ".")
+    git("commit", "-m", "initial")
+
+    cells[1] = _code("import pandas as pd\ndf = load(cache=True)\nprint(df)\n", 5, "R0lGODlhAQAB" * 300)
+    cells[2]["execution_count"] = 6
+    cells[3] = _markdown("## Results\n")
+    path.write_text(json.dumps(_notebook(cells), indent=1))
+    git("add", ".")
+    return git("diff", "--staged")
+
+
+class TestCondenseNotebookSection:
+    def test_lists_changed_cells_from_blobs(self, notebook_diff):
+        section = parse_diff(notebook_diff)[0]
+        assert is_notebook_section(section)
+
+        condensed = condense_notebook_section(section)
+
+        assert condensed.startswith("diff --git a/analysis.ipynb b/analysis.ipynb\nindex ")
+        assert "@@ cell 2 (code) modified @@\n import pandas as pd\n-df = load()\n+df = load(cache=True)\n" in condensed
+        assert "@@ cell 4 (code) deleted @@\n-cleanup()\n" in condensed
+        assert "@@ cell 4 (markdown) added @@\n+## Results\n" in condensed
+        assert "[Outputs or execution counts changed in cells 2, 3]" in condensed
+        assert "iVBORw0KGgo" not in condensed
+        assert "execution_count" not in condensed
+
+    def test_condenses_hunks_without_blobs(self, notebook_diff, monkeypatch):
+        monkeypatch.chdir(os.path.dirname(os.getcwd()))
+        section = parse_diff(notebook_diff.replace("index ", "index 1", 1))[0]
+
+        condensed = condense_notebook_section(section)
+
+        assert "-df = load()\n+df = load(cache=True)\n" in condensed
+        assert "(markdown cell) @@\n+## Results\n" in condensed
+        assert "output or execution count lines changed]" in condensed
+        assert "iVBORw0KGgo" not in condensed
+
+    def test_metadata_only_change(self, notebook_diff):
+        git("commit", "-m", "rerun")
+        notebook = json.loads(git("show", "HEAD:analysis.ipynb"))
+        notebook["metadata"]["kernelspec"]["name"] = "python3.12"
+        with open("analysis.ipynb", "w") as f:
+            json.dump(notebook, f, indent=1)
+        git("add", ".")
+
+        condensed = condense_notebook_section(parse_diff(git("diff", "--staged"))[0])
+
+        assert condensed.endswith("[Metadata changed: notebook]\n")
+
+
+def test_preprocess_condenses_notebooks(notebook_diff):
+    python_diff = "diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n@@ -1 +1 @@\n-a = 1\n+a = 2\n"
+    diff = notebook_diff + python_diff
+
+    filtered = filter_binary_and_minified(diff)
+    assert "@@ cell 2 (code) modified @@" in filtered
+    assert "[Minified file change]" not in filtered
+    assert filtered.endswith(python_diff)
+
+    processed = process_section(parse_diff(diff)[0])
+    assert processed is not None
+    assert [offset > 0 for offset in processed.hunk_offsets] == [True, True, True]
@@ -0,0 +1,118 @@
+"""Tests for building grouped commits from a temporary index."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from gac.errors import GitError
+from gac.plumbing_commits import TreeCommitBuilder
+from tests.conftest import git, init_repo
+
+
+@pytest.fixture()
+def git_repo(git_repo):
+    (git_repo / "keep.txt").write_text("keep\n")
+    (git_repo / "old.py").write_text("def f():\n    return 1\n")
+    (git_repo / "gone.txt").write_text("bye\n")
+    git("add", ".")
+    git("commit", "-m", "initial")
+    return git_repo
+
+
+def _files_in(commit: str) -> list[str]:
+    return git("diff-tree", "--no-commit-id", "--name-only", "-r", "--root", commit).splitlines()
+
+
+def test_builds_chain_and_moves_branch_once(git_repo):
+    (git_repo / "a.py").write_text("a = 1\n")
+    (git_repo / "b.py").write_text("b = 1\n")
+    (git_repo / "unstaged.txt").write_text("not staged\n")
+    git("add", "a.py", "b.py")
+    index_before = git("ls-files", "--stage").strip()
+    head = git("rev-parse", "HEAD").strip()
+
+    with TreeCommitBuilder() as builder:
+        first = builder.commit(["a.py"], "feat: a")
+        second = builder.commit(["b.py"], "feat: b")
+        assert git("rev-parse", "HEAD").strip() == head
+        builder.publish()
+
+    assert git("rev-parse", "HEAD").strip() == second
+    assert git("rev-parse", f"{second}^").strip() == first
+    assert git("rev-parse", f"{first}^").strip() == head
+    assert _files_in(first) == ["a.py"]
+    assert _files_in(second) == ["b.py"]
+    assert git("log", "-1", "--format=%s").strip() == "feat: b"
+    # The real index is untouched and now matches HEAD
+    assert git("ls-files", "--stage").strip() == index_before
+    assert git("diff", "--cached", "--name-only").strip() == ""
+    assert not [p for p in os.listdir(git_repo / ".git") if p.startswith("gac-index-")]
+
+
+def test_deletions_and_renames(git_repo):
+    git("rm", "-q", "gone.txt")
+    git("mv", "old.py", "new.py")
+
+    with TreeCommitBuilder() as builder:
+        removal = builder.commit(["gone.txt"], "chore: remove")
+        rename = builder.commit(["new.py", "old.py"], "refactor: rename")
+        builder.publish()
+
+    assert git("diff-tree", "--no-commit-id", "--name-status", "-r", removal).strip() == "D\tgone.txt"
+    assert git("diff-tree", "--no-commit-id", "--name-status", "-r", "-M", rename).strip() == "R100\told.py\tnew.py"
+
+
+def test_failure_leaves_branch_and_index_alone(git_repo):
+    (git_repo / "a.py").write_text("a = 1\n")
+    git("add", "a.py")
+    head = git("rev-parse", "HEAD").strip()
+
+    with TreeCommitBuilder() as builder:
+        builder.commit(["a.py"], "feat: a")
+        with pytest.raises(GitError, match="Nothing to commit"):
+            builder.commit(["keep.txt"], "chore: unchanged")
+
+    assert git("rev-parse", "HEAD").strip() == head
+    assert git("diff", "--cached", "--name-only").strip() == "a.py"
+
+
+def test_publish_refuses_moved_head(git_repo):
+    (git_repo / "a.py").write_text("a = 1\n")
+    git("add", "a.py")
+
+    with TreeCommitBuilder() as builder:
+        builder.commit(["a.py"], "feat: a")
+        git("commit", "-q", "--allow-empty", "-m", "concurrent")
+        with pytest.raises(GitError, match="update-ref"):
+            builder.publish()
+
+    assert git("log", "-1", "--format=%s").strip() == "concurrent"
+
+
+def test_signoff(git_repo):
+    (git_repo / "a.py").write_text("a = 1\n")
+    git("add", "a.py")
+
+    with TreeCommitBuilder(signoff=True) as builder:
+        builder.commit(["a.py"], "feat: a")
+        builder.publish()
+
+    assert git("log", "-1", "--format=%B").strip().endswith("Signed-off-by: Test <test@test.com>")
+
+
+def test_initial_commit(tmp_path, monkeypatch):
+    init_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 1\n")
+    git("add", ".")
+
+    with TreeCommitBuilder() as builder:
+        builder.commit(["a.py"], "feat: a")
+        builder.commit(["b.py"], "feat: b")
+        builder.publish()
+
+    assert git("log", "--format=%s").strip() == "feat: b\nfeat: a"
+    assert git("diff", "--cached", "--name-only").strip() == ""
@@ -1,16 +1,22 @@
 """Tests for the diff preprocessing functionality."""
 
+import re
 from unittest.mock import patch
 
+from gac.ai_utils import count_tokens
 from gac.preprocess import (
     analyze_code_patterns,
     calculate_section_importance,
+    estimate_entry_importance,
+    estimate_entry_tokens,
     extract_binary_file_summary,
     extract_filtered_file_summary,
     filter_binary_and_minified,
     get_extension_score,
+    is_filtered_filename,
     is_lockfile_or_generated,
     is_minified_content,
+    plan_diff_from_numstat,
     preprocess_diff,
     process_section,
     process_sections_parallel,
@@ -19,6 +25,7 @@ from gac.preprocess import (
     smart_truncate_diff,
     split_diff_into_sections,
 )
+from gac.repo_snapshot import StagedEntry
 
 
 class TestPreprocessModule:
@@ -388,6 +395,30 @@ diff --git a/README.md b/README.md
         s2 = calculate_section_importance(sec2)
         assert s1 > s2
 
+    def test_pattern_multiplier_cap_changes_ranking(self):
+        # A JavaScript file touching every kind of pattern used to outrank a new Python class
+        js = (
+            "diff --git a/queue.js b/queue.js\n--- a/queue.js\n+++ b/queue.js\n@@ -1,1 +1,8 @@\n"
+            "+import api from './api'\n+class Queue {\n+  function flush(items) {\n"
+            "+    // TODO batch requests\n+    for (const item of items) {\n"
+            "+      try {\n+        return await api.send(item)\n+      } catch (e) {}\n"
+        )
+        py = (
+            "diff --git a/models.py b/models.py\n--- a/models.py\n+++ b/models.py\n@@ -1,1 +1,8 @@\n"
+            "+class Order:\n+    def total(self):\n+        value = self.price\n+        value *= self.quantity\n"
+            "+        value -= self.discount\n+        value += self.tax\n+        value = round(value, 2)\n"
+            "+        self.cached = value\n"
+        )
+        uncapped = {
+            name: get_extension_score(name) * analyze_code_patterns(text)
+            for name, text in (("queue.js", js), ("models.py", py))
+        }
+        assert uncapped["queue.js"] > uncapped["models.py"]
+
+        ranked = [re.match(r"diff --git a/(\S+)", section).group(1) for section, _ in score_sections([js, py])]
+
+        assert ranked == ["models.py", "queue.js"]
+
     def test_filter_binary_and_minified(self):
         # Make minified content long enough to trigger is_minified_content
         minified_content = "+" + ("a" * 1200)
@@ -431,3 +462,197 @@ diff --git a/README.md b/README.md
         assert "min.js" in result
         # Should use some default change type indicator
         assert "[Filtered file change]" in result or "[Minified file change]" in result or "[File change]" in result
+
+
+class TestNumstatPlanning:
+    """Test choosing files from numstat counts before fetching patches."""
+
+    def test_is_filtered_filename(self):
+        assert is_filtered_filename("yarn.lock")
+        assert is_filtered_filename("web/dist/app.js")
+        assert is_filtered_filename("app.min.js")
+        assert not is_filtered_filename("src/app.py")
+
+    def test_estimates_grow_with_changes(self):
+        small = StagedEntry("M", "a.py", None, 1, 0)
+        large = StagedEntry("M", "a.py", None, 100, 20)
+
+        assert estimate_entry_tokens(large) > estimate_entry_tokens(small)
+        assert estimate_entry_importance(large) > estimate_entry_importance(small)
+        assert estimate_entry_importance(StagedEntry("A", "a.py", None, 1, 0)) > estimate_entry_importance(small)
+
+    def test_plan_prefers_important_files_within_budget(self):
+        entries = [
+            StagedEntry("M", "docs/notes.txt", None, 40, 0),
+            StagedEntry("M", "src/core.py", None, 40, 0),
+            StagedEntry("M", "src/util.py", None, 10, 2),
+        ]
+
+        plan = plan_diff_from_numstat(entries, token_limit=950)
+
+        assert [e.path for e in plan.included] == ["src/core.py", "src/util.py"]
+        assert [e.path for e in plan.omitted] == ["docs/notes.txt"]
+        assert plan.estimated_tokens == estimate_entry_tokens(entries[1]) + estimate_entry_tokens(entries[2])
+
+    def test_plan_skips_files_preprocessing_would_summarize(self):
+        entries = [
+            StagedEntry("M", "poetry.lock", None, 5, 5),
+            StagedEntry("M", "logo.png", None, None, None),
+            StagedEntry("M", "main.py", None, 5, 5),
+        ]
+
+        plan = plan_diff_from_numstat(entries, token_limit=10000)
+
+        assert [e.path for e in plan.included] == ["main.py"]
+        assert [e.path for e in plan.omitted] == ["poetry.lock", "logo.png"]
+
+    def test_plan_skips_excluded_files(self):
+        entries = [StagedEntry("M", "api/client_pb2.py", None, 5, 5), StagedEntry("M", "main.py", None, 5, 5)]
+
+        plan = plan_diff_from_numstat(entries, token_limit=10000, excluded={"api/client_pb2.py"})
+
+        assert [e.path for e in plan.included] == ["main.py"]
+
+    def test_pathspecs_include_rename_sources(self):
+        entries = [StagedEntry("R", "new.py", "old.py", 1, 1)]
+
+        assert plan_diff_from_numstat(entries, token_limit=1000).pathspecs == ["new.py", "old.py"]
+
+
+class TestCodePatternPrefilter:
+    """analyze_code_patterns must score exactly like searching every pattern."""
+
+    LINES = [
+        "+class Foo:",
+        "+    def bar(self):",
+        "+import os",
+        "+importlib.reload(x)",
+        "+from a import b",
+        "+    public static void",
+        '+  "dependencies": {',
+        '+version = "1.2.3"',
+        "+    if (x) {",
+        "+    except ValueError:",
+        "+        return value",
+        "+    await thing()",
+        "+    # TODO: later",
+        "+// FIXME",
+        '+    """Docstring."""',
+        "+    it('works', () => {",
+        "+    assertEqual(a, b)",
+        "++return 1",
+        "+x = a +return b",
+        "+    # plain comment",
+        " context return x",
+        "-    def removed(self):",
+    ]
+
+    @staticmethod
+    def _reference(section: str) -> float:
+        import re
+
+        from gac.constants import CodePatternImportance
+
+        score = 1.0
+        found = False
+        for pattern, multiplier in CodePatternImportance.PATTERNS.items():
+            if re.search(pattern, section, re.MULTILINE):
+                score *= multiplier
+                found = True
+        return score if found else score * 0.9
+
+    def test_each_line_matches_reference(self):
+        for line in self.LINES:
+            assert analyze_code_patterns(line) == self._reference(line), line
+
+    def test_combinations_match_reference(self):
+        for start in range(len(self.LINES)):
+            section = "\n".join(self.LINES[start:] + self.LINES[: start // 2])
+            assert analyze_code_patterns(section) == self._reference(section)
+
+
+class TestHunkTruncation:
+    """smart_truncate_diff keeps the most valuable hunks of every file it can."""
+
+    @staticmethod
+    def _section(path: str, hunks: list[str]) -> str:
+        text = f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n"
+        for number, body in enumerate(hunks):
+            text += f"@@ -{number * 100},3 +{number * 100},3 @@\n{body}"
+        return text
+
+    def test_large_file_is_cut_to_hunks_and_others_kept(self):
+        big = self._section("core.py", [f"+x{i} = {i}\n" * 40 for i in range(20)])
+        small = self._section("util.py", ["+def helper():\n+    return 1\n"])
+        readme = self._section("README.md", ["+More docs\n"])
+
+        result = smart_truncate_diff([(big, 10.0), (small, 5.0), (readme, 1.0)], 600, "test:model")
+
+        assert "core.py" in result and "util.py" in result and "README.md" in result
+        assert "hunks omitted due to token limits" in result
+        assert "Skipped files" not in result
+        assert count_tokens(result, "test:model") <= 600
+
+    def test_prefers_hunks_with_important_code(self):
+        plain = "".join(f"+value_{i} = {i}\n" for i in range(30))
+        structural = "+class Handler:\n+    def handle(self, request):\n+        return request\n" + plain[:600]
+        section = self._section("app.py", [plain, plain, structural, plain])
+
+        result = smart_truncate_diff([(section, 5.0)], 400, "test:model")
+
+        assert "class Handler" in result
+        assert "hunks omitted" in result
+
+    def test_hunks_stay_in_file_order(self):
+        hunks = [f"+line_{i} = {i}\n" * (5 + i) for i in range(6)]
+        section = self._section("order.py", hunks)
+
+        result = smart_truncate_diff([(section, 1.0)], 100, "test:model")
+
+        positions = [int(m) for m in re.findall(r"^@@ -(\d+),", result, re.MULTILINE)]
+        assert positions == sorted(positions)
+        assert len(positions) >= 1
+
+    def test_file_with_no_fitting_hunk_keeps_header(self):
+        important = self._section("core.py", ["+def run():\n+    return 1\n"])
+        hunks = ["".join(f"+row_{i}_{j} = {j}\n" for j in range(200)) for i in range(3)]
+        data = self._section("data.txt", hunks)
+
+        result = smart_truncate_diff([(important, 10.0), (data, 1.0)], 300, "test:model", summarize_python=False)
+
+        assert "diff --git a/data.txt b/data.txt" in result
+        assert "[2 of 3 hunks omitted due to token limits]" in result
+        assert "[rest of hunk omitted due to token limits]" in result
+        assert "Skipped files" not in result
+        assert count_tokens(result, "test:model") <= 300
+
+    def test_single_oversized_hunk_is_cut_to_its_leading_lines(self):
+        lines = [f"+entry_{i} = {i}\n" for i in range(500)]
+        section = self._section("table.txt", ["".join(lines)])
+
+        result = smart_truncate_diff([(section, 1.0)], 200, "test:model")
+
+        assert result.startswith("diff --git a/table.txt b/table.txt\n")
+        assert "@@ -0,3 +0,3 @@\n+entry_0 = 0\n" in result
+        assert "entry_499" not in result
+        assert result.endswith("[rest of hunk omitted due to token limits]\n")
+        assert count_tokens(result, "test:model") <= 200
+
+    def test_knapsack_matches_brute_force(self):
+        import itertools
+
+        from gac.preprocess import _knapsack
+
+        items = [(6.0, 5), (5.0, 4), (4.0, 3), (3.0, 2), (1.5, 1), (7.0, 7)]
+        capacity = 10
+
+        chosen = _knapsack(items, capacity)
+
+        best = max(
+            sum(items[i][0] for i in combo)
+            for size in range(len(items) + 1)
+            for combo in itertools.combinations(range(len(items)), size)
+            if sum(items[i][1] for i in combo) <= capacity
+        )
+        assert sum(items[i][1] for i in chosen) <= capacity
+        assert sum(items[i][0] for i in chosen) == best
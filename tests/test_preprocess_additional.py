@@ -116,12 +116,10 @@ new file mode 100644
     def test_should_filter_section_binary_pattern_matched(self):
         """Test should_filter_section with binary pattern match."""
         binary_section = """diff --git a/image.png b/image.png
-Binary file
+Binary files a/image.png and b/image.png differ
 """
 
-        with mock.patch("gac.preprocess.FilePatterns.BINARY", [r"Binary file"]):
-            result = should_filter_section(binary_section)
-            assert result is True
+        assert should_filter_section(binary_section) is True
 
     def test_should_filter_section_minified_extension(self):
         """Test should_filter_section with minified extension."""
@@ -334,18 +332,18 @@ deleted file mode 100644
         assert result == ""
 
     def test_smart_truncate_diff_high_token_limit(self):
-        """Test smart_truncate_diff with high token limit (lines 488-509)."""
+        """Test smart_truncate_diff keeps every section that fits the limit."""
         sections = [
-            ("section1", 1.0),
-            ("section2", 2.0),
-            ("section3", 0.5),
+            ("diff --git a/section1.py b/section1.py\n+one\n", 1.0),
+            ("diff --git a/section2.py b/section2.py\n+two\n", 2.0),
+            ("diff --git a/section3.py b/section3.py\n+three\n", 0.5),
         ]
 
         result = smart_truncate_diff(sections, 1000, "test-model")
-        # Should include all sections without complex processing
         assert "section1" in result
         assert "section2" in result
         assert "section3" in result
+        assert "Skipped" not in result
 
     def test_smart_truncate_diff_no_file_match(self):
         """Test smart_truncate_diff with sections that don't match file pattern."""
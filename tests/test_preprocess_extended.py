@@ -25,7 +25,7 @@ class TestPreprocessDiffMainFunction:
     """Test the main preprocess_diff function edge cases."""
 
     @patch("gac.preprocess.count_tokens")
-    @patch("gac.preprocess.split_diff_into_sections")
+    @patch("gac.preprocess.parse_diff")
     @patch("gac.preprocess.process_sections_parallel")
     @patch("gac.preprocess.score_sections")
     @patch("gac.preprocess.smart_truncate_diff")
@@ -310,18 +310,19 @@ class TestSmartTruncationEdgeCases:
 
     @patch("gac.preprocess.count_tokens")
     def test_smart_truncate_diff_high_token_limit(self, mock_count):
-        """Test truncation with very high token limit (special case)."""
+        """Test truncation with a limit that every section fits in."""
         sections = [
-            ("section1", 5.0),
-            ("section2", 3.0),
+            ("diff --git a/section1.py b/section1.py\n+one\n", 5.0),
+            ("diff --git a/section2.py b/section2.py\n+two\n", 3.0),
         ]
+        mock_count.return_value = 10
 
         result = smart_truncate_diff(sections, token_limit=1000, model="test:model")
 
         # Should include all sections when limit is high
         assert "section1" in result
         assert "section2" in result
-        mock_count.assert_not_called()  # Special case should skip counting
+        assert mock_count.call_count == 2  # One count per file
 
     @patch("gac.preprocess.count_tokens")
     def test_smart_truncate_diff_empty_sections(self, mock_count):
@@ -567,3 +568,96 @@ class TestSmartTruncateDiffSkippedSummaries:
         result = smart_truncate_diff(scored_sections, token_limit=300, model="test:model")
         assert "Summary:" in result
         assert "Showing" in result
+
+
+class TestParallelSections:
+    """Large diffs are spread over the shared section pool without changing results."""
+
+    SECTIONS = [
+        f"diff --git a/file{i}.{'py' if i % 3 else 'md'} b/file{i}.{'py' if i % 3 else 'md'}\n"
+        f"@@ -1 +1,{i % 7 + 1} @@\n" + "".join(f"+def f{j}():\n" for j in range(i % 7 + 1))
+        for i in range(40)
+    ]
+
+    @staticmethod
+    def _slow_first(executor_map):
+        """Wrap a thread pool's map so early items finish last."""
+        import time
+
+        def map_(func, items, chunksize=1):
+            items = list(items)
+
+            def delayed(index_item):
+                index, item = index_item
+                time.sleep(0.001 * (len(items) - index))
+                return func(item)
+
+            return executor_map(delayed, list(enumerate(items)))
+
+        return map_
+
+    def test_results_keep_section_order(self):
+        import concurrent.futures
+
+        import gac.preprocess as preprocess
+
+        expected_processed = process_sections_parallel(self.SECTIONS)
+        expected_scored = score_sections(self.SECTIONS)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            executor.map = self._slow_first(executor.map)  # type: ignore[method-assign]
+            with (
+                patch.object(preprocess, "_section_executor", return_value=executor),
+                patch.object(preprocess.Utility, "MAX_WORKERS", 4),
+                patch.object(preprocess.Utility, "PARALLEL_MIN_SECTIONS", 2),
+                patch.object(preprocess, "_free_threaded", return_value=True),
+                patch.object(preprocess.Utility, "FREE_THREADED_MIN_CHARS", 1),
+            ):
+                assert process_sections_parallel(self.SECTIONS) == expected_processed
+                assert score_sections(self.SECTIONS) == expected_scored
+
+    def test_small_diffs_stay_in_process(self):
+        import gac.preprocess as preprocess
+
+        with patch.object(preprocess, "_section_executor") as mock_executor:
+            process_sections_parallel(self.SECTIONS)
+            score_sections(self.SECTIONS)
+
+        mock_executor.assert_not_called()
+
+    def test_gil_builds_stay_in_process(self):
+        import gac.preprocess as preprocess
+
+        with (
+            patch.object(preprocess, "_section_executor") as mock_executor,
+            patch.object(preprocess, "_free_threaded", return_value=False),
+            patch.object(preprocess.Utility, "MAX_WORKERS", 4),
+            patch.object(preprocess.Utility, "PARALLEL_MIN_SECTIONS", 2),
+            patch.object(preprocess.Utility, "FREE_THREADED_MIN_CHARS", 1),
+        ):
+            process_sections_parallel(self.SECTIONS)
+            score_sections(self.SECTIONS)
+
+        mock_executor.assert_not_called()
+
+    def test_broken_pool_falls_back_in_process(self):
+        import concurrent.futures
+
+        import gac.preprocess as preprocess
+
+        with (
+            patch.object(preprocess, "_section_executor") as mock_executor,
+            patch.object(preprocess, "_parallel_broken", False),
+            patch.object(preprocess.Utility, "MAX_WORKERS", 4),
+            patch.object(preprocess.Utility, "PARALLEL_MIN_SECTIONS", 2),
+            patch.object(preprocess, "_free_threaded", return_value=True),
+            patch.object(preprocess.Utility, "FREE_THREADED_MIN_CHARS", 1),
+        ):
+            mock_executor.return_value.map.side_effect = concurrent.futures.BrokenExecutor("gone")
+            result = process_sections_parallel(self.SECTIONS)
+            assert preprocess._parallel_broken is True
+            assert mock_executor.return_value.map.call_count == 1
+            process_sections_parallel(self.SECTIONS)
+            assert mock_executor.return_value.map.call_count == 1
+
+        assert result == self.SECTIONS
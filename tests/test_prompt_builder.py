@@ -78,6 +78,14 @@ class TestPromptBuilder:
         mock_console.print.assert_called_once()
         mock_panel.assert_called_once()
 
+    @patch("gac.prompt_builder.Panel")
+    @patch("gac.prompt_builder.console")
+    def test_display_prompts_with_diff_context(self, mock_console, mock_panel, builder):
+        """Test that the chosen diff context is shown after the prompts."""
+        builder.display_prompts("system", "user", "no context for 2 files")
+
+        assert mock_panel.call_args[0][0].endswith("\n\nDIFF CONTEXT:\nno context for 2 files")
+
     def test_build_prompts_with_language_override(self, builder, mock_git_state):
         """Test building prompts with language override."""
         with patch("gac.prompt.build_prompt") as mock_build_prompt:
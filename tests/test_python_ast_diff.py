@@ -0,0 +1,149 @@
+"""Tests for summarizing Python diffs from their syntax trees."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from gac import python_ast_diff
+from gac.diff_sections import parse_diff
+from gac.preprocess import smart_truncate_diff
+from gac.python_ast_diff import describe_python_changes, python_change_summary, summarize_python_section
+from tests.conftest import git
+
+OLD_SOURCE = '''"""Client module."""
+
+import os
+
+TIMEOUT = 10
+
+
+def load(path):
+    return open(path).read()
+
+
+def legacy():
+    pass
+
+
+class Client(Base):
+    retries = 3
+
+    def send(self, request):
+        return request
+
+    @staticmethod
+    def close():
+        pass
+'''
+
+NEW_SOURCE = '''"""Client module."""
+
+import os
+import json
+
+TIMEOUT = 30
+
+
+def load(path, *, strict=False) -> str:
+    return open(path).read()
+
+
+class Client(Base, Mixin):
+    retries = 3
+
+    def send(self, request):
+        return json.dumps(request)
+
+    def close(self):
+        pass
+
+    async def stream(self, request):
+        yield request
+'''
+
+
+@pytest.fixture(autouse=True)
+def _empty_memory_cache(monkeypatch):
+    monkeypatch.setattr(python_ast_diff, "_memory_cache", {})
+
+
+@pytest.fixture()
+def python_diff(git_repo):
+    """Stage a rewrite of a Python module in a temporary repository."""
+    (git_repo / "client.py").write_text(OLD_SOURCE)
+    git("add", ".")
+    git("commit", "-m", "initial")
+    (git_repo / "client.py").write_text(NEW_SOURCE)
+    git("add", ".")
+    return git("diff", "--staged")
+
+
+class TestDescribePythonChanges:
+    def test_definition_changes(self):
+        changes = describe_python_changes(OLD_SOURCE, NEW_SOURCE)
+
+        assert changes == [
+            "changed signature of load: (path) -> (path, *, strict=False) -> str",
+            "removed function legacy()",
+            "changed bases of Client: (Base) -> (Base, Mixin)",
+            "modified method Client.send",
+            "changed signature of Client.close: () -> (self)",
+            "changed decorators of Client.close: @staticmethod -> none",
+            "added async method Client.stream(self, request)",
+            "added import json",
+            "changed module-level TIMEOUT",
+        ]
+
+    def test_added_file(self):
+        assert describe_python_changes("", "class A:\n    def f(self, x):\n        pass\n") == [
+            "added class A",
+            "added method A.f(self, x)",
+        ]
+
+    def test_syntax_error(self):
+        assert describe_python_changes("def f(:\n", "x = 1\n") is None
+
+
+class TestPythonChangeSummary:
+    def test_summarizes_from_blobs_and_caches(self, python_diff):
+        section = parse_diff(python_diff)[0]
+
+        summary = summarize_python_section(section)
+
+        assert summary is not None
+        assert summary.startswith("[Python changes]\n")
+        assert "removed function legacy()\n" in summary
+        cache_file = os.path.join(".git", "gac", python_ast_diff.CACHE_FILENAME)
+        with open(cache_file, encoding="utf-8") as f:
+            cached = json.load(f)
+        assert [entry["lines"] for entry in cached.values()] == [python_change_summary(section)]
+
+    def test_reuses_cached_summary_without_reading_blobs(self, python_diff, monkeypatch):
+        section = parse_diff(python_diff)[0]
+        first = python_change_summary(section)
+        monkeypatch.setattr(python_ast_diff, "_memory_cache", {})
+
+        def fail(*args, **kwargs):
+            raise AssertionError("blobs read again")
+
+        monkeypatch.setattr(python_ast_diff, "_read_source", fail)
+        assert python_change_summary(section) == first
+
+    def test_unreadable_blobs(self, python_diff):
+        section = parse_diff(python_diff.replace("index ", "index 1", 1))[0]
+        assert python_change_summary(section) is None
+
+
+def test_truncation_summarizes_python_file_that_does_not_fit(python_diff):
+    sections = [(section, 1.0) for section in parse_diff(python_diff)]
+
+    truncated = smart_truncate_diff(sections, 150, "openai:gpt-4o-mini")
+    assert truncated.startswith("diff --git a/client.py b/client.py\n")
+    assert "[Python changes]\n" in truncated
+    assert "return json.dumps(request)" not in truncated
+
+    without_summary = smart_truncate_diff(sections, 150, "openai:gpt-4o-mini", summarize_python=False)
+    assert "[Python changes]" not in without_summary
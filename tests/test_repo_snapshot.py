@@ -0,0 +1,263 @@
+"""Tests for the single-pass staged RepoSnapshot."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from gac.errors import GitError
+from gac.git import get_staged_files, get_staged_status
+from gac.repo_snapshot import (
+    StagedEntry,
+    format_numstat,
+    get_repo_snapshot,
+    invalidate_repo_snapshot,
+    parse_snapshot_output,
+    peek_repo_snapshot,
+)
+from tests.conftest import git
+
+
+@pytest.fixture()
+def git_repo(git_repo):
+    """Create a repo with a text file, a binary file and a file to rename."""
+    (git_repo / "f1.txt").write_text("a\nb\nc\n")
+    (git_repo / "old.txt").write_text("rename me\n")
+    (git_repo / "b.bin").write_bytes(b"bin\0ary")
+    git("add", ".")
+    git("commit", "-m", "initial")
+    return git_repo
+
+
+class TestParseSnapshotOutput:
+    def test_empty_output(self):
+        assert parse_snapshot_output("") == ((), "")
+
+    def test_raw_numstat_and_patch(self):
+        output = (
+            ":100644 100644 de98044 a7bc997 M\0f1.txt\0"
+            ":000000 100644 0000000 3e75765 A\0n.py\0"
+            ":100644 100644 587be6b 587be6b R100\0old.txt\0new name.txt\0"
+            ":100644 100644 87ae6b6 22f6b3b M\0b.bin\0"
+            "2\t1\tf1.txt\0"
+            "1\t0\tn.py\0"
+            "0\t0\t\0old.txt\0new name.txt\0"
+            "-\t-\tb.bin\0"
+            "\0diff --git a/f1.txt b/f1.txt\n+B\n"
+        )
+
+        entries, patch_text = parse_snapshot_output(output)
+
+        assert entries == (
+            StagedEntry("M", "f1.txt", None, 2, 1),
+            StagedEntry("A", "n.py", None, 1, 0),
+            StagedEntry("R", "new name.txt", "old.txt", 0, 0),
+            StagedEntry("M", "b.bin", None, None, None),
+        )
+        assert entries[3].is_binary
+        assert patch_text == "diff --git a/f1.txt b/f1.txt\n+B"
+
+
+class TestFormatNumstat:
+    def test_empty(self):
+        assert format_numstat([]) == ""
+
+    def test_text_binary_and_rename(self):
+        stat = format_numstat(
+            [
+                StagedEntry("M", "src/app.py", None, 3, 1),
+                StagedEntry("M", "logo.png", None, None, None),
+                StagedEntry("R", "b.txt", "a.txt", 0, 0),
+            ]
+        )
+
+        lines = stat.split("\n ")
+        assert lines[0].startswith("src/app.py")
+        assert lines[0].endswith("| 4 +++-")
+        assert "| Bin" in lines[1]
+        assert lines[2].startswith("a.txt => b.txt")
+        assert lines[-1] == "3 files changed, 3 insertions(+), 1 deletion(-)"
+
+    def test_large_counts_are_scaled(self):
+        stat = format_numstat([StagedEntry("M", "big.py", None, 1000, 0)])
+        assert stat.splitlines()[0].count("+") == 50
+
+
+class TestGetRepoSnapshot:
+    def test_captures_staged_state_in_one_diff(self, git_repo):
+        (git_repo / "f1.txt").write_text("a\nB\nc\nd\n")
+        (git_repo / "b.bin").write_bytes(b"bin\0ary2")
+        git("mv", "old.txt", "new name.txt")
+        git("add", "-A")
+        expected_files = get_staged_files()
+        expected_status = get_staged_status()
+
+        with (
+            patch("gac.repo_snapshot.run_git_command", wraps=__import__("gac.git").git.run_git_command) as spy,
+            patch("gac.repo_snapshot.subprocess.Popen", wraps=subprocess.Popen) as popen_spy,
+        ):
+            snapshot = get_repo_snapshot()
+
+        assert spy.call_count == 1
+        assert [c.args[0][1] for c in popen_spy.call_args_list] == ["rev-parse", "diff", "check-attr"]
+        assert os.path.realpath(snapshot.repo_root) == os.path.realpath(git_repo)
+        assert snapshot.files == expected_files
+        assert snapshot.status == expected_status
+        assert snapshot.rename_mappings == {"new name.txt": "old.txt"}
+        assert snapshot.patch.startswith("diff --git a/b.bin b/b.bin")
+        assert "+B" in snapshot.patch
+        assert "2 insertions(+), 1 deletion(-)" in snapshot.stat
+
+    def test_memoized_until_index_changes(self, git_repo):
+        (git_repo / "f1.txt").write_text("changed\n")
+        git("add", "f1.txt")
+
+        first = get_repo_snapshot()
+        assert get_repo_snapshot() is first
+        assert peek_repo_snapshot() is first
+
+        (git_repo / "new.txt").write_text("new\n")
+        git("add", "new.txt")
+
+        assert peek_repo_snapshot() is None
+        assert "new.txt" in get_repo_snapshot().files
+
+    def test_commit_invalidates_snapshot(self, git_repo):
+        (git_repo / "f1.txt").write_text("changed\n")
+        git("add", "f1.txt")
+        assert get_repo_snapshot().files == ["f1.txt"]
+
+        git("commit", "-m", "change")
+
+        assert get_repo_snapshot().files == []
+
+    def test_get_staged_files_reuses_snapshot(self, git_repo):
+        (git_repo / "f1.txt").write_text("changed\n")
+        git("add", "f1.txt")
+        get_repo_snapshot()
+
+        with patch("gac.git.run_git_command") as mock_run:
+            assert get_staged_files() == ["f1.txt"]
+        mock_run.assert_not_called()
+
+    def test_large_patch_is_not_buffered(self, git_repo):
+        (git_repo / "f1.txt").write_text("".join(f"line {i}\n" for i in range(100)))
+        git("add", "f1.txt")
+
+        with patch("gac.repo_snapshot.Utility.MAX_BUFFERED_DIFF_LINES", 10):
+            snapshot = get_repo_snapshot()
+
+        assert snapshot.patch is None
+        assert snapshot.files == ["f1.txt"]
+        assert snapshot.changed_lines == 103
+
+    def test_gitattributes_flagged_files_are_summarized(self, git_repo, monkeypatch):
+        (git_repo / ".gitattributes").write_text(
+            "gen/** linguist-generated\nvendor/** linguist-vendored=true\nnotes.txt gac-ignore\n"
+        )
+        (git_repo / "gen").mkdir()
+        (git_repo / "gen" / "api_pb2.py").write_text("GENERATED = 1\n")
+        (git_repo / "vendor").mkdir()
+        (git_repo / "vendor" / "lib.js").write_text("var bundled = 1;\n")
+        (git_repo / "notes.txt").write_text("private notes\n")
+        (git_repo / "f1.txt").write_text("a\nB\nc\n")
+        (git_repo / "z.txt").write_text("last\n")
+        git("add", "-A")
+        # Attribute lookups and pathspecs are relative to the repository root
+        monkeypatch.chdir(git_repo / "gen")
+
+        snapshot = get_repo_snapshot()
+
+        assert snapshot.flagged == {
+            "gen/api_pb2.py": "linguist-generated",
+            "notes.txt": "gac-ignore",
+            "vendor/lib.js": "linguist-vendored",
+        }
+        assert snapshot.files == [".gitattributes", "f1.txt", "gen/api_pb2.py", "notes.txt", "vendor/lib.js", "z.txt"]
+        assert "+B" in snapshot.patch
+        for body in ("GENERATED", "bundled", "private notes"):
+            assert body not in snapshot.patch
+        assert (
+            "diff --git a/gen/api_pb2.py b/gen/api_pb2.py\n"
+            "[Generated file change (linguist-generated, new file, +1/-0 lines)]\n"
+        ) in snapshot.patch
+        assert "[Vendored file change (linguist-vendored, new file, +1/-0 lines)]" in snapshot.patch
+        headers = [line for line in snapshot.patch.splitlines() if line.startswith("diff --git ")]
+        assert [header.split(" b/")[-1] for header in headers] == snapshot.files
+
+    def test_hung_check_attr_leaves_files_unflagged(self, git_repo, monkeypatch):
+        from gac import git_attributes
+
+        (git_repo / ".gitattributes").write_text("gen.py linguist-generated\n")
+        (git_repo / "gen.py").write_text("GENERATED = 1\n")
+        git("add", "-A")
+        run = subprocess.run
+
+        def hang_check_attr(command, **kwargs):
+            if command[:2] == ["git", "check-attr"]:
+                return run(["sleep", "30"], **{**kwargs, "input": None})
+            return run(command, **kwargs)
+
+        monkeypatch.setattr(git_attributes, "_CHECK_ATTR_TIMEOUT", 0.2)
+        monkeypatch.setattr(git_attributes.subprocess, "run", hang_check_attr)
+
+        snapshot = get_repo_snapshot()
+
+        assert snapshot.flagged == {}
+        assert "+GENERATED = 1" in snapshot.patch
+
+    @pytest.mark.parametrize("buffered_lines", [50000, 1], ids=["buffered", "streamed"])
+    def test_flagged_files_are_scanned_for_secrets(self, git_repo, monkeypatch, buffered_lines):
+        from gac.constants import Utility
+        from gac.git_state_validator import GitStateValidator
+
+        (git_repo / ".gitattributes").write_text("vendor/** linguist-vendored\n")
+        (git_repo / "vendor").mkdir()
+        (git_repo / "vendor" / "settings.py").write_text('AWS_ACCESS_KEY_ID = "AKIAZ7Q4MXR2KJ8PLW3N"\n')
+        (git_repo / "f1.txt").write_text("a\nB\nc\n")
+        git("add", "-A")
+        monkeypatch.setattr(Utility, "MAX_BUFFERED_DIFF_LINES", buffered_lines)
+
+        git_state = GitStateValidator({}).get_git_state(model="openai:gpt-4o-mini", quiet=True)
+
+        assert git_state is not None
+        assert [(s.file_path, s.line_number) for s in git_state.secrets] == [("vendor/settings.py", 1)]
+        assert "AKIAZ7Q4MXR2KJ8PLW3N" not in git_state.diff
+        assert "[Vendored file change (linguist-vendored, new file, +1/-0 lines)]" in git_state.diff
+
+    def test_hung_diff_is_killed_at_the_deadline(self, git_repo, monkeypatch):
+        from gac import repo_snapshot
+
+        popen = subprocess.Popen
+        hung = []
+
+        def hang_staged_diff(command, **kwargs):
+            if command[:2] != ["git", "diff"]:
+                return popen(command, **kwargs)
+            hung.append(popen(["sleep", "30"], **kwargs))
+            return hung[-1]
+
+        monkeypatch.setattr(repo_snapshot, "_STAGED_DIFF_TIMEOUT", 0.2)
+        monkeypatch.setattr(subprocess, "Popen", hang_staged_diff)
+
+        with pytest.raises(GitError, match="timed out"):
+            get_repo_snapshot()
+
+        assert hung[0].returncode is not None
+
+    def test_invalidate_forces_rebuild(self, git_repo):
+        first = get_repo_snapshot()
+        invalidate_repo_snapshot()
+        assert get_repo_snapshot() is not first
+
+    def test_not_a_repo_raises(self, tmp_path):
+        cwd = os.getcwd()
+        os.chdir(tmp_path)
+        try:
+            with pytest.raises(GitError, match="Not in a git repository"):
+                get_repo_snapshot()
+        finally:
+            os.chdir(cwd)
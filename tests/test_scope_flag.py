@@ -8,6 +8,7 @@ from click.testing import CliRunner
 from gac.cli import cli
 from gac.prompt import build_prompt
 from gac.workflow_context import CLIOptions
+from tests.git_test_utils import fake_snapshot
 
 
 class TestScopeFlag:
@@ -94,6 +95,13 @@ class TestScopeFlag:
 
         monkeypatch.setattr("gac.git.get_staged_files", mock_get_staged_files)
         monkeypatch.setattr("gac.git.get_staged_files", mock_get_staged_files)
+        monkeypatch.setattr(
+            "gac.git_state_validator.get_repo_snapshot",
+            lambda: fake_snapshot(
+                ["file1.py"],
+                patch="diff --git a/file.py b/file.py\n--- a/file.py\n+++ b/file.py\n@@ -1 +1 @@\n-old line\n+new line",
+            ),
+        )
 
         monkeypatch.setattr("rich.console.Console.print", lambda self, *a, **kw: None)
         # To prevent actual logging calls from interfering or printing during tests
@@ -286,7 +294,7 @@ class TestScopeIntegration:
 
         # Also mock get_staged_status
         monkeypatch.setattr("gac.git.get_staged_status", lambda: "M file1.py")
-        monkeypatch.setattr("gac.git_state_validator.get_staged_status", lambda: "M file1.py")
+        monkeypatch.setattr("gac.git_state_validator.get_repo_snapshot", lambda: fake_snapshot(["file1.py"]))
 
         monkeypatch.setattr("click.confirm", lambda *args, **kwargs: True)
 
@@ -0,0 +1,43 @@
+"""Tests for the JSON state files kept under .git/gac."""
+
+from __future__ import annotations
+
+import json
+import os
+
+from gac.state_files import gac_state_path, load_json_state, store_json_state
+
+
+def test_store_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "gac" / "state.json")
+
+    assert store_json_state(path, {"a": 1, "b": [2, 3]}) is True
+    assert load_json_state(path) == {"a": 1, "b": [2, 3]}
+    assert os.listdir(tmp_path / "gac") == ["state.json"]
+
+
+def test_missing_corrupt_or_non_object_files_load_empty(tmp_path):
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    listing = tmp_path / "list.json"
+    listing.write_text(json.dumps([1, 2]))
+
+    assert load_json_state(str(tmp_path / "missing.json")) == {}
+    assert load_json_state(str(corrupt)) == {}
+    assert load_json_state(str(listing)) == {}
+
+
+def test_failed_write_keeps_old_file_and_removes_temporary_file(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text('{"old": true}')
+
+    assert store_json_state(str(path), {"value": object()}) is False
+    assert json.loads(path.read_text()) == {"old": True}
+    assert os.listdir(tmp_path) == ["state.json"]
+
+
+def test_state_path_outside_repository(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+
+    assert gac_state_path("state.json") is None
@@ -1,14 +1,20 @@
 """Tests for core stats operations: load, save, record_commit, summary, reset, atomic save."""
 
 import json
+import os
+import subprocess
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 from gac.stats import (
     GACStats,
     find_model_key,
+    get_current_project_name,
     get_stats_summary,
+    invalidate_project_name_cache,
     load_stats,
     record_commit,
     record_gac,
@@ -527,3 +533,45 @@ class TestResetModelStats:
                 # Data should be unchanged
                 loaded = load_stats()
                 assert "model-a" in loaded["models"]
+
+
+class TestCurrentProjectName:
+    @pytest.fixture()
+    def repo(self, tmp_path):
+        cwd = os.getcwd()
+        root = tmp_path / "my-project"
+        root.mkdir()
+        os.chdir(root)
+        subprocess.run(["git", "init"], check=True, capture_output=True)
+        invalidate_project_name_cache()
+        yield root
+        invalidate_project_name_cache()
+        os.chdir(cwd)
+
+    def test_resolved_once_per_repo(self, repo):
+        subprocess.run(["git", "remote", "add", "origin", "git@github.com:me/remote-name.git"], check=True)
+        with patch("gac.stats.store.subprocess.run", wraps=subprocess.run) as run:
+            assert get_current_project_name() == "remote-name"
+            assert get_current_project_name() == "remote-name"
+            (repo / "sub").mkdir()
+            os.chdir(repo / "sub")
+            assert get_current_project_name() == "remote-name"
+
+        # rev-parse + remote get-url, then rev-parse for the new cwd only
+        assert [c.args[0][1] for c in run.call_args_list] == ["rev-parse", "remote", "rev-parse"]
+
+    def test_config_change_invalidates(self, repo):
+        assert get_current_project_name() == "my-project"
+
+        subprocess.run(["git", "remote", "add", "origin", "https://example.com/org/renamed.git"], check=True)
+
+        assert get_current_project_name() == "renamed"
+
+    def test_outside_repo(self, tmp_path):
+        cwd = os.getcwd()
+        os.chdir(tmp_path)
+        try:
+            with patch.dict(os.environ, {"GIT_CEILING_DIRECTORIES": str(tmp_path.parent)}):
+                assert get_current_project_name() is None
+        finally:
+            os.chdir(cwd)
@@ -18,6 +18,7 @@ from gac.cli import cli
 from gac.git import GitCommandResult
 from gac.mcp.models import CommitRequest, CommitResult
 from gac.mcp.server import gac_commit
+from tests.git_test_utils import fake_snapshot
 
 
 @pytest.fixture
@@ -68,6 +69,10 @@ def base_cli_mocks(monkeypatch):
     monkeypatch.setattr("gac.git.run_git_command", mock_run_git_command)
 
     monkeypatch.setattr("gac.git.get_staged_files", lambda existing_only=False: ["file.py"])
+    monkeypatch.setattr(
+        "gac.git_state_validator.get_repo_snapshot",
+        lambda: fake_snapshot(["file.py"], patch="diff --git a/file.py b/file.py\n+New line"),
+    )
 
     monkeypatch.setattr("gac.main.clean_commit_message", lambda msg, **kwargs: msg)
     monkeypatch.setattr("click.confirm", lambda *args, **kwargs: True)
@@ -219,8 +224,8 @@ class TestGroupedWorkflowRecordsTokens:
             lambda existing_only=False: ["a.py", "b.py"],
         )
         monkeypatch.setattr(
-            "gac.grouped_commit_executor.detect_rename_mappings",
-            lambda diff: {},
+            "gac.grouped_commit_executor.get_repo_snapshot",
+            lambda: fake_snapshot(["a.py", "b.py"]),
         )
         monkeypatch.setattr(
             "gac.grouped_commit_executor.execute_commit",
@@ -246,7 +251,7 @@ class TestGroupedWorkflowRecordsTokens:
             result=result,
             dry_run=False,
             push=False,
-            no_verify=True,
+            no_verify=False,
             hook_timeout=120,
             model="anthropic:claude-haiku-4-5",
         )
@@ -6,6 +6,7 @@ import pytest
 from click.testing import CliRunner
 
 from gac.cli import cli
+from tests.git_test_utils import fake_snapshot
 
 
 class TestTokenUsageDisplay:
@@ -64,6 +65,10 @@ class TestTokenUsageDisplay:
 
         monkeypatch.setattr("gac.git.get_staged_files", mock_get_staged_files)
         monkeypatch.setattr("gac.git.get_staged_files", mock_get_staged_files)
+        monkeypatch.setattr(
+            "gac.git_state_validator.get_repo_snapshot",
+            lambda: fake_snapshot(["file.py"], patch="diff --git a/file.py b/file.py\n+New line"),
+        )
 
         # Mock clean_commit_message to return the message as-is
         monkeypatch.setattr("gac.main.clean_commit_message", lambda msg, **kwargs: msg)
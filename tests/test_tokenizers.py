@@ -0,0 +1,111 @@
+"""Tests for gac.tokenizers."""
+
+import base64
+from unittest.mock import patch
+
+import pytest
+
+from gac import tokenizers
+from gac.ai_utils import count_tokens
+from gac.tokenizers import BPETokenizer, HeuristicTokenizer, count_text_tokens, encoding_for_model, get_tokenizer
+
+MERGES = [b"he", b"ll", b"hell", b" w", b"or", b" wor", b"ld", b" world"]
+
+
+def write_ranks(path):
+    tokens = [bytes([i]) for i in range(256)] + MERGES
+    path.write_text("".join(f"{base64.b64encode(token).decode()} {rank}\n" for rank, token in enumerate(tokens)))
+
+
+@pytest.fixture
+def tokenizer_dir(tmp_path, monkeypatch):
+    write_ranks(tmp_path / "o200k_base.tiktoken")
+    monkeypatch.setenv("GAC_TOKENIZER_DIR", str(tmp_path))
+    tokenizers._load_encoding.cache_clear()
+    yield tmp_path
+    tokenizers._load_encoding.cache_clear()
+
+
+class TestBPETokenizer:
+    def test_merges_by_rank(self, tmp_path):
+        write_ranks(tmp_path / "test.tiktoken")
+        tokenizer = BPETokenizer.from_file(tmp_path / "test.tiktoken")
+        assert tokenizer.name == "test"
+        # "hel" + "lo": "he"/"ll" merge first, then "hell"; " world" is a single token
+        assert tokenizer.count("hello") == 2
+        assert tokenizer.count("hello world") == 3
+
+    def test_unmerged_bytes_count_individually(self, tmp_path):
+        write_ranks(tmp_path / "test.tiktoken")
+        tokenizer = BPETokenizer.from_file(tmp_path / "test.tiktoken")
+        assert tokenizer.count("日本") == 6
+
+    def test_piece_cache_keeps_recently_used_pieces(self, tmp_path, monkeypatch):
+        write_ranks(tmp_path / "test.tiktoken")
+        monkeypatch.setattr(tokenizers, "_PIECE_CACHE_SIZE", 2)
+        tokenizer = BPETokenizer.from_file(tmp_path / "test.tiktoken")
+        for piece in (b"ab", b"cd", b"ab", b"ef"):
+            tokenizer._piece_count(piece)
+
+        with patch.object(tokenizer, "_merge_count", side_effect=AssertionError("evicted")):
+            assert tokenizer._piece_count(b"ab") == 2
+            with pytest.raises(AssertionError):
+                tokenizer._piece_count(b"cd")
+
+    def test_malformed_file(self, tmp_path):
+        (tmp_path / "bad.tiktoken").write_text("not-a-rank-line\n")
+        with pytest.raises(ValueError):
+            BPETokenizer.from_file(tmp_path / "bad.tiktoken")
+
+
+class TestEncodingForModel:
+    @pytest.mark.parametrize(
+        "model, expected",
+        [
+            ("openai:gpt-4o-mini", "o200k_base"),
+            ("openrouter:openai/gpt-5", "o200k_base"),
+            ("o3-mini", "o200k_base"),
+            ("gpt-4-turbo", "cl100k_base"),
+            ("anthropic:claude-sonnet-4", None),
+        ],
+    )
+    def test_families(self, model, expected):
+        assert encoding_for_model(model) == expected
+
+
+class TestCountTextTokens:
+    def test_uses_local_vocabulary(self, tokenizer_dir):
+        assert get_tokenizer("openai:gpt-4o").exact
+        assert count_tokens("hello world", "gpt-4o") == 3
+
+    def test_heuristic_for_unknown_model(self, tokenizer_dir):
+        assert isinstance(get_tokenizer("claude-sonnet-4"), HeuristicTokenizer)
+        assert count_tokens("hello world", "claude-sonnet-4") == 3
+        assert count_tokens("a", "claude-sonnet-4") == 1
+
+    def test_heuristic_when_file_missing(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("GAC_TOKENIZER_DIR", str(tmp_path))
+        tokenizers._load_encoding.cache_clear()
+        assert isinstance(get_tokenizer("gpt-4o"), HeuristicTokenizer)
+        assert count_tokens("x" * 34, "gpt-4o") == 10
+
+    def test_unreadable_file_falls_back(self, tmp_path, monkeypatch):
+        (tmp_path / "cl100k_base.tiktoken").write_text("garbage\n")
+        monkeypatch.setenv("GAC_TOKENIZER_DIR", str(tmp_path))
+        tokenizers._load_encoding.cache_clear()
+        assert isinstance(get_tokenizer("gpt-4"), HeuristicTokenizer)
+
+    def test_empty_text(self, tokenizer_dir):
+        assert count_text_tokens("", "gpt-4o") == 0
+
+    def test_long_texts_cached_by_content(self, tokenizer_dir):
+        text = "hello world " * 100
+        tokenizer = get_tokenizer("gpt-4o")
+        first = count_text_tokens(text, "gpt-4o")
+        with patch.object(tokenizer, "count", side_effect=AssertionError("not cached")):
+            assert count_text_tokens(text, "gpt-4o") == first
+
+    def test_very_long_texts_are_estimated(self, tokenizer_dir):
+        text = "hello world " * (tokenizers.MAX_EXACT_LENGTH // 12 + 1)
+        with patch.object(tokenizers, "get_tokenizer", side_effect=AssertionError("encoded")):
+            assert count_text_tokens(text, "gpt-4o") == round(len(text) / tokenizers.CHARS_PER_TOKEN)
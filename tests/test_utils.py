@@ -11,7 +11,6 @@ from gac.utils import (
     get_safe_encodings,
     print_message,
     run_subprocess,
-    run_subprocess_with_encoding,
     setup_logging,
 )
 
@@ -132,48 +131,33 @@ class TestEncodingFunctions:
         assert encodings[0] == "utf-8"
         assert "UTF-8" in encodings
 
-    def test_run_subprocess_with_encoding_success(self):
-        """Test successful subprocess call with specific encoding."""
+    def test_run_subprocess_encoding_fallback_success(self):
+        """Test that non-UTF-8 output is decoded with a fallback encoding from a single run."""
 
         class MockResult:
             def __init__(self):
                 self.returncode = 0
-                self.stdout = "test output"
-                self.stderr = ""
+                self.stdout = "测试 output".encode("gbk")
+                self.stderr = b""
 
-        with mock.patch("subprocess.run", return_value=MockResult()):
-            result = run_subprocess_with_encoding(["echo", "test"], encoding="utf-8")
-            assert result == "test output"
-
-    def test_run_subprocess_with_encoding_unicode_error(self):
-        """Test handling of UnicodeDecodeError."""
-
-        with mock.patch("subprocess.run", side_effect=UnicodeError("encoding error")):
-            with pytest.raises(UnicodeError):
-                run_subprocess_with_encoding(["fail"], encoding="utf-8")
+        with mock.patch("subprocess.run", return_value=MockResult()) as mock_run:
+            with mock.patch("gac.utils.get_safe_encodings", return_value=["utf-8", "cp936"]):
+                result = run_subprocess(["echo", "test"])
+                assert result == "测试 output"
+                mock_run.assert_called_once()
 
-    def test_run_subprocess_encoding_fallback_success(self):
-        """Test successful encoding fallback."""
+    def test_run_subprocess_decodes_mixed_encodings_per_line(self):
+        """Test that a legacy-encoded line does not garble the UTF-8 lines around it."""
 
         class MockResult:
             def __init__(self):
                 self.returncode = 0
-                self.stdout = "test output"
-                self.stderr = ""
-
-        def mock_run(*args, **kwargs):
-            encoding = kwargs.get("encoding", "utf-8")
-            if encoding == "utf-8":
-                raise UnicodeError("UTF-8 failed")
-            elif encoding == "cp936":
-                return MockResult()
-            else:
-                raise UnicodeError("Other encoding failed")
+                self.stdout = "+中文\n".encode() + b"+caf\xe9\n" + "+ok ✓".encode()
+                self.stderr = b""
 
-        with mock.patch("subprocess.run", side_effect=mock_run):
-            with mock.patch("gac.utils.get_safe_encodings", return_value=["utf-8", "cp936"]):
-                result = run_subprocess(["echo", "test"])
-                assert result == "test output"
+        with mock.patch("subprocess.run", return_value=MockResult()):
+            with mock.patch("gac.utils.get_safe_encodings", return_value=["utf-8", "latin-1"]):
+                assert run_subprocess(["git", "diff"]) == "+中文\n+café\n+ok ✓"
 
     def test_run_subprocess_encoding_fallback_all_fail(self):
         """Test when all encodings fail."""
@@ -316,54 +300,6 @@ class TestEditCommitMessageInplace:
 class TestRunSubprocessEdgeCases:
     """Test edge cases for subprocess functions."""
 
-    def test_run_subprocess_with_encoding_timeout_error(self):
-        """Test timeout handling in run_subprocess_with_encoding."""
-        import subprocess as sp
-
-        with mock.patch("subprocess.run", side_effect=sp.TimeoutExpired("test", 30)):
-            with mock.patch("gac.utils.logger") as mock_logger:
-                with pytest.raises(GacError) as exc_info:
-                    run_subprocess_with_encoding(["sleep", "30"], encoding="utf-8")
-
-                assert "Command timed out" in str(exc_info.value)
-                mock_logger.error.assert_called()
-
-    def test_run_subprocess_with_encoding_calledprocesserror_no_raise(self):
-        """Test CalledProcessError handling when raise_on_error=False."""
-        import subprocess as sp
-
-        with mock.patch("subprocess.run", side_effect=sp.CalledProcessError(1, ["fail"], "", "error")):
-            with mock.patch("gac.utils.logger") as mock_logger:
-                result = run_subprocess_with_encoding(["fail"], encoding="utf-8", raise_on_error=False)
-                assert result == ""
-                mock_logger.error.assert_called()
-
-    def test_run_subprocess_with_encoding_generic_exception_no_raise(self):
-        """Test generic exception handling when raise_on_error=False."""
-        with mock.patch("subprocess.run", side_effect=Exception("Generic error")):
-            with mock.patch("gac.utils.logger") as mock_logger:
-                result = run_subprocess_with_encoding(["fail"], encoding="utf-8", raise_on_error=False)
-                assert result == ""
-                mock_logger.debug.assert_called()
-
-    def test_run_subprocess_with_encoding_generic_exception_raise(self):
-        """Test generic exception handling when raise_on_error=True."""
-        with mock.patch("subprocess.run", side_effect=Exception("Generic error")):
-            with mock.patch("gac.utils.logger") as mock_logger:
-                with pytest.raises(subprocess.CalledProcessError) as exc_info:
-                    run_subprocess_with_encoding(["fail"], encoding="utf-8", raise_on_error=True)
-
-                assert "Generic error" in str(exc_info.value.stderr)
-                mock_logger.debug.assert_called()
-
-    def test_run_subprocess_with_encoding_unicode_error_rare_case(self):
-        """Test rare UnicodeError case that should be re-raised."""
-        with mock.patch("subprocess.run", side_effect=UnicodeError("Rare encoding error")):
-            with mock.patch("gac.utils.logger") as mock_logger:
-                with pytest.raises(UnicodeError):
-                    run_subprocess_with_encoding(["fail"], encoding="utf-8")
-                mock_logger.debug.assert_called()
-
     def test_run_subprocess_silent_mode(self):
         """Test subprocess execution in silent mode."""
 
@@ -380,33 +316,6 @@ class TestRunSubprocessEdgeCases:
                 # Should not log in silent mode
                 mock_logger.debug.assert_not_called()
 
-    def test_run_subprocess_with_encoding_strip_output_false(self):
-        """Test subprocess with strip_output=False."""
-
-        class MockResult:
-            def __init__(self):
-                self.returncode = 0
-                self.stdout = "test output\n"
-                self.stderr = ""
-
-        with mock.patch("subprocess.run", return_value=MockResult()):
-            result = run_subprocess_with_encoding(["echo", "test"], encoding="utf-8", strip_output=False)
-            assert result == "test output\n"
-
-    def test_run_subprocess_with_encoding_check_false(self):
-        """Test subprocess with check=False."""
-
-        class MockResult:
-            def __init__(self):
-                self.returncode = 1  # Non-zero return code
-                self.stdout = "error output"
-                self.stderr = "error message"
-
-        with mock.patch("subprocess.run", return_value=MockResult()):
-            # Should not raise when check=False and raise_on_error=False
-            result = run_subprocess_with_encoding(["fail"], encoding="utf-8", check=False, raise_on_error=False)
-            assert result == "error output"
-
     def test_run_subprocess_encoding_fallback_timeout_no_retry(self):
         """Test that timeout errors don't trigger encoding fallback."""
         import subprocess as sp
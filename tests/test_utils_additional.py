@@ -4,7 +4,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from gac.utils import get_safe_encodings, run_subprocess, run_subprocess_with_encoding
+from gac.utils import get_safe_encodings, run_subprocess
 
 
 class TestUtilsMissingCoverage:
@@ -22,43 +22,19 @@ class TestUtilsMissingCoverage:
                 assert "iso-8859-1" in encodings
                 assert encodings[0] == "utf-8"  # utf-8 is always first
 
-    @patch("subprocess.run")
-    def test_run_subprocess_with_encoding_success(self, mock_run):
-        """Test successful subprocess execution with encoding."""
-        mock_result = MagicMock()
-        mock_result.stdout = "success output"
-        mock_result.returncode = 0
-        mock_run.return_value = mock_result
-
-        result = run_subprocess_with_encoding(["echo", "hello"], "utf-8")
-
-        assert result == "success output"
-        mock_run.assert_called_once_with(
-            ["echo", "hello"],
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=60,
-            encoding="utf-8",
-            errors="replace",
-        )
-
     @patch("gac.utils.get_safe_encodings")
     def test_run_subprocess_with_multiple_encodings(self, mock_encodings):
         """Test subprocess with multiple encoding attempts using run_subprocess."""
         mock_encodings.return_value = ["utf-8", "iso-8859-1"]
 
         with patch("subprocess.run") as mock_run:
-            # First attempt fails with UnicodeError
-            mock_run.side_effect = [
-                UnicodeError("decode failed"),
-                MagicMock(returncode=0, stdout="final output", stderr=""),
-            ]
+            # Output is not valid UTF-8; it is decoded in memory, not by re-running
+            mock_run.return_value = MagicMock(returncode=0, stdout=b"final \xe9 output", stderr=b"")
 
             result = run_subprocess(["echo", "test"], raise_on_error=False)
 
-            assert result == "final output"
-            assert mock_run.call_count == 2
+            assert result == "final é output"
+            assert mock_run.call_count == 1
 
     @patch("gac.utils.get_safe_encodings")
     @patch("subprocess.run")
@@ -81,21 +81,15 @@ class TestRunSubprocessEdgeCases:
                 run_subprocess(["test"])
 
     def test_run_subprocess_with_encoding_fallback(self):
-        """When utf-8 fails with UnicodeError, try next encoding."""
+        """When output is not valid utf-8, decode with the next encoding without re-running."""
         from gac.utils import run_subprocess
 
-        call_count = 0
-
-        def mock_run_side_effect(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1 and kwargs.get("encoding") == "utf-8":
-                raise UnicodeError("bad utf-8")
-            return MagicMock(returncode=0, stdout="success", stderr="")
-
-        with patch("gac.utils.subprocess.run", side_effect=mock_run_side_effect):
-            result = run_subprocess(["test"])
-            assert result == "success"
+        with patch("gac.utils.get_safe_encodings", return_value=["utf-8", "latin-1"]):
+            with patch("gac.utils.subprocess.run") as mock_run:
+                mock_run.return_value = MagicMock(returncode=0, stdout=b"succ\xe8s", stderr=b"")
+                result = run_subprocess(["test"])
+                assert result == "succès"
+                mock_run.assert_called_once()
 
     def test_run_subprocess_all_encodings_fail(self):
         """When all encodings fail with UnicodeError, raise CalledProcessError."""
@@ -105,33 +99,6 @@ class TestRunSubprocessEdgeCases:
             with pytest.raises(subprocess.CalledProcessError):
                 run_subprocess(["test"])
 
-    def test_run_subprocess_with_encoding_check_false(self):
-        """When check=False and returncode != 0, don't raise by default."""
-        from gac.utils import run_subprocess_with_encoding
-
-        with patch("gac.utils.subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(returncode=1, stdout="output", stderr="error")
-            result = run_subprocess_with_encoding(["test"], "utf-8", check=False, raise_on_error=False)
-            assert result == "output"
-
-    def test_run_subprocess_with_encoding_strip_false(self):
-        """When strip_output=False, don't strip whitespace."""
-        from gac.utils import run_subprocess_with_encoding
-
-        with patch("gac.utils.subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(returncode=0, stdout="  output  ", stderr="")
-            result = run_subprocess_with_encoding(["test"], "utf-8", strip_output=False)
-            assert result == "  output  "
-
-    def test_run_subprocess_with_encoding_silent(self):
-        """When silent=True, don't log debug messages."""
-        from gac.utils import run_subprocess_with_encoding
-
-        with patch("gac.utils.subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(returncode=0, stdout="output", stderr="")
-            result = run_subprocess_with_encoding(["test"], "utf-8", silent=True)
-            assert result == "output"
-
 
 class TestSSLVerification:
     """Test SSL verification utility functions."""
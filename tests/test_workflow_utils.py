@@ -140,8 +140,8 @@ def test_restore_staging():
         mock_git.assert_any_call(["add", "file3.py"])
 
 
-def test_restore_staging_reapplies_diff(tmp_path):
-    """Test that staged diff is reapplied when provided."""
+def test_restore_staging_reads_saved_tree():
+    """Test that a saved tree is read back instead of re-adding files."""
     calls = []
 
     def fake_run_git(cmd):
@@ -149,11 +149,9 @@ def test_restore_staging_reapplies_diff(tmp_path):
         return GitCommandResult.ok("")
 
     with patch("gac.git.run_git_command", side_effect=fake_run_git):
-        restore_staging(["file1.py"], "dummy diff")
+        restore_staging(["file1.py"], "4b825dc642cb6eb9a060e54bf8d69288fbee4904")
 
-    assert calls[0] == ["reset", "HEAD"]
-    assert calls[1][0:2] == ["apply", "--cached"]
-    assert len(calls) == 2
+    assert calls == [["read-tree", "-m", "4b825dc642cb6eb9a060e54bf8d69288fbee4904"]]
 
 
 def test_restore_staging_handles_errors():
@@ -175,21 +173,21 @@ def test_restore_staging_handles_errors():
         mock_logger.assert_called_once()
 
 
-def test_restore_staging_diff_failure_falls_back():
-    """Test that restore_staging falls back to file add when diff apply fails."""
+def test_restore_staging_tree_failure_falls_back():
+    """Test that restore_staging falls back to file add when the tree cannot be read."""
 
     def git_side_effect(cmd):
-        if cmd[:2] == ["apply", "--cached"]:
-            raise Exception("apply failed")
+        if cmd[0] == "read-tree":
+            raise Exception("read-tree failed")
         return GitCommandResult.ok("")
 
     with (
         patch("gac.git.run_git_command", side_effect=git_side_effect) as mock_git,
         patch("gac.workflow_utils.logger.warning") as mock_logger,
     ):
-        restore_staging(["file1.py"], "dummy diff")
+        restore_staging(["file1.py"], "deadbeef")
 
-        # reset + apply + add
+        # read-tree + reset + add
         assert mock_git.call_count == 3
         mock_logger.assert_called_once()
 